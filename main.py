@@ -6,12 +6,13 @@ Orchestre :
 - Bridge API pywebview (TrackerAPI)
 - Fenêtre dashboard pywebview (hide on close)
 - Icône system tray pystray (daemon thread)
-- Boucle polling MUMU 100ms (daemon thread)
+- Boucle polling MUMU, cadence par état (daemon thread)
 
 Threading :
 - Thread principal : webview.start()   — boucle GUI pywebview
 - Thread daemon   : tray.run()         — boucle GUI pystray
-- Thread daemon   : polling.start()    — polling MUMU 100ms
+- Thread daemon   : frame_bus.start()  — capture écran unique, cadence du polling
+- Thread daemon   : polling.start()    — polling MUMU (0.1–0.5s selon l'état)
 """
 import logging
 import logging.handlers
@@ -26,9 +27,13 @@ import webview
 
 from tracker.api.api import TrackerAPI
 from tracker.backup import backup_db
-from tracker.capture.detector import CombatState, PollingLoop, StateDetector
+from tracker.capture.bus import FrameBus, grab_latest_image, grab_latest_rois
+from tracker.capture.detector import (STATE_INTERVALS, CombatState, ModelWatcher,
+                                      PollingLoop, StateDetector)
 from tracker.capture.ocr import OcrPipeline
-from tracker.capture.screen import capture_region_pil
+from tracker.capture.ocr_pool import OcrWorkerPool
+from tracker.capture.ocr_reader import get_reader_registry
+from tracker.capture.stats_screen import StatsScreenDetector, wait_for_stats
 from tracker.db.database import DatabaseManager
 from tracker.paths import get_data_dir
 from tracker.tray import TrayManager
@@ -71,8 +76,14 @@ def setup_logging(log_path: str = None) -> None:
     root.addHandler(console_handler)
 
 
-def main() -> None:
-    """Démarre l'application pokemon-tcg-tracker."""
+def main(source=None) -> None:
+    """Démarre l'application pokemon-tcg-tracker.
+
+    Args:
+        source: CaptureSource à utiliser (tracker.capture.source). Par défaut :
+                PTCG_SOURCE (dossier de captures ou session .ptcgrec) si défini,
+                sinon l'écran réel (mss + fenêtre MuMu).
+    """
     setup_logging()
     logger.info("Démarrage de pokemon-tcg-tracker")
 
@@ -125,7 +136,26 @@ def main() -> None:
     tray_thread.start()
 
     # OCR pipeline + état partagé (Story 3.3)
-    ocr_pipeline = OcrPipeline()
+    # Reader EasyOCR unique, chargé en arrière-plan dès le démarrage (pas au
+    # premier écran de pré-combat) et partagé avec les diagnostics de l'API.
+    ocr_registry = get_reader_registry()
+    _ocr_cfg = api._config.get_all()
+    if _ocr_cfg.get("torch_threads"):
+        # Réglage global au processus : vaut pour le CNN d'état ET EasyOCR
+        try:
+            import torch  # noqa: PLC0415
+            torch.set_num_threads(int(_ocr_cfg["torch_threads"]))
+        except ImportError:
+            pass
+    if _ocr_cfg.get("ocr_workers"):
+        # Modèles EasyOCR dans des processus workers (crops via mémoire partagée)
+        _workers, _inflight = int(_ocr_cfg["ocr_workers"]), _ocr_cfg.get("ocr_max_inflight")
+        ocr_registry.set_factory(lambda: OcrWorkerPool(
+            _workers, _inflight, on_error=ocr_registry.report_error).start())
+    ocr_registry.warm_up()
+    api.set_ocr_registry(ocr_registry)
+    ocr_pipeline = OcrPipeline(registry=ocr_registry)
+    stats_detector = StatsScreenDetector()
 
     import difflib as _difflib
 
@@ -139,6 +169,43 @@ def main() -> None:
 
     ocr_state = _OcrState()
 
+    # Source des frames : écran réel (fenêtre MuMu suivie par WindowTracker),
+    # ou rejeu hors ligne d'un dossier de captures / d'une session .ptcgrec
+    if source is None:
+        from tracker.capture.screen import WindowTracker  # noqa: PLC0415
+        from tracker.capture.source import make_source  # noqa: PLC0415
+        source = make_source(
+            os.environ.get("PTCG_SOURCE"),
+            config=api._config,
+            window=WindowTracker(config=api._config),
+        )
+    logger.info("Source de capture : %r", source)
+
+    # Bus de frames unique (une seule capture écran par tick, partagée par le
+    # polling, les threads OCR et le sampler). Démarré plus bas avec le polling.
+    # En IN_COMBAT, seules les ROIs des analyseurs de combat sont capturées
+    # (+ une frame complète toutes les 0.5 s pour le classifieur d'état).
+    combat_rois = ocr_pipeline.rois_for_state(CombatState.IN_COMBAT)
+    frame_bus = FrameBus(
+        config=api._config,
+        interval=lambda: polling.current_interval,
+        should_capture=lambda: polling.mumu_detected,
+        source=source,
+        rois=lambda: combat_rois if polling.state == CombatState.IN_COMBAT else None,
+    )
+    api.set_frame_bus(frame_bus)
+
+    # Mode enregistrement (PTCG_RECORD=1 ou chemin .ptcgrec) : frames du bus +
+    # transitions d'état, rejouables hors ligne (tracker.capture.recording)
+    recorder = None
+    _record = os.environ.get("PTCG_RECORD")
+    if _record:
+        from tracker.capture.recording import SessionRecorder, default_recording_path  # noqa: PLC0415
+        recorder = SessionRecorder(
+            default_recording_path() if _record == "1" else _record,
+            meta={"region": source.region()},
+        )
+
     def _find_deck_id_by_name(deck_name: str, energy_type: str, fallback_id) -> int | None:
         """Cherche le deck_id pour une détection de deck.
 
@@ -170,8 +237,13 @@ def main() -> None:
         return fallback_id
 
     def on_state_changed(prev_state, new_state):
+        if recorder is not None:
+            recorder.transition(
+                prev_state, new_state,
+                outcome=polling.last_outcome if new_state == CombatState.END_SCREEN else None,
+            )
         config_data = api._config.get_all()
-        region = config_data.get("mumu_region")
+        region = source.region()
         if not region:
             return
         if new_state == CombatState.PRE_QUEUE:
@@ -183,7 +255,7 @@ def main() -> None:
                 import time as _time
                 # Réessayer jusqu'à 8x (toutes les 1.5s) jusqu'à obtenir deck + type + énergie
                 for attempt in range(8):
-                    _img = capture_region_pil(region)
+                    _img = grab_latest_image(frame_bus, region)
                     if _img:
                         data = ocr_pipeline.extract_prequeue_data(_img)
                         deck_name   = data.get("deck_name", "?")
@@ -217,15 +289,15 @@ def main() -> None:
             ocr_state.opponent_energy_type = "?"
             stop_event = threading.Event()
             ocr_state._energy_stop = stop_event
+            # Les analyseurs de combat ne lisent que quelques zones (combat_rois) :
+            # frames ROI du bus, ou capturées seules si le bus n'a rien de frais.
 
             def _detect_opponent_energy(stop_ev):
                 import time as _time
                 import os as _os
                 from collections import Counter as _Counter
                 from tracker.paths import get_data_dir as _get_data_dir  # noqa: PLC0415
-                _region = config_data.get("mumu_region")
-                if not _region:
-                    return
+                _region = region
                 # Attendre la fin des animations d'entrée en combat
                 _time.sleep(10)
                 if stop_ev.is_set():
@@ -235,7 +307,7 @@ def main() -> None:
                 last_energy = None
                 deadline = _time.monotonic() + 90  # fenêtre étendue à 90s
                 while _time.monotonic() < deadline and not stop_ev.is_set():
-                    _img = capture_region_pil(_region)
+                    _img = grab_latest_rois(frame_bus, _region, combat_rois)
                     if _img is not None:
                         energy = ocr_pipeline.extract_opponent_energy(_img)
                         score = getattr(ocr_pipeline, "_last_energy_score", 0.0)
@@ -285,13 +357,11 @@ def main() -> None:
 
             def _detect_opponent_pokemon(stop_ev):
                 import time as _time
-                _region = config_data.get("mumu_region")
-                if not _region:
-                    return
+                _region = region
                 _time.sleep(5)  # attendre fin animations
                 seen = []
                 while not stop_ev.is_set():
-                    _img = capture_region_pil(_region)
+                    _img = grab_latest_rois(frame_bus, _region, combat_rois)
                     if _img is not None:
                         name = ocr_pipeline.extract_active_opponent_pokemon(_img)
                         if name and name not in seen:
@@ -316,14 +386,13 @@ def main() -> None:
             # L'écran de stats n'apparaît qu'après le clic sur "Touchez pour continuer"
             # On lance la capture dans un thread séparé pour ne pas bloquer le polling
             def _capture_end_screen(region, deck_id):
-                import time as _time
-
                 # Snapshot du résultat ML au moment de la transition (avant tout OCR)
                 ml_outcome = polling.last_outcome
 
                 try:
                     # Capture immédiate pour récupérer le résultat (écran carte star)
-                    first_img = capture_region_pil(region)
+                    end_frames = frame_bus.subscribe()
+                    first_img = grab_latest_image(frame_bus, region)
                     try:
                         first_data = ocr_pipeline.extract_end_screen_data(first_img) if first_img else {}
                     except Exception as _e:
@@ -331,27 +400,26 @@ def main() -> None:
                         first_data = {}
                     result_backup = first_data.get("result", "?")
 
-                    # Polling jusqu'à l'écran de stats (max 90s, 0.15s entre captures)
-                    # Sleep APRES la capture pour ne pas rater un écran fugace
-                    match_data = None
-                    stats_img = None
-                    for _attempt in range(600):
-                        img = capture_region_pil(region)
-                        if img is None:
-                            _time.sleep(0.15)
-                            continue
-                        try:
-                            data = ocr_pipeline.extract_end_screen_data(img)
-                        except Exception:
-                            continue
-                        raw = data.get("raw_ocr_data", "")
-                        on_stats_screen = "tours jou" in raw.lower() or "ordre d" in raw.lower()
-                        if data.get("turns_played") is not None or on_stats_screen:
-                            match_data = data
-                            stats_img = img
-                            logger.info("Stats trouvées à la tentative %d", _attempt + 1)
-                            break
-                        _time.sleep(0.15)
+                    # Polling jusqu'à l'écran de stats (90 s d'horloge au plus,
+                    # 0.15 s entre captures)
+                    # Chaque passe prend la frame la plus récente du bus (jamais
+                    # une frame déjà analysée) — pas de capture supplémentaire.
+                    # L'OCR complet ne tourne que si le détecteur voit le tableau
+                    # de stats (+ une OCR de secours après 5 s de refus,
+                    # puis 10 s, 20 s…).
+                    def _next_image():
+                        frame = end_frames.next(timeout=1.0)
+                        return frame.image if frame is not None else grab_latest_image(
+                            frame_bus, region, max_age=0.0)
+
+                    waited = wait_for_stats(
+                        _next_image, ocr_pipeline.extract_end_screen_data, stats_detector,
+                    )
+                    match_data = waited["data"]
+                    stats_img = waited["image"]
+                    if match_data is not None:
+                        logger.info("Stats trouvées à la tentative %d (%d OCR, %d frames ignorées)",
+                                    waited["attempt"], waited["ocr_calls"], waited["skipped"])
 
                     if match_data is None:
                         logger.warning("Écran de stats non trouvé après 90s — utilisation données partielles")
@@ -407,6 +475,8 @@ def main() -> None:
                     match_data.get("opponent_points"),
                     match_data.get("damage_dealt"),
                 )
+                logger.info("Cache OCR: %s — détecteur stats: %s",
+                            ocr_pipeline.cache_stats, stats_detector.stats)
 
                 # Debug: sauvegarder l'image de stats pour analyse
                 try:
@@ -485,9 +555,21 @@ def main() -> None:
 
     threading.Thread(target=_auto_reconnect_window, name="auto-reconnect", daemon=True).start()
 
-    # Polling MUMU 100ms + détection états combat (Stories 3.1, 3.2)
-    detector = StateDetector()
-    polling = PollingLoop(interval=0.1, config=api._config, detector=detector)
+    # Polling MUMU (cadence par état) + détection états combat (Stories 3.1, 3.2)
+    from tracker.capture.change import FrameChangeGate  # noqa: PLC0415
+    # Écran statique (menus, attente adversaire) : label précédent réutilisé
+    cfg = api._config.get_all()
+    detector = StateDetector(gate=FrameChangeGate(), backend=cfg.get("state_backend", "svm"))
+    # Préchargement du modèle + rechargement à chaud après réentraînement
+    model_watcher = ModelWatcher(detector)
+    threading.Thread(target=model_watcher.start, name="model-watcher", daemon=True).start()
+    engine = None
+    if cfg.get("state_engine") == "filter":
+        from tracker.capture.temporal import StateFilter  # noqa: PLC0415
+        engine = StateFilter()
+    polling = PollingLoop(interval=0.1, config=api._config, detector=detector,
+                          bus=frame_bus, source=source, intervals=STATE_INTERVALS,
+                          engine=engine)
     polling.set_callbacks(
         on_mumu_detected=tray.set_state_active,
         on_mumu_lost=tray.set_state_inactive,
@@ -496,6 +578,10 @@ def main() -> None:
     api.set_polling(polling)
     polling_thread = threading.Thread(target=polling.start, name="polling", daemon=True)
     polling_thread.start()
+    bus_thread = threading.Thread(target=frame_bus.start, name="frame-bus", daemon=True)
+    bus_thread.start()
+    if recorder is not None:
+        recorder.start(frame_bus)
 
     # Background update check (Story 5.1)
     def _check_update():
@@ -521,8 +607,16 @@ def main() -> None:
 
     # Boucle GUI pywebview (bloquant jusqu'à window.destroy())
     webview.start()
+    logger.info("Frame gate (classifications évitées) : %s", detector.gate_stats)
+    model_watcher.stop()
+    ocr_registry.close()
+    if recorder is not None:
+        recorder.close()
+    source.close()
     logger.info("Application fermée proprement")
 
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # workers OCR (ocr_pool) en exécutable gelé
     main()
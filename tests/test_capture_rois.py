@@ -0,0 +1,128 @@
+"""Tests capture sous-région — ROIs en union / rectangles séparés, RoiFrames.
+
+Le faux mss génère des pixels dépendant des coordonnées écran absolues :
+une ROI capturée directement doit être identique au crop de la frame complète.
+"""
+import numpy as np
+import pytest
+
+from tracker.capture.frame import Frame, RoiFrames, crop_named_roi, crop_rois
+from tracker.capture.screen import CaptureSession
+
+REGION = {"x": 100, "y": 50, "width": 200, "height": 300}
+ROIS = {
+    "energy": (0.10, 0.10, 0.18, 0.16),
+    "name":   (0.38, 0.26, 0.88, 0.34),
+}
+
+
+class CoordShot:
+    def __init__(self, monitor):
+        w, h = monitor["width"], monitor["height"]
+        ys, xs = np.mgrid[monitor["top"]:monitor["top"] + h, monitor["left"]:monitor["left"] + w]
+        arr = np.stack([xs % 256, ys % 256, (xs + ys) % 256, np.full_like(xs, 255)], axis=2)
+        self.size = (w, h)
+        self.raw = bytearray(arr.astype(np.uint8).tobytes())
+
+
+class CoordSct:
+    def __init__(self):
+        self.monitors = []
+
+    def grab(self, monitor):
+        self.monitors.append(monitor)
+        return CoordShot(monitor)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session():
+    sct = CoordSct()
+    s = CaptureSession(factory=lambda: sct)
+    s.sct = sct
+    return s
+
+
+def full_frame(session):
+    return session.grab_frame(REGION)
+
+
+@pytest.mark.parametrize("mode", ["union", "separate", "auto"])
+def test_grab_rois_matches_crop_of_full_frame(session, mode):
+    expected = crop_rois(full_frame(session), ROIS)
+    got = session.grab_rois(REGION, ROIS, mode=mode)
+    assert isinstance(got, RoiFrames)
+    assert got.size == (200, 300)
+    for name in ROIS:
+        np.testing.assert_array_equal(got[name].rgb, expected[name].rgb)
+
+
+def test_union_mode_grabs_once_separate_once_per_roi(session):
+    session.grab_rois(REGION, ROIS, mode="union")
+    assert len(session.sct.monitors) == 1
+    session.sct.monitors.clear()
+    session.grab_rois(REGION, ROIS, mode="separate")
+    assert len(session.sct.monitors) == 2
+
+
+def test_union_grab_is_smaller_than_full_region(session):
+    session.grab_rois(REGION, ROIS, mode="union")
+    m = session.sct.monitors[0]
+    assert m["width"] * m["height"] < REGION["width"] * REGION["height"] / 4
+
+
+def test_grab_rois_empty_returns_none(session):
+    assert session.grab_rois(REGION, {}) is None
+
+
+def test_crop_named_roi_accepts_full_image_or_roi_frames(session):
+    frame = full_frame(session)
+    rois = crop_rois(frame, ROIS)
+    np.testing.assert_array_equal(crop_named_roi(frame, ROIS, "energy").rgb,
+                                  crop_named_roi(rois, ROIS, "energy").rgb)
+
+
+def test_ocr_energy_reads_same_zone_from_roi_frames(session, monkeypatch):
+    from tracker.capture.ocr import OcrPipeline
+
+    ocr = OcrPipeline(reader=object())
+    ocr._energy_sigs = {"Feu": {"hist": np.ones(36) / 36}}
+    monkeypatch.setattr(ocr, "_save_opponent_energy_debug", lambda *a: None)
+    seen = []
+    monkeypatch.setattr(ocr, "_compute_hue_hist",
+                        lambda arr, alpha_mask=None: seen.append(arr.copy()) or {"hist": np.zeros(36)})
+
+    frame = full_frame(session)
+    rois = session.grab_rois(REGION, ocr.rois_for_state("in_combat"))
+    ocr.extract_opponent_energy(frame)
+    ocr.extract_opponent_energy(rois)
+    np.testing.assert_array_equal(seen[0], seen[1])
+
+
+def test_rois_for_state():
+    from tracker.capture.detector import CombatState
+    from tracker.capture.ocr import OcrPipeline
+
+    ocr = OcrPipeline(reader=object())
+    assert set(ocr.rois_for_state(CombatState.IN_COMBAT)) == {
+        "opponent_energy", "active_opp", "active_opp_hi"}
+    assert ocr.rois_for_state(CombatState.IDLE) == {}
+
+
+def test_grab_latest_rois_slices_bus_frame(monkeypatch):
+    from tracker.capture import screen
+    from tracker.capture.bus import FrameBus, grab_latest_rois
+
+    called = []
+    monkeypatch.setattr(screen, "capture_rois", lambda *a, **k: called.append(a))
+    bus = FrameBus()
+    frame = Frame(np.zeros((300, 200, 4), dtype=np.uint8))
+    bus.publish(frame)
+    rois = grab_latest_rois(bus, REGION, ROIS)
+    assert np.shares_memory(rois["energy"].bgra, frame.bgra)
+    assert called == []
+
+    grab_latest_rois(None, REGION, ROIS)
+    assert len(called) == 1
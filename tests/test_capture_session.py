@@ -0,0 +1,131 @@
+"""Tests CaptureSession — réutilisation du handle mss, reconnexion, threads.
+
+mss est remplacé par une factory factice — pas de vrai écran.
+"""
+import threading
+
+from tracker.capture.screen import CaptureSession
+
+REGION = {"x": 0, "y": 0, "width": 4, "height": 2}
+
+
+class FakeShot:
+    def __init__(self, w, h):
+        self.size = (w, h)
+        self.bgra = bytes([10, 20, 30, 255]) * (w * h)
+
+
+class FakeSct:
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.grabs = 0
+        self.closed = False
+
+    def grab(self, monitor):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("DC invalide")
+        self.grabs += 1
+        return FakeShot(monitor["width"], monitor["height"])
+
+    def close(self):
+        self.closed = True
+
+
+def make_session(fail_first=0):
+    """Session dont les `fail_first` premiers handles échouent au premier grab."""
+    created = []
+
+    def factory():
+        sct = FakeSct(fail_times=1 if len(created) < fail_first else 0)
+        created.append(sct)
+        return sct
+
+    return CaptureSession(factory=factory), created
+
+
+def test_grab_reuses_handle_between_calls():
+    session, created = make_session()
+    for _ in range(5):
+        assert session.grab(REGION) is not None
+    assert len(created) == 1
+    assert created[0].grabs == 5
+    assert session.stats["opened"] == 1
+
+
+def test_grab_pil_converts_bgrx_to_rgb():
+    session, _ = make_session()
+    img = session.grab_pil(REGION)
+    assert img.size == (4, 2)
+    assert img.getpixel((0, 0)) == (30, 20, 10)
+
+
+def test_grab_reconnects_after_error():
+    session, created = make_session(fail_first=1)
+    shot = session.grab(REGION)
+    assert shot is not None
+    assert len(created) == 2          # handle en erreur remplacé
+    assert created[0].closed is True
+    assert session.stats["reconnects"] == 1
+
+
+def test_grab_returns_none_when_reconnect_fails():
+    session, _ = make_session(fail_first=5)
+    assert session.grab(REGION) is None
+    assert session.grab_pil(REGION) is None
+
+
+def test_one_handle_per_thread():
+    session, created = make_session()
+    session.grab(REGION)
+    grabbed, release = threading.Event(), threading.Event()
+
+    def worker():
+        session.grab(REGION)
+        grabbed.set()
+        release.wait(5)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    grabbed.wait(5)
+    assert len(created) == 2
+    assert session.stats["live_handles"] == 2
+    release.set()
+    t.join()
+
+
+def test_thread_exit_closes_its_handle():
+    session, created = make_session()
+    session.grab(REGION)
+
+    for _ in range(3):
+        t = threading.Thread(target=session.grab, args=(REGION,))
+        t.start()
+        t.join()
+
+    assert len(created) == 4
+    assert all(sct.closed for sct in created[1:])
+    assert created[0].closed is False
+    assert session.stats["live_handles"] == 1
+
+
+def test_close_releases_handles_and_session_reopens():
+    session, created = make_session()
+    session.grab(REGION)
+    session.close()
+    assert created[0].closed is True
+    assert session.stats["live_handles"] == 0
+
+    assert session.grab(REGION) is not None
+    assert len(created) == 2
+
+
+def test_capture_region_pil_uses_shared_session(monkeypatch):
+    from tracker.capture import screen
+
+    session, created = make_session()
+    monkeypatch.setattr(screen, "_session", session)
+    screen.capture_region_pil(REGION)
+    screen.capture_region_pil(REGION)
+    assert len(created) == 1
+    assert created[0].grabs == 2
@@ -0,0 +1,128 @@
+"""Tests CaptureSource — sources live / dossier PNG / replay injectées dans la pile."""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.bus import FrameBus, grab_latest_image, grab_latest_rois
+from tracker.capture.detector import CombatState, PollingLoop, StateDetector
+from tracker.capture.frame import Frame, RoiFrames
+from tracker.capture.recording import SessionRecorder
+from tracker.capture.source import (CaptureSource, DirectorySource, LiveSource,
+                                    ReplaySource, make_source)
+
+
+def write_pngs(folder, values, size=(40, 30)):
+    folder.mkdir(exist_ok=True)
+    for i, v in enumerate(values):
+        Image.new("RGB", size, (v, v, v)).save(folder / f"shot_{i:03d}.png")
+    return folder
+
+
+def first_pixel(frame):
+    return int(frame.rgb[0, 0, 0])
+
+
+def test_directory_source_reads_in_name_order(tmp_path):
+    src = DirectorySource(str(write_pngs(tmp_path / "shots", [10, 20, 30])))
+    assert src.region() == {"x": 0, "y": 0, "width": 40, "height": 30}
+    assert src.poll()
+    assert [first_pixel(src.grab()) for _ in range(3)] == [10, 20, 30]
+    assert src.grab() is None
+    assert src.poll() is None
+
+
+def test_directory_source_loop(tmp_path):
+    src = DirectorySource(str(write_pngs(tmp_path / "shots", [1, 2])), loop=True)
+    assert [first_pixel(src.grab()) for _ in range(5)] == [1, 2, 1, 2, 1]
+    assert src.poll()
+
+
+def test_directory_source_empty(tmp_path):
+    src = DirectorySource(str(tmp_path))
+    assert src.poll() is None
+    assert src.region() is None
+    assert src.grab() is None
+
+
+def test_replay_source(tmp_path):
+    path = str(tmp_path / "s.ptcgrec")
+    with SessionRecorder(path) as rec:
+        for v in (5, 6, 7):
+            rec.add_frame(Frame.from_rgb(np.full((12, 16, 3), v, dtype=np.uint8)))
+    src = ReplaySource(path)
+    assert src.region()["width"] == 16
+    assert [first_pixel(src.grab()) for _ in range(3)] == [5, 6, 7]
+    assert src.poll() is None
+    src.close()
+
+
+def test_make_source(tmp_path):
+    assert isinstance(make_source(None), LiveSource)
+    assert isinstance(make_source("live"), LiveSource)
+    assert isinstance(make_source(str(write_pngs(tmp_path / "d", [1]))), DirectorySource)
+    path = str(tmp_path / "s.ptcgrec")
+    SessionRecorder(path).close()
+    assert isinstance(make_source(path), ReplaySource)
+    with pytest.raises(ValueError):
+        make_source(str(tmp_path / "missing.png"))
+
+
+def test_incomplete_source_fails_at_instantiation():
+    class NoGrab(CaptureSource):
+        def region(self):
+            return None
+
+    with pytest.raises(TypeError):
+        NoGrab()
+
+
+def test_live_source_delegates_to_screen(monkeypatch):
+    from tracker.capture import screen
+    monkeypatch.setattr(screen, "find_mumu_window", lambda: 99)
+    monkeypatch.setattr(screen, "capture_region_frame", lambda region: ("frame", region))
+    config = MagicMock()
+    config.get_all.return_value = {"mumu_region": {"x": 1}}
+    src = LiveSource(config=config)
+    assert src.poll() == 99
+    assert src.grab() == ("frame", {"x": 1})
+    window = MagicMock()
+    window.poll.return_value = 7
+    assert LiveSource(window=window).poll() == 7
+
+
+def test_polling_loop_runs_headless_on_directory_source(tmp_path):
+    src = DirectorySource(str(write_pngs(tmp_path / "shots", [0] * 2 + [100] * 9)))
+    detector = MagicMock(spec=StateDetector)
+    detector.is_pre_queue_ranked.side_effect = lambda img: first_pixel(img) == 0
+    detector.is_in_combat.side_effect = lambda img: first_pixel(img) == 100
+    detector.is_end_screen.return_value = False
+    loop = PollingLoop(config=None, detector=detector, source=src)
+    changes = []
+    loop.set_callbacks(on_state_changed=lambda prev, new: changes.append(new))
+    for _ in range(12):
+        loop._tick()
+    assert changes == [CombatState.PRE_QUEUE, CombatState.IN_COMBAT]
+    assert not loop.mumu_detected          # source épuisée = émulateur perdu
+
+
+def test_frame_bus_publishes_from_source(tmp_path):
+    src = DirectorySource(str(write_pngs(tmp_path / "shots", [3, 4])))
+    bus = FrameBus(source=src)
+    bus._tick()
+    frame = bus.latest()
+    assert first_pixel(frame.image) == 3
+    assert frame.region == src.region()
+
+
+def test_grab_latest_offline_source_uses_last_bus_frame(tmp_path):
+    src = DirectorySource(str(write_pngs(tmp_path / "shots", [3, 4])))
+    bus = FrameBus(source=src)
+    assert grab_latest_image(bus, src.region()) is None
+    bus._tick()
+    img = grab_latest_image(bus, src.region(), max_age=0.0)
+    assert first_pixel(img) == 3
+    rois = grab_latest_rois(bus, src.region(), {"a": (0.0, 0.0, 0.5, 0.5)}, max_age=0.0)
+    assert isinstance(rois, RoiFrames) and rois["a"].size == (20, 15)
+    assert src.position == 1                # aucun grab hors bus
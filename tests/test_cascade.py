@@ -0,0 +1,108 @@
+"""Tests cascade StateDetector — étage couleur puis HOG + SVM pour les frames ambiguës."""
+import importlib.util
+import os
+import warnings
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.detector import ColorStage, StateDetector, _color_features, load_npz_model
+from tracker.capture.frame import Frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASSES = ["end_screen", "in_combat", "pre_queue"]
+
+
+def make_stage(threshold=0.9, bias=(0.0, 5.0, 0.0)):
+    """Étage couleur dont la décision ne dépend que du biais."""
+    return ColorStage(mean=np.zeros(28), scale=np.ones(28), coef=np.zeros((3, 28)),
+                      intercept=np.array(bias), classes=CLASSES, threshold=threshold)
+
+
+def make_detector(stage):
+    pipeline = MagicMock()
+    pipeline.predict.return_value = ["pre_queue"]
+    detector = StateDetector()
+    detector._model = {"pipeline": pipeline, "color_stage": stage}
+    detector._model_loaded = True
+    return detector, pipeline
+
+
+def test_color_features_same_for_frame_and_pil():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+    feats = _color_features(Frame.from_rgb(rgb))
+    assert feats.shape == (28,)
+    np.testing.assert_allclose(feats, _color_features(Image.fromarray(rgb)), rtol=1e-6)
+
+
+def test_color_stage_decides_only_when_confident():
+    label, proba = make_stage().decide(np.zeros(28))
+    assert label == "in_combat"
+    assert sum(proba.values()) == pytest.approx(1.0)
+    assert make_stage(bias=(0.0, 0.5, 0.0)).decide(np.zeros(28))[0] is None
+
+
+def test_confident_frame_skips_hog_and_svm():
+    detector, pipeline = make_detector(make_stage())
+    with patch("tracker.capture.detector._extract_features") as feats:
+        prediction = detector.classify(Frame.from_rgb(np.zeros((48, 64, 3), np.uint8)))
+    assert prediction.label == "in_combat"
+    assert prediction.proba["in_combat"] > 0.9
+    feats.assert_not_called()
+    pipeline.predict.assert_not_called()
+    assert detector.cascade_stats["stage1"] == 1
+
+
+def test_ambiguous_frame_falls_through_to_svm():
+    detector, pipeline = make_detector(make_stage(bias=(0.0, 0.5, 0.0)))
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)):
+        assert detector.predict(Frame.from_rgb(np.zeros((48, 64, 3), np.uint8))) == "pre_queue"
+    stats = detector.cascade_stats
+    assert (stats["stage1"], stats["stage2"], stats["stage1_ratio"]) == (0, 1, 0.0)
+    assert stats["mean_ms"] >= 0.0
+
+
+def test_model_without_color_stage_uses_svm_only():
+    detector, pipeline = make_detector(None)
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)):
+        detector.predict(object())
+    assert detector.cascade_stats["stage2"] == 1
+
+
+def load_trainer():
+    spec = importlib.util.spec_from_file_location(
+        "train_classifier", os.path.join(ROOT, "tools", "train_classifier.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_trained_color_stage_round_trips_through_npz(tmp_path):
+    pytest.importorskip("sklearn")
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    trainer = load_trainer()
+    rng = np.random.default_rng(0)
+    y = np.array(CLASSES)[rng.integers(0, 3, 150)]
+    X_color = rng.normal(size=(150, 28))
+    for i, label in enumerate(CLASSES):
+        X_color[y == label, i] += 4.0
+    params, cv_proba, classes = trainer.train_color_stage(X_color, y)
+    assert 0.5 <= float(params["threshold"]) < 1.0
+    assert cv_proba.shape == (150, 3)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        pipeline = Pipeline([("scaler", StandardScaler()),
+                             ("svm", SVC(probability=True))]).fit(X_color, y)
+        trainer.export_npz({"pipeline": pipeline, "color_stage": params,
+                            "win_lose_rule": {}}, str(tmp_path / "m.npz"))
+    stage = ColorStage.from_dict(load_npz_model(str(tmp_path / "m.npz"))["color_stage"])
+    decided = [stage.decide(x)[0] for x in X_color]
+    accepted = [(d, t) for d, t in zip(decided, y) if d is not None]
+    assert len(accepted) > 100
+    assert all(d == t for d, t in accepted)
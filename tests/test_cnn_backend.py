@@ -0,0 +1,98 @@
+"""Tests backend CNN de StateDetector (tracker.capture.cnn) et du mode cnn du trainer."""
+import importlib.util
+import os
+import pickle
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture import detector as detector_mod
+from tracker.capture.cnn import CNN_INPUT, cnn_input, cnn_input_batch
+from tracker.capture.detector import StateDetector
+from tracker.capture.frame import Frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASSES = ["end_screen", "in_combat", "pre_queue"]
+
+
+def load_trainer():
+    spec = importlib.util.spec_from_file_location(
+        "train_classifier", os.path.join(ROOT, "tools", "train_classifier.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_cnn_input_shape_and_range():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(360, 480, 3), dtype=np.uint8)
+    x = cnn_input(Image.fromarray(rgb))
+    assert x.shape == (3, CNN_INPUT[1], CNN_INPUT[0]) and x.dtype == np.float32
+    assert 0.0 <= x.min() and x.max() <= 1.0
+    np.testing.assert_array_equal(cnn_input(Frame.from_rgb(rgb)), x)
+    assert cnn_input_batch([]).shape == (0, 3, 72, 96)
+    assert cnn_input_batch([Image.fromarray(rgb)] * 2).shape == (2, 3, 72, 96)
+
+
+def test_cnn_backend_falls_back_to_svm(tmp_path, monkeypatch):
+    pkl = tmp_path / "state_classifier.pkl"
+    with open(pkl, "wb") as f:
+        pickle.dump({"pipeline": "svm"}, f)
+    monkeypatch.setattr(detector_mod, "_MODEL_PATH", str(pkl))
+    monkeypatch.setattr(detector_mod, "_CNN_MODEL_PATH", str(tmp_path / "absent.pt"))
+    monkeypatch.setattr(detector_mod, "_CNN_MODEL_PATH_LEGACY", str(tmp_path / "absent2.pt"))
+    detector = StateDetector(backend="cnn")
+    assert detector.is_model_available()
+    assert detector._load_model()["pipeline"] == "svm"
+
+
+def test_split_holdout_is_stratified_and_reproducible():
+    trainer = load_trainer()
+    samples = [(f"{label}/{i}.png", label) for label in CLASSES for i in range(10)]
+    train_set, holdout = trainer.split_holdout(samples, fraction=0.2, seed=1)
+    assert len(holdout) == 6 and len(train_set) == 24
+    assert sorted({label for _, label in holdout}) == CLASSES
+    assert not set(train_set) & set(holdout)
+    assert trainer.split_holdout(samples, fraction=0.2, seed=1) == (train_set, holdout)
+
+
+# ---------------------------------------------------------------------------
+# torch
+# ---------------------------------------------------------------------------
+
+def test_network_and_classifier():
+    pytest.importorskip("torch")
+    from tracker.capture.cnn import CnnClassifier, build_network
+
+    clf = CnnClassifier(build_network(3), CLASSES)
+    X = np.random.default_rng(0).random((4, 3, 72, 96), dtype=np.float32)
+    proba = clf.predict_proba(X)
+    assert proba.shape == (4, 3)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, atol=1e-6)
+    assert set(clf.predict(X)) <= set(CLASSES)
+
+
+def test_checkpoint_round_trip_and_detector(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    from tracker.capture.cnn import CnnClassifier, build_network, save_cnn_model
+
+    network = build_network(3).eval()
+    path = tmp_path / "state_classifier_cnn.pt"
+    rule = {"roi": [0.0, 0.0, 1.0, 0.1], "brightness_threshold": 100.0}
+    save_cnn_model(str(path), network, CLASSES, {"win_lose_rule": rule, "holdout": ["a/b.png"]})
+
+    model = detector_mod.load_model_file(str(path))
+    assert model["backend"] == "cnn" and model["holdout"] == ["a/b.png"]
+    assert model["win_lose_rule"]["roi"] == (0.0, 0.0, 1.0, 0.1)
+    img = Image.new("RGB", (480, 360), (40, 90, 200))
+    X = cnn_input_batch([img])
+    np.testing.assert_allclose(model["pipeline"].predict_proba(X),
+                               CnnClassifier(network, CLASSES).predict_proba(X), atol=1e-6)
+
+    monkeypatch.setattr(detector_mod, "_CNN_MODEL_PATH", str(path))
+    detector = StateDetector(backend="cnn")
+    prediction = detector.classify(img)
+    assert prediction.label in CLASSES
+    assert prediction.proba[prediction.label] == max(prediction.proba.values())
+    classes, proba = detector.predict_proba_batch([img, img])
+    assert classes == CLASSES and proba.shape == (2, 3)
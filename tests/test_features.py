@@ -0,0 +1,135 @@
+"""Tests tracker.capture.features — parité avec skimage.feature.hog et l'ancienne extraction."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture import features
+from tracker.capture.frame import Frame
+
+
+def _rgb_to_hsv(arr):
+    """Conversion HSV historique (masques successifs r, g, b)."""
+    r, g, b = arr[:, :, 0] / 255., arr[:, :, 1] / 255., arr[:, :, 2] / 255.
+    cmax = np.maximum(np.maximum(r, g), b)
+    delta = cmax - np.minimum(np.minimum(r, g), b)
+    h = np.zeros_like(r)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(cmax > 0, delta / cmax, 0.)
+    for mask, value in (((delta > 0) & (cmax == r), lambda m: ((g[m] - b[m]) / delta[m]) % 6),
+                        ((delta > 0) & (cmax == g), lambda m: (b[m] - r[m]) / delta[m] + 2),
+                        ((delta > 0) & (cmax == b), lambda m: (r[m] - g[m]) / delta[m] + 4)):
+        h[mask] = value(mask)
+    return np.stack([h / 6., s, cmax], axis=2)
+
+
+def make_images():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, size=(360, 480, 3), dtype=np.uint8)
+    blocks = np.repeat(np.repeat(rng.integers(0, 256, size=(36, 48, 3), dtype=np.uint8),
+                                 10, axis=0), 10, axis=1)
+    posterized = noise // 64 * 64     # nombreux gradients à 0°, 45°, 90° (bords de bins)
+    flat = np.full((360, 480, 3), 90, dtype=np.uint8)
+    return [noise, blocks, posterized, flat]
+
+
+def reference_features(img):
+    """Extraction historique : skimage.feature.hog + np.histogram."""
+    skimage_feature = pytest.importorskip("skimage.feature")
+    img_rgb = img.convert("RGB").resize(features.IMG_SIZE, Image.LANCZOS)
+    gray = np.asarray(img_rgb.convert("L"), dtype=np.uint8)
+    hog = skimage_feature.hog(gray, orientations=8, pixels_per_cell=(16, 16),
+                              cells_per_block=(2, 2), feature_vector=True)
+    hsv = _rgb_to_hsv(np.asarray(img_rgb, dtype=np.uint8))
+    hists = []
+    for ch in range(3):
+        h, _ = np.histogram(hsv[:, :, ch], bins=16, range=(0, 1))
+        hists.append(h / (h.sum() + 1e-6))
+    return np.concatenate([hog, np.concatenate(hists)])
+
+
+@pytest.mark.parametrize("index", range(4))
+def test_hog_matches_skimage(index):
+    skimage_feature = pytest.importorskip("skimage.feature")
+    gray = np.asarray(Image.fromarray(make_images()[index]).convert("L")
+                      .resize(features.IMG_SIZE, Image.LANCZOS))
+    reference = skimage_feature.hog(gray, 8, (16, 16), (2, 2))
+    assert features.hog(gray).shape == reference.shape == (1728,)
+    np.testing.assert_allclose(features.hog(gray), reference, atol=1e-6)
+    np.testing.assert_allclose(features.hog(gray, np.float32), reference, atol=1e-5)
+
+
+@pytest.mark.parametrize("index", range(4))
+def test_extract_features_matches_reference(index):
+    img = Image.fromarray(make_images()[index])
+    reference = reference_features(img)
+    np.testing.assert_allclose(features.extract_features(img), reference, atol=1e-6)
+    np.testing.assert_allclose(features.extract_features(img, dtype=np.float32), reference,
+                               atol=1e-5)
+
+
+def test_hsv_histograms_match_numpy_histogram():
+    arr = make_images()[0][:120, :160]
+    hsv = _rgb_to_hsv(arr)
+    expected = np.concatenate([np.histogram(hsv[:, :, c], bins=16, range=(0, 1))[0]
+                               for c in range(3)]) / (arr.shape[0] * arr.shape[1] + 1e-6)
+    np.testing.assert_array_equal(features.rgb_to_hsv(arr), hsv)
+    np.testing.assert_allclose(features.hsv_histograms(arr), expected, rtol=1e-12)
+    np.testing.assert_allclose(features.hsv_histograms(arr, np.float32), expected, rtol=1e-6)
+
+
+def test_frame_and_pil_give_same_features():
+    rgb = make_images()[1]
+    np.testing.assert_array_equal(features.extract_features(Frame.from_rgb(rgb)),
+                                  features.extract_features(Image.fromarray(rgb)))
+
+
+def test_cheaper_resampling_stays_close():
+    img = Image.fromarray(make_images()[1])
+    exact = features.extract_features(img)
+    for kwargs in ({"resample": "box"}, {"reducing_gap": 2.0}):
+        cheap = features.extract_features(img, **kwargs)
+        assert cheap.shape == exact.shape
+        assert np.corrcoef(cheap, exact)[0, 1] > 0.75
+
+
+def test_hog_rejects_non_uint8():
+    with pytest.raises(ValueError):
+        features.hog(np.zeros((120, 160), dtype=np.float64))
+
+
+def test_batch_matches_single_frames():
+    images = [Image.fromarray(a) for a in make_images()]
+    batch = features.extract_features_batch(images)
+    assert batch.shape == (4, features.feature_length())
+    for img, row in zip(images, batch):
+        np.testing.assert_array_equal(row, features.extract_features(img))
+    assert features.extract_features_batch([]).shape == (0, features.feature_length())
+
+
+def test_feature_version_tracks_extraction_settings():
+    assert features.FEATURE_VERSION == features.feature_version()
+    assert len(features.FEATURE_VERSION) == 12
+    assert features.feature_version(resample="box") != features.FEATURE_VERSION
+    assert features.feature_version(reducing_gap=2.0) != features.FEATURE_VERSION
+
+
+@pytest.mark.parametrize("model, accepted", [
+    ({"feature_version": features.FEATURE_VERSION}, True),
+    ({}, True),                                                   # modèle antérieur
+    ({"feature_version": "0123456789ab"}, False),
+    ({"feature_version": features.feature_version(resample="box"),
+      "feature_params": {"resample": "box"}}, True),
+    ({"feature_params": {"resample": "box"}}, False),
+    ({"feature_version": "x", "feature_params": {"unknown": 1}}, False),
+])
+def test_detector_checks_feature_version(model, accepted, tmp_path, monkeypatch):
+    import pickle
+
+    from tracker.capture import detector as detector_mod
+
+    path = tmp_path / "state_classifier.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(dict(model, pipeline="svm"), f)
+    monkeypatch.setattr(detector_mod, "_MODEL_PATH", str(path))
+    loaded = detector_mod.StateDetector()._load_model()
+    assert (loaded is not None) is accepted
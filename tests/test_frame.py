@@ -0,0 +1,106 @@
+"""Tests Frame — vue NumPy zero-copy sur le buffer mss, crops en tranches, PIL paresseux."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.frame import Frame, crop_rgb_array, rgb_array, to_pil_rgb
+
+
+class FakeShot:
+    def __init__(self, w, h, seed=0):
+        rng = np.random.default_rng(seed)
+        self.size = (w, h)
+        self.raw = bytearray(rng.integers(0, 256, size=w * h * 4, dtype=np.uint8).tobytes())
+
+    @property
+    def bgra(self):
+        return bytes(self.raw)
+
+
+def pil_reference(shot):
+    """Ancien chemin : Image.frombytes(..., 'BGRX')."""
+    return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+
+def test_from_mss_is_a_view_on_the_raw_buffer():
+    shot = FakeShot(8, 4)
+    frame = Frame.from_mss(shot)
+    assert frame.size == (8, 4)
+    shot.raw[0] = 123
+    assert frame.bgra[0, 0, 0] == 123
+
+
+def test_rgb_matches_pil_bgrx_decoding():
+    shot = FakeShot(16, 9)
+    frame = Frame.from_mss(shot)
+    np.testing.assert_array_equal(frame.rgb, np.asarray(pil_reference(shot)))
+    np.testing.assert_array_equal(np.array(frame), np.asarray(pil_reference(shot)))
+
+
+def test_crop_is_a_slice_without_copy():
+    frame = Frame.from_mss(FakeShot(20, 10))
+    sub = frame.crop((2, 3, 12, 8))
+    assert sub.size == (10, 5)
+    assert np.shares_memory(sub.bgra, frame.bgra)
+
+
+def test_crop_matches_pil_crop():
+    shot = FakeShot(20, 10)
+    ref = pil_reference(shot).crop((2, 3, 12, 8))
+    np.testing.assert_array_equal(Frame.from_mss(shot).crop((2, 3, 12, 8)).rgb, np.asarray(ref))
+
+
+def test_crop_is_clamped_to_frame_bounds():
+    frame = Frame.from_mss(FakeShot(10, 10))
+    assert frame.crop((-5, -5, 50, 50)).size == (10, 10)
+    assert frame.crop((8, 8, 2, 2)).size == (0, 0)
+
+
+def test_to_pil_is_lazy_and_cached():
+    shot = FakeShot(6, 6)
+    frame = Frame.from_mss(shot)
+    assert frame._pil is None
+    pil = frame.to_pil()
+    assert frame.to_pil() is pil
+    np.testing.assert_array_equal(np.asarray(pil), np.asarray(pil_reference(shot)))
+
+
+def test_pil_compat_methods():
+    frame = Frame.from_mss(FakeShot(8, 6))
+    assert frame.convert("L").mode == "L"
+    assert frame.resize((4, 3)).size == (4, 3)
+    assert frame.width == 8 and frame.height == 6
+
+
+def test_from_pil_roundtrip():
+    img = Image.new("RGB", (5, 4), (10, 20, 30))
+    frame = Frame.from_pil(img)
+    assert tuple(frame.rgb[0, 0]) == (10, 20, 30)
+
+
+def test_helpers_accept_frame_and_pil():
+    shot = FakeShot(12, 8)
+    frame, pil = Frame.from_mss(shot), pil_reference(shot)
+    np.testing.assert_array_equal(rgb_array(frame), rgb_array(pil))
+    np.testing.assert_array_equal(crop_rgb_array(frame, (1, 2, 7, 6)),
+                                  crop_rgb_array(pil, (1, 2, 7, 6)))
+    assert to_pil_rgb(frame) is frame.to_pil()
+
+
+def test_deck_strip_detection_same_result_for_frame_and_pil():
+    from tracker.capture.ocr import OcrPipeline
+
+    rgb = np.full((200, 100, 3), 40, dtype=np.uint8)
+    rgb[110:125, 20:80] = (220, 40, 30)   # bande rouge saturée (zone 2)
+    pil = Image.fromarray(rgb)
+    ocr = OcrPipeline(reader=object())
+    assert ocr._find_deck_card_strip(Frame.from_rgb(rgb)) == ocr._find_deck_card_strip(pil)
+
+
+def test_extract_features_same_for_frame_and_pil():
+    pytest.importorskip("skimage")
+    from tracker.capture.detector import _extract_features
+
+    shot = FakeShot(320, 240, seed=3)
+    np.testing.assert_array_equal(_extract_features(Frame.from_mss(shot)),
+                                  _extract_features(pil_reference(shot)))
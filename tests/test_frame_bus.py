@@ -0,0 +1,168 @@
+"""Tests FrameBus — producteur unique, ring buffer borné, abonnés.
+
+Tests sur _tick()/publish() directement — un seul test avec thread réel
+pour wait_next().
+"""
+import threading
+import time
+from unittest.mock import MagicMock
+
+from tracker.capture.bus import FrameBus, grab_latest_image
+from tracker.capture.detector import CombatState, PollingLoop, StateDetector
+
+REGION = {"x": 0, "y": 0, "width": 800, "height": 600}
+
+
+def make_config(region=REGION):
+    config = MagicMock()
+    config.get_all.return_value = {"mumu_region": region}
+    return config
+
+
+def test_tick_captures_once_per_tick_and_publishes():
+    grab = MagicMock(return_value="img")
+    bus = FrameBus(config=make_config(), grab=grab)
+    bus._tick()
+    bus._tick()
+    assert grab.call_count == 2
+    frame = bus.latest()
+    assert frame.seq == 2
+    assert frame.image == "img"
+    assert frame.region == REGION
+
+
+def test_tick_skips_when_should_capture_false():
+    grab = MagicMock(return_value="img")
+    bus = FrameBus(config=make_config(), grab=grab, should_capture=lambda: False)
+    bus._tick()
+    grab.assert_not_called()
+    assert bus.latest() is None
+
+
+def test_tick_skips_without_region():
+    grab = MagicMock()
+    bus = FrameBus(config=make_config(region=None), grab=grab)
+    bus._tick()
+    grab.assert_not_called()
+
+
+def test_ring_buffer_is_bounded():
+    bus = FrameBus(capacity=3)
+    for i in range(10):
+        bus.publish(i)
+    frames = bus.frames()
+    assert [f.image for f in frames] == [7, 8, 9]
+
+
+def test_latest_respects_max_age():
+    bus = FrameBus()
+    bus.publish("old", timestamp=time.monotonic() - 5)
+    assert bus.latest(max_age=1.0) is None
+    assert bus.latest().image == "old"
+
+
+def test_subscriber_does_not_return_same_frame_twice():
+    bus = FrameBus()
+    sub = bus.subscribe()
+    bus.publish("a")
+    assert sub.latest().image == "a"
+    assert sub.latest() is None
+    bus.publish("b")
+    assert sub.latest().image == "b"
+
+
+def test_subscribers_are_independent():
+    bus = FrameBus()
+    s1, s2 = bus.subscribe(), bus.subscribe()
+    bus.publish("a")
+    assert s1.latest().image == "a"
+    assert s2.latest().image == "a"
+
+
+def test_next_waits_for_new_frame():
+    bus = FrameBus()
+    sub = bus.subscribe()
+    bus.publish("a")
+    sub.latest()
+
+    t = threading.Timer(0.05, bus.publish, args=("b",))
+    t.start()
+    frame = sub.next(timeout=2.0)
+    t.join()
+    assert frame.image == "b"
+
+
+def test_next_times_out():
+    bus = FrameBus()
+    assert bus.subscribe().next(timeout=0.01) is None
+
+
+def test_grab_latest_image_prefers_bus(monkeypatch):
+    from tracker.capture import screen
+    direct = MagicMock(return_value="direct")
+    monkeypatch.setattr(screen, "capture_region_frame", direct)
+
+    bus = FrameBus()
+    bus.publish("from_bus")
+    assert grab_latest_image(bus, REGION) == "from_bus"
+    direct.assert_not_called()
+
+    assert grab_latest_image(FrameBus(), REGION) == "direct"
+    assert grab_latest_image(None, REGION) == "direct"
+
+
+def test_polling_loop_reads_frames_from_bus():
+    bus = FrameBus()
+    detector = MagicMock(spec=StateDetector)
+    detector.is_pre_queue_ranked.return_value = True
+    loop = PollingLoop(config=make_config(), detector=detector, bus=bus)
+    loop._mumu_detected = True
+
+    loop._detect_and_transition()          # bus vide → pas d'analyse
+    detector.is_pre_queue_ranked.assert_not_called()
+
+    bus.publish("frame")
+    loop._detect_and_transition()
+    assert loop.state == CombatState.PRE_QUEUE
+
+    detector.reset_mock()
+    loop._detect_and_transition()          # même frame → pas réanalysée
+    detector.is_pre_queue_ranked.assert_not_called()
+
+
+def test_roi_mode_grabs_rois_between_full_frames(monkeypatch):
+    from tracker.capture import bus as bus_mod
+    from tracker.capture.bus import grab_latest_rois
+    from tracker.capture.frame import Frame, RoiFrames
+    import numpy as np
+
+    now = [100.0]
+    monkeypatch.setattr(bus_mod.time, "monotonic", lambda: now[0])
+    rois = {"energy": (0.0, 0.0, 0.5, 0.5)}
+    full = MagicMock(return_value=Frame(np.zeros((600, 800, 4), dtype=np.uint8)))
+    part = MagicMock(return_value=RoiFrames((800, 600), {
+        "energy": Frame(np.zeros((300, 400, 4), dtype=np.uint8))}))
+    active = [rois]
+    bus = FrameBus(config=make_config(), grab=full, grab_rois=part,
+                   rois=lambda: active[0], full_every=0.5)
+
+    for t in (100.0, 100.1, 100.2, 100.3, 100.4):   # 1 complète puis 4 ROI
+        now[0] = t
+        bus._tick()
+    now[0] = 100.5              # nouvelle frame complète
+    bus._tick()
+    now[0] = 100.6
+    assert full.call_count == 2
+    assert part.call_count == 4
+    stats = bus.capture_stats
+    assert stats == {"full": 2, "rois": 4, "pixels": 2 * 800 * 600 + 4 * 400 * 300}
+
+    # Le classifieur ne voit que des frames complètes ; les analyseurs ROI la frame ROI
+    bus._tick()
+    assert bus.latest().full and bus.latest().seq == 6
+    assert isinstance(grab_latest_rois(bus, REGION, rois), RoiFrames)
+    assert not bus.latest(full=False).full
+
+    active[0] = None            # hors IN_COMBAT : frame complète à chaque tick
+    bus._tick()
+    assert full.call_count == 3
@@ -0,0 +1,102 @@
+"""Tests FrameChangeGate — vignette de luminance, seuil, réutilisation du label."""
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from PIL import Image
+
+from tracker.capture.change import FrameChangeGate, luma_thumbnail
+from tracker.capture.detector import StateDetector
+from tracker.capture.frame import Frame
+
+
+def make_rgb(value=80, seed=None, shape=(240, 320)):
+    if seed is None:
+        return np.full(shape + (3,), value, dtype=np.uint8)
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=shape + (3,), dtype=np.uint8)
+
+
+def test_thumbnail_same_for_frame_and_pil():
+    rgb = make_rgb(seed=1)
+    np.testing.assert_allclose(luma_thumbnail(Frame.from_rgb(rgb)),
+                               luma_thumbnail(Image.fromarray(rgb)))
+    assert luma_thumbnail(Frame.from_rgb(rgb)).shape == (24, 32)
+
+
+def test_identical_frames_are_skipped():
+    gate = FrameChangeGate()
+    frame = Frame.from_rgb(make_rgb(seed=2))
+    assert gate.check(frame) is True
+    assert gate.check(frame) is False
+    assert gate.check(Frame.from_rgb(make_rgb(seed=2))) is False
+    assert gate.stats["skipped"] == 2
+    assert gate.stats["skip_ratio"] == 2 / 3
+
+
+def test_small_noise_below_threshold_is_skipped():
+    gate = FrameChangeGate(threshold=1.5)
+    base = make_rgb(100)
+    gate.check(Frame.from_rgb(base))
+    noisy = base.copy()
+    noisy[10:20, 10:20] = 255          # petite zone (curseur, timer…)
+    assert gate.check(Frame.from_rgb(noisy)) is False
+
+
+def test_scene_change_is_classified():
+    gate = FrameChangeGate()
+    gate.check(Frame.from_rgb(make_rgb(40)))
+    assert gate.check(Frame.from_rgb(make_rgb(200))) is True
+    assert gate.stats["last_diff"] > 100
+
+
+def test_drift_is_measured_against_last_classified_frame():
+    gate = FrameChangeGate(threshold=1.5, max_skips=100)
+    gate.check(Frame.from_rgb(make_rgb(100)))
+    results = [gate.check(Frame.from_rgb(make_rgb(100 + i))) for i in range(1, 4)]
+    assert results == [False, True, False]
+
+
+def test_max_skips_forces_classification():
+    gate = FrameChangeGate(max_skips=3)
+    frame = Frame.from_rgb(make_rgb(50))
+    assert [gate.check(frame) for _ in range(6)] == [True, False, False, False, True, False]
+
+
+def test_unreadable_image_counts_as_changed():
+    gate = FrameChangeGate()
+    assert gate.check(MagicMock()) is True
+    assert gate.check(MagicMock()) is True
+
+
+def make_detector(labels):
+    pipeline = MagicMock()
+    pipeline.predict.side_effect = [[label] for label in labels]
+    detector = StateDetector(gate=FrameChangeGate())
+    detector._model = {"pipeline": pipeline}
+    detector._model_loaded = True
+    return detector, pipeline
+
+
+def test_detector_reuses_label_on_static_frames():
+    detector, pipeline = make_detector(["pre_queue", "in_combat"])
+    static = make_rgb(seed=3)   # nouvelle Frame à chaque tick, même contenu
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)) as feats:
+        assert [detector.predict(Frame.from_rgb(static)) for _ in range(5)] == ["pre_queue"] * 5
+        assert feats.call_count == 1
+        assert detector.predict(Frame.from_rgb(make_rgb(seed=4))) == "in_combat"
+    assert pipeline.predict.call_count == 2
+    assert detector.gate_stats["skipped"] == 4
+
+
+def test_detector_without_gate_classifies_every_call():
+    pipeline = MagicMock()
+    pipeline.predict.return_value = ["idle"]
+    detector = StateDetector()
+    detector._model = {"pipeline": pipeline}
+    detector._model_loaded = True
+    rgb = make_rgb(seed=5)
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)):
+        for _ in range(3):
+            detector.predict(Frame.from_rgb(rgb))
+    assert pipeline.predict.call_count == 3
+    assert detector.gate_stats is None
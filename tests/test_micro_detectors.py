@@ -0,0 +1,155 @@
+"""Tests micro-détecteurs un-contre-tous (MicroDetector, StateDetector.ask, trainer)."""
+import importlib.util
+import os
+import warnings
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture import features
+from tracker.capture.detector import (CombatState, MicroDetector, PollingLoop, StateDetector,
+                                      load_model_file, load_npz_model)
+from tracker.capture.frame import Frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASSES = ["end_screen", "in_combat", "pre_queue"]
+TOP = features.ROI_CANDIDATES["top"]
+
+
+def load_trainer():
+    spec = importlib.util.spec_from_file_location(
+        "train_classifier", os.path.join(ROOT, "tools", "train_classifier.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_micro(bias, low=0.1, high=0.9):
+    """Micro-détecteur dont la probabilité ne dépend que du biais."""
+    n = 240
+    return MicroDetector(roi=TOP, mean=np.zeros(n), scale=np.ones(n), coef=np.zeros(n),
+                         intercept=np.array([bias]), low=low, high=high)
+
+
+def make_detector(micro: dict, label="in_combat"):
+    pipeline = MagicMock()
+    pipeline.predict.return_value = [label]
+    detector = StateDetector()
+    detector._model = {"pipeline": pipeline, "micro": micro}
+    detector._model_loaded = True
+    return detector, pipeline
+
+
+def test_roi_features_only_read_the_roi():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(360, 480, 3), dtype=np.uint8)
+    feats = features.roi_features(Frame.from_rgb(rgb), TOP)
+    assert feats.shape == (240,)
+    np.testing.assert_array_equal(feats, features.roi_features(Image.fromarray(rgb), TOP))
+    other = rgb.copy()
+    other[100:] = 0                                  # hors du bandeau haut (15 %)
+    np.testing.assert_array_equal(features.roi_features(Frame.from_rgb(other), TOP), feats)
+
+
+def test_micro_detector_thresholds():
+    img = Image.new("RGB", (160, 120))
+    assert make_micro(5.0).decide(img) is True
+    assert make_micro(-5.0).decide(img) is False
+    assert make_micro(0.0).decide(img) is None
+
+
+def test_ask_uses_micro_detector_without_full_model():
+    detector, pipeline = make_detector({"end_screen": make_micro(-5.0)})
+    img = Image.new("RGB", (160, 120))
+    assert not detector.is_end_screen(img)
+    assert not detector.is_end_screen(img)           # réponse mémoïsée pour la frame
+    pipeline.predict.assert_not_called()
+    assert detector.micro_stats["decided"] == 1
+
+
+def test_ask_falls_back_and_reuses_classification(monkeypatch):
+    from tracker.capture import detector as detector_mod
+    monkeypatch.setattr(detector_mod, "_extract_features", lambda img, **kw: np.zeros(4))
+    detector, pipeline = make_detector({"in_combat": make_micro(0.0),
+                                        "pre_queue": make_micro(5.0)})
+    img = Image.new("RGB", (160, 120))
+    assert detector.is_in_combat(img)                 # ambigu : modèle complet
+    assert not detector.is_pre_queue_ranked(img)      # classification déjà faite : cohérent
+    assert pipeline.predict.call_count == 1
+    assert detector.micro_stats == pytest.approx(
+        {"decided": 0, "fallback": 1, "decided_ratio": 0.0,
+         "mean_ms": detector.micro_stats["mean_ms"]})
+
+
+def test_gate_skips_micro_detectors_on_unchanged_frame():
+    from tracker.capture.change import FrameChangeGate
+
+    micro = make_micro(-5.0)
+    calls = []
+    decide = micro.decide
+    micro.decide = lambda img: calls.append(img) or decide(img)
+    detector, pipeline = make_detector({"end_screen": micro})
+    detector._gate = FrameChangeGate()
+
+    assert not detector.is_end_screen(Image.new("RGB", (160, 120)))
+    assert not detector.is_end_screen(Image.new("RGB", (160, 120)))    # même écran, autre frame
+    assert len(calls) == 1
+    assert detector.gate_stats["skipped"] == 1
+
+    assert not detector.is_end_screen(Image.new("RGB", (160, 120), (255, 255, 255)))
+    assert len(calls) == 2                                              # frame changée
+    pipeline.predict.assert_not_called()
+
+
+def test_polling_idle_only_asks_pre_queue():
+    detector, pipeline = make_detector({"pre_queue": make_micro(-5.0),
+                                        "in_combat": make_micro(0.0),
+                                        "end_screen": make_micro(0.0)})
+    loop = PollingLoop(detector=detector)
+    img = Image.new("RGB", (160, 120))
+    assert loop._compute_next_state(CombatState.IDLE, img) == (CombatState.IDLE, None)
+    pipeline.predict.assert_not_called()
+
+
+def test_model_without_micro_detectors_uses_full_model(monkeypatch):
+    from tracker.capture import detector as detector_mod
+    monkeypatch.setattr(detector_mod, "_extract_features", lambda img, **kw: np.zeros(4))
+    detector, pipeline = make_detector({}, label="end_screen")
+    assert detector.is_end_screen(Image.new("RGB", (160, 120)))
+    assert detector.micro_stats["decided"] == detector.micro_stats["fallback"] == 0
+
+
+def test_trained_micro_detectors_round_trip_through_npz(tmp_path):
+    pytest.importorskip("sklearn")
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    trainer = load_trainer()
+    rng = np.random.default_rng(0)
+    y = np.array(CLASSES)[rng.integers(0, 3, 120)]
+    X_roi = {name: rng.normal(size=(120, 240)) for name in features.ROI_CANDIDATES}
+    for i, label in enumerate(CLASSES):
+        X_roi["top"][y == label, i] += 5.0            # seule la ROI "top" est informative
+    micro, report = trainer.train_micro_detectors(X_roi, y)
+    assert set(micro) == set(CLASSES)
+    assert all(r["roi"] == "top" and r["coverage"] > 0 for r in report.values())
+
+    X = rng.normal(size=(120, 8))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        pipeline = Pipeline([("scaler", StandardScaler()),
+                             ("svm", SVC(probability=True))]).fit(X, y)
+        trainer.export_npz({"pipeline": pipeline, "micro": micro, "win_lose_rule": {},
+                            "micro_version": features.roi_features_version()},
+                           str(tmp_path / "m.npz"))
+    model = load_model_file(str(tmp_path / "m.npz"))
+    assert set(model["micro"]) == set(CLASSES)
+    assert model["micro"]["end_screen"].roi == TOP
+    assert "micro_labels" not in model
+
+    raw = load_npz_model(str(tmp_path / "m.npz"))
+    raw["micro_version"] = "obsolete"
+    from tracker.capture.detector import _micro_detectors
+    assert _micro_detectors(raw, "m.npz") == {}
@@ -0,0 +1,138 @@
+"""Tests rechargement à chaud du modèle (StateDetector.reload_model, ModelWatcher)."""
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from tracker.capture import detector as detector_mod
+from tracker.capture.detector import ModelWatcher, StateDetector
+
+
+class FixedPipeline:
+    classes_ = np.array(["end_screen", "in_combat", "pre_queue"])
+
+    def __init__(self, label, fail=False):
+        self.label = label
+        self.fail = fail
+
+    def predict(self, X):
+        if self.fail:
+            raise ValueError("features incompatibles")
+        return np.array([self.label] * len(X))
+
+
+def setup(tmp_path, monkeypatch, loads):
+    """Modèle sur disque factice : load_model_file renvoie loads[-1] (après un délai)."""
+    pkl = tmp_path / "state_classifier.pkl"
+    pkl.write_bytes(b"v1")
+    monkeypatch.setattr(detector_mod, "_MODEL_PATH", str(pkl))
+    monkeypatch.setattr(detector_mod, "_MODEL_PATH_LEGACY", str(tmp_path / "legacy.pkl"))
+    monkeypatch.setattr(detector_mod, "_extract_features", lambda img, **kw: np.zeros(4))
+    calls = []
+
+    def load(path):
+        calls.append(path)
+        time.sleep(loads[-1].get("delay", 0))
+        return {"pipeline": loads[-1]["pipeline"]} if loads[-1]["pipeline"] else None
+
+    monkeypatch.setattr(detector_mod, "load_model_file", load)
+    return pkl, calls
+
+
+def frame():
+    return Image.new("RGB", (64, 48), (90, 40, 10))
+
+
+def test_concurrent_first_load_reads_once(tmp_path, monkeypatch):
+    _, calls = setup(tmp_path, monkeypatch, [{"pipeline": FixedPipeline("in_combat"),
+                                              "delay": 0.1}])
+    detector = StateDetector()
+    threading.Thread(target=detector._load_model, daemon=True).start()
+    assert detector.predict(frame()) == "in_combat"   # attend le préchargement
+    assert len(calls) == 1
+
+
+def test_reload_swaps_without_unknown_window(tmp_path, monkeypatch):
+    loads = [{"pipeline": FixedPipeline("in_combat")}]
+    setup(tmp_path, monkeypatch, loads)
+    detector = StateDetector()
+    assert detector.predict(frame()) == "in_combat"
+    detector._samples.clear()   # substitution seule : pas de frame de validation
+
+    loads.append({"pipeline": FixedPipeline("pre_queue"), "delay": 0.2})
+    labels, done = [], threading.Event()
+
+    def poll():
+        while not done.is_set():
+            labels.append(detector.predict(frame()))
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    assert detector.reload_model()
+    time.sleep(0.02)
+    done.set()
+    poller.join()
+
+    assert "unknown" not in labels
+    assert labels[0] == "in_combat" and labels[-1] == "pre_queue"
+    assert detector.reload_stats == {"swapped": 1, "rejected": 0}
+
+
+def test_reload_keeps_current_model_when_new_one_is_invalid(tmp_path, monkeypatch):
+    loads = [{"pipeline": FixedPipeline("in_combat")}]
+    setup(tmp_path, monkeypatch, loads)
+    detector = StateDetector()
+    assert detector.predict(frame()) == "in_combat"   # frame gardée pour la validation
+
+    loads.append({"pipeline": None})                 # fichier illisible
+    assert not detector.reload_model()
+    loads.append({"pipeline": FixedPipeline("pre_queue", fail=True)})
+    assert not detector.reload_model()                # échoue sur les frames récentes
+    assert detector.predict(frame()) == "in_combat"
+    assert detector.reload_stats == {"swapped": 0, "rejected": 2}
+
+
+def test_reload_rejects_model_that_disagrees_on_recent_frames(tmp_path, monkeypatch):
+    loads = [{"pipeline": FixedPipeline("in_combat")}]
+    setup(tmp_path, monkeypatch, loads)
+    detector = StateDetector()
+    assert detector.predict(frame()) == "in_combat"
+
+    loads.append({"pipeline": FixedPipeline("end_screen")})
+    assert not detector.reload_model()
+    assert detector.predict(frame()) == "in_combat"
+    loads.append({"pipeline": FixedPipeline("in_combat")})
+    assert detector.reload_model()
+    assert detector.reload_stats == {"swapped": 1, "rejected": 1}
+
+
+def test_watcher_reloads_once_file_is_stable(tmp_path, monkeypatch):
+    loads = [{"pipeline": FixedPipeline("in_combat")}]
+    pkl, calls = setup(tmp_path, monkeypatch, loads)
+    detector = StateDetector()
+    watcher = ModelWatcher(detector, interval=0.01)
+    watcher._signature = watcher._read_signature()
+    assert not watcher.check()
+
+    loads.append({"pipeline": FixedPipeline("end_screen")})
+    pkl.write_bytes(b"v2 plus long")
+    os.utime(pkl, ns=(1, 10**18))
+    assert not watcher.check()        # changement vu une fois : écriture peut-être en cours
+    assert watcher.check()            # stable : rechargement
+    assert detector.predict(frame()) == "end_screen"
+    assert not watcher.check()
+
+
+def test_watcher_thread_preloads_and_stops(tmp_path, monkeypatch):
+    _, calls = setup(tmp_path, monkeypatch, [{"pipeline": FixedPipeline("in_combat")}])
+    detector = StateDetector()
+    watcher = ModelWatcher(detector, interval=0.01)
+    thread = threading.Thread(target=watcher.start, daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    watcher.stop()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+    assert detector._model_loaded and len(calls) == 1
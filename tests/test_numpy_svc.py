@@ -0,0 +1,119 @@
+"""Tests NumpySVC — parité avec le pipeline scikit-learn et chargement du .npz."""
+import importlib.util
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+
+from tracker.capture import detector as detector_mod
+from tracker.capture.detector import NumpySVC, StateDetector, load_npz_model
+
+sklearn = pytest.importorskip("sklearn")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASSES = np.array(["end_screen", "in_combat", "pre_queue"])
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    rng = np.random.default_rng(0)
+    y = CLASSES[rng.integers(0, 3, 180)]
+    X = rng.normal(size=(180, 64))
+    for i, label in enumerate(CLASSES):
+        X[y == label, i * 8:(i + 1) * 8] += 1.5
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return Pipeline([
+            ("scaler", StandardScaler()),
+            ("svm", SVC(kernel="rbf", C=10, gamma="scale",
+                        probability=True, class_weight="balanced")),
+        ]).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return np.random.default_rng(1).normal(size=(300, 64)) * 1.5
+
+
+def from_pipeline(pipeline):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return NumpySVC.from_pipeline(pipeline)
+
+
+def test_predict_matches_sklearn(pipeline, samples):
+    model = from_pipeline(pipeline)
+    assert list(model.classes_) == list(pipeline.classes_)
+    np.testing.assert_array_equal(model.predict(samples), pipeline.predict(samples))
+
+
+def test_decision_and_proba_match_sklearn(pipeline, samples):
+    model = from_pipeline(pipeline)
+    svc = pipeline.steps[-1][1]
+    svc.decision_function_shape = "ovo"
+    try:
+        reference = pipeline.decision_function(samples)
+    finally:
+        svc.decision_function_shape = "ovr"
+    np.testing.assert_allclose(model.decision_function(samples), reference, atol=1e-10)
+    np.testing.assert_allclose(model.predict_proba(samples), pipeline.predict_proba(samples),
+                               atol=1e-10)
+
+
+def test_arrays_round_trip(pipeline, samples, tmp_path):
+    path = tmp_path / "model.npz"
+    np.savez(path, **from_pipeline(pipeline).arrays())
+    with np.load(path, allow_pickle=False) as data:
+        model = NumpySVC.from_arrays(data)
+    np.testing.assert_array_equal(model.predict(samples), pipeline.predict(samples))
+
+
+def test_proba_requires_platt_parameters(pipeline, samples):
+    arrays = from_pipeline(pipeline).arrays()
+    arrays["prob_a"] = arrays["prob_b"] = np.empty(0)
+    with pytest.raises(AttributeError):
+        NumpySVC.from_arrays(arrays).predict_proba(samples[:1])
+
+
+def load_trainer():
+    spec = importlib.util.spec_from_file_location(
+        "train_classifier", os.path.join(ROOT, "tools", "train_classifier.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_detector_prefers_npz_export(pipeline, samples, tmp_path, monkeypatch):
+    model = {"pipeline": pipeline, "cls_labels": list(CLASSES),
+             "win_lose_rule": {"roi": (0.0, 0.0, 1.0, 0.1), "brightness_threshold": 100.0},
+             "img_size": (160, 120)}
+    pkl_path = tmp_path / "state_classifier.pkl"
+    with open(pkl_path, "wb") as f:
+        pickle.dump(model, f)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        load_trainer().export_npz(model, str(tmp_path / "state_classifier.npz"))
+
+    loaded = load_npz_model(str(tmp_path / "state_classifier.npz"))
+    assert loaded["win_lose_rule"]["roi"] == (0.0, 0.0, 1.0, 0.1)
+
+    monkeypatch.setattr(detector_mod, "_MODEL_PATH", str(pkl_path))
+    detector = StateDetector()
+    assert detector.is_model_available()
+    assert isinstance(detector._load_model()["pipeline"], NumpySVC)
+    monkeypatch.setattr(detector_mod, "_extract_features", lambda img, **kw: samples[0])
+    assert detector.predict(object()) == pipeline.predict(samples[:1])[0]
+
+
+def test_stale_npz_is_ignored(tmp_path):
+    pkl_path, npz_path = tmp_path / "m.pkl", tmp_path / "m.npz"
+    npz_path.write_bytes(b"")
+    pkl_path.write_bytes(b"")
+    os.utime(npz_path, (0, 0))
+    assert detector_mod._model_paths(str(pkl_path)) == [str(pkl_path)]
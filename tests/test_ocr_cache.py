@@ -0,0 +1,104 @@
+"""Tests du cache OCR de OcrPipeline (LRU par empreinte de crop quantifié)."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.ocr import OcrPipeline
+
+
+class CountingReader:
+    def __init__(self, results=None):
+        self.results = results if results is not None else [
+            ([[0, 0], [80, 0], [80, 20], [0, 20]], "Victoire !", 0.9)]
+        self.calls = 0
+
+    def readtext(self, img):
+        self.calls += 1
+        return self.results
+
+
+def _img(seed=0, shape=(60, 200, 3)):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, size=shape, dtype=np.uint8))
+
+
+def test_repeated_crop_is_served_from_cache():
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader)
+    first = ocr._read_text(_img())
+    second = ocr._read_text(_img())
+    assert first == second == reader.results
+    assert reader.calls == 1
+    stats = ocr.cache_stats
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_quantization_absorbs_low_bit_noise():
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader)
+    arr = np.asarray(_img()).copy()
+    arr &= 0xF0                        # bits bas libres pour le bruit
+    ocr._read_text(Image.fromarray(arr))
+    ocr._read_text(Image.fromarray(arr | 0x05))
+    assert reader.calls == 1
+
+
+def test_different_crop_misses():
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader)
+    ocr._read_text(_img(0))
+    ocr._read_text(_img(1))
+    ocr._read_text(_img(0, shape=(50, 200, 3)))
+    assert reader.calls == 3
+    assert ocr.cache_stats["hits"] == 0
+
+
+def test_cache_is_bounded_lru():
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader, cache_size=2)
+    for seed in (0, 1, 0, 2):           # 0 rafraîchi avant l'arrivée de 2
+        ocr._read_text(_img(seed))
+    assert ocr.cache_stats["size"] == 2
+    ocr._read_text(_img(0))             # toujours présent
+    assert reader.calls == 3
+    ocr._read_text(_img(1))             # évincé
+    assert reader.calls == 4
+
+
+def test_cache_can_be_disabled():
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader)
+    ocr.use_cache = False
+    ocr._read_text(_img())
+    ocr._read_text(_img())
+    assert reader.calls == 2
+    assert ocr.cache_stats["hits"] == 0
+    assert OcrPipeline(reader=reader, cache_size=0).cache_stats["enabled"] is False
+
+
+def test_exceptions_are_not_cached():
+    class Flaky(CountingReader):
+        def readtext(self, img):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("EasyOCR crash")
+            return self.results
+
+    reader = Flaky()
+    ocr = OcrPipeline(reader=reader)
+    with pytest.raises(RuntimeError):
+        ocr._read_text(_img())
+    assert ocr._read_text(_img()) == reader.results
+    assert ocr.cache_stats["size"] == 1
+
+
+def test_repeated_end_screen_frame_skips_ocr(tmp_path):
+    reader = CountingReader()
+    ocr = OcrPipeline(reader=reader)
+    frame = _img(shape=(720, 1280, 3))
+    ocr.extract_end_screen_data(frame)
+    calls = reader.calls
+    ocr.extract_end_screen_data(frame.copy())
+    assert reader.calls == calls
+    ocr.clear_cache()
+    assert ocr.cache_stats["size"] == 0
@@ -0,0 +1,113 @@
+"""Tests des layouts OCR (reconnaissance seule sur boîtes fixes, readtext en secours).
+
+Reader factice : `recognize` répond par boîte selon sa position dans la zone,
+`readtext` compte les appels (détection) — pas d'import EasyOCR.
+"""
+from PIL import Image
+
+from tracker.capture.ocr import OcrPipeline
+
+
+class FakeReader:
+    """recognize : texte par index de boîte du layout ; readtext : résultats fixes."""
+
+    def __init__(self, texts_by_box=None, readtext_results=None):
+        self.texts_by_box = texts_by_box or {}
+        self.readtext_results = readtext_results or []
+        self.recognize_calls = 0
+        self.readtext_calls = 0
+
+    def recognize(self, img, horizontal_list=None, free_list=None, detail=1, batch_size=1):
+        self.recognize_calls += 1
+        out = []
+        # Ordre inversé : l'association se fait par position, pas par rang
+        for i, (x0, x1, y0, y1) in reversed(list(enumerate(horizontal_list))):
+            text, conf = self.texts_by_box.get(i, ("", 0.0))
+            out.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, conf))
+        return out
+
+    def readtext(self, img):
+        self.readtext_calls += 1
+        return self.readtext_results
+
+
+STATS_TEXTS = {
+    0: ("Ordre d'action", 0.95), 1: ("A joué en premier", 0.9),
+    2: ("Tours joués", 0.93),    3: ("12", 0.8),
+    4: ("Vos points", 0.91),     5: ("3", 0.7),
+    6: ("Points adversaire", 0.9), 7: ("1", 0.7),
+    8: ("Dégâts infligés", 0.92),  9: ("340", 0.85),
+}
+
+
+def _frame():
+    return Image.new("RGB", (1280, 720), (20, 20, 30))
+
+
+def test_end_stats_layout_skips_detection_on_bottom_zone():
+    reader = FakeReader(STATS_TEXTS)
+    ocr = OcrPipeline(reader=reader)
+    data = ocr.extract_end_screen_data(_frame())
+    assert data["first_player"] == "Moi"
+    assert data["turns_played"] == 12
+    assert data["damage_dealt"] == 340
+    assert data["player_points"] == 3
+    assert data["opponent_points"] == 1
+    # readtext uniquement pour la bande haute (résultat / adversaire)
+    assert reader.readtext_calls == 1
+    assert ocr.layout_stats["end_stats"] == {"hits": 1, "fallbacks": 0}
+
+
+def test_end_stats_layout_falls_back_when_label_missing():
+    texts = dict(STATS_TEXTS)
+    texts[2] = ("Touchez pour continuer", 0.9)   # pas l'écran de stats
+    reader = FakeReader(texts)
+    ocr = OcrPipeline(reader=reader)
+    ocr.extract_end_screen_data(_frame())
+    assert reader.readtext_calls == 2   # haut + bas (détection en secours)
+    assert ocr.layout_stats["end_stats"] == {"hits": 0, "fallbacks": 1}
+
+
+def test_layout_digits_validation_rejects_missing_number():
+    texts = dict(STATS_TEXTS)
+    texts[3] = ("--", 0.9)
+    ocr = OcrPipeline(reader=FakeReader(texts))
+    assert ocr._read_layout(_frame(), "end_stats") is None
+
+
+def test_layouts_disabled_always_uses_readtext():
+    reader = FakeReader(STATS_TEXTS)
+    ocr = OcrPipeline(reader=reader, layouts=False)
+    ocr.extract_end_screen_data(_frame())
+    assert reader.recognize_calls == 0
+    assert reader.readtext_calls == 2
+    assert ocr.layout_stats == {}
+
+
+def test_reader_without_recognize_falls_back():
+    class DetectOnly:
+        def readtext(self, img):
+            return [(None, "Match classé", 0.9)]
+
+    ocr = OcrPipeline(reader=DetectOnly())
+    assert ocr._read_layout(_frame(), "prequeue_type") is None
+    assert ocr.layout_stats["prequeue_type"]["fallbacks"] == 1
+
+
+def test_prequeue_type_accept_rejects_unparsable_text(tmp_path, monkeypatch):
+    monkeypatch.setenv("PTCG_DATA_DIR", str(tmp_path))
+    reader = FakeReader({0: ("Ici, vous pouvez choisir", 0.9)},
+                        readtext_results=[(None, "Match aléatoire", 0.9)])
+    ocr = OcrPipeline(reader=reader)
+    data = ocr.extract_prequeue_data(_frame())
+    assert data["match_type"] == "aléatoire"
+    assert ocr.layout_stats["prequeue_type"] == {"hits": 0, "fallbacks": 1}
+
+
+def test_prequeue_type_recognized_without_detection():
+    reader = FakeReader({0: ("Match classé", 0.9)})
+    ocr = OcrPipeline(reader=reader)
+    results = ocr._read_layout(_frame(), "prequeue_type",
+                               accept=lambda r: ocr._parse_match_type(r) != "?")
+    assert ocr._parse_match_type(results) == "classé"
+    assert reader.readtext_calls == 0
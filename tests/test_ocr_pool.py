@@ -0,0 +1,147 @@
+"""Tests du pool de workers OCR (processus spawn, reader factice, mémoire partagée)."""
+import functools
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.ocr import OcrPipeline
+from tracker.capture.ocr_pool import OcrWorkerPool
+from tracker.capture.ocr_reader import ReaderRegistry
+
+
+class EchoReader:
+    """Renvoie la forme et la somme du crop reçu (preuve du transfert), après `delay` s."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def readtext(self, arr, **kwargs):
+        time.sleep(self.delay)
+        h, w = arr.shape[:2]
+        return [(np.array([[0, 0], [w, 0], [w, h], [0, h]]), f"{arr.shape}:{int(arr.sum())}",
+                 np.float32(0.9))]
+
+    def recognize(self, arr, horizontal_list=None, free_list=None, **kwargs):
+        return [([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], "Match classé", 0.9)
+                for x0, x1, y0, y1 in horizontal_list]
+
+
+def _settled(pool, timeout=5.0):
+    """Stats du pool une fois les callbacks de fin exécutés (après Future.result)."""
+    deadline = time.monotonic() + timeout
+    while pool.pool_stats()["inflight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return pool.pool_stats()
+
+
+def echo_factory():
+    return EchoReader()
+
+
+def slow_factory():
+    return EchoReader(delay=0.3)
+
+
+def flaky_factory(marker):
+    """EchoReader, sauf si le fichier `marker` existe (worker qui ne redémarre plus)."""
+    if os.path.exists(marker):
+        raise RuntimeError("modèle OCR introuvable")
+    return EchoReader()
+
+
+def _kill_workers(pool):
+    for pid in list(pool._executor._processes):
+        os.kill(pid, signal.SIGTERM)
+
+
+@pytest.fixture
+def pool():
+    p = OcrWorkerPool(workers=1, factory=echo_factory, threads=None).start()
+    yield p
+    p.shutdown()
+
+
+def test_submit_returns_future_with_worker_result(pool):
+    arr = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    future = pool.submit("readtext", arr)
+    (bbox, text, conf), = future.result(timeout=30)
+    assert text == f"(2, 3, 3):{int(arr.sum())}"
+    assert bbox[2] == [3, 2] and isinstance(bbox[2][0], int)
+    assert isinstance(conf, float)
+    stats = _settled(pool)
+    assert stats["submitted"] == stats["completed"] == 1
+    assert stats["inflight"] == 0 and stats["failed"] == 0
+
+
+def test_worker_error_is_raised_by_future(pool):
+    future = pool.submit("missing_method", np.zeros((2, 2, 3), np.uint8))
+    with pytest.raises(AttributeError):
+        future.result(timeout=30)
+    assert _settled(pool)["failed"] == 1
+
+
+def test_max_inflight_bounds_concurrent_requests():
+    pool = OcrWorkerPool(workers=2, max_inflight=1, factory=slow_factory, threads=None).start()
+    try:
+        peak = []
+        stop = threading.Event()
+
+        def watch():
+            while not stop.is_set():
+                peak.append(pool.pool_stats()["inflight"])
+                time.sleep(0.01)
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        futures = [pool.submit("readtext", np.zeros((4, 4, 3), np.uint8)) for _ in range(3)]
+        for f in futures:
+            f.result(timeout=30)
+        stop.set()
+        watcher.join()
+        assert max(peak) == 1
+    finally:
+        pool.shutdown()
+
+
+def test_pool_is_an_ocr_pipeline_reader(pool):
+    registry = ReaderRegistry(factory=lambda: pool)
+    ocr = OcrPipeline(registry=registry)
+    crop = Image.new("RGB", (1280, 72))
+    results = ocr._read_layout(crop, "prequeue_type",
+                               accept=lambda r: ocr._parse_match_type(r) != "?")
+    assert ocr._parse_match_type(results) == "classé"
+    assert "pool" in registry.status()
+
+
+def test_killed_worker_is_replaced_once(pool):
+    arr = np.zeros((2, 2, 3), np.uint8)
+    pool.readtext(arr)
+    _kill_workers(pool)
+    (_, text, _), = pool.readtext(arr)
+    assert text == "(2, 2, 3):0"
+    assert pool.pool_stats()["restarts"] == 1
+    pool.readtext(arr)
+    assert pool.pool_stats()["restarts"] == 1
+
+
+def test_failed_recreation_marks_registry_error(tmp_path):
+    marker = str(tmp_path / "broken")
+    registry = ReaderRegistry(factory=lambda: pool)
+    pool = OcrWorkerPool(workers=1, factory=functools.partial(flaky_factory, marker),
+                         threads=None, on_error=registry.report_error).start()
+    try:
+        reader = registry.get()
+        assert registry.status()["state"] == "ready"
+        open(marker, "w").close()
+        _kill_workers(pool)
+        with pytest.raises(Exception):
+            reader.readtext(np.zeros((2, 2, 3), np.uint8))
+        status = registry.status()
+        assert status["state"] == "error" and "pool OCR" in status["error"]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,156 @@
+"""Tests du registre process-wide du lecteur EasyOCR (reader factice, pas d'import easyocr)."""
+import threading
+
+import pytest
+
+from tracker.capture.ocr import OcrPipeline
+from tracker.capture.ocr_reader import LockedReader, ReaderRegistry
+
+
+class FakeReader:
+    def __init__(self):
+        self.readtext_calls = 0
+
+    def readtext(self, img):
+        self.readtext_calls += 1
+        return []
+
+
+def test_single_reader_shared_by_all_pipelines():
+    built = []
+    registry = ReaderRegistry(factory=lambda: built.append(FakeReader()) or built[-1])
+    pipelines = [OcrPipeline(registry=registry) for _ in range(3)]
+    for p in pipelines:
+        p._ensure_reader()
+    assert len(built) == 1
+    assert all(p._reader.reader is built[0] for p in pipelines)
+    assert registry.status()["instances"] == 1
+
+
+def test_concurrent_get_builds_once():
+    started = threading.Event()
+    release = threading.Event()
+    built = []
+
+    def slow_factory():
+        started.set()
+        release.wait(5)
+        built.append(FakeReader())
+        return built[-1]
+
+    registry = ReaderRegistry(factory=slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    started.wait(5)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(built) == 1
+    assert all(r is results[0] for r in results)
+    assert results[0].reader is built[0]
+
+
+def test_warm_up_loads_in_background_and_reports_ready():
+    release = threading.Event()
+    reader = FakeReader()
+
+    def factory():
+        release.wait(5)
+        return reader
+
+    registry = ReaderRegistry(factory=factory)
+    assert registry.status()["state"] == "idle"
+    thread = registry.warm_up()
+    assert registry.status()["state"] == "loading"
+    assert registry.warm_up() is None          # pas de second chargement
+    release.set()
+    thread.join(5)
+    status = registry.status()
+    assert status["state"] == "ready" and status["ready"]
+    assert status["load_seconds"] is not None and status["warmup_seconds"] is not None
+    assert reader.readtext_calls == 1          # inférence de chauffe
+    assert registry.get().reader is reader
+    assert registry.warm_up() is None
+
+
+def test_build_error_is_reported_and_raised():
+    def broken():
+        raise ImportError("No module named 'easyocr'")
+
+    registry = ReaderRegistry(factory=broken)
+    registry.warm_up().join(5)
+    status = registry.status()
+    assert status["state"] == "error"
+    assert "easyocr" in status["error"]
+    with pytest.raises(ImportError):
+        OcrPipeline(registry=registry)._read_text(None)
+
+
+def test_concurrent_inference_is_serialized():
+    class SlowReader:
+        def __init__(self):
+            self.active = self.peak = 0
+            self.guard = threading.Lock()
+
+        def _call(self):
+            with self.guard:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            threading.Event().wait(0.02)
+            with self.guard:
+                self.active -= 1
+            return []
+
+        def readtext(self, img, **kwargs):
+            return self._call()
+
+        def recognize(self, img, **kwargs):
+            return self._call()
+
+    inner = SlowReader()
+    registry = ReaderRegistry(factory=lambda: inner)
+    # Pipeline live et diagnostics de l'API : deux pipelines, un seul reader
+    live, api = OcrPipeline(registry=registry), OcrPipeline(registry=registry)
+    live._ensure_reader()
+    api._ensure_reader()
+    assert isinstance(live._reader, LockedReader) and live._reader is api._reader
+
+    threads = [threading.Thread(target=p._reader.readtext if i % 2 else p._reader.recognize,
+                                args=(None,))
+               for i, p in enumerate([live, api] * 4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert inner.peak == 1
+
+
+def test_thread_safe_reader_is_not_wrapped():
+    class PoolLike(FakeReader):
+        thread_safe = True
+
+    registry = ReaderRegistry(factory=PoolLike)
+    assert isinstance(registry.get(), PoolLike)
+
+
+def test_api_diagnostics_use_injected_registry(tmp_path):
+    from tracker.api.api import TrackerAPI
+    from tracker.db.database import DatabaseManager
+
+    registry = ReaderRegistry(factory=FakeReader)
+    api = TrackerAPI(DatabaseManager(db_path=str(tmp_path / "test.db")))
+    api.set_ocr_registry(registry)
+    first, second = api._ocr_pipeline(), api._ocr_pipeline()
+    first._ensure_reader()
+    second._ensure_reader()
+    assert first._reader is second._reader
+    assert registry.status()["instances"] == 1
+
+
+def test_locked_reader_keeps_missing_recognize_missing():
+    registry = ReaderRegistry(factory=FakeReader)
+    reader = registry.get()
+    assert callable(reader.readtext)
+    assert not callable(getattr(reader, "recognize", None))   # OcrPipeline : readtext seul
@@ -0,0 +1,140 @@
+"""Tests PollingLoop — cadence par état, debounce en secondes, coût des ticks."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from tracker.capture.bus import FrameBus
+from tracker.capture.detector import (STATE_INTERVALS, CombatState, PollingLoop,
+                                      StateDetector)
+
+FAKE_IMG = MagicMock()
+
+
+def make_loop(intervals=None, **flags):
+    detector = MagicMock(spec=StateDetector)
+    detector.is_pre_queue_ranked.return_value = flags.get("pre_queue", False)
+    detector.is_in_combat.return_value = flags.get("in_combat", False)
+    detector.is_end_screen.return_value = flags.get("end_screen", False)
+    loop = PollingLoop(config=MagicMock(), detector=detector, intervals=intervals)
+    return loop, detector
+
+
+def ticks_until_change(loop, state, limit=50):
+    for n in range(1, limit + 1):
+        next_state, _ = loop._compute_next_state(state, FAKE_IMG)
+        if next_state != state:
+            return n, next_state
+    return None, state
+
+
+def test_current_interval_follows_state():
+    loop, _ = make_loop(intervals=STATE_INTERVALS)
+    assert loop.current_interval == STATE_INTERVALS[CombatState.IDLE]
+    loop._mumu_detected = True
+    loop._state = CombatState.PRE_QUEUE
+    assert loop.current_interval == STATE_INTERVALS[CombatState.PRE_QUEUE]
+
+
+def test_states_without_interval_use_default():
+    loop, _ = make_loop(intervals={CombatState.IDLE: 1.0})
+    assert loop.interval_for(CombatState.IN_COMBAT) == 0.1
+    assert loop.interval_for(CombatState.IDLE) == 1.0
+
+
+@pytest.mark.parametrize("interval, expected_ticks", [(0.1, 8), (0.2, 4), (0.05, 16)])
+def test_prequeue_to_combat_debounce_is_in_seconds(interval, expected_ticks):
+    loop, _ = make_loop(intervals={CombatState.PRE_QUEUE: interval}, in_combat=True)
+    assert ticks_until_change(loop, CombatState.PRE_QUEUE) == (expected_ticks,
+                                                               CombatState.IN_COMBAT)
+
+
+def test_default_rate_keeps_historical_tick_counts():
+    loop, det = make_loop(pre_queue=True)
+    assert ticks_until_change(loop, CombatState.IN_COMBAT)[0] == 10
+    loop, det = make_loop()
+    assert ticks_until_change(loop, CombatState.PRE_QUEUE)[0] == 15
+    assert ticks_until_change(loop, CombatState.END_SCREEN)[0] == 5
+
+
+def test_interrupted_condition_resets_dwell():
+    loop, det = make_loop(in_combat=True)
+    for _ in range(7):
+        loop._compute_next_state(CombatState.PRE_QUEUE, FAKE_IMG)
+    det.is_in_combat.return_value = False
+    det.is_pre_queue_ranked.return_value = True
+    loop._compute_next_state(CombatState.PRE_QUEUE, FAKE_IMG)
+    det.is_in_combat.return_value = True
+    assert ticks_until_change(loop, CombatState.PRE_QUEUE)[0] == 8
+
+
+def test_custom_debounce():
+    loop = PollingLoop(detector=MagicMock(spec=StateDetector),
+                       debounce={"end_screen_exit": 0.2})
+    loop._detector.is_end_screen.return_value = False
+    assert ticks_until_change(loop, CombatState.END_SCREEN)[0] == 2
+
+
+def test_tick_stats_are_grouped_by_state(monkeypatch):
+    monkeypatch.setattr("tracker.capture.detector.find_mumu_window", lambda: None)
+    loop, _ = make_loop()
+    loop._tick()
+    loop._tick()
+    stats = loop.tick_stats
+    assert stats["idle"]["ticks"] == 2
+    assert stats["idle"]["mean_ms"] >= 0.0
+    assert set(stats["idle"]) == {"ticks", "mean_ms", "max_ms", "total_s"}
+
+
+def test_frame_bus_accepts_callable_interval():
+    rate = {"value": 0.5}
+    bus = FrameBus(interval=lambda: rate["value"])
+    assert bus.interval == 0.5
+    rate["value"] = 0.1
+    assert bus.interval == 0.1
+
+
+def bus_loop(monkeypatch, now, **flags):
+    import tracker.capture.bus as bus_mod
+    monkeypatch.setattr(bus_mod.time, "monotonic", lambda: now[0])
+    bus = FrameBus()
+    config = MagicMock()
+    config.get_all.return_value = {"mumu_region": {"x": 0, "y": 0, "width": 8, "height": 8}}
+    loop, det = make_loop(intervals={CombatState.PRE_QUEUE: 0.1}, **flags)
+    loop._config = config
+    loop._frames = bus.subscribe()
+    loop._mumu_detected = True
+    loop._state = CombatState.PRE_QUEUE
+    return loop, bus
+
+
+def test_debounce_counts_real_time_between_late_frames(monkeypatch):
+    now = [100.0]
+    loop, bus = bus_loop(monkeypatch, now, in_combat=True)
+    observed = 0
+    # Frames toutes les 0.3 s au lieu de 0.1 s (ticks en retard)
+    for t in (100.0, 100.3, 100.6, 100.9):
+        now[0] = t
+        bus.publish(FAKE_IMG, timestamp=t)
+        loop._detect_and_transition()
+        observed += 1
+        if loop.state == CombatState.IN_COMBAT:
+            break
+    # 0.1 (1re observation) + 3 × 0.3 s ≥ 0.8 s — pas 8 observations
+    assert loop.state == CombatState.IN_COMBAT
+    assert observed == 4
+
+
+def test_ticks_without_new_frame_still_count_elapsed_time(monkeypatch):
+    now = [100.0]
+    loop, bus = bus_loop(monkeypatch, now, in_combat=True)
+    bus.publish(FAKE_IMG, timestamp=100.0)
+    loop._detect_and_transition()
+    for t in (100.1, 100.2, 100.3):      # ticks qui ne trouvent pas de nouvelle frame
+        now[0] = t
+        loop._detect_and_transition()
+    assert loop._dwell["prequeue_combat"] == pytest.approx(0.1)
+    now[0] = 100.4
+    bus.publish(FAKE_IMG, timestamp=100.4)
+    loop._detect_and_transition()
+    assert loop._dwell["prequeue_combat"] == pytest.approx(0.5)
+    assert loop.state == CombatState.PRE_QUEUE
@@ -0,0 +1,75 @@
+"""Tests StateDetector.classify — une seule classification par frame et par tick."""
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from tracker.capture.bus import FrameBus
+from tracker.capture.detector import CombatState, PollingLoop, StateDetector
+
+
+def make_detector(label="in_combat"):
+    pipeline = MagicMock()
+    pipeline.predict.return_value = [label]
+    pipeline.classes_ = np.array(["end_screen", "in_combat", "pre_queue"])
+    pipeline.predict_proba.return_value = np.array([[0.1, 0.7, 0.2]])
+    detector = StateDetector()
+    detector._model = {"pipeline": pipeline}
+    detector._model_loaded = True
+    return detector, pipeline
+
+
+def test_classify_is_memoized_per_frame():
+    detector, pipeline = make_detector()
+    img, other = object(), object()
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)) as feats:
+        assert detector.classify(img) is detector.classify(img)
+        assert detector.is_in_combat(img) and not detector.is_end_screen(img)
+        detector.classify(other)
+    assert feats.call_count == 2
+    assert pipeline.predict.call_count == 2
+
+
+def test_proba_is_lazy():
+    detector, pipeline = make_detector()
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)):
+        prediction = detector.classify(object())
+    pipeline.predict_proba.assert_not_called()
+    assert prediction.proba == pytest.approx({"end_screen": 0.1, "in_combat": 0.7,
+                                              "pre_queue": 0.2})
+    prediction.proba
+    assert pipeline.predict_proba.call_count == 1
+
+
+def test_proba_empty_without_predict_proba():
+    detector, pipeline = make_detector()
+    pipeline.predict_proba.side_effect = AttributeError("probability=False")
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)):
+        assert detector.predict_proba(object()) == {}
+
+
+def test_unknown_without_model():
+    detector = StateDetector()
+    detector._model_loaded = True
+    assert detector.classify(object()).label == "unknown"
+    assert detector.predict_proba(object()) == {}
+
+
+@pytest.mark.parametrize("state, label", [
+    (CombatState.PRE_QUEUE, "in_combat"),     # is_in_combat + is_pre_queue_ranked
+    (CombatState.IN_COMBAT, "pre_queue"),     # is_end_screen + is_pre_queue_ranked
+    (CombatState.END_SCREEN, "end_screen"),
+])
+def test_one_feature_extraction_per_tick(state, label):
+    detector, _ = make_detector(label)
+    bus = FrameBus()
+    config = MagicMock()
+    config.get_all.return_value = {"mumu_region": {"x": 0, "y": 0, "width": 8, "height": 8}}
+    loop = PollingLoop(config=config, detector=detector, bus=bus)
+    loop._mumu_detected = True
+    loop._state = state
+    with patch("tracker.capture.detector._extract_features", return_value=np.zeros(4)) as feats:
+        for n in range(1, 4):
+            bus.publish(object())
+            loop._detect_and_transition()
+            assert feats.call_count == n
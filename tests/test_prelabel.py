@@ -0,0 +1,140 @@
+"""Tests pré-labélisation par lots des captures non labélisées (sampler.prelabel_unlabeled)."""
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture import sampler
+from tracker.capture.detector import StateDetector
+
+CLASSES = np.array(["end_screen", "in_combat", "pre_queue"])
+
+
+class MeanPipeline:
+    """Pipeline factice : classe choisie par la luminosité moyenne des features HSV."""
+
+    classes_ = CLASSES
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, X):
+        self.batches.append(len(X))
+        value = X[:, -16:].argmax(axis=1)        # bin V dominant
+        proba = np.full((len(X), 3), 0.1)
+        proba[np.arange(len(X)), np.where(value > 10, 0, np.where(value > 5, 1, 2))] = 0.8
+        return proba
+
+    def predict(self, X):
+        return CLASSES[self.predict_proba(X).argmax(axis=1)]
+
+
+@pytest.fixture
+def unlabeled(tmp_path, monkeypatch):
+    monkeypatch.setattr(sampler, "_UNLABELED_DIR", str(tmp_path))
+    for i, grey in enumerate([250, 120, 20, 250, 120]):
+        Image.new("RGB", (320, 240), (grey,) * 3).save(tmp_path / f"2024_{i}_unknown.png")
+    return tmp_path
+
+
+@pytest.fixture
+def detector():
+    d = StateDetector()
+    d._model = {"pipeline": MeanPipeline(),
+                "win_lose_rule": {"roi": (0.0, 0.0, 1.0, 0.1), "brightness_threshold": 100.0,
+                                  "win_is_brighter": True, "warm_threshold": -1.0,
+                                  "win_is_warmer": True}}
+    d._model_loaded = True
+    return d
+
+
+def test_predict_proba_batch_scores_whole_batch(detector):
+    images = [Image.new("RGB", (320, 240), (g,) * 3) for g in (250, 20)]
+    classes, proba = detector.predict_proba_batch(images)
+    assert classes == list(CLASSES)
+    assert proba.shape == (2, 3)
+    assert detector._model["pipeline"].batches == [2]
+
+
+def test_predict_proba_batch_without_probabilities(detector):
+    class NoProba(MeanPipeline):
+        def predict_proba(self, X):
+            raise AttributeError("probability=False")
+
+        def predict(self, X):
+            return np.array(["in_combat"] * len(X))
+
+    detector._model["pipeline"] = NoProba()
+    classes, proba = detector.predict_proba_batch([Image.new("RGB", (160, 120))])
+    assert proba[0, classes.index("in_combat")] == 1.0
+
+
+def test_prelabel_stores_suggestions_in_chunks(unlabeled, detector):
+    result = sampler.prelabel_unlabeled(detector, chunk=2)
+    assert result["labeled"] == 5 and result["skipped"] == 0
+    assert detector._model["pipeline"].batches == [2, 2, 1]
+
+    samples = {s["filename"]: s for s in sampler.list_unlabeled()}
+    assert samples["2024_0_unknown.png"]["suggested_label"] == "end_screen_win"
+    assert samples["2024_2_unknown.png"]["suggested_label"] == "pre_queue"
+    assert samples["2024_1_unknown.png"]["confidence"] == pytest.approx(0.8)
+    assert samples["2024_1_unknown.png"]["auto_label"] == "unknown"
+
+
+def test_prelabel_skips_already_scored_and_purges_missing(unlabeled, detector):
+    sampler.prelabel_unlabeled(detector)
+    (unlabeled / "2024_0_unknown.png").unlink()
+    Image.new("RGB", (320, 240)).save(unlabeled / "2024_9_unknown.png")
+
+    result = sampler.prelabel_unlabeled(detector)
+    assert result["labeled"] == 1 and result["skipped"] == 4
+    assert set(sampler.load_suggestions()) == {f"2024_{i}_unknown.png" for i in (1, 2, 3, 4, 9)}
+    assert sampler.prelabel_unlabeled(detector, force=True)["labeled"] == 5
+
+
+def test_prelabel_ignores_unreadable_files(unlabeled, detector):
+    (unlabeled / "broken_unknown.png").write_bytes(b"not a png")
+    assert sampler.prelabel_unlabeled(detector)["labeled"] == 5
+    assert "broken_unknown.png" not in sampler.load_suggestions()
+
+
+def test_prelabel_without_model(unlabeled):
+    d = StateDetector()
+    d._model_loaded = True
+    assert "error" in sampler.prelabel_unlabeled(d)
+    assert all(s["suggested_label"] is None for s in sampler.list_unlabeled())
+
+
+def test_predict_proba_batch_empty(detector):
+    classes, proba = detector.predict_proba_batch([])
+    assert classes == [] and proba.shape == (0, 0)
+
+
+def test_thumbnails_cached_by_prelabel_and_refreshed_when_png_changes(unlabeled, detector,
+                                                                       monkeypatch):
+    sampler.prelabel_unlabeled(detector)
+    assert len(list((unlabeled / ".thumbs").glob("*.jpg"))) == 5
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("PNG relu malgré une vignette à jour")
+
+    with monkeypatch.context() as m:
+        m.setattr(sampler.Image, "open", no_decode)
+        assert sampler.thumbnail_jpeg("2024_0_unknown.png")[:2] == b"\xff\xd8"   # JPEG
+
+    png = unlabeled / "2024_0_unknown.png"
+    Image.new("RGB", (640, 480), (0, 0, 0)).save(png)
+    mtime = (unlabeled / ".thumbs" / "2024_0_unknown.jpg").stat().st_mtime + 10
+    os.utime(png, (mtime, mtime))
+    with Image.open(io.BytesIO(sampler.thumbnail_jpeg(png.name))) as thumb:
+        assert thumb.size == (320, 240) and thumb.getpixel((5, 5))[0] < 20
+
+
+def test_label_sample_drops_cached_thumbnail(unlabeled, monkeypatch, tmp_path_factory):
+    monkeypatch.setattr(sampler, "_SAMPLES_DIR", str(tmp_path_factory.mktemp("samples")))
+    sampler.thumbnail_jpeg("2024_1_unknown.png")
+    assert (unlabeled / ".thumbs" / "2024_1_unknown.jpg").exists()
+    assert sampler.label_sample("2024_1_unknown.png", "in_combat")
+    assert not (unlabeled / ".thumbs" / "2024_1_unknown.jpg").exists()
@@ -0,0 +1,119 @@
+"""Tests SessionRecorder / SessionReplay — format .ptcgrec, keyframes + deltas, mmap."""
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tracker.capture.bus import FrameBus
+from tracker.capture.detector import CombatState
+from tracker.capture.frame import Frame
+from tracker.capture.recording import SessionRecorder, SessionReplay
+
+
+def make_frames(n, shape=(60, 80), seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=shape + (3,), dtype=np.uint8)
+    frames = []
+    for i in range(n):
+        rgb = base.copy()
+        rgb[i % shape[0], :, 0] = i          # petit changement par frame
+        frames.append(rgb)
+    return frames
+
+
+def record(path, frames, **kwargs):
+    with SessionRecorder(str(path), **kwargs) as rec:
+        for i, rgb in enumerate(frames):
+            rec.add_frame(Frame.from_rgb(rgb), timestamp=float(i) / 10)
+    return rec
+
+
+def test_roundtrip_is_lossless(tmp_path):
+    frames = make_frames(12)
+    record(tmp_path / "s.ptcgrec", frames, keyframe_interval=5)
+    with SessionReplay(str(tmp_path / "s.ptcgrec")) as replay:
+        assert len(replay) == 12
+        for i, rgb in enumerate(frames):
+            np.testing.assert_array_equal(replay.rgb(i), rgb)
+        np.testing.assert_allclose(replay.timestamps, np.arange(12) / 10)
+
+
+def test_random_access_from_nearest_keyframe(tmp_path):
+    frames = make_frames(20)
+    record(tmp_path / "s.ptcgrec", frames, keyframe_interval=7)
+    with SessionReplay(str(tmp_path / "s.ptcgrec")) as replay:
+        for i in (13, 2, 19, 0, 7, -1):
+            np.testing.assert_array_equal(replay.rgb(i), frames[i])
+        assert isinstance(replay.frame(3), Frame)
+        with pytest.raises(IndexError):
+            replay.rgb(20)
+
+
+def test_static_frames_compress_well(tmp_path):
+    frames = make_frames(1) * 30
+    rec = record(tmp_path / "s.ptcgrec", frames, keyframe_interval=100)
+    assert rec.stats["compression_ratio"] > 15
+
+
+def test_size_change_forces_keyframe(tmp_path):
+    frames = make_frames(3) + make_frames(2, shape=(30, 40), seed=1)
+    record(tmp_path / "s.ptcgrec", frames)
+    with SessionReplay(str(tmp_path / "s.ptcgrec")) as replay:
+        assert replay.rgb(4).shape == (30, 40, 3)
+        np.testing.assert_array_equal(replay.rgb(3), frames[3])
+
+
+def test_transitions_and_meta(tmp_path):
+    path = tmp_path / "s.ptcgrec"
+    frames = make_frames(4)
+    with SessionRecorder(str(path), meta={"region": {"x": 1}}) as rec:
+        rec.add_frame(Image.fromarray(frames[0]), timestamp=0.0)
+        rec.transition(CombatState.IN_COMBAT, CombatState.END_SCREEN, outcome="win",
+                       timestamp=0.05)
+        rec.add_frame(Image.fromarray(frames[1]), timestamp=0.1)
+    with SessionReplay(str(path)) as replay:
+        assert replay.meta["region"] == {"x": 1}
+        assert replay.transitions == [{
+            "from": "in_combat", "to": "end_screen", "outcome": "win",
+            "timestamp": 0.05, "frame": 1,
+        }]
+
+
+def test_min_interval_drops_frames(tmp_path):
+    with SessionRecorder(str(tmp_path / "s.ptcgrec"), min_interval=0.25) as rec:
+        kept = [rec.add_frame(Frame.from_rgb(rgb), timestamp=i / 10)
+                for i, rgb in enumerate(make_frames(6))]
+    assert kept == [True, False, False, True, False, False]
+
+
+def test_truncated_file_is_readable(tmp_path):
+    path = tmp_path / "s.ptcgrec"
+    record(path, make_frames(5))
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    with SessionReplay(str(path)) as replay:
+        assert len(replay) == 4
+
+
+def test_invalid_file_rejected(tmp_path):
+    path = tmp_path / "bad.ptcgrec"
+    path.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        SessionReplay(str(path))
+
+
+def test_records_frames_from_bus(tmp_path):
+    bus = FrameBus()
+    path = tmp_path / "s.ptcgrec"
+    rec = SessionRecorder(str(path))
+    rec.start(bus)
+    for rgb in make_frames(3):
+        bus.publish(Frame.from_rgb(rgb))
+        for _ in range(200):
+            if rec.stats["frames"] == bus.latest().seq:
+                break
+            time.sleep(0.005)
+    rec.close()
+    with SessionReplay(str(path)) as replay:
+        assert len(replay) == 3
@@ -0,0 +1,144 @@
+"""Tests du détecteur d'écran de stats et de la boucle wait_for_stats."""
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from tracker.capture.stats_screen import StatsScreenDetector, wait_for_stats
+
+LABELS = ["Ordre d'action", "Tours joués", "Vos points", "Points adversaire", "Dégâts infligés"]
+
+
+def stats_frame(values=("A joué en premier", "12", "3", "1", "340"), size=(1280, 720)):
+    """Tableau de stats synthétique : 5 lignes label / valeur dans la zone basse."""
+    w, h = size
+    img = Image.new("RGB", size, (235, 238, 245))
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=int(h * 0.032))
+    y0, y1 = 0.62 * h, 0.95 * h
+    for i, (label, value) in enumerate(zip(LABELS, values)):
+        y = int(y0 + (i + 0.3) * (y1 - y0) / 5)
+        draw.text((int(w * 0.05), y), label, fill=(50, 50, 70), font=font)
+        draw.text((int(w * 0.45), y), value, fill=(50, 50, 70), font=font)
+    return img
+
+
+def card_frame(seed=0, size=(1280, 720)):
+    """Carte résultat synthétique : illustration centrale + "Touchez pour continuer"."""
+    w, h = size
+    rng = np.random.default_rng(seed)
+    arr = np.full((h, w, 3), (30, 30, 50), np.uint8)
+    y0, y1, x0, x1 = int(h * 0.05), int(h * 0.9), int(w * 0.3), int(w * 0.7)
+    arr[y0:y1, x0:x1] = rng.integers(0, 256, (y1 - y0, x1 - x0, 3), dtype=np.uint8)
+    img = Image.fromarray(arr)
+    ImageDraw.Draw(img).text((int(w * 0.4), int(h * 0.93)), "Touchez pour continuer",
+                             fill=(255, 255, 255), font=ImageFont.load_default(size=int(h * 0.03)))
+    return img
+
+
+def test_row_structure_separates_stats_from_card(tmp_path):
+    detector = StatsScreenDetector(template_path=str(tmp_path / "tpl.npy"))
+    assert detector.is_stats_screen(stats_frame())
+    assert not detector.is_stats_screen(card_frame(0))
+    assert not detector.is_stats_screen(card_frame(1))
+    assert not detector.is_stats_screen(Image.new("RGB", (1280, 720)))
+    assert detector.stats == {"checks": 4, "positives": 1, "template": False}
+
+
+def test_learned_template_is_persisted_and_matches(tmp_path):
+    path = tmp_path / "tpl.npy"
+    StatsScreenDetector(template_path=str(path)).learn(stats_frame())
+    assert path.exists()
+    detector = StatsScreenDetector(template_path=str(path))
+    score = detector.score(stats_frame(("A joué en deuxième", "7", "0", "3", "90")))
+    assert score["template"] > 0.8
+    assert detector.score(card_frame())["template"] < 0.5
+
+
+def _run(frames, detector, ocr_every=5.0, ocr_every_max=40.0):
+    """wait_for_stats sur une liste de frames, horloge virtuelle de 0.15 s par frame."""
+    now = [0.0]
+    calls = []
+    feed = iter(frames)
+
+    def extract(img):
+        calls.append(img)
+        if img.stats:
+            return {"turns_played": 12, "raw_ocr_data": "[]"}
+        return {"turns_played": None, "raw_ocr_data": "[]"}
+
+    def sleep(dt):
+        now[0] += dt
+
+    result = wait_for_stats(lambda: next(feed, None), extract, detector, attempts=len(frames),
+                            ocr_every=ocr_every, ocr_every_max=ocr_every_max,
+                            sleep=sleep, clock=lambda: now[0])
+    return result, calls
+
+
+def _tagged(img, stats):
+    img.stats = stats
+    return img
+
+
+def test_wait_for_stats_runs_ocr_once_with_detector(tmp_path):
+    frames = [_tagged(card_frame(i % 3), False) for i in range(20)] + [_tagged(stats_frame(), True)]
+    detector = StatsScreenDetector(template_path=str(tmp_path / "tpl.npy"))
+    result, calls = _run(frames, detector)
+    assert result["attempt"] == 21
+    assert result["ocr_calls"] == 1 and len(calls) == 1
+    assert result["skipped"] == 20
+    assert (tmp_path / "tpl.npy").exists()      # gabarit appris sur confirmation OCR
+
+
+def test_wait_for_stats_without_detector_ocrs_every_frame():
+    frames = [_tagged(card_frame(0), False) for _ in range(5)] + [_tagged(stats_frame(), True)]
+    result, calls = _run(frames, None)
+    assert result["ocr_calls"] == 6
+    assert result["data"]["turns_played"] == 12
+
+
+class Never:
+    def is_stats_screen(self, img):
+        return False
+
+    def learn(self, img):
+        pass
+
+
+def test_wait_for_stats_periodic_ocr_when_detector_refuses():
+    # 40 frames à 0.15 s = 6 s : une OCR de secours après 5 s, qui trouve le tableau
+    frames = [_tagged(stats_frame(), True) for _ in range(40)]
+    result, calls = _run(frames, Never(), ocr_every=5.0)
+    assert result["data"] is not None
+    assert result["ocr_calls"] == result["safety_calls"] == 1
+    assert result["skipped"] >= 30
+
+
+def test_wait_for_stats_is_bounded_by_time_not_frames():
+    # Bus au ralenti (IDLE) : next_image bloque 0.5 s avant chaque frame
+    now = [0.0]
+
+    def next_image():
+        now[0] += 0.5
+        return _tagged(card_frame(0), False)
+
+    def sleep(dt):
+        now[0] += dt
+
+    result = wait_for_stats(next_image, lambda img: {"turns_played": None, "raw_ocr_data": ""},
+                            Never(), timeout=90.0, sleep=sleep, clock=lambda: now[0])
+    assert result["data"] is None
+    assert 90.0 <= now[0] < 91.0
+    # 0.5 s d'attente + 0.15 s de pause par frame : ~138 frames, loin des 600 d'avant
+    assert result["skipped"] + result["ocr_calls"] <= 140
+
+
+def test_wait_for_stats_safety_ocr_backs_off():
+    # Carte résultat de 30 s (200 frames à 0.15 s) refusée : secours à 5 s puis 15 s
+    frames = [_tagged(card_frame(0), False) for _ in range(200)]
+    result, calls = _run(frames, Never(), ocr_every=5.0)
+    assert result["data"] is None
+    assert result["ocr_calls"] == result["safety_calls"] == 2
+
+    # Plafond : 5, 10, 10, 10… s entre deux secours
+    result, _ = _run(frames, Never(), ocr_every=5.0, ocr_every_max=10.0)
+    assert result["safety_calls"] == 3
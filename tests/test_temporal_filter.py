@@ -0,0 +1,123 @@
+"""Tests StateFilter — filtre forward HMM et moteur de transitions de PollingLoop."""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from tracker.capture.detector import STATE_INTERVALS, CombatState, PollingLoop, StateDetector
+from tracker.capture.temporal import StateFilter
+
+FAKE_IMG = MagicMock()
+
+PQ = {"pre_queue": 0.9, "in_combat": 0.05, "end_screen": 0.05}
+IC = {"pre_queue": 0.05, "in_combat": 0.9, "end_screen": 0.05}
+ES = {"pre_queue": 0.05, "in_combat": 0.05, "end_screen": 0.9}
+# Frames très sûres : une seule suffit là où l'ancien moteur validait en un tick
+PQ_SURE = {"pre_queue": 0.98, "in_combat": 0.01, "end_screen": 0.01}
+ES_SURE = {"pre_queue": 0.01, "in_combat": 0.01, "end_screen": 0.98}
+
+
+def ticks_until_change(f, proba, dt=0.1, limit=100):
+    start = f.state
+    for n in range(1, limit + 1):
+        if f.update(proba, dt) != start:
+            return n
+    return None
+
+
+def test_transition_matrix_rows_are_stochastic():
+    f = StateFilter()
+    for state in (None, CombatState.IDLE, CombatState.IN_COMBAT):
+        A = f.transition_matrix(0.1, state)
+        np.testing.assert_allclose(A.sum(axis=1), 1.0)
+    # Avec un état validé, les autres états sont absorbants
+    A = f.transition_matrix(0.1, CombatState.PRE_QUEUE)
+    assert A[1, 1] < 1.0 and A[2, 2] == 1.0 and A[0, 0] == 1.0
+
+
+def test_confident_evidence_commits_faster_than_debounce():
+    f = StateFilter(initial=CombatState.PRE_QUEUE)
+    assert ticks_until_change(f, IC) == 3          # debounce : 8 ticks
+    assert f.state == CombatState.IN_COMBAT
+    assert f.posterior["in_combat"] == 1.0
+
+
+@pytest.mark.parametrize("initial, proba, dt", [
+    (CombatState.IDLE, PQ_SURE, STATE_INTERVALS[CombatState.IDLE]),
+    (CombatState.IN_COMBAT, ES_SURE, STATE_INTERVALS[CombatState.IN_COMBAT]),
+])
+def test_one_confident_frame_commits_where_debounce_took_one_tick(initial, proba, dt):
+    assert ticks_until_change(StateFilter(initial=initial), proba, dt=dt) == 1
+
+
+def test_ambiguous_evidence_needs_more_frames():
+    f = StateFilter(initial=CombatState.PRE_QUEUE)
+    weak = {"pre_queue": 0.3, "in_combat": 0.7, "end_screen": 0.0}
+    assert ticks_until_change(f, weak) > 3
+
+
+def test_single_glitch_is_rejected():
+    f = StateFilter(initial=CombatState.IN_COMBAT)
+    for proba in (IC, ES, IC, IC, ES, IC):
+        assert f.update(proba, 0.2) == CombatState.IN_COMBAT
+
+
+def test_idle_ignores_in_combat_evidence():
+    # Combat non classé depuis les menus : aucune transition IDLE → IN_COMBAT
+    f = StateFilter()
+    for _ in range(50):
+        assert f.update(IC, 0.5) == CombatState.IDLE
+
+
+def test_prequeue_exit_on_end_screen_evidence():
+    f = StateFilter(initial=CombatState.PRE_QUEUE)
+    assert ticks_until_change(f, ES) is not None
+    assert f.state == CombatState.IDLE
+
+
+def test_commit_time_is_rate_independent():
+    # Observations neutres : seule la durée écoulée fait sortir de END_SCREEN
+    neutral = {"pre_queue": 1 / 3, "in_combat": 1 / 3, "end_screen": 1 / 3}
+    seconds = []
+    for dt in (0.05, 0.1, 0.2):
+        f = StateFilter(initial=CombatState.END_SCREEN)
+        seconds.append(ticks_until_change(f, neutral, dt=dt) * dt)
+    assert max(seconds) - min(seconds) <= 0.2
+
+
+def test_empty_proba_is_ignored():
+    f = StateFilter(initial=CombatState.PRE_QUEUE)
+    assert f.update({}, 0.1) == CombatState.PRE_QUEUE
+    assert f.posterior["pre_queue"] == 1.0
+
+
+def make_loop(proba, outcome="win"):
+    detector = MagicMock(spec=StateDetector)
+    detector.predict_proba.return_value = proba
+    detector.predict_outcome.return_value = outcome
+    detector.is_pre_queue_ranked.return_value = False
+    detector.is_in_combat.return_value = False
+    detector.is_end_screen.return_value = proba in (ES, ES_SURE)
+    return PollingLoop(detector=detector, engine=StateFilter(),
+                       intervals=STATE_INTERVALS), detector
+
+
+def test_polling_loop_uses_engine_and_outcome():
+    loop, detector = make_loop(ES_SURE, outcome="lose")
+    result = loop._compute_next_state(CombatState.IN_COMBAT, FAKE_IMG)
+    assert result == (CombatState.END_SCREEN, "lose")
+    detector.predict_outcome.assert_called_once_with(FAKE_IMG)
+
+
+def test_polling_loop_falls_back_to_debounce_without_proba():
+    loop, detector = make_loop({})
+    detector.is_in_combat.return_value = True
+    states = [loop._compute_next_state(CombatState.PRE_QUEUE, FAKE_IMG)[0] for _ in range(8)]
+    assert states == [CombatState.PRE_QUEUE] * 7 + [CombatState.IN_COMBAT]
+
+
+@pytest.mark.parametrize("forced", [CombatState.IN_COMBAT, CombatState.END_SCREEN])
+def test_engine_follows_externally_forced_state(forced):
+    loop, _ = make_loop(PQ)
+    loop._compute_next_state(forced, FAKE_IMG)
+    assert loop._engine.posterior[forced.value] > 0.5
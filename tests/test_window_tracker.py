@@ -0,0 +1,217 @@
+"""Tests WindowTracker — hwnd en cache, validation légère, suivi des déplacements.
+
+Win32 piloté via FakeWindows (même interface que screen.Win32Windows).
+"""
+from unittest.mock import MagicMock
+
+from tracker.capture.detector import PollingLoop
+from tracker.capture.screen import WindowTracker, find_mumu_window
+
+
+class FakeWindows:
+    def __init__(self):
+        self.windows = {}      # hwnd -> {"title", "rect", "visible", "iconic"}
+        self.enum_calls = 0
+
+    def add(self, hwnd, title="MuMu Player 12", rect=(100, 50, 900, 650)):
+        self.windows[hwnd] = {"title": title, "rect": rect, "visible": True, "iconic": False}
+
+    def enum_windows(self):
+        self.enum_calls += 1
+        return list(self.windows)
+
+    def is_window(self, hwnd):
+        return hwnd in self.windows
+
+    def is_visible(self, hwnd):
+        return self.windows[hwnd]["visible"]
+
+    def is_iconic(self, hwnd):
+        return self.windows[hwnd]["iconic"]
+
+    def get_title(self, hwnd):
+        return self.windows[hwnd]["title"]
+
+    def get_rect(self, hwnd):
+        return self.windows[hwnd]["rect"]
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_config(region):
+    store = {"mumu_region": region}
+    config = MagicMock()
+    config.get_all.side_effect = lambda: dict(store)
+    config.save.side_effect = store.update
+    return config, store
+
+
+def test_find_mumu_window_matches_title():
+    win = FakeWindows()
+    win.add(1, title="Explorer")
+    win.add(2, title="MuMu Player 12")
+    assert find_mumu_window(win) == 2
+
+
+def test_poll_uses_cached_hwnd_between_rescans():
+    win, clock = FakeWindows(), Clock()
+    win.add(42)
+    tracker = WindowTracker(windows=win, clock=clock, rescan_interval=5.0)
+    for _ in range(20):
+        assert tracker.poll() == 42
+        clock.t += 0.1
+    assert win.enum_calls == 1
+    assert tracker.stats == {"full_scans": 1, "validations": 19}
+
+
+def test_rescan_when_cached_window_closed():
+    win, clock = FakeWindows(), Clock()
+    win.add(42)
+    tracker = WindowTracker(windows=win, clock=clock)
+    tracker.poll()
+    del win.windows[42]
+    win.add(43)
+    assert tracker.poll() == 43
+    assert win.enum_calls == 2
+
+
+def test_rescan_when_cached_window_hidden():
+    win, clock = FakeWindows(), Clock()
+    win.add(42)
+    tracker = WindowTracker(windows=win, clock=clock)
+    tracker.poll()
+    win.windows[42]["visible"] = False
+    assert tracker.poll() is None
+
+
+def test_slow_timer_forces_rescan():
+    win, clock = FakeWindows(), Clock()
+    win.add(42)
+    tracker = WindowTracker(windows=win, clock=clock, rescan_interval=5.0)
+    tracker.poll()
+    clock.t = 5.0
+    tracker.poll()
+    assert win.enum_calls == 2
+
+
+def test_no_window_rescans_only_on_timer():
+    win, clock = FakeWindows(), Clock()
+    tracker = WindowTracker(windows=win, clock=clock, rescan_interval=5.0)
+    assert tracker.poll() is None
+    clock.t = 1.0
+    assert tracker.poll() is None
+    assert win.enum_calls == 2   # pas de hwnd en cache → énumération
+
+
+def test_move_translates_region():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 120, "y": 90, "width": 500, "height": 400})
+    tracker = WindowTracker(windows=win, config=config, clock=clock)
+    tracker.poll()
+    win.windows[42]["rect"] = (130, 40, 930, 640)
+    tracker.poll()
+    clock.t = 1.0
+    tracker.poll()
+    assert store["mumu_region"] == {"x": 150, "y": 80, "width": 500, "height": 400}
+
+
+def test_move_replaces_region_matching_window_rect():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 100, "y": 50, "width": 800, "height": 600})
+    tracker = WindowTracker(windows=win, config=config, clock=clock)
+    tracker.poll()
+    win.windows[42]["rect"] = (0, 0, 1000, 700)
+    tracker.poll()
+    clock.t = 1.0
+    tracker.poll()
+    assert store["mumu_region"] == {"x": 0, "y": 0, "width": 1000, "height": 700}
+
+
+def test_resize_keeps_margins_of_region():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 110, "y": 90, "width": 780, "height": 550})
+    tracker = WindowTracker(windows=win, config=config, clock=clock)
+    tracker.poll()
+    win.windows[42]["rect"] = (100, 50, 1100, 800)
+    tracker.poll()
+    clock.t = 1.0
+    tracker.poll()
+    assert store["mumu_region"] == {"x": 110, "y": 90, "width": 980, "height": 700}
+
+
+def test_drag_saves_config_once_when_rect_is_stable():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 120, "y": 90, "width": 500, "height": 400})
+    tracker = WindowTracker(windows=win, config=config, clock=clock, settle=0.5)
+    tracker.poll()
+    for i in range(1, 11):          # glisser-déposer : un nouveau rect par tick
+        clock.t = i * 0.1
+        win.windows[42]["rect"] = (100 + 10 * i, 50, 900 + 10 * i, 650)
+        tracker.poll()
+    config.save.assert_not_called()
+    clock.t = 1.6
+    tracker.poll()
+    config.save.assert_called_once()
+    assert store["mumu_region"]["x"] == 220
+
+
+def test_tracker_own_window_is_never_the_emulator():
+    win = FakeWindows()
+    win.add(1, title="Pokemon TCG Tracker")
+    assert find_mumu_window(win) is None
+    win.add(2, title="MuMu Player 12")
+    assert find_mumu_window(win) == 2
+
+
+def test_configured_window_title_takes_priority():
+    win = FakeWindows()
+    win.add(1, title="Pokémon - Wikipédia")
+    win.add(2, title="Mon émulateur")
+    assert find_mumu_window(win) == 1
+    assert find_mumu_window(win, title="Mon émulateur") == 2
+
+
+def test_keyword_only_match_does_not_rewrite_region():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, title="Pokémon - Wikipédia", rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 120, "y": 90, "width": 500, "height": 400})
+    tracker = WindowTracker(windows=win, config=config, clock=clock)
+    assert tracker.poll() == 42
+    win.windows[42]["rect"] = (300, 50, 1100, 650)
+    tracker.poll()
+    clock.t = 1.0
+    tracker.poll()
+    config.save.assert_not_called()
+
+
+def test_minimized_window_does_not_move_region():
+    win, clock = FakeWindows(), Clock()
+    win.add(42, rect=(100, 50, 900, 650))
+    config, store = make_config({"x": 120, "y": 90, "width": 500, "height": 400})
+    tracker = WindowTracker(windows=win, config=config, clock=clock)
+    tracker.poll()
+    win.windows[42].update(iconic=True, rect=(-32000, -32000, -31840, -31973))
+    tracker.poll()
+    win.windows[42].update(iconic=False, rect=(100, 50, 900, 650))
+    tracker.poll()
+    config.save.assert_not_called()
+
+
+def test_polling_loop_uses_injected_tracker():
+    tracker = MagicMock()
+    tracker.poll.return_value = 7
+    loop = PollingLoop(config=None, detector=MagicMock(), window=tracker)
+    loop._detect_and_transition = MagicMock()
+    loop._tick()
+    tracker.poll.assert_called_once()
+    assert loop.mumu_detected
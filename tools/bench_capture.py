@@ -0,0 +1,139 @@
+"""tools/bench_capture.py — Microbenchmark du chemin de capture écran.
+
+Compare la latence par appel :
+  - "per_call"   : ancien chemin, `with mss.mss()` ouvert à chaque capture
+  - "session"    : CaptureSession persistante (tracker.capture.screen)
+  - "frame"      : CaptureSession → Frame NumPy (pas de conversion PIL)
+  - "rois_union" : ROIs IN_COMBAT capturées via leur rectangle englobant
+  - "rois_sep"   : ROIs IN_COMBAT capturées une par une
+
+Lance ce script depuis Windows (pas WSL) avec :
+    python tools/bench_capture.py
+    python tools/bench_capture.py --n 300 --region 0,0,800,600
+
+Sans --region, utilise la mumu_region de la config (ou 800x600 en haut à gauche).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import time
+
+
+def _percentiles(samples_ms: list) -> dict:
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {
+        "mean": statistics.fmean(s),
+        "p50":  pct(50),
+        "p95":  pct(95),
+        "max":  s[-1],
+    }
+
+
+def bench_per_call(region: dict, n: int) -> list:
+    import mss  # noqa: PLC0415
+    from PIL import Image  # noqa: PLC0415
+
+    monitor = {"left": region["x"], "top": region["y"],
+               "width": region["width"], "height": region["height"]}
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        with mss.mss() as sct:
+            shot = sct.grab(monitor)
+            Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def bench_session(region: dict, n: int) -> list:
+    from tracker.capture.screen import CaptureSession  # noqa: PLC0415
+
+    session = CaptureSession()
+    session.grab_pil(region)  # ouverture du handle hors mesure
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        session.grab_pil(region)
+        samples.append((time.perf_counter() - t0) * 1000)
+    session.close()
+    return samples
+
+
+def bench_frame(region: dict, n: int) -> list:
+    from tracker.capture.screen import CaptureSession  # noqa: PLC0415
+
+    session = CaptureSession()
+    session.grab_frame(region)
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        session.grab_frame(region)
+        samples.append((time.perf_counter() - t0) * 1000)
+    session.close()
+    return samples
+
+
+def bench_rois(region: dict, n: int, mode: str) -> list:
+    from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+    from tracker.capture.screen import CaptureSession  # noqa: PLC0415
+
+    rois = OcrPipeline(reader=object()).rois_for_state("in_combat")
+    session = CaptureSession()
+    session.grab_rois(region, rois, mode=mode)
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        session.grab_rois(region, rois, mode=mode)
+        samples.append((time.perf_counter() - t0) * 1000)
+    session.close()
+    return samples
+
+
+def _default_region() -> dict:
+    try:
+        from tracker.config import ConfigManager  # noqa: PLC0415
+        region = ConfigManager().get_all().get("mumu_region")
+        if region:
+            return region
+    except Exception:
+        pass
+    return {"x": 0, "y": 0, "width": 800, "height": 600}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=200, help="captures par variante")
+    parser.add_argument("--region", default=None, help="x,y,width,height")
+    args = parser.parse_args()
+
+    if args.region:
+        x, y, w, h = (int(v) for v in args.region.split(","))
+        region = {"x": x, "y": y, "width": w, "height": h}
+    else:
+        region = _default_region()
+
+    print(f"Région : {region}  ({args.n} captures par variante)\n")
+    results = {
+        "per_call": _percentiles(bench_per_call(region, args.n)),
+        "session":  _percentiles(bench_session(region, args.n)),
+        "frame":    _percentiles(bench_frame(region, args.n)),
+        "rois_union": _percentiles(bench_rois(region, args.n, "union")),
+        "rois_sep":   _percentiles(bench_rois(region, args.n, "separate")),
+    }
+    print(f"{'variante':<12}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}   (ms)")
+    for name, r in results.items():
+        print(f"{name:<12}{r['mean']:>9.2f}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['max']:>9.2f}")
+    speedup = results["per_call"]["mean"] / max(results["session"]["mean"], 1e-9)
+    print(f"\nGain moyen session vs per_call : x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
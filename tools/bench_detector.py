@@ -0,0 +1,242 @@
+"""tools/bench_detector.py — Vitesse et précision du détecteur sur les samples labellisés.
+
+Charge une fois data/detection_samples/<label>/*.png (pre_queue, in_combat,
+end_screen_win, end_screen_lose) puis, pour chaque frame, mesure séparément :
+  - features  : features couleur (étage 1) + HOG/HSV si la frame passe à l'étage 2
+  - inference : décision de l'étage couleur + SVM
+et rapporte percentiles de latence, débit (frames/s frame par frame, et par
+lot via extract_features_batch pour l'étage 2 seul), précision par classe,
+matrice de confusion, et précision de predict_outcome (win/lose) sur les
+écrans de fin.
+
+Résultat en JSON (stdout ou --out) pour comparer modèles et variantes de
+features d'une exécution à l'autre.
+
+Usage :
+    python tools/bench_detector.py
+    python tools/bench_detector.py --model data/state_classifier.npz --out bench.json
+    python tools/bench_detector.py --limit 50 --repeat 3
+    python tools/bench_detector.py --model data/state_classifier_cnn.pt \
+        --holdout data/state_classifier_cnn.pt     # CNN, frames du holdout seulement
+
+--holdout restreint les samples à la liste "holdout" d'un checkpoint CNN
+(frames non vues par le CNN). Le SVM du runtime a pu être entraîné sur ces
+frames : la comparaison équitable est celle de `train_classifier.py --mode cnn`.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import time
+
+# Dossier source → (label du classificateur, issue attendue)
+SAMPLE_LABELS = {
+    "pre_queue":       ("pre_queue", None),
+    "in_combat":       ("in_combat", None),
+    "end_screen_win":  ("end_screen", "win"),
+    "end_screen_lose": ("end_screen", "lose"),
+}
+CLASSES = ["pre_queue", "in_combat", "end_screen"]
+
+
+def _percentiles(samples_ms: list) -> dict:
+    if not samples_ms:
+        return {}
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"mean": statistics.fmean(s), "p50": pct(50), "p95": pct(95),
+            "p99": pct(99), "max": s[-1]}
+
+
+def load_samples(samples_dir: str, limit: int | None, only: set | None = None) -> list:
+    """[(image PIL, label, issue attendue)] — images décodées une seule fois.
+
+    `only` : chemins relatifs "dossier/fichier.png" à garder (holdout).
+    """
+    from PIL import Image  # noqa: PLC0415
+
+    samples = []
+    for folder, (label, outcome) in SAMPLE_LABELS.items():
+        path = os.path.join(samples_dir, folder)
+        if not os.path.isdir(path):
+            continue
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith(".png")
+                       and (only is None or f"{folder}/{f}" in only))
+        for fname in files[:limit]:
+            with Image.open(os.path.join(path, fname)) as img:
+                samples.append((img.convert("RGB"), label, outcome))
+    return samples
+
+
+def _resolve_model(path: str | None) -> tuple:
+    from tracker.capture import detector  # noqa: PLC0415
+
+    if path is None:
+        pkl = detector._MODEL_PATH if os.path.exists(detector._MODEL_PATH) \
+            else detector._MODEL_PATH_LEGACY
+        candidates = [p for p in detector._model_paths(pkl) if os.path.exists(p)]
+        if not candidates:
+            return None, None
+        path = candidates[0]
+    return path, detector.load_model_file(path)
+
+
+def classify_timed(model: dict, img) -> tuple:
+    """(label, ms features, ms inference, étage) — mêmes étapes que StateDetector._classify."""
+    from tracker.capture.detector import _color_features, _model_features  # noqa: PLC0415
+
+    feat_ms = inf_ms = 0.0
+    stage = model.get("color_stage")
+    if stage is not None:
+        t0 = time.perf_counter()
+        color = _color_features(img)
+        t1 = time.perf_counter()
+        label, _ = stage.decide(color)
+        t2 = time.perf_counter()
+        feat_ms += (t1 - t0) * 1000
+        inf_ms += (t2 - t1) * 1000
+        if label is not None:
+            return str(label), feat_ms, inf_ms, 1
+    t0 = time.perf_counter()
+    feat = _model_features(model, img)
+    t1 = time.perf_counter()
+    label = str(model["pipeline"].predict([feat])[0])
+    t2 = time.perf_counter()
+    return label, feat_ms + (t1 - t0) * 1000, inf_ms + (t2 - t1) * 1000, 2
+
+
+def _confusion(pairs: list, labels: list) -> dict:
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = [[0] * len(labels) for _ in labels]
+    for true, pred in pairs:
+        matrix[index[true]][index.get(pred, index[labels[-1]])] += 1
+    per_class = {}
+    for label in labels:
+        n = sum(1 for t, _ in pairs if t == label)
+        if n:
+            correct = sum(1 for t, p in pairs if t == label and p == label)
+            per_class[label] = {"n": n, "correct": correct, "accuracy": correct / n}
+    total = len(pairs)
+    correct = sum(1 for t, p in pairs if t == p)
+    return {
+        "overall": correct / total if total else None,
+        "per_class": per_class,
+        "labels": labels,
+        "confusion": matrix,   # lignes : vrai label, colonnes : prédiction
+    }
+
+
+def run(samples: list, model: dict, repeat: int = 1, batch: int = 32) -> dict:
+    from tracker.capture.detector import StateDetector, _model_features_batch  # noqa: PLC0415
+
+    classify_timed(model, samples[0][0])   # imports et tables précalculées hors mesure
+    feat_ms, inf_ms, total_ms, stages = [], [], [], [0, 0]
+    pairs = []
+    t_start = time.perf_counter()
+    for r in range(repeat):
+        for img, label, _ in samples:
+            pred, f_ms, i_ms, stage = classify_timed(model, img)
+            feat_ms.append(f_ms)
+            inf_ms.append(i_ms)
+            total_ms.append(f_ms + i_ms)
+            if r == 0:
+                pairs.append((label, pred))
+                stages[stage - 1] += 1
+    elapsed = time.perf_counter() - t_start
+
+    # Débit par lot, étage 2 seul (sans cascade) : extraction vectorisée + une prédiction par lot
+    t0 = time.perf_counter()
+    for i in range(0, len(samples), batch):
+        X = _model_features_batch(model, [s[0] for s in samples[i:i + batch]])
+        model["pipeline"].predict(X)
+    batch_elapsed = time.perf_counter() - t0
+
+    # Issue win/lose sur les écrans de fin (règle couleur)
+    detector = StateDetector()
+    detector._model, detector._model_loaded = model, True
+    outcomes = [(expected, detector.predict_outcome(img))
+                for img, _, expected in samples if expected is not None]
+
+    labels = CLASSES + ["unknown"]
+    accuracy = _confusion(pairs, labels)
+    n = len(samples) * repeat
+    return {
+        "frames": len(samples),
+        "repeat": repeat,
+        "latency_ms": {
+            "features": _percentiles(feat_ms),
+            "inference": _percentiles(inf_ms),
+            "total": _percentiles(total_ms),
+        },
+        "throughput_fps": n / elapsed if elapsed else None,
+        "batch_stage2_fps": len(samples) / batch_elapsed if batch_elapsed else None,
+        "stages": {"stage1": stages[0], "stage2": stages[1],
+                   "stage1_ratio": stages[0] / len(samples)},
+        "accuracy": accuracy,
+        "outcome": _confusion(outcomes, ["win", "lose", "unknown"]) if outcomes else None,
+    }
+
+
+def main():
+    from tracker.paths import get_data_dir  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description="Benchmark vitesse/précision du détecteur")
+    parser.add_argument("--samples", default=os.path.join(get_data_dir(), "detection_samples"),
+                        help="dossier contenant <label>/*.png")
+    parser.add_argument("--model", default=None,
+                        help="modèle .pkl, .npz ou .pt (défaut : celui du runtime)")
+    parser.add_argument("--holdout", default=None,
+                        help="checkpoint CNN (.pt) dont la liste holdout restreint les samples")
+    parser.add_argument("--limit", type=int, default=None, help="images max par label")
+    parser.add_argument("--repeat", type=int, default=1, help="passes de mesure")
+    parser.add_argument("--batch", type=int, default=32, help="taille de lot (débit par lot)")
+    parser.add_argument("--out", default=None, help="fichier JSON de sortie (défaut : stdout)")
+    args = parser.parse_args()
+
+    path, model = _resolve_model(args.model)
+    if model is None:
+        print(f"Modèle absent ou incompatible : {path}", file=sys.stderr)
+        sys.exit(1)
+    only = None
+    if args.holdout:
+        from tracker.capture.detector import load_model_file  # noqa: PLC0415
+        only = set((load_model_file(args.holdout) or {}).get("holdout") or [])
+    samples = load_samples(args.samples, args.limit, only)
+    if not samples:
+        print(f"Aucun sample dans {args.samples}", file=sys.stderr)
+        sys.exit(1)
+
+    result = {
+        "model": {
+            "path": path,
+            "type": type(model["pipeline"]).__name__,
+            "backend": model.get("backend", "svm"),
+            "feature_version": model.get("feature_version"),
+            "feature_params": model.get("feature_params") or {},
+            "cascade": model.get("color_stage") is not None,
+        },
+        "samples": {label: sum(1 for _, l, _ in samples if l == label) for label in CLASSES},
+        **run(samples, model, args.repeat, args.batch),
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        lat = result["latency_ms"]
+        print(f"{result['frames']} frames — features p50 {lat['features']['p50']:.2f} ms, "
+              f"inférence p50 {lat['inference']['p50']:.2f} ms, "
+              f"{result['throughput_fps']:.1f} fps, précision {result['accuracy']['overall']:.1%}"
+              f" → {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
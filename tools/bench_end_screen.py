@@ -0,0 +1,169 @@
+"""tools/bench_end_screen.py — Délai entre l'écran de stats et le match prêt à être enregistré.
+
+Rejoue une fin de combat : des frames "carte résultat" (--card) pendant
+--card-seconds (le joueur n'a pas encore touché l'écran), puis des frames du
+tableau de stats (--stats). La boucle est celle de main._capture_end_screen
+(stats_screen.wait_for_stats), avec et sans StatsScreenDetector devant l'OCR.
+
+Rapporte, par variante et par durée de carte (--card-seconds en accepte
+plusieurs : le délai dépend de la phase de l'OCR en cours au moment du clic) :
+  - time_to_saved_s : du premier affichage du tableau aux données OCR prêtes
+  - ocr_calls / safety_calls / skipped : OCR complètes lancées / dont OCR de
+    secours / frames écartées par le détecteur
+  - ocr_seconds : temps passé dans extract_end_screen_data (CPU volé au polling)
+  - detector_ms : coût par frame du détecteur
+puis un résumé (moyenne, max) sur l'ensemble des durées.
+
+Par défaut l'OCR est réelle (EasyOCR). --ocr-ms simule une OCR de durée fixe
+qui reconnaît les frames --stats, pour mesurer la boucle sans EasyOCR.
+
+Usage :
+    python tools/bench_end_screen.py --card carte.png --stats data/debug_end_screen.png
+    python tools/bench_end_screen.py --card carte.png --stats stats.png --ocr-ms 1500 \
+        --card-seconds 4 5 6 7 8 9 10 30
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+
+def _load(paths: list) -> list:
+    from PIL import Image  # noqa: PLC0415
+
+    images = []
+    for path in paths:
+        with Image.open(path) as img:
+            images.append(img.convert("RGB"))
+    return images
+
+
+def _simulated_extract(stats_images: list, ocr_ms: float):
+    stats_ids = {id(img) for img in stats_images}
+
+    def extract(img):
+        time.sleep(ocr_ms / 1000)
+        if id(img) in stats_ids:
+            return {"turns_played": 1, "raw_ocr_data": "[]"}
+        return {"turns_played": None, "raw_ocr_data": "[]"}
+
+    return extract
+
+
+def replay(card_images: list, stats_images: list, card_seconds: float, extract,
+           detector, interval: float) -> dict:
+    from tracker.capture.stats_screen import wait_for_stats  # noqa: PLC0415
+
+    t0 = time.monotonic()
+    served = [0]
+    ocr_seconds = [0.0]
+
+    def next_image():
+        pool = card_images if time.monotonic() - t0 < card_seconds else stats_images
+        served[0] += 1
+        return pool[served[0] % len(pool)]
+
+    def timed_extract(img):
+        t = time.perf_counter()
+        try:
+            return extract(img)
+        finally:
+            ocr_seconds[0] += time.perf_counter() - t
+
+    result = wait_for_stats(next_image, timed_extract, detector, interval=interval)
+    done = time.monotonic() - t0
+    return {
+        "found": result["data"] is not None,
+        "time_to_saved_s": done - card_seconds,
+        "total_s": done,
+        "frames": served[0],
+        "ocr_calls": result["ocr_calls"],
+        "safety_calls": result["safety_calls"],
+        "skipped": result["skipped"],
+        "ocr_seconds": ocr_seconds[0],
+    }
+
+
+def detector_cost(detector, images: list, n: int = 50) -> dict:
+    times = []
+    for i in range(n):
+        t = time.perf_counter()
+        detector.is_stats_screen(images[i % len(images)])
+        times.append((time.perf_counter() - t) * 1000)
+    return {"p50": statistics.median(times), "max": max(times)}
+
+
+def summarize(runs: list) -> dict:
+    delays = [r["time_to_saved_s"] for r in runs]
+    return {
+        "time_to_saved_mean_s": statistics.fmean(delays),
+        "time_to_saved_max_s": max(delays),
+        "ocr_calls": sum(r["ocr_calls"] for r in runs),
+        "ocr_seconds": sum(r["ocr_seconds"] for r in runs),
+    }
+
+
+def main():
+    from tracker.capture.stats_screen import StatsScreenDetector  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description="Benchmark délai écran de stats → match enregistré")
+    parser.add_argument("--card", nargs="+", required=True, help="frames de la carte résultat")
+    parser.add_argument("--stats", nargs="+", required=True, help="frames du tableau de stats")
+    parser.add_argument("--card-seconds", type=float, nargs="+", default=[8.0],
+                        help="durée(s) simulée(s) avant le clic « Touchez pour continuer »")
+    parser.add_argument("--interval", type=float, default=0.15, help="pause entre deux frames (s)")
+    parser.add_argument("--ocr-ms", type=float, default=None,
+                        help="OCR simulée de durée fixe (défaut : EasyOCR réel)")
+    parser.add_argument("--out", default=None, help="fichier JSON de sortie (défaut : stdout)")
+    args = parser.parse_args()
+
+    card_images, stats_images = _load(args.card), _load(args.stats)
+    if args.ocr_ms is not None:
+        extract = _simulated_extract(stats_images, args.ocr_ms)
+    else:
+        from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+        # Sans cache : chaque OCR lancée coûte son vrai prix
+        extract = OcrPipeline(cache_size=0).extract_end_screen_data
+        extract(stats_images[0])   # chargement du reader hors mesure
+
+    tmp = tempfile.mkdtemp(prefix="bench_end_screen_")
+    detector = StatsScreenDetector(template_path=os.path.join(tmp, "template.npy"))
+    result = {
+        "card_seconds": args.card_seconds,
+        "ocr": f"simulée {args.ocr_ms:.0f} ms" if args.ocr_ms is not None else "easyocr",
+        "detector_ms": detector_cost(detector, card_images + stats_images),
+        "classified": {
+            "card_positive": sum(detector.is_stats_screen(img) for img in card_images),
+            "stats_positive": sum(detector.is_stats_screen(img) for img in stats_images),
+        },
+        "without_detector": [], "with_detector": [],
+    }
+    for i, card_seconds in enumerate(args.card_seconds):
+        result["without_detector"].append(
+            replay(card_images, stats_images, card_seconds, extract, None, args.interval))
+        # Gabarit vierge à chaque fin de combat : seule la structure en lignes décide
+        fresh = StatsScreenDetector(template_path=os.path.join(tmp, f"t{i}.npy"))
+        result["with_detector"].append(
+            replay(card_images, stats_images, card_seconds, extract, fresh, args.interval))
+    result["summary"] = {key: summarize(result[key])
+                         for key in ("without_detector", "with_detector")}
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        for key, s in result["summary"].items():
+            print(f"{key}: {s['time_to_saved_mean_s']:.2f} s après le clic en moyenne "
+                  f"(max {s['time_to_saved_max_s']:.2f} s), {s['ocr_calls']} OCR, "
+                  f"{s['ocr_seconds']:.1f} s d'OCR → {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
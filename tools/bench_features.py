@@ -0,0 +1,130 @@
+"""tools/bench_features.py — Microbenchmark de l'extraction de features HOG + HSV.
+
+Compare le temps d'extraction par frame :
+  - "skimage"      : extraction historique (skimage.feature.hog + np.histogram)
+  - "numpy"        : tracker.capture.features, float64 (parité avec skimage)
+  - "numpy_f32"    : idem, HOG en float32
+  - "numpy_box"    : float32 + redimensionnement BOX
+  - "numpy_gap"    : float32 + LANCZOS avec reducing_gap=2.0
+et l'écart maximal de chaque variante avec la référence skimage.
+
+Usage :
+    python tools/bench_features.py                          # data/detection_samples
+    python tools/bench_features.py --samples dossier/ --n 200
+    python tools/bench_features.py --size 1280x720          # images synthétiques
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import time
+
+
+def _percentiles(samples_ms: list) -> dict:
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"mean": statistics.fmean(s), "p50": pct(50), "p95": pct(95), "max": s[-1]}
+
+
+def _load_images(samples: str | None, n: int, size: tuple) -> list:
+    import numpy as np  # noqa: PLC0415
+    from PIL import Image  # noqa: PLC0415
+
+    paths = []
+    if samples and os.path.isdir(samples):
+        for root, _, files in os.walk(samples):
+            paths += [os.path.join(root, f) for f in files if f.lower().endswith(".png")]
+    if paths:
+        images = []
+        for path in sorted(paths)[:n]:
+            with Image.open(path) as img:
+                images.append(img.convert("RGB"))
+        return images
+    rng = np.random.default_rng(0)
+    w, h = size
+    return [Image.fromarray(rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8))
+            for _ in range(min(n, 20))]
+
+
+def _reference(img):
+    import numpy as np  # noqa: PLC0415
+    from PIL import Image  # noqa: PLC0415
+    from skimage.feature import hog  # noqa: PLC0415
+
+    from tracker.capture.features import rgb_to_hsv  # noqa: PLC0415
+
+    img_rgb = img.convert("RGB").resize((160, 120), Image.LANCZOS)
+    gray = np.asarray(img_rgb.convert("L"), dtype=np.uint8)
+    hog_feat = hog(gray, orientations=8, pixels_per_cell=(16, 16), cells_per_block=(2, 2),
+                   feature_vector=True)
+    hsv = rgb_to_hsv(np.asarray(img_rgb, dtype=np.uint8))
+    hists = []
+    for ch in range(3):
+        h, _ = np.histogram(hsv[:, :, ch], bins=16, range=(0, 1))
+        hists.append(h / (h.sum() + 1e-6))
+    return np.concatenate([hog_feat, np.concatenate(hists)])
+
+
+def _variants() -> dict:
+    import numpy as np  # noqa: PLC0415
+
+    from tracker.capture.features import extract_features  # noqa: PLC0415
+
+    variants = {
+        "numpy":     lambda img: extract_features(img),
+        "numpy_f32": lambda img: extract_features(img, dtype=np.float32),
+        "numpy_box": lambda img: extract_features(img, "box", dtype=np.float32),
+        "numpy_gap": lambda img: extract_features(img, dtype=np.float32, reducing_gap=2.0),
+    }
+    try:
+        import skimage.feature  # noqa: F401, PLC0415
+        variants = {"skimage": _reference, **variants}
+    except ImportError:
+        pass
+    return variants
+
+
+def main():
+    from tracker.paths import get_data_dir  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction de features")
+    parser.add_argument("--samples", default=os.path.join(get_data_dir(), "detection_samples"),
+                        help="dossier de PNG (récursif)")
+    parser.add_argument("--n", type=int, default=100, help="nombre d'images max")
+    parser.add_argument("--size", default="1280x720",
+                        help="taille des images synthétiques si aucun PNG (LxH)")
+    parser.add_argument("--repeat", type=int, default=3, help="passes par variante")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    images = _load_images(args.samples, args.n, size)
+    print(f"{len(images)} images ({images[0].size[0]}x{images[0].size[1]})\n")
+
+    variants = _variants()
+    reference = [variants["skimage"](img) for img in images] if "skimage" in variants else None
+
+    print(f"{'variante':<12}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}{'écart max':>12}")
+    for name, fn in variants.items():
+        fn(images[0])   # imports et tables précalculées hors mesure
+        samples = []
+        for _ in range(args.repeat):
+            for img in images:
+                t0 = time.perf_counter()
+                fn(img)
+                samples.append((time.perf_counter() - t0) * 1000)
+        p = _percentiles(samples)
+        drift = "-"
+        if reference is not None:
+            drift = f"{max(float(abs(fn(img) - ref).max()) for img, ref in zip(images, reference)):.1e}"
+        print(f"{name:<12}{p['mean']:>8.2f}ms{p['p50']:>7.2f}ms{p['p95']:>7.2f}ms"
+              f"{p['max']:>7.2f}ms{drift:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""tools/bench_ocr.py — Latence de bout en bout de l'OCR fin de combat / pré-combat.
+
+Mesure extract_end_screen_data et extract_prequeue_data sur des captures
+réelles, avant (layouts=False : readtext = détection CRAFT + reconnaissance
+sur chaque zone) et après (layouts=True : reconnaissance seule sur les boîtes
+de OcrPipeline._LAYOUTS, readtext en secours si la validation échoue).
+Un seul easyocr.Reader est partagé par les deux variantes.
+
+Les deux variantes tournent sans cache OCR ; "cached_repeat_ms" mesure à part
+une frame déjà vue (cache OCR chaud, cas de l'écran de fin immobile).
+
+Rapporte percentiles de latence, accélération, champs qui diffèrent entre les
+deux variantes (régression de lecture) et compteurs layout_stats (hits /
+fallbacks). --calibrate affiche les boîtes détectées par readtext dans chaque
+zone, en fractions de la zone, pour recaler _LAYOUTS.
+
+Usage :
+    python tools/bench_ocr.py      # debug_end_screen.png + detection_samples/pre_queue
+    python tools/bench_ocr.py --end stats1.png stats2.png --prequeue pq.png --repeat 5
+    python tools/bench_ocr.py --end stats1.png --calibrate
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+# Champs comparés avant / après (captured_at et raw_ocr_data varient toujours)
+_IGNORED_FIELDS = {"captured_at", "raw_ocr_data"}
+
+
+def _percentiles(samples_ms: list) -> dict:
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"mean": statistics.fmean(s), "p50": pct(50), "p95": pct(95), "max": s[-1]}
+
+
+def _load(paths: list, limit: int) -> list:
+    """Images RGB depuis des fichiers ou dossiers (PNG, `limit` max par dossier)."""
+    from PIL import Image  # noqa: PLC0415
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(".png"))[:limit]
+        else:
+            files.append(path)
+    images = []
+    for path in files:
+        if not os.path.exists(path):
+            print(f"Image absente : {path}", file=sys.stderr)
+            continue
+        with Image.open(path) as img:
+            images.append(img.convert("RGB"))
+    return images
+
+
+def _measure(pipeline, method: str, images: list, repeat: int) -> tuple:
+    """(latences ms, résultats de la dernière passe) — 1 appel de chauffe hors mesure."""
+    extract = getattr(pipeline, method)
+    extract(images[0])
+    times, outputs = [], []
+    for r in range(repeat):
+        for img in images:
+            t0 = time.perf_counter()
+            data = extract(img)
+            times.append((time.perf_counter() - t0) * 1000)
+            if r == repeat - 1:
+                outputs.append(data)
+    return times, outputs
+
+
+def _diff(before: list, after: list) -> list:
+    diffs = []
+    for i, (b, a) in enumerate(zip(before, after)):
+        for key in b:
+            if key not in _IGNORED_FIELDS and b.get(key) != a.get(key):
+                diffs.append({"image": i, "field": key, "before": b.get(key), "after": a.get(key)})
+    return diffs
+
+
+def compare(reader, method: str, images: list, repeat: int) -> dict:
+    from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+
+    before = OcrPipeline(reader=reader, layouts=False, cache_size=0)
+    after = OcrPipeline(reader=reader, layouts=True, cache_size=0)
+    t_before, out_before = _measure(before, method, images, repeat)
+    t_after, out_after = _measure(after, method, images, repeat)
+    p_before, p_after = _percentiles(t_before), _percentiles(t_after)
+    cached = OcrPipeline(reader=reader)
+    t_cached, _ = _measure(cached, method, images, repeat)
+    return {
+        "images": len(images),
+        "repeat": repeat,
+        "before_ms": p_before,
+        "after_ms": p_after,
+        "speedup_p50": p_before["p50"] / p_after["p50"] if p_after["p50"] else None,
+        "cached_repeat_ms": _percentiles(t_cached),
+        "cache_stats": cached.cache_stats,
+        "layout_stats": after.layout_stats,
+        "field_diffs": _diff(out_before, out_after),
+    }
+
+
+def calibrate(reader, images: list, zones: dict) -> None:
+    """Boîtes readtext en fractions de chaque zone (x0, y0, x1, y1) + texte."""
+    import numpy as np  # noqa: PLC0415
+
+    for i, img in enumerate(images):
+        w, h = img.size
+        for name, zone in zones.items():
+            crop = img.crop((int(zone[0] * w), int(zone[1] * h),
+                             int(zone[2] * w), int(zone[3] * h)))
+            cw, ch = crop.size
+            print(f"[image {i}] {name} {zone}")
+            for bbox, text, conf in reader.readtext(np.array(crop)):
+                xs = [p[0] for p in bbox]
+                ys = [p[1] for p in bbox]
+                print(f"  ({min(xs) / cw:.2f}, {min(ys) / ch:.2f}, "
+                      f"{max(xs) / cw:.2f}, {max(ys) / ch:.2f})  {conf:.2f}  {text!r}")
+
+
+def main():
+    from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+    from tracker.paths import get_data_dir  # noqa: PLC0415
+
+    data_dir = get_data_dir()
+    parser = argparse.ArgumentParser(description="Benchmark OCR layouts vs readtext")
+    parser.add_argument("--end", nargs="*",
+                        default=[os.path.join(data_dir, "debug_end_screen.png")],
+                        help="captures de l'écran de stats de fin de combat")
+    parser.add_argument("--prequeue", nargs="*",
+                        default=[os.path.join(data_dir, "detection_samples", "pre_queue")],
+                        help="captures de l'écran de pré-combat (fichiers ou dossiers)")
+    parser.add_argument("--limit", type=int, default=5, help="images max par dossier")
+    parser.add_argument("--repeat", type=int, default=3, help="passes de mesure")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="affiche les boîtes readtext des zones de layout")
+    parser.add_argument("--out", default=None, help="fichier JSON de sortie (défaut : stdout)")
+    args = parser.parse_args()
+
+    end_images, pq_images = _load(args.end, args.limit), _load(args.prequeue, args.limit)
+    if not end_images and not pq_images:
+        sys.exit(1)
+
+    from tracker.capture.ocr_reader import get_reader_registry  # noqa: PLC0415
+    reader = get_reader_registry().get()
+
+    if args.calibrate:
+        calibrate(reader, end_images, {"end_stats": OcrPipeline._ZONE_BOTTOM})
+        calibrate(reader, pq_images, {"prequeue_type": OcrPipeline._ZONE_PREQUEUE_TYPE,
+                                      "prequeue_deck": OcrPipeline._ZONE_PREQUEUE_DECK})
+        return
+
+    # extract_prequeue_data écrit debug_prequeue.png : pas dans le vrai dossier data
+    os.environ["PTCG_DATA_DIR"] = tempfile.mkdtemp(prefix="bench_ocr_")
+    result = {}
+    if end_images:
+        result["extract_end_screen_data"] = compare(
+            reader, "extract_end_screen_data", end_images, args.repeat)
+    if pq_images:
+        result["extract_prequeue_data"] = compare(
+            reader, "extract_prequeue_data", pq_images, args.repeat)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        for method, res in result.items():
+            print(f"{method}: p50 {res['before_ms']['p50']:.0f} → {res['after_ms']['p50']:.0f} ms "
+                  f"(x{res['speedup_p50']:.1f}), {len(res['field_diffs'])} champ(s) différent(s)"
+                  f" → {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""tools/bench_ocr_pool.py — Gigue du polling pendant l'OCR, avec et sans pool de workers.
+
+Reproduit la boucle de PollingLoop (tick puis attente de `interval - durée
+du tick`, 100 ms par défaut ; le tick calcule la vignette de luminance de
+FrameChangeGate sur une frame 1280x720) pendant que --ocr-threads threads
+enchaînent extract_end_screen_data, comme _capture_end_screen et la détection
+du Pokémon adverse.
+
+Variantes :
+  - idle      : pas d'OCR (référence)
+  - inprocess : reader dans le processus du polling
+  - pool      : OcrWorkerPool (--workers, --max-inflight), crops en mémoire partagée
+
+Par variante : gigue = période réelle − période visée (percentiles, ms),
+durée des ticks, et nombre d'OCR terminées (débit).
+
+Par défaut le reader est EasyOCR. --busy-ms remplace chaque readtext /
+recognize par une boucle Python de N ms qui garde le GIL (pire cas de
+contention), pour mesurer sans EasyOCR.
+
+Usage :
+    python tools/bench_ocr_pool.py --image data/debug_end_screen.png --seconds 20
+    python tools/bench_ocr_pool.py --busy-ms 300 --workers 2 --max-inflight 2
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import functools
+import json
+import statistics
+import threading
+import time
+
+
+class BusyReader:
+    """Reader factice : boucle Python de `ms` millisecondes (GIL tenu) par appel."""
+
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def _spin(self):
+        deadline = time.perf_counter() + self.ms / 1000
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+        return n
+
+    def readtext(self, arr, **kwargs):
+        self._spin()
+        return []
+
+    def recognize(self, arr, horizontal_list=None, **kwargs):
+        self._spin()
+        return []
+
+
+def busy_factory(ms: float):
+    return BusyReader(ms)
+
+
+def _percentiles(samples_ms: list) -> dict:
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"mean": statistics.fmean(s), "p50": pct(50), "p95": pct(95),
+            "p99": pct(99), "max": s[-1]}
+
+
+def run_variant(reader, image, seconds: float, interval: float, ocr_threads: int) -> dict:
+    from tracker.capture.change import luma_thumbnail  # noqa: PLC0415
+    from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+
+    stop = threading.Event()
+    ocr_done = [0]
+
+    def ocr_load():
+        pipeline = OcrPipeline(reader=reader, cache_size=0)
+        while not stop.is_set():
+            pipeline.extract_end_screen_data(image)
+            ocr_done[0] += 1
+
+    threads = [threading.Thread(target=ocr_load, daemon=True)
+               for _ in range(ocr_threads if reader is not None else 0)]
+    for t in threads:
+        t.start()
+
+    jitter_ms, tick_ms = [], []
+    last = None
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if last is not None:
+            jitter_ms.append((started - last - interval) * 1000)
+        last = started
+        luma_thumbnail(image)
+        elapsed = time.perf_counter() - started
+        tick_ms.append(elapsed * 1000)
+        time.sleep(max(0.0, interval - elapsed))
+
+    stop.set()
+    for t in threads:
+        t.join(timeout=30)
+    return {"ticks": len(tick_ms), "jitter_ms": _percentiles(jitter_ms),
+            "tick_ms": _percentiles(tick_ms), "ocr_completed": ocr_done[0]}
+
+
+def main():
+    from PIL import Image  # noqa: PLC0415
+
+    from tracker.capture.ocr_pool import OcrWorkerPool  # noqa: PLC0415
+    from tracker.capture.ocr_reader import OCR_LANGS, _easyocr_factory  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(description="Gigue du polling pendant l'OCR (pool ou non)")
+    parser.add_argument("--image", default=None,
+                        help="frame de fin de combat (défaut : image grise 1280x720)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="durée par variante")
+    parser.add_argument("--interval", type=float, default=0.1, help="période du polling (s)")
+    parser.add_argument("--ocr-threads", type=int, default=2, help="threads qui lancent l'OCR")
+    parser.add_argument("--workers", type=int, default=1, help="workers du pool")
+    parser.add_argument("--max-inflight", type=int, default=None, help="requêtes en vol max")
+    parser.add_argument("--busy-ms", type=float, default=None,
+                        help="reader factice gardant le GIL N ms (défaut : EasyOCR)")
+    parser.add_argument("--out", default=None, help="fichier JSON de sortie (défaut : stdout)")
+    args = parser.parse_args()
+
+    if args.image:
+        with Image.open(args.image) as img:
+            image = img.convert("RGB")
+    else:
+        image = Image.new("RGB", (1280, 720), (128, 128, 128))
+
+    factory = (functools.partial(busy_factory, args.busy_ms) if args.busy_ms is not None
+               else functools.partial(_easyocr_factory, OCR_LANGS, False))
+
+    result = {
+        "interval_ms": args.interval * 1000,
+        "reader": f"busy {args.busy_ms:.0f} ms" if args.busy_ms is not None else "easyocr",
+        "idle": run_variant(None, image, args.seconds, args.interval, 0),
+        "inprocess": run_variant(factory(), image, args.seconds, args.interval,
+                                 args.ocr_threads),
+    }
+    pool = OcrWorkerPool(args.workers, args.max_inflight, factory=factory).start()
+    try:
+        result["pool"] = run_variant(pool, image, args.seconds, args.interval, args.ocr_threads)
+        result["pool"]["pool_stats"] = pool.pool_stats()
+    finally:
+        pool.shutdown()
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        for key in ("idle", "inprocess", "pool"):
+            j = result[key]["jitter_ms"]
+            print(f"{key}: gigue p50 {j['p50']:.1f} ms, p99 {j['p99']:.1f} ms, "
+                  f"max {j['max']:.1f} ms, {result[key]['ocr_completed']} OCR → {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""tools/bench_pipeline.py — Débit de la pile de détection complète, sans émulateur.
+
+Rejoue une source hors ligne (dossier de captures ou session .ptcgrec) dans
+PollingLoop + StateDetector, tick après tick sans attente, et mesure :
+  - le débit (ticks/s) et la latence par tick (mean / p50 / p95 / max) ;
+  - les transitions d'état émises.
+
+Usage (Linux ou Windows) :
+    python tools/bench_pipeline.py data/recordings/session_20260101_120000.ptcgrec
+    python tools/bench_pipeline.py data/detection_samples/in_combat --no-gate
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import time
+
+
+def _percentiles(samples_ms: list) -> dict:
+    s = sorted(samples_ms)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    return {"mean": statistics.fmean(s), "p50": pct(50), "p95": pct(95), "max": s[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="dossier de captures ou fichier .ptcgrec")
+    parser.add_argument("--no-gate", action="store_true", help="désactive le FrameChangeGate")
+    args = parser.parse_args()
+
+    from tracker.capture.change import FrameChangeGate  # noqa: PLC0415
+    from tracker.capture.detector import PollingLoop, StateDetector  # noqa: PLC0415
+    from tracker.capture.source import make_source  # noqa: PLC0415
+
+    source = make_source(args.source)
+    detector = StateDetector(gate=None if args.no_gate else FrameChangeGate())
+    if not detector.is_model_available():
+        print("Modèle ML absent — lancer d'abord tools/train_classifier.py")
+        return
+    polling = PollingLoop(interval=0.0, detector=detector, source=source)
+    transitions = []
+    polling.set_callbacks(on_state_changed=lambda prev, new: transitions.append(
+        (source.position, prev.value, new.value)))
+
+    samples = []
+    t_start = time.perf_counter()
+    while source.poll():
+        t0 = time.perf_counter()
+        polling._tick()
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+    source.close()
+
+    if not samples:
+        print("Source vide.")
+        return
+    r = _percentiles(samples)
+    print(f"Source      : {source!r}")
+    print(f"Ticks       : {len(samples)} en {elapsed:.2f}s → {len(samples) / elapsed:.1f} ticks/s")
+    print(f"Latence (ms): mean {r['mean']:.2f}  p50 {r['p50']:.2f}  "
+          f"p95 {r['p95']:.2f}  max {r['max']:.2f}")
+    if detector.gate_stats:
+        print(f"Frame gate  : {detector.gate_stats}")
+    print(f"Transitions : {len(transitions)}")
+    for pos, prev, new in transitions:
+        print(f"  frame {pos:>6}  {prev} → {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""tools/eval_state_engine.py — Compare les moteurs de transitions sur des sessions enregistrées.
+
+Pour chaque session .ptcgrec : chaque frame est classifiée une seule fois
+(label + predict_proba), puis les deux moteurs de PollingLoop sont rejoués
+sur la même séquence :
+  - "debounce" : compteurs en secondes (DEBOUNCE_SECONDS)
+  - "filter"   : filtre forward HMM (tracker.capture.temporal.StateFilter)
+
+Mesures par moteur :
+  - transitions émises, latence par rapport aux transitions enregistrées
+    pendant la session (appariées par type from → to, la plus proche) ;
+  - allers-retours (A → B puis B → A en moins de --flip secondes), proxy des
+    fausses transitions.
+
+--synthetic N : sans enregistrement, N matchs simulés (IDLE → PRE_QUEUE →
+IN_COMBAT → END_SCREEN → IDLE) à la cadence STATE_INTERVALS, probabilités
+d'un classificateur bruité (--glitch : part de frames isolées d'une autre
+classe). Les transitions de référence sont les vrais changements d'état.
+
+Usage :
+    python tools/eval_state_engine.py data/recordings/*.ptcgrec
+    python tools/eval_state_engine.py session.ptcgrec --threshold 0.95
+    python tools/eval_state_engine.py --synthetic 50 --glitch 0.03
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+
+
+class _RecordedDetector:
+    """Détecteur rejouant des prédictions précalculées (l'« image » est l'indice de frame)."""
+
+    def __init__(self, predictions: list, replay, detector):
+        self._predictions = predictions
+        self._replay = replay
+        self._detector = detector
+
+    def is_pre_queue_ranked(self, i) -> bool:
+        return self._predictions[i].label == "pre_queue"
+
+    def is_in_combat(self, i) -> bool:
+        return self._predictions[i].label == "in_combat"
+
+    def is_end_screen(self, i) -> bool:
+        return self._predictions[i].label == "end_screen"
+
+    def predict_proba(self, i) -> dict:
+        return self._predictions[i].proba
+
+    def predict_outcome(self, i) -> str:
+        return self._detector.predict_outcome(self._replay.frame(i))
+
+
+class _Prediction:
+    __slots__ = ("label", "proba")
+
+    def __init__(self, label: str, proba: dict):
+        self.label = label
+        self.proba = proba
+
+
+class _SyntheticDetector(_RecordedDetector):
+    def predict_outcome(self, i) -> str:
+        return "win"
+
+
+# Durées (s) des états simulés et classe vue par le classificateur
+_SYNTHETIC_DURATIONS = {"idle": 6.0, "pre_queue": 8.0, "in_combat": 40.0, "end_screen": 5.0}
+_CLASSES = ("pre_queue", "in_combat", "end_screen")
+# Menus / lobby : pas de classe dédiée, vus surtout comme in_combat / end_screen
+_IDLE_LABELS = (("in_combat", 0.6), ("end_screen", 0.38), ("pre_queue", 0.02))
+
+
+def _synthetic_session(matches: int, glitch: float, seed: int) -> tuple:
+    """(prédictions, horodatages, transitions de référence) d'une session simulée."""
+    import random  # noqa: PLC0415
+
+    from tracker.capture.detector import STATE_INTERVALS, CombatState  # noqa: PLC0415
+
+    rng = random.Random(seed)
+
+    def proba_for(label: str, conf: float) -> dict:
+        rest = (1.0 - conf) / 2
+        return {c: conf if c == label else rest for c in _CLASSES}
+
+    predictions, timestamps, reference = [], [], []
+    t, prev = 0.0, None
+    cycle = ("idle", "pre_queue", "in_combat", "end_screen")
+    for state in cycle * matches + ("idle",):
+        if prev is not None:
+            reference.append((t, prev, state))
+        interval = STATE_INTERVALS[CombatState(state)]
+        end = t + _SYNTHETIC_DURATIONS[state] * rng.uniform(0.7, 1.3)
+        while t < end:
+            if state == "idle":
+                r, label = rng.random(), "pre_queue"
+                for name, share in _IDLE_LABELS:
+                    if r < share:
+                        label = name
+                        break
+                    r -= share
+                conf = rng.uniform(0.4, 0.8)
+            elif rng.random() < glitch:
+                label = rng.choice([c for c in _CLASSES if c != state])
+                conf = rng.uniform(0.6, 0.95)
+            else:
+                label, conf = state, rng.uniform(0.9, 0.995)
+            predictions.append(_Prediction(label, proba_for(label, conf)))
+            timestamps.append(t)
+            t += interval * rng.uniform(0.8, 1.5)    # ticks en retard
+        prev = state
+    return predictions, timestamps, reference
+
+
+def _simulate(polling, n: int, timestamps) -> list:
+    from tracker.capture.detector import CombatState  # noqa: PLC0415
+    state = CombatState.IDLE
+    transitions = []
+    for i in range(n):
+        dt = float(timestamps[i] - timestamps[i - 1]) if i else None
+        next_state, _ = polling._compute_next_state(state, i, dt)
+        if next_state != state:
+            transitions.append((float(timestamps[i]), state.value, next_state.value))
+            state = next_state
+    return transitions
+
+
+def _pair(emitted: list, reference: list, causal: bool = False) -> list:
+    """Latence (s) de chaque transition de référence, None si non appariée.
+
+    Par défaut : transition émise du même type la plus proche (référence =
+    transitions du moteur live, elles-mêmes retardées). `causal` (vérité
+    terrain, --synthetic) : première émise entre la référence et la suivante.
+    """
+    out = []
+    for k, (ts, src, dst) in enumerate(reference):
+        candidates = [t for t, s, d in emitted if (s, d) == (src, dst)]
+        if causal:
+            end = reference[k + 1][0] if k + 1 < len(reference) else float("inf")
+            candidates = [t for t in candidates if ts <= t < end]
+            out.append(min(candidates) - ts if candidates else None)
+        else:
+            out.append(min(candidates, key=lambda t: abs(t - ts)) - ts if candidates else None)
+    return out
+
+
+def _latencies(emitted: list, reference: list, causal: bool = False) -> list:
+    return [lat for lat in _pair(emitted, reference, causal) if lat is not None]
+
+
+def _flip_flops(emitted: list, window: float) -> int:
+    return sum(
+        1 for (t1, a, b), (t2, c, d) in zip(emitted, emitted[1:])
+        if (c, d) == (b, a) and t2 - t1 < window
+    )
+
+
+def evaluate(path: str, threshold: float, flip: float) -> dict:
+    import numpy as np  # noqa: PLC0415
+    from tracker.capture.detector import PollingLoop, StateDetector  # noqa: PLC0415
+    from tracker.capture.recording import SessionReplay  # noqa: PLC0415
+    from tracker.capture.temporal import StateFilter  # noqa: PLC0415
+
+    detector = StateDetector()
+    with SessionReplay(path) as replay:
+        n = len(replay)
+        timestamps = replay.timestamps
+        predictions = []
+        for i in range(n):
+            prediction = detector.classify(replay.frame(i))
+            prediction.proba   # calculées tant que les features sont en mémoire
+            predictions.append(prediction)
+        interval = float(np.median(np.diff(timestamps))) if n > 1 else 0.1
+        reference = [(tr["timestamp"], tr["from"], tr["to"]) for tr in replay.transitions]
+
+        recorded = _RecordedDetector(predictions, replay, detector)
+        results = _compare(recorded, n, timestamps, reference, interval, threshold, flip,
+                           causal=False)
+    return {"frames": n, "interval_s": interval, "reference": len(reference), **results}
+
+
+def evaluate_synthetic(matches: int, glitch: float, seed: int, threshold: float,
+                       flip: float) -> dict:
+    import numpy as np  # noqa: PLC0415
+
+    predictions, timestamps, reference = _synthetic_session(matches, glitch, seed)
+    n = len(predictions)
+    interval = float(np.median(np.diff(timestamps)))
+    detector = _SyntheticDetector(predictions, None, None)
+    results = _compare(detector, n, timestamps, reference, interval, threshold, flip,
+                       causal=True)
+    return {"frames": n, "interval_s": interval, "reference": len(reference), **results}
+
+
+def _compare(detector, n: int, timestamps, reference: list, interval: float,
+             threshold: float, flip: float, causal: bool) -> dict:
+    from tracker.capture.detector import PollingLoop  # noqa: PLC0415
+    from tracker.capture.temporal import StateFilter  # noqa: PLC0415
+
+    results = {}
+    for name, engine in (("debounce", None), ("filter", StateFilter(threshold=threshold))):
+        polling = PollingLoop(interval=interval, detector=detector, engine=engine)
+        emitted = _simulate(polling, n, timestamps)
+        pairs = _pair(emitted, reference, causal)
+        lat = [x for x in pairs if x is not None]
+        by_type, totals = {}, {}
+        for (ts, src, dst), one in zip(reference, pairs):
+            kind = f"{src}→{dst}"
+            totals[kind] = totals.get(kind, 0) + 1
+            if one is not None:
+                by_type.setdefault(kind, []).append(one)
+        results[name] = {
+            "transitions": len(emitted),
+            "matched": len(lat),
+            "mean_latency_s": statistics.fmean(lat) if lat else None,
+            "latency_by_type_s": {k: statistics.fmean(v) for k, v in by_type.items()},
+            "matched_by_type": {k: (len(by_type.get(k, [])), n) for k, n in totals.items()},
+            "flip_flops": _flip_flops(emitted, flip),
+            "emitted": emitted,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="sessions .ptcgrec")
+    parser.add_argument("--threshold", type=float, default=0.9, help="seuil du filtre")
+    parser.add_argument("--flip", type=float, default=3.0, help="fenêtre aller-retour (s)")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="N matchs simulés au lieu d'enregistrements")
+    parser.add_argument("--glitch", type=float, default=0.03,
+                        help="part de frames aberrantes (--synthetic)")
+    parser.add_argument("--seed", type=int, default=0, help="graine (--synthetic)")
+    parser.add_argument("--verbose", action="store_true", help="lister les transitions")
+    args = parser.parse_args()
+    if not args.paths and not args.synthetic:
+        parser.error("sessions .ptcgrec ou --synthetic N")
+
+    runs = [(p, lambda p=p: evaluate(p, args.threshold, args.flip)) for p in args.paths]
+    if args.synthetic:
+        runs.append((f"synthétique ({args.synthetic} matchs, glitch {args.glitch:.0%})",
+                     lambda: evaluate_synthetic(args.synthetic, args.glitch, args.seed,
+                                                args.threshold, args.flip)))
+    for path, run in runs:
+        r = run()
+        print(f"\n{path}  ({r['frames']} frames, {r['interval_s'] * 1000:.0f}ms, "
+              f"{r['reference']} transitions enregistrées)")
+        print(f"  {'moteur':<10}{'transitions':>12}{'appariées':>11}{'latence moy.':>14}"
+              f"{'allers-retours':>16}")
+        for name in ("debounce", "filter"):
+            e = r[name]
+            lat = "-" if e["mean_latency_s"] is None else f"{e['mean_latency_s'] * 1000:+.0f}ms"
+            print(f"  {name:<10}{e['transitions']:>12}{e['matched']:>11}{lat:>14}"
+                  f"{e['flip_flops']:>16}")
+            for kind, (matched, total) in e["matched_by_type"].items():
+                seconds = e["latency_by_type_s"].get(kind)
+                lat = "-" if seconds is None else f"{seconds * 1000:+.0f}ms"
+                print(f"      {kind:<24}{matched:>4}/{total:<4}{lat:>10}")
+            if args.verbose:
+                for ts, src, dst in e["emitted"]:
+                    print(f"      {ts:10.2f}s  {src} → {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""tools/replay_session.py — Inspecte une session enregistrée (.ptcgrec).
+
+Enregistrer une session : lancer l'application avec PTCG_RECORD=1
+(fichier dans data/recordings/) ou PTCG_RECORD=<chemin.ptcgrec>.
+
+Usage :
+    python tools/replay_session.py data/recordings/session_20260101_120000.ptcgrec
+    python tools/replay_session.py session.ptcgrec --export out/ --every 10
+    python tools/replay_session.py session.ptcgrec --classify
+
+--export  : écrit une frame PNG sur `--every`
+--classify: rejoue StateDetector sur chaque frame et affiche la séquence de labels
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="fichier .ptcgrec")
+    parser.add_argument("--export", default=None, help="dossier de sortie PNG")
+    parser.add_argument("--every", type=int, default=1, help="exporter une frame sur N")
+    parser.add_argument("--classify", action="store_true", help="rejouer StateDetector")
+    args = parser.parse_args()
+
+    from tracker.capture.recording import SessionReplay  # noqa: PLC0415
+
+    with SessionReplay(args.path) as replay:
+        size = os.path.getsize(args.path)
+        print(f"Fichier    : {args.path} ({size / 1e6:.1f} Mo)")
+        print(f"Méta       : {replay.meta}")
+        print(f"Frames     : {len(replay)} sur {replay.duration:.1f}s")
+        print(f"Transitions: {len(replay.transitions)}")
+        t0 = replay.timestamp(0) if len(replay) else 0.0
+        for tr in replay.transitions:
+            outcome = f"  outcome={tr['outcome']}" if tr["outcome"] else ""
+            print(f"  +{tr['timestamp'] - t0:8.2f}s  frame {tr['frame']:>6}  "
+                  f"{tr['from']} → {tr['to']}{outcome}")
+
+        if args.export:
+            os.makedirs(args.export, exist_ok=True)
+            for i in range(0, len(replay), max(1, args.every)):
+                replay.frame(i).save(os.path.join(args.export, f"frame_{i:06d}.png"))
+            print(f"Export PNG : {args.export}")
+
+        if args.classify:
+            from tracker.capture.detector import StateDetector  # noqa: PLC0415
+            detector = StateDetector()
+            prev = None
+            t_start = time.perf_counter()
+            for i, (ts, frame) in enumerate(replay.frames()):
+                label = detector.predict(frame)
+                if label != prev:
+                    print(f"  +{ts - t0:8.2f}s  frame {i:>6}  {label}")
+                    prev = label
+            elapsed = time.perf_counter() - t_start
+            print(f"Classification : {len(replay) / max(elapsed, 1e-9):.1f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
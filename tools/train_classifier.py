@@ -2,12 +2,29 @@
 
 Architecture à deux étapes :
   1. SVM 3 classes : pre_queue / in_combat / end_screen
+     précédé d'un étage couleur (régression logistique sur features couleur/ROI)
+     qui tranche seul les frames évidentes — cascade, voir train_color_stage
   2. Règle couleur   : end_screen → win ou lose (fond chaud = victoire, froid = défaite)
+  + micro-détecteurs un-contre-tous (un par classe, features d'une ROI choisie
+    parmi features.ROI_CANDIDATES) : PollingLoop ne pose qu'une ou deux
+    questions par état, voir train_micro_detectors
 
 Usage :
     python tools/train_classifier.py
+    python tools/train_classifier.py --export-only   # réexporte le .npz d'un .pkl existant
+    python tools/train_classifier.py --mode cnn      # petit CNN torch (state_classifier_cnn.pt)
 
-Sortie : data/state_classifier.pkl
+Sortie : data/state_classifier.pkl + data/state_classifier.npz (export NumPy
+chargé par StateDetector sans scikit-learn)
+
+--mode cnn : CNN 96x72 (tracker.capture.cnn) entraîné sur 80 % des samples ;
+un SVM de référence est entraîné sur les mêmes 80 % et les deux sont comparés
+(précision, latence CPU) sur les 20 % restants.
+Sortie : data/state_classifier_cnn.pt
+
+Les features viennent de tracker.capture.features (le même code qu'au runtime) ;
+la version des features est enregistrée dans le modèle. Options :
+    --resample box --reducing-gap 2.0    # redimensionnement moins coûteux
 """
 
 import os
@@ -15,13 +32,20 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import argparse
+import json
 import logging
 import pickle
 import random
+import time
 
 import numpy as np
 from PIL import Image
 
+from tracker.capture.features import (IMG_SIZE, ROI_CANDIDATES, color_features, crop_xywh,
+                                      extract_features_batch, feature_version, roi_features,
+                                      roi_features_version)
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -30,55 +54,10 @@ SRC_LABELS = ["pre_queue", "in_combat", "end_screen_win", "end_screen_lose"]
 # Labels du classificateur stage 1
 CLS_LABELS = ["pre_queue", "in_combat", "end_screen"]
 
-IMG_SIZE = (160, 120)
 # Bande du haut : fond bleu/pastel (victoire) vs orange/saumon (défaite)
 WIN_LOSE_ROI = (0.0, 0.0, 1.0, 0.10)
 
 
-# ---------------------------------------------------------------------------
-# Features
-# ---------------------------------------------------------------------------
-
-def extract_features(img: Image.Image) -> np.ndarray:
-    from skimage.feature import hog  # noqa: PLC0415
-
-    img_rgb = img.convert("RGB").resize(IMG_SIZE, Image.LANCZOS)
-    arr = np.asarray(img_rgb, dtype=np.uint8)
-
-    gray = np.asarray(img_rgb.convert("L"), dtype=np.uint8)
-    hog_feat = hog(
-        gray,
-        orientations=8,
-        pixels_per_cell=(16, 16),
-        cells_per_block=(2, 2),
-        feature_vector=True,
-    )
-
-    hsv_arr = _rgb_to_hsv(arr)
-    hist_feats = []
-    for ch in range(3):
-        hist, _ = np.histogram(hsv_arr[:, :, ch], bins=16, range=(0, 1))
-        hist_feats.append(hist / (hist.sum() + 1e-6))
-
-    return np.concatenate([hog_feat, np.concatenate(hist_feats)])
-
-
-def _rgb_to_hsv(arr: np.ndarray) -> np.ndarray:
-    r, g, b = arr[:,:,0]/255., arr[:,:,1]/255., arr[:,:,2]/255.
-    cmax = np.maximum(np.maximum(r, g), b)
-    cmin = np.minimum(np.minimum(r, g), b)
-    delta = cmax - cmin
-    h = np.zeros_like(r)
-    s = np.where(cmax > 0, delta / cmax, 0.)
-    v = cmax
-    mr, mg, mb = (delta > 0) & (cmax == r), (delta > 0) & (cmax == g), (delta > 0) & (cmax == b)
-    h[mr] = ((g[mr] - b[mr]) / delta[mr]) % 6
-    h[mg] = (b[mg] - r[mg]) / delta[mg] + 2
-    h[mb] = (r[mb] - g[mb]) / delta[mb] + 4
-    h /= 6.
-    return np.stack([h, s, v], axis=2)
-
-
 # ---------------------------------------------------------------------------
 # Règle win/lose sur couleur du fond
 # ---------------------------------------------------------------------------
@@ -96,7 +75,7 @@ def calibrate_win_lose_rule(samples_dir: str) -> dict:
         for fname in files:
             try:
                 img = Image.open(os.path.join(folder, fname)).convert("RGB")
-                roi = _crop_roi(img, WIN_LOSE_ROI)
+                roi = crop_xywh(img, WIN_LOSE_ROI)
                 arr = np.asarray(roi, dtype=float)
                 r, g, b = arr[:,:,0], arr[:,:,1], arr[:,:,2]
                 brightnesses.append((r + g + b).mean() / 3)
@@ -142,18 +121,9 @@ def calibrate_win_lose_rule(samples_dir: str) -> dict:
     return rule
 
 
-def _crop_roi(img: Image.Image, roi: tuple) -> Image.Image:
-    w, h = img.size
-    x0 = int(roi[0] * w)
-    y0 = int(roi[1] * h)
-    x1 = int((roi[0] + roi[2]) * w)
-    y1 = int((roi[1] + roi[3]) * h)
-    return img.crop((x0, y0, x1, y1))
-
-
 def predict_win_lose(img: Image.Image, rule: dict) -> str:
     """Prédit 'end_screen_win' ou 'end_screen_lose' via règle couleur."""
-    roi = _crop_roi(img.convert("RGB"), rule["roi"])
+    roi = crop_xywh(img.convert("RGB"), rule["roi"])
     arr = np.asarray(roi, dtype=float)
     r, g, b = arr[:,:,0], arr[:,:,1], arr[:,:,2]
     brightness = (r + g + b).mean() / 3
@@ -177,9 +147,14 @@ def predict_win_lose(img: Image.Image, rule: dict) -> str:
 # Dataset stage 1
 # ---------------------------------------------------------------------------
 
-def load_dataset(samples_dir: str):
-    X, y = [], []
+def load_dataset(samples_dir: str, feature_params: dict | None = None, chunk: int = 64):
+    """Features HOG (X), features couleur (X_color), features ROI par ROI candidate
+    (X_roi, {nom: tableau}), labels et temps d'extraction moyens."""
+    feature_params = feature_params or {}
+    X, X_color, y = [], [], []
+    X_roi = {name: [] for name in ROI_CANDIDATES}
     counts = {}
+    timings = {"color_s": 0.0, "full_s": 0.0, "roi_s": 0.0}
 
     label_map = {
         "pre_queue":      "pre_queue",
@@ -196,17 +171,36 @@ def load_dataset(samples_dir: str):
             continue
         files = [f for f in os.listdir(folder) if f.lower().endswith(".png")]
         counts[src_label] = len(files)
-        for fname in files:
-            try:
-                img = Image.open(os.path.join(folder, fname))
-                X.append(extract_features(img))
-                y.append(cls_label)
-            except Exception as e:
-                logger.warning("Erreur %s : %s", fname, e)
+        # Par paquets : extraction vectorisée sans garder toutes les images en mémoire
+        for i in range(0, len(files), chunk):
+            images = []
+            for fname in files[i:i + chunk]:
+                try:
+                    img = Image.open(os.path.join(folder, fname))
+                    img.load()
+                    images.append(img)
+                except Exception as e:
+                    logger.warning("Erreur %s : %s", fname, e)
+            if not images:
+                continue
+            t0 = time.perf_counter()
+            X_color.extend(color_features(img) for img in images)
+            t1 = time.perf_counter()
+            X.extend(extract_features_batch(images, **feature_params))
+            t2 = time.perf_counter()
+            for name, roi in ROI_CANDIDATES.items():
+                X_roi[name].extend(roi_features(img, roi) for img in images)
+            timings["color_s"] += t1 - t0
+            timings["full_s"] += t2 - t1
+            timings["roi_s"] += (time.perf_counter() - t2) / len(ROI_CANDIDATES)
+            y.extend([cls_label] * len(images))
 
     logger.info("Images chargées : %s", counts)
     logger.info("Classes stage 1 : %s", {l: y.count(l) for l in set(y)})
-    return np.array(X), np.array(y), counts
+    n = max(1, len(y))
+    timings = {k: v / n for k, v in timings.items()}
+    X_roi = {name: np.array(rows) for name, rows in X_roi.items()}
+    return np.array(X), np.array(X_color), X_roi, np.array(y), counts, timings
 
 
 # ---------------------------------------------------------------------------
@@ -238,6 +232,130 @@ def train(X, y):
     return pipeline
 
 
+def train_color_stage(X_color, y, target_precision: float = 0.995):
+    """Étage 1 de la cascade : régression logistique sur les features couleur.
+
+    Le seuil de confiance est le plus bas (sur une grille) pour lequel les
+    frames acceptées en validation croisée atteignent `target_precision` ;
+    les autres frames passent au HOG + SVM. Retourne (paramètres, cv_proba, classes).
+    """
+    from sklearn.linear_model import LogisticRegression  # noqa: PLC0415
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict  # noqa: PLC0415
+    from sklearn.pipeline import Pipeline  # noqa: PLC0415
+    from sklearn.preprocessing import StandardScaler  # noqa: PLC0415
+
+    stage = Pipeline([
+        ("scaler", StandardScaler()),
+        ("logreg", LogisticRegression(C=1.0, max_iter=2000, class_weight="balanced")),
+    ])
+    _, class_counts = np.unique(y, return_counts=True)
+    n_splits = max(2, min(5, int(class_counts.min())))
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    cv_proba = cross_val_predict(stage, X_color, y, cv=cv, method="predict_proba")
+    stage.fit(X_color, y)
+    classes = stage.classes_
+
+    confident = cv_proba.max(axis=1)
+    correct = classes[cv_proba.argmax(axis=1)] == y
+    threshold = 1.0   # aucun seuil sûr : l'étage 1 ne tranche jamais
+    for t in np.arange(0.50, 1.0, 0.01):
+        accepted = confident >= t
+        if accepted.any() and correct[accepted].mean() >= target_precision:
+            threshold = float(t)
+            break
+
+    scaler, logreg = stage.steps[0][1], stage.steps[-1][1]
+    coef, intercept = logreg.coef_, logreg.intercept_
+    if len(classes) == 2:
+        # Binaire : softmax([-z/2, z/2]) == sigmoid(z)
+        coef = np.vstack([-coef[0] / 2, coef[0] / 2])
+        intercept = np.array([-intercept[0] / 2, intercept[0] / 2])
+    params = {
+        "mean": scaler.mean_, "scale": scaler.scale_, "coef": coef,
+        "intercept": intercept, "classes": classes.astype(str),
+        "threshold": np.array(threshold),
+    }
+    logger.info("Étage couleur : seuil %.2f (précision cible %.1f%%)",
+                threshold, target_precision * 100)
+    return params, cv_proba, classes
+
+
+def train_micro_detectors(X_roi: dict, y, target_precision: float = 0.995) -> tuple:
+    """Micro-détecteurs un-contre-tous : un par classe, sur la ROI la plus utile.
+
+    Pour chaque classe et chaque ROI candidate, régression logistique binaire
+    évaluée en validation croisée ; seuils low / high symétriques les plus
+    larges pour lesquels les frames tranchées atteignent `target_precision`.
+    La ROI retenue est celle qui tranche le plus de frames (à égalité, la
+    plus petite). Retourne ({label: paramètres}, {label: rapport}).
+    """
+    from sklearn.linear_model import LogisticRegression  # noqa: PLC0415
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict  # noqa: PLC0415
+    from sklearn.pipeline import Pipeline  # noqa: PLC0415
+    from sklearn.preprocessing import StandardScaler  # noqa: PLC0415
+
+    micro, report = {}, {}
+    for label in sorted(str(c) for c in set(y)):
+        target = (y == label).astype(int)
+        n_splits = max(2, min(5, int(np.bincount(target).min())))
+        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        best = None
+        for name, roi in ROI_CANDIDATES.items():
+            stage = Pipeline([
+                ("scaler", StandardScaler()),
+                ("logreg", LogisticRegression(C=0.5, max_iter=2000, class_weight="balanced")),
+            ])
+            proba = cross_val_predict(stage, X_roi[name], target, cv=cv,
+                                      method="predict_proba")[:, 1]
+            high, coverage = 1.0, 0.0   # aucun seuil sûr : ne tranche jamais
+            for t in np.arange(0.50, 1.0, 0.01):
+                decided = (proba >= t) | (proba <= 1 - t)
+                if decided.any() and ((proba >= t) == target)[decided].mean() >= target_precision:
+                    high, coverage = float(t), float(decided.mean())
+                    break
+            key = (coverage, -roi[2] * roi[3])
+            if best is None or key > best[0]:
+                best = (key, name, roi, stage, high, coverage)
+        _, name, roi, stage, high, coverage = best
+        stage.fit(X_roi[name], target)
+        scaler, logreg = stage.steps[0][1], stage.steps[-1][1]
+        micro[label] = {
+            "roi": np.array(roi), "mean": scaler.mean_, "scale": scaler.scale_,
+            "coef": logreg.coef_[0], "intercept": logreg.intercept_,
+            "low": np.array(1.0 - high), "high": np.array(high),
+        }
+        report[label] = {"roi": name, "high": high, "coverage": coverage}
+        logger.info("Micro-détecteur %s : ROI %s, seuil %.2f, %.1f%% des frames tranchées",
+                    label, name, high, coverage * 100)
+    return micro, report
+
+
+def print_micro_report(report: dict, timings: dict) -> None:
+    """Part des questions tranchées par chaque micro-détecteur (validation croisée)."""
+    print("\n--- Micro-détecteurs (un-contre-tous, ROI) ---")
+    for label, r in report.items():
+        print(f"{label:<12}: ROI {r['roi']:<7} seuil {r['high']:.2f}  "
+              f"{r['coverage'] * 100:5.1f}% tranchées sans modèle complet")
+    print(f"Latence features     : ROI {timings['roi_s'] * 1000:.2f} ms, "
+          f"HOG {timings['full_s'] * 1000:.2f} ms")
+
+
+def print_cascade_report(cv_proba, classes, threshold: float, y, timings: dict):
+    """Part des frames tranchées par chaque étage (validation croisée) et latence moyenne."""
+    accepted = cv_proba.max(axis=1) >= threshold
+    stage1 = float(accepted.mean())
+    stage1_acc = float((classes[cv_proba.argmax(axis=1)] == y)[accepted].mean()) \
+        if accepted.any() else float("nan")
+    color_ms, full_ms = timings["color_s"] * 1000, timings["full_s"] * 1000
+    print("\n--- Cascade ---")
+    print(f"Étage 1 (couleur)    : {stage1 * 100:5.1f}% des frames  "
+          f"(précision {stage1_acc * 100:.1f}%)")
+    print(f"Étage 2 (HOG + SVM)  : {(1 - stage1) * 100:5.1f}% des frames")
+    print(f"Latence features     : couleur {color_ms:.2f} ms, HOG {full_ms:.2f} ms")
+    print(f"Latence moyenne      : {color_ms + (1 - stage1) * full_ms:.2f} ms/frame "
+          f"(sans cascade : {full_ms:.2f} ms)")
+
+
 def print_report(pipeline, X, y):
     from sklearn.metrics import classification_report, confusion_matrix  # noqa: PLC0415
 
@@ -253,6 +371,213 @@ def print_report(pipeline, X, y):
         print(label[:col_w].ljust(col_w) + "".join(str(v).ljust(col_w) for v in cm[i]))
 
 
+# ---------------------------------------------------------------------------
+# Export NumPy
+# ---------------------------------------------------------------------------
+
+def export_npz(model: dict, path: str) -> None:
+    """Écrit le modèle en .npz : scaler, vecteurs de support, coefficients duaux,
+    paramètres de Platt, étage couleur (color_*) + métadonnées JSON (règle
+    win/lose, labels, taille)."""
+    from tracker.capture.detector import NumpySVC  # noqa: PLC0415
+
+    arrays = NumpySVC.from_pipeline(model["pipeline"]).arrays()
+    for key, value in (model.get("color_stage") or {}).items():
+        arrays["color_" + key] = np.asarray(value)
+    micro = model.get("micro") or {}
+    for label, params in micro.items():
+        for key, value in params.items():
+            arrays[f"micro_{label}_{key}"] = np.asarray(value)
+    meta = {k: v for k, v in model.items() if k not in ("pipeline", "color_stage", "micro")}
+    if micro:
+        meta["micro_labels"] = sorted(micro)
+    arrays["meta"] = np.array(json.dumps(meta))
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    logger.info("Export NumPy : %s", path)
+
+
+# ---------------------------------------------------------------------------
+# Backend CNN (--mode cnn)
+# ---------------------------------------------------------------------------
+
+def list_samples(samples_dir: str) -> list:
+    """[(chemin relatif "dossier/fichier.png", label 3 classes)] triés."""
+    samples = []
+    for src_label in SRC_LABELS:
+        folder = os.path.join(samples_dir, src_label)
+        if not os.path.isdir(folder):
+            continue
+        cls_label = "end_screen" if src_label.startswith("end_screen") else src_label
+        samples += [(f"{src_label}/{f}", cls_label)
+                    for f in sorted(os.listdir(folder)) if f.lower().endswith(".png")]
+    return samples
+
+
+def split_holdout(samples: list, fraction: float = 0.2, seed: int = 42) -> tuple:
+    """Découpage stratifié (train, holdout) reproductible."""
+    rng = random.Random(seed)
+    train_set, holdout = [], []
+    for label in sorted({label for _, label in samples}):
+        group = [s for s in samples if s[1] == label]
+        rng.shuffle(group)
+        n_holdout = int(round(len(group) * fraction)) if len(group) > 1 else 0
+        holdout += group[:n_holdout]
+        train_set += group[n_holdout:]
+    return sorted(train_set), sorted(holdout)
+
+
+def iter_images(samples_dir: str, samples: list, chunk: int = 64):
+    """Images RGB par paquets : [(image, label)] sans tout garder en mémoire."""
+    for i in range(0, len(samples), chunk):
+        batch = []
+        for rel, label in samples[i:i + chunk]:
+            try:
+                with Image.open(os.path.join(samples_dir, rel)) as img:
+                    batch.append((img.convert("RGB"), label))
+            except Exception as e:
+                logger.warning("Erreur %s : %s", rel, e)
+        if batch:
+            yield batch
+
+
+def train_cnn(X, y, classes, epochs: int = 20, batch_size: int = 32, seed: int = 42):
+    """Entraîne build_network sur des entrées cnn_input (N, 3, 72, 96).
+
+    Adam + entropie croisée pondérée par classe (équivalent de
+    class_weight="balanced" du SVM) ; augmentation : luminosité / contraste.
+    """
+    import torch  # noqa: PLC0415
+    from torch import nn  # noqa: PLC0415
+
+    from tracker.capture.cnn import build_network  # noqa: PLC0415
+
+    torch.manual_seed(seed)
+    index = {c: i for i, c in enumerate(classes)}
+    targets = torch.tensor([index[label] for label in y], dtype=torch.long)
+    counts = np.bincount(targets.numpy(), minlength=len(classes)).clip(min=1)
+    weights = torch.tensor(len(y) / (len(classes) * counts), dtype=torch.float32)
+    inputs = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+
+    network = build_network(len(classes))
+    optimizer = torch.optim.Adam(network.parameters(), lr=2e-3, weight_decay=1e-4)
+    criterion = nn.CrossEntropyLoss(weight=weights)
+    for epoch in range(epochs):
+        network.train()
+        order = torch.randperm(len(inputs))
+        total, correct = 0.0, 0
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            xb, yb = inputs[idx], targets[idx]
+            gain = 1 + 0.3 * (torch.rand(len(idx), 1, 1, 1) - 0.5)
+            shift = 0.1 * (torch.rand(len(idx), 1, 1, 1) - 0.5)
+            xb = (xb * gain + shift).clamp(0, 1)
+            optimizer.zero_grad()
+            out = network(xb)
+            loss = criterion(out, yb)
+            loss.backward()
+            optimizer.step()
+            total += float(loss) * len(idx)
+            correct += int((out.argmax(dim=1) == yb).sum())
+        logger.info("Époque %d/%d : perte %.4f, précision train %.1f%%",
+                    epoch + 1, epochs, total / len(order), correct / len(order) * 100)
+    return network.eval()
+
+
+def benchmark_backends(models: dict, samples_dir: str, holdout: list) -> dict:
+    """Précision et latence CPU frame par frame (StateDetector.classify) par backend.
+
+    Chaque image du holdout est classée par chaque modèle avec le même chemin
+    qu'au runtime (features + inférence, sans cascade ni gate).
+    """
+    from tracker.capture.detector import StateDetector  # noqa: PLC0415
+
+    detectors = {}
+    for name, model in models.items():
+        detectors[name] = StateDetector()
+        detectors[name]._model, detectors[name]._model_loaded = model, True
+    timings = {name: [] for name in models}
+    correct = {name: 0 for name in models}
+    n = 0
+    for batch in iter_images(samples_dir, holdout):
+        if n == 0:
+            for detector in detectors.values():   # imports et premier appel hors mesure
+                detector.classify(batch[0][0].copy())
+        for img, label in batch:
+            n += 1
+            for name, detector in detectors.items():
+                t0 = time.perf_counter()
+                pred = detector.classify(img).label
+                timings[name].append((time.perf_counter() - t0) * 1000)
+                correct[name] += pred == label
+    results = {}
+    for name, ms in timings.items():
+        ms = sorted(ms)
+        results[name] = {
+            "frames": n,
+            "accuracy": correct[name] / n if n else None,
+            "mean_ms": float(np.mean(ms)) if ms else None,
+            "p50_ms": ms[len(ms) // 2] if ms else None,
+            "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))] if ms else None,
+        }
+    return results
+
+
+def print_backend_report(results: dict) -> None:
+    print("\n--- Holdout : CNN vs SVM (CPU, frame par frame) ---")
+    print(f"{'backend':<10}{'frames':>8}{'précision':>12}{'moy.':>10}{'p50':>10}{'p95':>10}")
+    for name, r in results.items():
+        if not r["frames"]:
+            continue
+        print(f"{name:<10}{r['frames']:>8}{r['accuracy'] * 100:>11.1f}%"
+              f"{r['mean_ms']:>8.2f}ms{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms")
+
+
+def main_cnn(samples_dir: str, data_dir: str, epochs: int) -> None:
+    """Entraîne le CNN sur 80 % des samples, et un SVM de référence sur les mêmes
+    80 %, puis compare les deux sur les 20 % restants (liste enregistrée dans
+    le checkpoint, "holdout")."""
+    from tracker.capture.cnn import (CnnClassifier, cnn_input_batch,  # noqa: PLC0415
+                                     save_cnn_model)
+    from tracker.capture.detector import NumpySVC  # noqa: PLC0415
+
+    samples = list_samples(samples_dir)
+    train_set, holdout = split_holdout(samples)
+    logger.info("CNN : %d images d'entraînement, %d en holdout", len(train_set), len(holdout))
+    if len({label for _, label in train_set}) < 2:
+        logger.error("Il faut au moins 2 classes.")
+        sys.exit(1)
+
+    X_cnn, X_hog, y = [], [], []
+    for batch in iter_images(samples_dir, train_set):
+        images = [img for img, _ in batch]
+        X_cnn.append(cnn_input_batch(images))
+        X_hog.append(extract_features_batch(images))
+        y += [label for _, label in batch]
+    X_cnn, X_hog, y = np.concatenate(X_cnn), np.concatenate(X_hog), np.array(y)
+
+    classes = sorted(set(y))
+    network = train_cnn(X_cnn, y, classes, epochs)
+    win_lose_rule = calibrate_win_lose_rule(samples_dir)
+
+    # SVM de référence : même découpage, même évaluateur qu'au runtime (NumpySVC)
+    svm = {"pipeline": NumpySVC.from_pipeline(train(X_hog, y)), "win_lose_rule": win_lose_rule}
+    cnn = {"pipeline": CnnClassifier(network, classes), "backend": "cnn",
+           "win_lose_rule": win_lose_rule}
+    results = benchmark_backends({"svm": svm, "cnn": cnn}, samples_dir, holdout)
+    print_backend_report(results)
+
+    cnn_path = os.path.join(data_dir, "state_classifier_cnn.pt")
+    save_cnn_model(cnn_path, network, classes, {
+        "cls_labels": CLS_LABELS,
+        "win_lose_rule": {**win_lose_rule, "roi": list(win_lose_rule["roi"])},
+        "holdout": [rel for rel, _ in holdout],
+        "benchmark": results,
+    })
+    logger.info("Modèle CNN sauvegardé : %s", cnn_path)
+    print(f"\nModèle : {cnn_path}  (config : \"state_backend\": \"cnn\")")
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -260,14 +585,43 @@ def print_report(pipeline, X, y):
 def main():
     from tracker.paths import get_data_dir  # noqa: PLC0415
 
+    parser = argparse.ArgumentParser(description="Entraîne le classificateur d'état de jeu.")
+    parser.add_argument("--mode", choices=("svm", "cnn"), default="svm",
+                        help="svm : HOG + SVM (défaut) ; cnn : petit CNN torch comparé au SVM")
+    parser.add_argument("--epochs", type=int, default=20, help="époques d'entraînement (cnn)")
+    parser.add_argument("--export-only", action="store_true",
+                        help="réexporter le .npz du modèle .pkl existant sans réentraîner")
+    parser.add_argument("--resample", choices=("lanczos", "bilinear", "box"), default="lanczos",
+                        help="filtre de redimensionnement des features (défaut : lanczos)")
+    parser.add_argument("--reducing-gap", type=float, default=None,
+                        help="réduction entière préalable au redimensionnement (ex. 2.0)")
+    args = parser.parse_args()
+
+    # Paramètres non par défaut seulement : un modèle par défaut reste lisible partout
+    feature_params = {}
+    if args.resample != "lanczos":
+        feature_params["resample"] = args.resample
+    if args.reducing_gap is not None:
+        feature_params["reducing_gap"] = args.reducing_gap
+
     data_dir    = get_data_dir()
     samples_dir = os.path.join(data_dir, "detection_samples")
     model_path  = os.path.join(data_dir, "state_classifier.pkl")
+    npz_path    = os.path.splitext(model_path)[0] + ".npz"
+
+    if args.export_only:
+        with open(model_path, "rb") as f:
+            export_npz(pickle.load(f), npz_path)
+        return
+    if args.mode == "cnn":
+        main_cnn(samples_dir, data_dir, args.epochs)
+        return
 
     logger.info("Dossier samples : %s", samples_dir)
 
     # Stage 1 : classificateur 3 classes
-    X, y, counts_raw = load_dataset(samples_dir)
+    logger.info("Version des features : %s %s", feature_version(**feature_params), feature_params)
+    X, X_color, X_roi, y, counts_raw, timings = load_dataset(samples_dir, feature_params)
 
     if len(X) == 0:
         logger.error("Aucune image trouvée dans %s", samples_dir)
@@ -281,6 +635,14 @@ def main():
     pipeline = train(X, y)
     print_report(pipeline, X, y)
 
+    # Étage 1 de la cascade : features couleur
+    color_stage, cv_proba, color_classes = train_color_stage(X_color, y)
+    print_cascade_report(cv_proba, color_classes, float(color_stage["threshold"]), y, timings)
+
+    # Micro-détecteurs par question (PollingLoop n'en pose qu'une ou deux par état)
+    micro, micro_report = train_micro_detectors(X_roi, y)
+    print_micro_report(micro_report, timings)
+
     # Stage 2 : calibration règle win/lose
     win_lose_rule = calibrate_win_lose_rule(samples_dir)
 
@@ -290,10 +652,16 @@ def main():
         "cls_labels":    CLS_LABELS,
         "win_lose_rule": win_lose_rule,
         "img_size":      IMG_SIZE,
+        "feature_version": feature_version(**feature_params),
+        "feature_params":  feature_params,
+        "color_stage":   color_stage,
+        "micro":         micro,
+        "micro_version": roi_features_version(),
     }
     with open(model_path, "wb") as f:
         pickle.dump(model, f)
     logger.info("Modèle sauvegardé : %s", model_path)
+    export_npz(model, npz_path)
     print(f"\nModèle : {model_path}")
 
 
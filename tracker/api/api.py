@@ -35,6 +35,8 @@ class TrackerAPI:
         self._db_lock = threading.Lock()
         self._config = ConfigManager()
         self._polling = None  # injecté depuis main.py via set_polling()
+        self._bus = None      # injecté depuis main.py via set_frame_bus()
+        self._ocr_registry = None  # injecté depuis main.py via set_ocr_registry()
         logger.info("TrackerAPI initialisée")
 
     # -------------------------------------------------------------------------
@@ -234,6 +236,19 @@ class TrackerAPI:
         """Injecte la référence au PollingLoop depuis main.py (Story 3.1)."""
         self._polling = polling
 
+    def set_frame_bus(self, bus) -> None:
+        """Injecte le FrameBus partagé depuis main.py (capture unique)."""
+        self._bus = bus
+
+    def set_ocr_registry(self, registry) -> None:
+        """Injecte le registre du lecteur EasyOCR partagé (un seul reader par processus)."""
+        self._ocr_registry = registry
+
+    def _ocr_pipeline(self):
+        """OcrPipeline de diagnostic sur le reader partagé (jamais de nouveau easyocr.Reader)."""
+        from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+        return OcrPipeline(registry=self._ocr_registry)
+
     def capture_test_frame(self) -> dict:
         """Capture un frame de la région configurée pour test visuel."""
         config = self._config.get_all()
@@ -251,11 +266,29 @@ class TrackerAPI:
         region = config.get("mumu_region")
 
         if self._polling is not None:
-            return {
+            status = {
                 "mumu_detected": self._polling.mumu_detected,
                 "state": self._polling.state.value,
                 "region_configured": region is not None,
             }
+            tick_stats = getattr(self._polling, "tick_stats", None)
+            if isinstance(tick_stats, dict):
+                status["tick_stats"] = tick_stats
+            gate_stats = getattr(self._polling._detector, "gate_stats", None)
+            if isinstance(gate_stats, dict):
+                status["frame_gate"] = gate_stats
+            cascade_stats = getattr(self._polling._detector, "cascade_stats", None)
+            if isinstance(cascade_stats, dict):
+                status["cascade"] = cascade_stats
+            micro_stats = getattr(self._polling._detector, "micro_stats", None)
+            if isinstance(micro_stats, dict):
+                status["micro_detectors"] = micro_stats
+            reload_stats = getattr(self._polling._detector, "reload_stats", None)
+            if isinstance(reload_stats, dict):
+                status["model_reloads"] = reload_stats
+            if self._ocr_registry is not None:
+                status["ocr_reader"] = self._ocr_registry.status()
+            return status
 
         mumu_detected = False
         try:
@@ -293,7 +326,6 @@ class TrackerAPI:
     def test_ocr_now(self) -> dict:
         """Capture l'écran MuMu actuel et retourne les données OCR extraites."""
         try:
-            from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
             import os as _os
             region = self._config.get_all().get("mumu_region")
             if not region:
@@ -310,7 +342,7 @@ class TrackerAPI:
             top_crop.save(_os.path.join(data_dir, "debug_crop_top.png"))
             bot_crop.save(_os.path.join(data_dir, "debug_crop_bot.png"))
             logger.info("Crops sauvegardés dans %s", data_dir)
-            ocr = OcrPipeline()
+            ocr = self._ocr_pipeline()
             data = ocr.extract_end_screen_data(img)
             logger.info("test_ocr_now: %s", data)
             return data
@@ -328,10 +360,14 @@ class TrackerAPI:
             from tracker.capture.sampler import SamplingLoop  # noqa: PLC0415
             if getattr(self, "_sampler", None) and self._sampler.is_running:
                 return {"error": "Sampling déjà en cours."}
-            region = self._config.get_all().get("mumu_region")
+            source = self._bus.source if self._bus is not None else None
+            if source is not None:
+                region = source.region()
+            else:
+                region = self._config.get_all().get("mumu_region")
             if not region:
                 return {"error": "Aucune région configurée."}
-            self._sampler = SamplingLoop(config=self._config)
+            self._sampler = SamplingLoop(config=self._config, bus=self._bus, source=source)
             t = threading.Thread(target=self._sampler.start, daemon=True)
             t.start()
             return {"ok": True}
@@ -371,20 +407,18 @@ class TrackerAPI:
     def get_unlabeled_samples(self) -> list:
         """Retourne la liste des captures non labélisées avec leur label auto-détecté."""
         try:
-            import base64, io  # noqa: PLC0415, E401
-            from tracker.capture.sampler import list_unlabeled  # noqa: PLC0415
+            import base64  # noqa: PLC0415
+            from tracker.capture.sampler import list_unlabeled, thumbnail_jpeg  # noqa: PLC0415
             samples = list_unlabeled()
             result = []
             for s in samples:
                 try:
-                    img = __import__("PIL.Image", fromlist=["Image"]).open(s["path"])
-                    img.thumbnail((320, 240))
-                    buf = io.BytesIO()
-                    img.save(buf, format="JPEG", quality=75)
-                    b64 = base64.b64encode(buf.getvalue()).decode()
+                    b64 = base64.b64encode(thumbnail_jpeg(s["filename"])).decode()
                     result.append({
                         "filename": s["filename"],
                         "auto_label": s["auto_label"],
+                        "suggested_label": s["suggested_label"],
+                        "confidence": s["confidence"],
                         "thumbnail": b64,
                     })
                 except Exception:
@@ -394,6 +428,15 @@ class TrackerAPI:
             logger.error("get_unlabeled_samples: %s", e)
             return {"error": str(e)}
 
+    def prelabel_samples(self, force: bool = False) -> dict:
+        """Suggère un label (+ confiance) pour les captures non labélisées via le modèle ML."""
+        try:
+            from tracker.capture.sampler import prelabel_unlabeled  # noqa: PLC0415
+            return prelabel_unlabeled(force=force)
+        except Exception as e:
+            logger.error("prelabel_samples: %s", e)
+            return {"error": str(e)}
+
     def capture_now(self) -> dict:
         """Capture immédiatement l'écran et sauvegarde dans unlabeled/ pour labélisation."""
         try:
@@ -421,14 +464,13 @@ class TrackerAPI:
         """Capture l'écran actuel et retourne la détection du deck (nom + énergie).
         Sauvegarde aussi la détection dans deck_detection_mappings si le nom est valide."""
         try:
-            from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
             region = self._config.get_all().get("mumu_region")
             if not region:
                 return {"error": "Région non configurée"}
             img = capture_region_pil(region)
             if img is None:
                 return {"error": "Capture échouée"}
-            ocr = OcrPipeline()
+            ocr = self._ocr_pipeline()
             data = ocr.extract_prequeue_data(img)
             deck_name   = data.get("deck_name", "?")
             energy_type = data.get("energy_type", "?")
@@ -449,7 +491,6 @@ class TrackerAPI:
         Retourne {'name': str|None, 'zones': [{'label', 'results'}]}.
         """
         try:
-            from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
             from tracker.paths import get_data_dir       # noqa: PLC0415
             from PIL import ImageDraw                    # noqa: PLC0415
             region = self._config.get_all().get("mumu_region")
@@ -459,7 +500,7 @@ class TrackerAPI:
             if img is None:
                 return {"error": "Capture échouée"}
 
-            ocr = OcrPipeline()
+            ocr = self._ocr_pipeline()
             name = ocr.extract_active_opponent_pokemon(img)
 
             # Sauvegarde crops debug pour chaque zone
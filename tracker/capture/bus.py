@@ -0,0 +1,355 @@
+"""tracker/capture/bus.py — Bus de frames à producteur unique.
+
+FrameBus : un seul thread capture la région MuMu à intervalle fixe et publie
+des frames horodatées dans un ring buffer borné. Tous les analyseurs
+(PollingLoop, threads OCR de main.py, SamplingLoop) lisent ce buffer au lieu
+de capturer l'écran chacun de leur côté : le coût I/O écran dépend du
+framerate du bus, plus du nombre d'analyseurs.
+
+FrameSubscriber : curseur par consommateur — `latest()` pour la frame la plus
+récente non encore vue, `next()` pour attendre la suivante.
+
+Mode ROI (`rois=`) : tant que le callable retourne des ROIs (IN_COMBAT), le
+bus ne capture que ces zones (RoiFrames) et une frame complète toutes les
+`full_every` secondes pour le classifieur d'état. latest() / wait_next()
+retournent par défaut la dernière frame complète ; grab_latest_rois accepte
+aussi les frames ROI.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INTERVAL = 0.1
+_DEFAULT_CAPACITY = 8
+# Mode ROI : cadence des frames complètes gardées pour le classifieur (s)
+BUS_FULL_FRAME_EVERY = 0.5
+
+
+class BusFrame:
+    """Frame publiée sur le bus : numéro de séquence, horodatage monotonic, image.
+
+    `image` est une Frame NumPy (tracker.capture.frame) en production.
+    """
+
+    __slots__ = ("seq", "timestamp", "image", "region")
+
+    def __init__(self, seq: int, timestamp: float, image, region: dict | None = None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+        self.region = region
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    @property
+    def full(self) -> bool:
+        """False pour une frame ROI (RoiFrames) publiée en mode ROI."""
+        from tracker.capture.frame import RoiFrames  # noqa: PLC0415
+        return not isinstance(self.image, RoiFrames)
+
+    def __repr__(self):
+        return f"BusFrame(seq={self.seq}, t={self.timestamp:.3f})"
+
+
+class FrameBus:
+    """Producteur unique de frames écran, ring buffer borné + notification.
+
+    Usage :
+        bus = FrameBus(config=config_manager, interval=0.1)
+        threading.Thread(target=bus.start, name="frame-bus", daemon=True).start()
+        sub = bus.subscribe()
+        frame = sub.next(timeout=1.0)   # ou sub.latest()
+
+    `should_capture` (callable → bool, optionnel) permet de suspendre la
+    capture quand l'émulateur n'est pas détecté. `interval` peut être un
+    callable (ex. `lambda: polling.current_interval`) pour suivre la cadence
+    du polling selon l'état.
+
+    Avec une CaptureSource (`source=`, tracker.capture.source), région et
+    frames viennent de la source (écran réel, dossier PNG ou session rejouée)
+    au lieu de la config + mss.
+
+    `rois` (callable → {nom: (x0, y0, x1, y1)}, optionnel) active le mode
+    ROI : quand il retourne des ROIs, les ticks ne capturent que ces zones
+    (`grab_rois`, défaut screen.capture_rois) sauf une frame complète toutes
+    les `full_every` secondes. Sources hors ligne : toujours la frame complète
+    (un grab ROI y consommerait une frame de la séquence).
+    """
+
+    def __init__(self, config=None, interval: float = _DEFAULT_INTERVAL,
+                 capacity: int = _DEFAULT_CAPACITY, grab=None, should_capture=None,
+                 source=None, rois=None, grab_rois=None,
+                 full_every: float = BUS_FULL_FRAME_EVERY):
+        self._config = config
+        self._interval = interval
+        self._grab = grab
+        self._source = source
+        self._should_capture = should_capture
+        self._rois = rois
+        self._grab_rois = grab_rois
+        self._full_every = full_every
+        self._last_full = None
+        self._ring = deque(maxlen=max(1, capacity))
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._stop_event = threading.Event()
+        self._running = False
+        self._capture_stats = {"full": 0, "rois": 0, "pixels": 0}
+
+    # ------------------------------------------------------------------
+    # Cycle de vie (même convention que PollingLoop : start() bloque)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._stop_event.clear()
+        with self._cond:
+            self._running = True
+        logger.info("FrameBus démarré (interval=%.3fs, capacité=%d)",
+                    self.interval, self._ring.maxlen)
+        try:
+            self._loop()
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        logger.info("FrameBus arrêté (%d frames publiées, captures %s)", self._seq,
+                    self.capture_stats)
+
+    @property
+    def is_running(self) -> bool:
+        with self._cond:
+            return self._running
+
+    @property
+    def interval(self) -> float:
+        return self._interval() if callable(self._interval) else self._interval
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def capture_stats(self) -> dict:
+        """Captures publiées : frames complètes, frames ROI, pixels capturés."""
+        with self._cond:
+            return dict(self._capture_stats)
+
+    # ------------------------------------------------------------------
+    # Production
+    # ------------------------------------------------------------------
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error("FrameBus tick error: %s", e)
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+
+    def _tick(self):
+        if self._should_capture is not None and not self._should_capture():
+            return
+        if self._source is not None:
+            region = self._source.region()
+        elif self._config is not None:
+            region = self._config.get_all().get("mumu_region")
+        else:
+            return
+        if not region:
+            return
+        rois = self._active_rois()
+        now = time.monotonic()
+        if rois and self._last_full is not None and now - self._last_full < self._full_every:
+            img = self._grab_rois_now(region, rois)
+        else:
+            img = self._grab_full(region)
+            if img is not None:
+                self._last_full = now
+        if img is not None:
+            self._count(img)
+            self.publish(img, region=region)
+
+    def _active_rois(self) -> dict:
+        if self._rois is None or (self._source is not None and not self._source.live):
+            return {}
+        return self._rois() or {}
+
+    def _grab_full(self, region: dict):
+        grab = self._grab
+        if grab is None and self._source is not None:
+            grab = self._source.grab
+        if grab is None:
+            from tracker.capture.screen import capture_region_frame  # noqa: PLC0415
+            grab = capture_region_frame
+        return grab(region)
+
+    def _grab_rois_now(self, region: dict, rois: dict):
+        grab_rois = self._grab_rois
+        if grab_rois is None and self._source is not None:
+            grab_rois = self._source.grab_rois
+        if grab_rois is None:
+            from tracker.capture.screen import capture_rois  # noqa: PLC0415
+            grab_rois = capture_rois
+        return grab_rois(region, rois)
+
+    def _count(self, img) -> None:
+        from tracker.capture.frame import RoiFrames  # noqa: PLC0415
+        if isinstance(img, RoiFrames):
+            key = "rois"
+            pixels = sum(img[n].size[0] * img[n].size[1] for n in img.names)
+        else:
+            key = "full"
+            size = getattr(img, "size", None)
+            pixels = size[0] * size[1] if isinstance(size, tuple) and len(size) == 2 else 0
+        with self._cond:
+            self._capture_stats[key] += 1
+            self._capture_stats["pixels"] += pixels
+
+    def publish(self, image, timestamp: float = None, region: dict = None) -> BusFrame:
+        """Ajoute une frame au ring buffer et réveille les abonnés en attente."""
+        with self._cond:
+            self._seq += 1
+            frame = BusFrame(self._seq, time.monotonic() if timestamp is None else timestamp,
+                             image, region)
+            self._ring.append(frame)
+            self._cond.notify_all()
+        return frame
+
+    # ------------------------------------------------------------------
+    # Consommation
+    # ------------------------------------------------------------------
+
+    def _newest(self, full: bool) -> BusFrame | None:
+        """Frame la plus récente du ring (complète seulement si `full`) — sous _cond."""
+        for frame in reversed(self._ring):
+            if not full or frame.full:
+                return frame
+        return None
+
+    def latest(self, max_age: float = None, full: bool = True) -> BusFrame | None:
+        """Frame la plus récente, ou None si vide / plus vieille que max_age.
+
+        `full=False` accepte aussi les frames ROI du mode ROI.
+        """
+        with self._cond:
+            frame = self._newest(full)
+        if frame is None:
+            return None
+        if max_age is not None and frame.age > max_age:
+            return None
+        return frame
+
+    def wait_next(self, after_seq: int = 0, timeout: float = None,
+                  full: bool = True) -> BusFrame | None:
+        """Attend une frame de séquence > after_seq. None si timeout ou arrêt."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                frame = self._newest(full)
+                if frame is not None and frame.seq > after_seq:
+                    return frame
+                if self._stop_event.is_set():
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def frames(self) -> list:
+        """Copie du contenu du ring buffer (plus ancienne → plus récente)."""
+        with self._cond:
+            return list(self._ring)
+
+    def subscribe(self) -> "FrameSubscriber":
+        return FrameSubscriber(self)
+
+
+class FrameSubscriber:
+    """Curseur de lecture d'un consommateur sur un FrameBus.
+
+    Chaque abonné mémorise la dernière séquence consommée : deux appels
+    successifs à latest() ne renvoient pas deux fois la même frame.
+    """
+
+    def __init__(self, bus: FrameBus):
+        self._bus = bus
+        self._last_seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def latest(self, max_age: float = None, full: bool = True) -> BusFrame | None:
+        """Frame la plus récente si elle n'a pas encore été vue par cet abonné."""
+        frame = self._bus.latest(max_age=max_age, full=full)
+        if frame is None or frame.seq <= self._last_seq:
+            return None
+        self._last_seq = frame.seq
+        return frame
+
+    def next(self, timeout: float = None, full: bool = True) -> BusFrame | None:
+        """Attend la prochaine frame non vue (None si timeout)."""
+        frame = self._bus.wait_next(self._last_seq, timeout=timeout, full=full)
+        if frame is not None:
+            self._last_seq = frame.seq
+        return frame
+
+
+def grab_latest_image(bus: FrameBus | None, region: dict, max_age: float = 0.5):
+    """Image la plus récente du bus si assez fraîche, sinon capture directe.
+
+    Permet aux appelants ponctuels (threads OCR, API) de profiter du bus sans
+    dépendre de sa présence (tests, diagnostic, bus arrêté).
+
+    Avec une source hors ligne (dossier, replay), il n'y a pas d'écran à
+    capturer : la dernière frame du bus est retournée quel que soit son âge.
+    """
+    if bus is not None:
+        frame = bus.latest(max_age=max_age)
+        if frame is not None:
+            return frame.image
+        source = bus.source
+        if source is not None:
+            if not source.live:
+                frame = bus.latest()
+                return frame.image if frame is not None else None
+            return source.grab(region)
+    from tracker.capture.screen import capture_region_frame  # noqa: PLC0415
+    return capture_region_frame(region)
+
+
+def grab_latest_rois(bus: FrameBus | None, region: dict, rois: dict, max_age: float = 0.5):
+    """ROIs nommées : découpées dans la frame du bus si fraîche, sinon capture sous-région.
+
+    Les analyseurs qui ne lisent que quelques zones (énergie, nom du Pokémon
+    adverse) ne déclenchent jamais de capture pleine fenêtre. Une frame ROI du
+    bus (mode ROI) sert telle quelle si elle contient toutes les ROIs demandées.
+    """
+    from tracker.capture.frame import crop_rois  # noqa: PLC0415
+
+    if bus is not None:
+        frame = bus.latest(max_age=max_age, full=False)
+        if frame is not None and not frame.full and not set(rois) <= set(frame.image.names):
+            frame = bus.latest(max_age=max_age)
+        if frame is not None:
+            return crop_rois(frame.image, rois)
+        source = bus.source
+        if source is not None:
+            if not source.live:
+                frame = bus.latest()
+                return crop_rois(frame.image, rois) if frame is not None else None
+            return source.grab_rois(region, rois)
+    from tracker.capture.screen import capture_rois  # noqa: PLC0415
+    return capture_rois(region, rois)
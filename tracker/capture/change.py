@@ -0,0 +1,108 @@
+"""tracker/capture/change.py — Détection de changement d'image à faible coût.
+
+FrameChangeGate : compare une vignette de luminance (32x24 par défaut) de la
+frame courante à celle de la dernière frame réellement classifiée. Si l'écart
+moyen reste sous le seuil, l'image est considérée inchangée et le résultat de
+classification précédent peut être réutilisé (pas de resize LANCZOS + HOG + SVM).
+
+La vignette est calculée sur une grille sous-échantillonnée puis moyennée par
+blocs : quelques dizaines de milliers de pixels lus au lieu de l'image entière.
+"""
+import threading
+
+import numpy as np
+
+from tracker.capture.frame import rgb_array
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def luma_thumbnail(img, size: tuple = (32, 24)) -> np.ndarray:
+    """Vignette (h, w) float32 de luminance moyenne par bloc.
+
+    Accepte une Frame (aucune copie avant le sous-échantillonnage) ou une PIL Image.
+    """
+    arr = rgb_array(img)
+    tw, th = size
+    h, w = arr.shape[:2]
+    # Sous-échantillonnage : ~4 échantillons par bloc et par axe suffisent
+    sub = arr[::max(1, h // (th * 4)), ::max(1, w // (tw * 4))]
+    h2 = sub.shape[0] // th * th
+    w2 = sub.shape[1] // tw * tw
+    if h2 == 0 or w2 == 0:
+        raise ValueError(f"image trop petite pour une vignette {size}: {w}x{h}")
+    luma = sub[:h2, :w2].astype(np.float32) @ _LUMA
+    return luma.reshape(th, h2 // th, tw, w2 // tw).mean(axis=(1, 3))
+
+
+class FrameChangeGate:
+    """Porte « frame changée ? » devant la classification.
+
+    check(img) retourne True si l'image doit être (re)classifiée : première
+    image, écart moyen de luminance > `threshold` (niveaux 0-255) par rapport
+    à la référence, ou `max_skips` images consécutives déjà sautées (borne la
+    durée pendant laquelle un résultat peut être réutilisé). La référence est
+    alors remplacée par l'image courante.
+
+    Une image illisible (vignette impossible) est toujours considérée changée.
+    """
+
+    def __init__(self, threshold: float = 1.5, size: tuple = (32, 24),
+                 max_skips: int = 20):
+        self._threshold = threshold
+        self._size = size
+        self._max_skips = max_skips
+        self._lock = threading.Lock()
+        self._ref = None
+        self._skipped_in_row = 0
+        self._checked = 0
+        self._skipped = 0
+        self._last_diff = None
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            checked, skipped = self._checked, self._skipped
+            last_diff = self._last_diff
+        return {
+            "checked": checked,
+            "skipped": skipped,
+            "classified": checked - skipped,
+            "skip_ratio": skipped / checked if checked else 0.0,
+            "last_diff": last_diff,
+        }
+
+    def reset(self) -> None:
+        """Oublie la référence — la prochaine image sera classifiée."""
+        with self._lock:
+            self._ref = None
+            self._skipped_in_row = 0
+
+    def check(self, img) -> bool:
+        try:
+            thumb = luma_thumbnail(img, self._size)
+        except Exception:
+            thumb = None
+
+        with self._lock:
+            self._checked += 1
+            if thumb is None:
+                self._ref = None
+                self._last_diff = None
+                return True
+            if self._ref is not None and self._ref.shape == thumb.shape:
+                diff = float(np.abs(thumb - self._ref).mean())
+                self._last_diff = diff
+                if diff <= self._threshold and self._skipped_in_row < self._max_skips:
+                    self._skipped_in_row += 1
+                    self._skipped += 1
+                    return False
+            else:
+                self._last_diff = None
+            self._ref = thumb
+            self._skipped_in_row = 0
+            return True
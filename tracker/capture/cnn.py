@@ -0,0 +1,107 @@
+"""tracker/capture/cnn.py — Petit CNN CPU pour la détection d'état (backend "cnn").
+
+Alternative au HOG + SVM RBF de StateDetector : torch est déjà chargé dans le
+processus par EasyOCR, un réseau de quelques couches de convolution remplace
+l'extraction HOG/HSV et les milliers de vecteurs de support.
+
+- Entrée : image RGB réduite à 96x72 (BILINEAR), valeurs dans [0, 1], (3, 72, 96).
+- Réseau : 4 blocs conv 3x3 + BatchNorm + ReLU (+ max-pool 2x2), pooling moyen global,
+  couche linéaire vers les classes (~60 k paramètres, ~250 Ko).
+- Inférence : torch.inference_mode. Le nombre de threads torch
+  (torch.set_num_threads) est global au processus et partagé avec EasyOCR :
+  le classifieur n'y touche pas, main.py le règle une fois au démarrage
+  (config "torch_threads").
+- Modèle : state_classifier_cnn.pt écrit par `tools/train_classifier.py --mode cnn`
+  (state_dict + classes + métadonnées simples, lu avec weights_only=True).
+
+CnnClassifier expose classes_ / predict / predict_proba sur des entrées
+préparées par cnn_input, comme le "pipeline" d'un modèle SVM.
+
+torch n'est importé que par build_network, CnnClassifier et load_cnn_model.
+"""
+import numpy as np
+from PIL import Image
+
+from tracker.capture.frame import to_pil_rgb
+
+CNN_INPUT = (96, 72)
+CNN_CHANNELS = (16, 32, 64, 64)
+
+
+def cnn_input(img) -> np.ndarray:
+    """Tableau (3, 72, 96) float32 dans [0, 1] depuis une Frame ou PIL Image."""
+    small = to_pil_rgb(img).resize(CNN_INPUT, Image.BILINEAR)
+    return np.asarray(small, dtype=np.float32).transpose(2, 0, 1) / np.float32(255.)
+
+
+def cnn_input_batch(frames) -> np.ndarray:
+    """Pile (N, 3, 72, 96) float32 de cnn_input."""
+    if not frames:
+        w, h = CNN_INPUT
+        return np.empty((0, 3, h, w), dtype=np.float32)
+    return np.stack([cnn_input(img) for img in frames])
+
+
+def build_network(n_classes: int, channels: tuple = CNN_CHANNELS):
+    """Réseau convolutif : blocs conv 3x3 + BatchNorm + ReLU, max-pool sauf le dernier."""
+    from torch import nn  # noqa: PLC0415
+
+    layers, c_in = [], 3
+    for i, c_out in enumerate(channels):
+        layers += [nn.Conv2d(c_in, c_out, 3, padding=1), nn.BatchNorm2d(c_out), nn.ReLU()]
+        if i < len(channels) - 1:
+            layers.append(nn.MaxPool2d(2))
+        c_in = c_out
+    layers += [nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(c_in, n_classes)]
+    return nn.Sequential(*layers)
+
+
+class CnnClassifier:
+    """Réseau entraîné + classes, interface predict / predict_proba du pipeline SVM."""
+
+    def __init__(self, network, classes):
+        import torch  # noqa: PLC0415
+
+        self._torch = torch
+        self.network = network.eval()
+        self.classes_ = np.asarray(classes).astype(str)
+
+    def predict_proba(self, X) -> np.ndarray:
+        torch = self._torch
+        batch = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+        with torch.inference_mode():
+            return torch.softmax(self.network(batch), dim=1).numpy().astype(np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def save_cnn_model(path: str, network, classes, meta: dict) -> None:
+    """Checkpoint torch : poids + classes + métadonnées (win_lose_rule, holdout…)."""
+    import torch  # noqa: PLC0415
+
+    torch.save({
+        "state_dict": network.state_dict(),
+        "classes": [str(c) for c in classes],
+        "input_size": list(CNN_INPUT),
+        "channels": list(CNN_CHANNELS),
+        "meta": meta,
+    }, path)
+
+
+def load_cnn_model(path: str) -> dict:
+    """Modèle au format de StateDetector ({"pipeline", "backend": "cnn", …})."""
+    import torch  # noqa: PLC0415
+
+    checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+    if tuple(checkpoint["input_size"]) != CNN_INPUT:
+        raise ValueError(f"entrée {checkpoint['input_size']} ≠ {CNN_INPUT}")
+    network = build_network(len(checkpoint["classes"]), tuple(checkpoint["channels"]))
+    network.load_state_dict(checkpoint["state_dict"])
+    model = dict(checkpoint.get("meta") or {})
+    model.update(pipeline=CnnClassifier(network, checkpoint["classes"]),
+                 backend="cnn")
+    rule = model.get("win_lose_rule")
+    if rule and "roi" in rule:
+        rule["roi"] = tuple(rule["roi"])
+    return model
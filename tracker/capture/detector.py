@@ -2,21 +2,26 @@
 
 CombatState : IDLE → PRE_QUEUE → IN_COMBAT → END_SCREEN → IDLE
 
-StateDetector : utilise le modèle ML (data/state_classifier.pkl) pour détecter
-l'état du jeu. Fallback sur "unknown" si le modèle est absent.
+StateDetector : utilise le modèle ML (data/state_classifier.pkl, ou son export
+NumPy state_classifier.npz évalué par NumpySVC) pour détecter l'état du jeu.
+Fallback sur "unknown" si le modèle est absent.
 
-PollingLoop : thread daemon 100ms — détecte MUMU + pilote les transitions d'état.
+PollingLoop : thread daemon (100ms par défaut, cadence réglable par état) —
+détecte MUMU + pilote les transitions d'état.
 Expose last_outcome ("win" | "lose" | None) après une transition vers END_SCREEN.
 """
 import logging
 import os
 import pickle
 import threading
+import time
+from collections import deque
 from enum import Enum
 
 import numpy as np
-from PIL import Image
 
+from tracker.capture import features
+from tracker.capture.frame import crop_rgb_array, to_pil_rgb
 from tracker.capture.screen import capture_region_pil, find_mumu_window
 from tracker.paths import get_data_dir, get_project_root
 
@@ -25,62 +30,322 @@ logger = logging.getLogger(__name__)
 # Cherche d'abord dans models/ (distribué avec le repo), puis dans data/ (local)
 _MODEL_PATH = os.path.join(get_project_root(), "models", "state_classifier.pkl")
 _MODEL_PATH_LEGACY = os.path.join(get_data_dir(), "state_classifier.pkl")
-_IMG_SIZE = (160, 120)
+# Backend "cnn" (tracker.capture.cnn) : checkpoint torch, mêmes emplacements
+_CNN_MODEL_PATH = os.path.join(get_project_root(), "models", "state_classifier_cnn.pt")
+_CNN_MODEL_PATH_LEGACY = os.path.join(get_data_dir(), "state_classifier_cnn.pt")
 
 
 # ---------------------------------------------------------------------------
-# Features (dupliquées ici pour éviter une dépendance circulaire avec sampler)
+# Features (module partagé avec tools/train_classifier.py)
 # ---------------------------------------------------------------------------
 
-def _extract_features(img: Image.Image) -> np.ndarray:
-    from skimage.feature import hog  # noqa: PLC0415
-
-    img_rgb = img.convert("RGB").resize(_IMG_SIZE, Image.LANCZOS)
-    arr = np.asarray(img_rgb, dtype=np.uint8)
-
-    gray = np.asarray(img_rgb.convert("L"), dtype=np.uint8)
-    hog_feat = hog(
-        gray,
-        orientations=8,
-        pixels_per_cell=(16, 16),
-        cells_per_block=(2, 2),
-        feature_vector=True,
-    )
-
-    hsv = _rgb_to_hsv(arr)
-    hist_feats = []
-    for ch in range(3):
-        h, _ = np.histogram(hsv[:, :, ch], bins=16, range=(0, 1))
-        hist_feats.append(h / (h.sum() + 1e-6))
-
-    return np.concatenate([hog_feat, np.concatenate(hist_feats)])
-
-
-def _rgb_to_hsv(arr: np.ndarray) -> np.ndarray:
-    r, g, b = arr[:, :, 0] / 255., arr[:, :, 1] / 255., arr[:, :, 2] / 255.
-    cmax = np.maximum(np.maximum(r, g), b)
-    cmin = np.minimum(np.minimum(r, g), b)
-    delta = cmax - cmin
-    h = np.zeros_like(r)
-    with np.errstate(divide='ignore', invalid='ignore'):
-        s = np.where(cmax > 0, delta / cmax, 0.)
-    v = cmax
-    mr = (delta > 0) & (cmax == r)
-    mg = (delta > 0) & (cmax == g)
-    mb = (delta > 0) & (cmax == b)
-    h[mr] = ((g[mr] - b[mr]) / delta[mr]) % 6
-    h[mg] = (b[mg] - r[mg]) / delta[mg] + 2
-    h[mb] = (r[mb] - g[mb]) / delta[mb] + 4
-    h /= 6.
-    return np.stack([h, s, v], axis=2)
-
-
-def _crop_roi(img: Image.Image, roi: tuple) -> Image.Image:
-    w, h = img.size
-    return img.crop((
-        int(roi[0] * w), int(roi[1] * h),
-        int((roi[0] + roi[2]) * w), int((roi[1] + roi[3]) * h),
-    ))
+def _extract_features(img, **params) -> np.ndarray:
+    # HOG + HSV en NumPy (tracker.capture.features) : pas d'import skimage au runtime
+    return features.extract_features(img, **params)
+
+
+def _model_features(model: dict, img):
+    """Entrée du pipeline du modèle : image 96x72 (backend cnn) ou HOG + HSV."""
+    if model.get("backend") == "cnn":
+        from tracker.capture.cnn import cnn_input  # noqa: PLC0415
+        return cnn_input(img)
+    return _extract_features(img, **(model.get("feature_params") or {}))
+
+
+def _model_features_batch(model: dict, images: list) -> np.ndarray:
+    if model.get("backend") == "cnn":
+        from tracker.capture.cnn import cnn_input_batch  # noqa: PLC0415
+        return cnn_input_batch(images)
+    return features.extract_features_batch(images, **(model.get("feature_params") or {}))
+
+
+def _color_features(img) -> np.ndarray:
+    return features.color_features(img)
+
+
+# ---------------------------------------------------------------------------
+# Évaluateur NumPy du pipeline StandardScaler + SVC (export .npz)
+# ---------------------------------------------------------------------------
+
+def _model_paths(pkl_path: str) -> list:
+    """Candidats pour un modèle : le .npz (si au moins aussi récent) puis le .pkl."""
+    npz_path = os.path.splitext(pkl_path)[0] + ".npz"
+    if os.path.exists(npz_path) and (not os.path.exists(pkl_path)
+                                     or os.path.getmtime(npz_path) >= os.path.getmtime(pkl_path)):
+        return [npz_path, pkl_path]
+    return [pkl_path]
+
+
+class NumpySVC:
+    """Reproduit Pipeline(StandardScaler, SVC(rbf, probability=True)) en NumPy.
+
+    Mêmes étapes que libsvm : noyau RBF sur les vecteurs de support, vote
+    un-contre-un, probabilités par paires (Platt, probA/probB) couplées par
+    la méthode de Wu, Lin & Weng. Expose predict / predict_proba / classes_
+    comme le pipeline scikit-learn : sklearn n'est pas importé à l'exécution.
+    """
+
+    _MIN_PROB = 1e-7
+
+    def __init__(self, mean, scale, support_vectors, dual_coef, intercept, n_support,
+                 gamma, classes, prob_a=None, prob_b=None):
+        self.classes_ = np.asarray(classes)
+        self._mean = np.asarray(mean, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+        self._sv = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self._sv_sq = np.einsum("ij,ij->i", self._sv, self._sv)
+        self._coef = np.asarray(dual_coef, dtype=np.float64)
+        self._intercept = np.asarray(intercept, dtype=np.float64)
+        self._gamma = float(gamma)
+        self._prob_a = None if prob_a is None or len(prob_a) == 0 else np.asarray(prob_a)
+        self._prob_b = None if prob_b is None or len(prob_b) == 0 else np.asarray(prob_b)
+        starts = np.concatenate([[0], np.cumsum(n_support)])
+        self._slices = [slice(int(a), int(b)) for a, b in zip(starts[:-1], starts[1:])]
+        k = len(self.classes_)
+        self._pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "NumpySVC":
+        """Extrait les paramètres d'un Pipeline(StandardScaler, SVC) entraîné."""
+        scaler, svc = pipeline.steps[0][1], pipeline.steps[-1][1]
+        return cls(scaler.mean_, scaler.scale_, svc.support_vectors_, svc._dual_coef_,
+                   svc._intercept_, svc.n_support_, svc._gamma, svc.classes_,
+                   getattr(svc, "probA_", None), getattr(svc, "probB_", None))
+
+    def arrays(self) -> dict:
+        """Paramètres sous forme de tableaux (contenu du .npz)."""
+        return {
+            "scaler_mean": self._mean, "scaler_scale": self._scale,
+            "support_vectors": self._sv, "dual_coef": self._coef,
+            "intercept": self._intercept,
+            "n_support": np.array([s.stop - s.start for s in self._slices], dtype=np.int32),
+            "gamma": np.array(self._gamma), "classes": self.classes_.astype(str),
+            "prob_a": self._prob_a if self._prob_a is not None else np.empty(0),
+            "prob_b": self._prob_b if self._prob_b is not None else np.empty(0),
+        }
+
+    @classmethod
+    def from_arrays(cls, data) -> "NumpySVC":
+        return cls(data["scaler_mean"], data["scaler_scale"], data["support_vectors"],
+                   data["dual_coef"], data["intercept"], data["n_support"],
+                   data["gamma"], data["classes"], data["prob_a"], data["prob_b"])
+
+    def decision_function(self, X) -> np.ndarray:
+        """Valeurs de décision un-contre-un, shape (n, k(k-1)/2) — ordre libsvm."""
+        X = (np.asarray(X, dtype=np.float64) - self._mean) / self._scale
+        sq = np.einsum("ij,ij->i", X, X)
+        dist = np.maximum(sq[:, None] + self._sv_sq[None, :] - 2.0 * (X @ self._sv.T), 0.0)
+        kernel = np.exp(-self._gamma * dist)
+        dec = np.empty((len(X), len(self._pairs)))
+        for p, (i, j) in enumerate(self._pairs):
+            si, sj = self._slices[i], self._slices[j]
+            dec[:, p] = (kernel[:, si] @ self._coef[j - 1, si]
+                         + kernel[:, sj] @ self._coef[i, sj] + self._intercept[p])
+        return dec
+
+    def predict(self, X) -> np.ndarray:
+        dec = self.decision_function(X)
+        votes = np.zeros((len(dec), len(self.classes_)), dtype=np.int32)
+        for p, (i, j) in enumerate(self._pairs):
+            positive = dec[:, p] > 0
+            votes[:, i] += positive
+            votes[:, j] += ~positive
+        return self.classes_[np.argmax(votes, axis=1)]
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self._prob_a is None:
+            raise AttributeError("modèle entraîné sans probability=True")
+        f = self.decision_function(X) * self._prob_a + self._prob_b
+        # sigmoid_predict de libsvm (forme stable selon le signe)
+        pair = np.where(f >= 0, np.exp(-np.abs(f)) / (1.0 + np.exp(-np.abs(f))),
+                        1.0 / (1.0 + np.exp(-np.abs(f))))
+        pair = np.clip(pair, self._MIN_PROB, 1 - self._MIN_PROB)
+        k = len(self.classes_)
+        if k == 2:
+            return np.stack([pair[:, 0], 1 - pair[:, 0]], axis=1)
+        r = np.empty((len(pair), k, k))
+        for p, (i, j) in enumerate(self._pairs):
+            r[:, i, j] = pair[:, p]
+            r[:, j, i] = 1 - pair[:, p]
+        return np.array([_multiclass_probability(k, rows) for rows in r])
+
+
+def _multiclass_probability(k: int, r: np.ndarray) -> np.ndarray:
+    """Couplage des probabilités par paires — port de multiclass_probability (libsvm)."""
+    Q = np.empty((k, k))
+    for t in range(k):
+        Q[t, t] = sum(r[j, t] * r[j, t] for j in range(k) if j != t)
+        for j in range(t):
+            Q[t, j] = Q[j, t]
+        for j in range(t + 1, k):
+            Q[t, j] = -r[j, t] * r[t, j]
+    p = [1.0 / k] * k
+    Q = Q.tolist()
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qp = [sum(Q[t][j] * p[j] for j in range(k)) for t in range(k)]
+        pQp = sum(p[t] * Qp[t] for t in range(k))
+        if max(abs(Qp[t] - pQp) for t in range(k)) < eps:
+            break
+        for t in range(k):
+            diff = (-Qp[t] + pQp) / Q[t][t]
+            p[t] += diff
+            pQp = (pQp + diff * (diff * Q[t][t] + 2 * Qp[t])) / (1 + diff) / (1 + diff)
+            for j in range(k):
+                Qp[j] = (Qp[j] + diff * Q[t][j]) / (1 + diff)
+                p[j] /= (1 + diff)
+    return np.array(p)
+
+
+def load_npz_model(path: str) -> dict:
+    """Charge un modèle exporté par tools/train_classifier.py (.npz, sans pickle)."""
+    import json  # noqa: PLC0415
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        model = {"pipeline": NumpySVC.from_arrays(data)}
+        if "color_classes" in data:
+            model["color_stage"] = {k: data["color_" + k] for k in ColorStage.FIELDS}
+        for label in meta.pop("micro_labels", []):
+            model.setdefault("micro", {})[label] = {
+                k: data[f"micro_{label}_{k}"] for k in MicroDetector.FIELDS}
+    model.update(meta)
+    if "win_lose_rule" in model and "roi" in model["win_lose_rule"]:
+        model["win_lose_rule"]["roi"] = tuple(model["win_lose_rule"]["roi"])
+    return model
+
+
+def _feature_version_ok(model: dict, path: str) -> bool:
+    """Le modèle a-t-il été entraîné avec les features calculées par ce code ?
+
+    Un modèle sans "feature_version" (antérieur au module features) est accepté :
+    l'extraction par défaut reproduit l'ancienne extraction skimage.
+    """
+    params = model.get("feature_params") or {}
+    try:
+        expected = features.feature_version(**params)
+    except TypeError:
+        logger.error("Modèle %s : paramètres de features inconnus %s", path, params)
+        return False
+    version = model.get("feature_version")
+    if version is None:
+        logger.warning("Modèle %s sans version de features — supposé compatible", path)
+        return not params
+    if version != expected:
+        logger.error("Modèle %s refusé : features %s, code %s — réentraîner "
+                     "(tools/train_classifier.py)", path, version, expected)
+        return False
+    return True
+
+
+def load_model_file(path: str) -> dict | None:
+    """Charge et valide un modèle (.npz, .pkl ou .pt) — None si illisible ou incompatible."""
+    try:
+        if path.endswith(".pt"):
+            # Backend cnn : pas de features HOG, pas de version de features
+            from tracker.capture.cnn import load_cnn_model  # noqa: PLC0415
+            return load_cnn_model(path)
+        if path.endswith(".npz"):
+            # Export NumPy : pas d'import scikit-learn au démarrage
+            model = load_npz_model(path)
+        else:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+    except Exception as e:
+        logger.error("Erreur chargement modèle %s : %s", path, e)
+        return None
+    if not _feature_version_ok(model, path):
+        return None
+    stage = model.get("color_stage")
+    if isinstance(stage, dict):
+        model["color_stage"] = ColorStage.from_dict(stage)
+    if "micro" in model:
+        model["micro"] = _micro_detectors(model, path)
+    return model
+
+
+class ColorStage:
+    """Étage 1 de la cascade : régression logistique multinomiale sur _color_features.
+
+    Décide seule quand sa probabilité maximale atteint `threshold` (seuil choisi
+    à l'entraînement pour une précision cible) ; sinon la frame passe au HOG + SVM.
+    Paramètres stockés dans le modèle sous "color_stage" (dict de tableaux).
+    """
+
+    FIELDS = ("mean", "scale", "coef", "intercept", "classes", "threshold")
+
+    def __init__(self, mean, scale, coef, intercept, classes, threshold):
+        self.classes_ = np.asarray(classes).astype(str)
+        self._mean = np.asarray(mean, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+        self._coef = np.asarray(coef, dtype=np.float64)
+        self._intercept = np.asarray(intercept, dtype=np.float64)
+        self.threshold = float(threshold)
+
+    @classmethod
+    def from_dict(cls, params: dict) -> "ColorStage":
+        return cls(**{k: params[k] for k in cls.FIELDS})
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = (np.atleast_2d(np.asarray(X, dtype=np.float64)) - self._mean) / self._scale
+        z = X @ self._coef.T + self._intercept
+        z -= z.max(axis=1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def decide(self, features) -> tuple[str | None, dict]:
+        """(label, proba) — label None si la frame est ambiguë pour cet étage."""
+        probs = self.predict_proba(features)[0]
+        proba = {c: float(p) for c, p in zip(self.classes_, probs)}
+        best = int(np.argmax(probs))
+        return (self.classes_[best] if probs[best] >= self.threshold else None), proba
+
+
+class MicroDetector:
+    """Détecteur binaire « la frame est-elle <label> ? » sur les features d'une ROI.
+
+    Régression logistique sur features.roi_features(img, roi) : ne lit qu'une
+    zone de l'image (ex. bandeau de l'écran de fin). Répond True / False quand
+    la probabilité sort de [low, high] (seuils choisis à l'entraînement pour
+    une précision cible), None sinon — la classification complète tranche.
+    Paramètres stockés dans le modèle sous "micro" ({label: dict de tableaux}).
+    """
+
+    FIELDS = ("roi", "mean", "scale", "coef", "intercept", "low", "high")
+
+    def __init__(self, roi, mean, scale, coef, intercept, low, high):
+        self.roi = tuple(float(v) for v in np.ravel(roi))
+        self._mean = np.asarray(mean, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+        self._coef = np.ravel(np.asarray(coef, dtype=np.float64))
+        self._intercept = float(np.ravel(intercept)[0])
+        self.low, self.high = float(low), float(high)
+
+    @classmethod
+    def from_dict(cls, params: dict) -> "MicroDetector":
+        return cls(**{k: params[k] for k in cls.FIELDS})
+
+    def probability(self, img) -> float:
+        x = (features.roi_features(img, self.roi) - self._mean) / self._scale
+        return float(1.0 / (1.0 + np.exp(-(x @ self._coef + self._intercept))))
+
+    def decide(self, img) -> bool | None:
+        p = self.probability(img)
+        if p >= self.high:
+            return True
+        if p <= self.low:
+            return False
+        return None
+
+
+def _micro_detectors(model: dict, path: str) -> dict:
+    """{label: MicroDetector} du modèle ({} si absents ou de features ROI obsolètes)."""
+    micro = model.get("micro") or {}
+    if micro and model.get("micro_version") != features.roi_features_version():
+        logger.warning("Modèle %s : micro-détecteurs ignorés (features ROI %s, code %s)",
+                       path, model.get("micro_version"), features.roi_features_version())
+        return {}
+    return {label: params if isinstance(params, MicroDetector)
+            else MicroDetector.from_dict(params) for label, params in micro.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -94,6 +359,74 @@ class CombatState(Enum):
     END_SCREEN = "end_screen"
 
 
+# Cadence de polling conseillée par état (secondes) : lente au lobby, rapide
+# autour des transitions attendues (entrée en combat, écran de fin).
+STATE_INTERVALS = {
+    CombatState.IDLE: 0.5,
+    CombatState.PRE_QUEUE: 0.1,
+    CombatState.IN_COMBAT: 0.2,
+    CombatState.END_SCREEN: 0.1,
+}
+
+# Debounce des transitions, en secondes d'observation continue (anciens
+# compteurs 8 / 10 / 15 / 5 ticks à 100ms) — indépendant de la cadence.
+DEBOUNCE_SECONDS = {
+    "prequeue_combat": 0.8,   # PRE_QUEUE → IN_COMBAT
+    "combat_prequeue": 1.0,   # IN_COMBAT → PRE_QUEUE (fausse détection)
+    "prequeue_exit": 1.5,     # PRE_QUEUE → IDLE
+    "end_screen_exit": 0.5,   # END_SCREEN → IDLE
+}
+
+
+# ---------------------------------------------------------------------------
+# Prediction
+# ---------------------------------------------------------------------------
+
+class Prediction:
+    """Classification d'une frame : label + probabilités par classe.
+
+    Les probabilités (predict_proba du pipeline) ne sont calculées qu'au
+    premier accès à `proba`, à partir des features déjà extraites.
+    """
+
+    __slots__ = ("label", "_features", "_pipeline", "_proba")
+
+    def __init__(self, label: str, features=None, pipeline=None, proba: dict | None = None):
+        self.label = label
+        self._features = features
+        self._pipeline = pipeline
+        self._proba = proba
+
+    @property
+    def proba(self) -> dict:
+        """{classe: probabilité} — {} si le modèle n'expose pas predict_proba."""
+        if self._proba is None:
+            self._proba = {}
+            if self._pipeline is not None and self._features is not None:
+                try:
+                    probs = self._pipeline.predict_proba([self._features])[0]
+                    self._proba = {str(c): float(p)
+                                   for c, p in zip(self._pipeline.classes_, probs)}
+                except Exception as e:
+                    logger.debug("predict_proba indisponible: %s", e)
+            self._features = None
+        return self._proba
+
+    def __repr__(self):
+        return f"Prediction({self.label!r})"
+
+
+_UNKNOWN = Prediction("unknown", proba={})
+
+# Frames gardées (réduites) pour valider un modèle rechargé avant de l'activer
+_VALIDATION_FRAMES = 4
+_VALIDATION_SIZE = (320, 240)
+_VALIDATION_EVERY = 10.0   # secondes entre deux frames gardées
+# Part minimale des frames récentes classées comme par le modèle actuel : un
+# réentraînement corrige quelques frames, pas la majorité
+_VALIDATION_MIN_AGREEMENT = 0.5
+
+
 # ---------------------------------------------------------------------------
 # StateDetector
 # ---------------------------------------------------------------------------
@@ -103,11 +436,48 @@ class StateDetector:
 
     Utilise le modèle SVM entraîné (state_classifier.pkl).
     Si le modèle est absent, toutes les méthodes retournent False.
+
+    Une seule classification par frame : classify(img) est mémoïsée sur
+    l'identité de l'image, les is_*() d'un même tick lisent ce résultat.
+
+    Avec un FrameChangeGate (`gate=`), une image quasi identique à la dernière
+    image classifiée réutilise la prédiction précédente sans extraction de features.
+
+    Si le modèle contient un étage couleur ("color_stage", voir ColorStage), la
+    classification est une cascade : features couleur d'abord, HOG + SVM
+    seulement pour les frames que l'étage 1 juge ambiguës (voir cascade_stats).
+
+    `backend="cnn"` : petit CNN torch (state_classifier_cnn.pt, voir
+    tracker.capture.cnn) à la place du HOG + SVM ; repli sur le SVM si le
+    checkpoint est absent ou si torch n'est pas disponible.
+
+    Micro-détecteurs (modèle avec "micro", voir MicroDetector) : les is_*()
+    interrogés par PollingLoop — une ou deux questions selon l'état — sont
+    d'abord posés au détecteur binaire de la question, sur une ROI ; la
+    classification complète n'est faite que s'il ne tranche pas (micro_stats).
+
+    Rechargement à chaud (reload_model, appelé par ModelWatcher) : le nouveau
+    modèle est chargé et validé sur quelques frames récentes hors du thread de
+    polling, puis remplace l'ancien en une affectation — jamais de fenêtre
+    sans modèle, donc jamais de "unknown" pendant un rechargement.
     """
 
-    def __init__(self):
+    def __init__(self, gate=None, backend: str = "svm"):
         self._model = None        # chargé lazily
         self._model_loaded = False
+        self._backend = backend
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._samples = deque(maxlen=_VALIDATION_FRAMES)   # (image réduite, label)
+        self._sampled_at = 0.0
+        self._reloads = {"swapped": 0, "rejected": 0}
+        self._gate = gate
+        self._last = None         # dernière Prediction calculée (réutilisée par le gate)
+        self._memo = (None, None)  # (image, Prediction) de la dernière frame vue
+        self._cascade = {"stage1": 0, "stage2": 0, "total_s": 0.0}
+        self._micro_memo = (None, {})   # (image, {label: réponse}) des micro-détecteurs
+        self._gate_memo = (None, True)  # (image, verdict du gate) : un check par frame
+        self._micro = {"decided": 0, "fallback": 0, "total_s": 0.0}
 
     # ------------------------------------------------------------------
     # Modèle
@@ -116,42 +486,219 @@ class StateDetector:
     def _load_model(self) -> dict | None:
         if self._model_loaded:
             return self._model
-        self._model_loaded = True
-        path = _MODEL_PATH if os.path.exists(_MODEL_PATH) else _MODEL_PATH_LEGACY
-        if not os.path.exists(path):
+        # Un seul chargement : le polling attend un préchargement déjà en cours
+        with self._load_lock:
+            if not self._model_loaded:
+                self._model = self._read_model()
+                self._model_loaded = True
+        return self._model
+
+    def _read_model(self) -> dict | None:
+        """Premier modèle valide parmi les candidats (None si aucun)."""
+        candidates = self._candidate_paths()
+        if not candidates:
             logger.warning("Modèle ML absent — détection désactivée.")
             return None
+        for path in candidates:
+            model = load_model_file(path)
+            if model is not None:
+                logger.info("Modèle ML chargé : %s", path)
+                return model
+        return None
+
+    def _candidate_paths(self) -> list:
+        """Fichiers modèle existants, par ordre de préférence."""
+        pkl_path = _MODEL_PATH if os.path.exists(_MODEL_PATH) else _MODEL_PATH_LEGACY
+        paths = _model_paths(pkl_path)
+        if self._backend == "cnn":
+            paths = [_CNN_MODEL_PATH, _CNN_MODEL_PATH_LEGACY] + paths
+        return [p for p in paths if os.path.exists(p)]
+
+    def is_model_available(self) -> bool:
+        bases = (_MODEL_PATH, _MODEL_PATH_LEGACY)
+        if self._backend == "cnn":
+            bases += (_CNN_MODEL_PATH, _CNN_MODEL_PATH_LEGACY)
+        return any(os.path.exists(p) for base in bases for p in _model_paths(base))
+
+    def watched_paths(self) -> list:
+        """Fichiers dont la modification doit déclencher reload_model."""
+        bases = [_MODEL_PATH, _MODEL_PATH_LEGACY]
+        paths = [p for base in bases for p in (base, os.path.splitext(base)[0] + ".npz")]
+        if self._backend == "cnn":
+            paths = [_CNN_MODEL_PATH, _CNN_MODEL_PATH_LEGACY] + paths
+        return paths
+
+    def reload_model(self) -> bool:
+        """Recharge le modèle depuis le disque (utile après un réentraînement).
+
+        Chargement et validation dans le thread appelant ; le modèle courant
+        reste actif jusqu'à la substitution, et est conservé si le nouveau
+        est absent, illisible ou échoue sur les frames de validation.
+        """
+        with self._reload_lock:
+            model = self._read_model()
+            if model is None or not self._validate(model):
+                self._reloads["rejected"] += 1
+                logger.warning("Rechargement du modèle refusé — modèle actuel conservé.")
+                return False
+            self.swap_model(model)
+            self._reloads["swapped"] += 1
+            return True
+
+    def swap_model(self, model: dict) -> None:
+        """Active `model` : une affectation, les classifications en cours finissent
+        avec l'ancien modèle, les suivantes utilisent le nouveau."""
+        self._model = model
+        self._model_loaded = True
+        self._last = None
+        self._memo = (None, None)
+        self._micro_memo = (None, {})
+        self._gate_memo = (None, True)
+        if self._gate is not None:
+            self._gate.reset()
+
+    def _validate(self, model: dict) -> bool:
+        """Le modèle classe-t-il les frames récentes sans erreur, et surtout comme
+        le modèle actuel (au moins _VALIDATION_MIN_AGREEMENT d'entre elles) ?"""
+        samples = list(self._samples)
+        if not samples:
+            return True
+        probe = StateDetector(backend=self._backend)
+        probe._model, probe._model_loaded = model, True
+        labels = [probe._classify(img).label for img, _ in samples]
+        if "unknown" in labels:
+            logger.error("Nouveau modèle en échec sur les frames de validation.")
+            return False
+        agree = sum(new == old for new, (_, old) in zip(labels, samples))
+        if agree < _VALIDATION_MIN_AGREEMENT * len(samples):
+            logger.error("Nouveau modèle en désaccord sur les frames récentes (%d/%d identiques).",
+                         agree, len(samples))
+            return False
+        logger.info("Nouveau modèle validé : %d/%d frames récentes classées à l'identique",
+                    agree, len(samples))
+        return True
+
+    def _keep_sample(self, img, label: str) -> None:
+        now = time.monotonic()
+        if now - self._sampled_at < _VALIDATION_EVERY:
+            return
+        self._sampled_at = now
         try:
-            with open(path, "rb") as f:
-                self._model = pickle.load(f)
-            logger.info("Modèle ML chargé : %s", path)
+            self._samples.append((to_pil_rgb(img).resize(_VALIDATION_SIZE), label))
         except Exception as e:
-            logger.error("Erreur chargement modèle : %s", e)
-        return self._model
+            logger.debug("frame de validation ignorée : %s", e)
 
-    def is_model_available(self) -> bool:
-        return os.path.exists(_MODEL_PATH) or os.path.exists(_MODEL_PATH_LEGACY)
+    @property
+    def reload_stats(self) -> dict:
+        """Rechargements appliqués / refusés depuis le démarrage."""
+        return dict(self._reloads)
 
-    def reload_model(self):
-        """Force le rechargement du modèle (utile après un réentraînement)."""
-        self._model = None
-        self._model_loaded = False
+    @property
+    def gate_stats(self) -> dict | None:
+        """Compteurs du FrameChangeGate (skip_ratio…), None si pas de gate."""
+        return self._gate.stats if self._gate is not None else None
+
+    @property
+    def cascade_stats(self) -> dict:
+        """Frames tranchées par étage (couleur / HOG + SVM) et latence moyenne."""
+        c = self._cascade
+        total = c["stage1"] + c["stage2"]
+        return {
+            "stage1": c["stage1"],
+            "stage2": c["stage2"],
+            "stage1_ratio": c["stage1"] / total if total else 0.0,
+            "mean_ms": c["total_s"] / total * 1000 if total else 0.0,
+        }
 
     # ------------------------------------------------------------------
     # Prédiction
     # ------------------------------------------------------------------
 
-    def predict(self, img) -> str:
-        """Retourne 'pre_queue', 'in_combat', 'end_screen', ou 'unknown'."""
+    def classify(self, img) -> Prediction:
+        """Prediction (label + probabilités) de la frame, calculée une fois par image."""
+        memo_img, memo = self._memo
+        if memo is not None and memo_img is img:
+            return memo
+        prediction = self._classify(img)
+        self._memo = (img, prediction)
+        return prediction
+
+    def _frame_changed(self, img) -> bool:
+        """Verdict du gate pour `img` (True sans gate), calculé une fois par image."""
+        if self._gate is None:
+            return True
+        memo_img, changed = self._gate_memo
+        if memo_img is not img:
+            changed = self._gate.check(img)
+            self._gate_memo = (img, changed)
+        return changed
+
+    def _classify(self, img) -> Prediction:
         model = self._load_model()
         if model is None:
-            return "unknown"
+            return _UNKNOWN
+        if self._gate is not None:
+            last = self._last
+            if not self._frame_changed(img) and last is not None:
+                return last
+        start = time.perf_counter()
         try:
-            feat = _extract_features(img)
-            return str(model["pipeline"].predict([feat])[0])
+            prediction = None
+            stage = model.get("color_stage")
+            if stage is not None:
+                label, proba = stage.decide(_color_features(img))
+                if label is not None:
+                    prediction = Prediction(str(label), proba=proba)
+                    self._cascade["stage1"] += 1
+            if prediction is None:
+                pipeline = model["pipeline"]
+                feat = _model_features(model, img)
+                if model.get("backend") == "cnn":
+                    # Une passe du réseau donne label et probabilités
+                    probs = pipeline.predict_proba([feat])[0]
+                    proba = {str(c): float(p) for c, p in zip(pipeline.classes_, probs)}
+                    prediction = Prediction(str(pipeline.classes_[int(np.argmax(probs))]),
+                                            proba=proba)
+                else:
+                    prediction = Prediction(str(pipeline.predict([feat])[0]), feat, pipeline)
+                self._cascade["stage2"] += 1
         except Exception as e:
             logger.error("predict: %s", e)
-            return "unknown"
+            self._last = None
+            return _UNKNOWN
+        self._cascade["total_s"] += time.perf_counter() - start
+        self._last = prediction
+        self._keep_sample(img, prediction.label)
+        return prediction
+
+    def predict(self, img) -> str:
+        """Retourne 'pre_queue', 'in_combat', 'end_screen', ou 'unknown'."""
+        return self.classify(img).label
+
+    def predict_proba(self, img) -> dict:
+        """{classe: probabilité} pour la frame ({} si modèle absent ou sans probabilités)."""
+        return self.classify(img).proba
+
+    def predict_proba_batch(self, images: list) -> tuple[list, np.ndarray]:
+        """(classes, probabilités (N, n_classes)) d'un lot d'images, en une passe.
+
+        Features extraites par extract_features_batch puis un seul predict_proba
+        du pipeline (sans cascade ni gate : destiné aux traitements hors ligne).
+        Sans probabilités dans le modèle, la classe prédite reçoit 1.0.
+        """
+        model = self._load_model()
+        if model is None or not images:
+            return [], np.empty((len(images), 0))
+        pipeline = model["pipeline"]
+        X = _model_features_batch(model, images)
+        classes = [str(c) for c in pipeline.classes_]
+        try:
+            return classes, np.asarray(pipeline.predict_proba(X), dtype=float)
+        except AttributeError:
+            labels = [str(label) for label in pipeline.predict(X)]
+            proba = np.zeros((len(images), len(classes)))
+            proba[np.arange(len(images)), [classes.index(label) for label in labels]] = 1.0
+            return classes, proba
 
     def predict_outcome(self, img) -> str:
         """Retourne 'win' ou 'lose' depuis un écran de fin (règle couleur ROI haut)."""
@@ -162,8 +709,8 @@ class StateDetector:
         if not rule:
             return "unknown"
         try:
-            roi = _crop_roi(img.convert("RGB"), rule["roi"])
-            arr = np.asarray(roi, dtype=float)
+            # Frame : tranche du buffer (pas de conversion PIL de l'image entière)
+            arr = crop_rgb_array(img, features.xywh_box(img.size, rule["roi"])).astype(float)
             r, g, b = arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]
             brightness = (r + g + b).mean() / 3
             warm = r.mean() - b.mean()
@@ -187,14 +734,61 @@ class StateDetector:
     # Interface états (utilisée par PollingLoop)
     # ------------------------------------------------------------------
 
+    def ask(self, label: str, img) -> bool:
+        """La frame est-elle `label` ? Micro-détecteur de la question s'il tranche,
+        sinon classification complète (réutilisée si déjà faite pour cette frame).
+
+        Comme classify, passe par le FrameChangeGate : sur une frame inchangée,
+        les réponses de la frame précédente (ou sa Prediction) sont reconduites
+        sans recalculer les features ROI.
+        """
+        memo_img, memo = self._memo
+        if memo is not None and memo_img is img:
+            return memo.label == label
+        model = self._load_model()
+        micro = (model.get("micro") or {}).get(label) if model is not None else None
+        if micro is not None:
+            memo_img, answers = self._micro_memo
+            if memo_img is not img:
+                if self._frame_changed(img):
+                    answers = {}
+                self._micro_memo = (img, answers)
+            if label not in answers and not self._frame_changed(img) \
+                    and self._last is not None:
+                return self._last.label == label
+            if label not in answers:
+                start = time.perf_counter()
+                try:
+                    answers[label] = micro.decide(img)
+                except Exception as e:
+                    logger.error("micro-détecteur %s: %s", label, e)
+                    answers[label] = None
+                self._micro["total_s"] += time.perf_counter() - start
+                self._micro["decided" if answers[label] is not None else "fallback"] += 1
+            if answers[label] is not None:
+                return answers[label]
+        return self.predict(img) == label
+
+    @property
+    def micro_stats(self) -> dict:
+        """Questions tranchées par les micro-détecteurs / renvoyées au modèle complet."""
+        m = self._micro
+        total = m["decided"] + m["fallback"]
+        return {
+            "decided": m["decided"],
+            "fallback": m["fallback"],
+            "decided_ratio": m["decided"] / total if total else 0.0,
+            "mean_ms": m["total_s"] / total * 1000 if total else 0.0,
+        }
+
     def is_pre_queue_ranked(self, img) -> bool:
-        return self.predict(img) == "pre_queue"
+        return self.ask("pre_queue", img)
 
     def is_in_combat(self, img) -> bool:
-        return self.predict(img) == "in_combat"
+        return self.ask("in_combat", img)
 
     def is_end_screen(self, img) -> bool:
-        return self.predict(img) == "end_screen"
+        return self.ask("end_screen", img)
 
     # ------------------------------------------------------------------
     # Calibration (conservée pour compatibilité UI — non utilisée par ML)
@@ -208,12 +802,79 @@ class StateDetector:
         return self.is_model_available()
 
 
+# ---------------------------------------------------------------------------
+# ModelWatcher
+# ---------------------------------------------------------------------------
+
+class ModelWatcher:
+    """Surveille les fichiers modèle d'un StateDetector et le recharge à chaud.
+
+    Thread daemon : précharge le modèle, puis compare toutes les `interval`
+    secondes (mtime, taille) des fichiers de detector.watched_paths(). Un
+    changement n'est pris en compte qu'une fois stable sur deux relevés
+    (fichier en cours d'écriture par le trainer), puis reload_model() charge,
+    valide et substitue le modèle — dans ce thread, pas dans le polling.
+
+    Usage :
+        watcher = ModelWatcher(detector)
+        threading.Thread(target=watcher.start, daemon=True).start()
+        ...
+        watcher.stop()
+    """
+
+    def __init__(self, detector: StateDetector, interval: float = 2.0):
+        self._detector = detector
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self._signature = None
+        self._pending = None
+
+    def _read_signature(self) -> tuple:
+        sig = []
+        for path in self._detector.watched_paths():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def start(self):
+        self._stop_event.clear()
+        self._signature = self._read_signature()
+        self._detector._load_model()
+        logger.info("ModelWatcher démarré (%d fichiers, interval=%.1fs)",
+                    len(self._signature), self._interval)
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("ModelWatcher: %s", e)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def check(self) -> bool:
+        """Un relevé ; True si un rechargement a été tenté."""
+        sig = self._read_signature()
+        if sig == self._signature:
+            self._pending = None
+            return False
+        if sig != self._pending:
+            self._pending = sig     # attendre un relevé identique (écriture terminée)
+            return False
+        self._signature, self._pending = sig, None
+        logger.info("Fichier modèle modifié — rechargement en arrière-plan.")
+        self._detector.reload_model()
+        return True
+
+
 # ---------------------------------------------------------------------------
 # PollingLoop
 # ---------------------------------------------------------------------------
 
 class PollingLoop:
-    """Boucle de polling à 100ms — détecte MUMU et pilote la machine à états.
+    """Boucle de polling (100ms par défaut) — détecte MUMU et pilote la machine à états.
 
     Usage :
         detector = StateDetector()
@@ -224,13 +885,42 @@ class PollingLoop:
         thread = threading.Thread(target=polling.start, daemon=True)
         thread.start()
 
+    Si un FrameBus est fourni (`bus=`), les frames sont lues sur le bus
+    (une frame déjà traitée n'est pas réanalysée) au lieu d'être capturées ici.
+    Si un WindowTracker est fourni (`window=`), la présence de MuMu est
+    vérifiée via son hwnd en cache plutôt que par find_mumu_window() à chaque tick.
+    Si une CaptureSource est fournie (`source=`), présence, région et frames
+    viennent de la source (écran réel, dossier PNG, session rejouée) : la
+    boucle tourne alors sans config ni émulateur.
+
+    `intervals` ({CombatState: secondes}, ex. STATE_INTERVALS) règle la cadence
+    par état ; les états absents utilisent `interval`. Les debounces sont en
+    secondes (DEBOUNCE_SECONDS, surchargeables via `debounce`) : chaque
+    observation compte pour le temps réellement écoulé depuis la précédente
+    (horodatage de la BusFrame, ou de la capture), plafonné à l'âge maximal
+    d'une frame ; la première compte pour l'intervalle de l'état. Ticks sans
+    nouvelle frame, ticks en retard et changement de cadence ne modifient donc
+    pas leur durée.
+
+    Avec un moteur temporel (`engine=`, ex. temporal.StateFilter), les
+    transitions sont décidées par le filtre à partir de predict_proba au lieu
+    des debounces (repli sur ceux-ci si le modèle n'a pas de probabilités).
+
     Après une transition vers END_SCREEN, polling.last_outcome vaut 'win' ou 'lose'.
     """
 
-    def __init__(self, interval: float = 0.1, config=None, detector=None):
+    def __init__(self, interval: float = 0.1, config=None, detector=None, bus=None,
+                 window=None, source=None, intervals: dict | None = None,
+                 debounce: dict | None = None, engine=None):
         self._interval = interval
+        self._engine = engine
+        self._intervals = dict(intervals or {})
+        self._debounce = dict(DEBOUNCE_SECONDS, **(debounce or {}))
         self._config = config
         self._detector = detector
+        self._frames = bus.subscribe() if bus is not None else None
+        self._window = window
+        self._source = source
         self._stop_event = threading.Event()
         self._lock = threading.Lock()
         self._state = CombatState.IDLE
@@ -239,10 +929,11 @@ class PollingLoop:
         self._on_mumu_detected = None
         self._on_mumu_lost = None
         self._on_state_changed = None
-        self._prequeue_exit_ticks = 0     # debounce quitter PRE_QUEUE sans IN_COMBAT
-        self._prequeue_combat_ticks = 0   # debounce PRE_QUEUE → IN_COMBAT
-        self._combat_prequeue_ticks = 0   # debounce retour PRE_QUEUE depuis IN_COMBAT
-        self._end_screen_exit_ticks = 0   # debounce END_SCREEN → IDLE
+        # Durée (s) d'observation continue de chaque condition de debounce
+        self._dwell = {name: 0.0 for name in self._debounce}
+        self._frame_time = None           # horodatage (monotonic) de la frame capturée
+        self._last_observation = None     # horodatage de la dernière frame analysée
+        self._tick_stats = {}             # état → [ticks, total_s, max_s]
 
     # ------------------------------------------------------------------
     # Propriétés thread-safe
@@ -264,6 +955,31 @@ class PollingLoop:
         with self._lock:
             return self._last_outcome
 
+    @property
+    def current_interval(self) -> float:
+        """Intervalle de polling pour l'état courant (IDLE si MUMU absent)."""
+        with self._lock:
+            state = self._state if self._mumu_detected else CombatState.IDLE
+        return self.interval_for(state)
+
+    def interval_for(self, state: CombatState) -> float:
+        return self._intervals.get(state, self._interval)
+
+    @property
+    def tick_stats(self) -> dict:
+        """Coût des ticks par état : {état: {ticks, mean_ms, max_ms, total_s}}."""
+        with self._lock:
+            stats = {state: list(v) for state, v in self._tick_stats.items()}
+        return {
+            state.value: {
+                "ticks": n,
+                "mean_ms": total / n * 1000 if n else 0.0,
+                "max_ms": peak * 1000,
+                "total_s": total,
+            }
+            for state, (n, total, peak) in stats.items()
+        }
+
     # ------------------------------------------------------------------
     # Configuration & cycle de vie
     # ------------------------------------------------------------------
@@ -276,12 +992,13 @@ class PollingLoop:
 
     def start(self):
         self._stop_event.clear()
-        logger.info("PollingLoop démarrée (interval=%.3fs)", self._interval)
+        logger.info("PollingLoop démarrée (interval=%.3fs, par état=%s)", self._interval,
+                    {s.value: v for s, v in self._intervals.items()} or "-")
         self._loop()
 
     def stop(self):
         self._stop_event.set()
-        logger.info("PollingLoop arrêtée")
+        logger.info("PollingLoop arrêtée — coût des ticks par état : %s", self.tick_stats)
 
     # ------------------------------------------------------------------
     # Boucle interne
@@ -289,14 +1006,36 @@ class PollingLoop:
 
     def _loop(self):
         while not self._stop_event.is_set():
+            started = time.perf_counter()
             try:
                 self._tick()
             except Exception as e:
                 logger.error("polling error: %s", e)
-            self._stop_event.wait(self._interval)
+            elapsed = time.perf_counter() - started
+            self._stop_event.wait(max(0.0, self.current_interval - elapsed))
 
     def _tick(self):
-        hwnd = find_mumu_window()
+        state = self.state
+        started = time.perf_counter()
+        try:
+            self._tick_inner()
+        finally:
+            self._record_tick(state, time.perf_counter() - started)
+
+    def _record_tick(self, state: CombatState, seconds: float) -> None:
+        with self._lock:
+            entry = self._tick_stats.setdefault(state, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def _tick_inner(self):
+        if self._source is not None:
+            hwnd = self._source.poll()
+        elif self._window is not None:
+            hwnd = self._window.poll()
+        else:
+            hwnd = find_mumu_window()
         on_detected = None
         on_lost = None
 
@@ -316,21 +1055,28 @@ class PollingLoop:
         if on_lost:
             on_lost()
 
-        if self._mumu_detected and self._config is not None and self._detector is not None:
+        has_region = self._config is not None or self._source is not None
+        if self._mumu_detected and has_region and self._detector is not None:
             self._detect_and_transition()
 
+    def _region(self) -> dict | None:
+        if self._source is not None:
+            return self._source.region()
+        return self._config.get_all().get("mumu_region")
+
     def _detect_and_transition(self):
-        region = self._config.get_all().get("mumu_region")
+        region = self._region()
         if not region:
             return
 
-        img = capture_region_pil(region)
+        img = self._capture(region)
         if img is None:
             return
 
         current = self.state
         try:
-            next_state, outcome = self._compute_next_state(current, img)
+            next_state, outcome = self._compute_next_state(current, img,
+                                                           self._observation_dt(current))
         except Exception as e:
             logger.error("state detection error: %s", e)
             return
@@ -346,11 +1092,65 @@ class PollingLoop:
             if self._on_state_changed:
                 self._on_state_changed(prev_state, next_state)
 
-    def _compute_next_state(self, current: CombatState, img) -> tuple[CombatState, str | None]:
+    def _max_frame_age(self) -> float:
+        return max(0.5, 5 * self.current_interval)
+
+    def _capture(self, region: dict):
+        """Frame à analyser : dernière frame non vue du bus, sinon source / capture directe."""
+        if self._frames is not None:
+            frame = self._frames.latest(max_age=self._max_frame_age())
+            if frame is None:
+                return None
+            self._frame_time = frame.timestamp
+            return frame.image
+        # Source hors ligne lue sans attente : pas de temps réel, intervalle nominal
+        live = self._source is None or self._source.live
+        self._frame_time = time.monotonic() if live else None
+        if self._source is not None:
+            return self._source.grab(region)
+        return capture_region_pil(region)
+
+    def _observation_dt(self, current: CombatState) -> float:
+        """Secondes couvertes par la frame capturée : écart réel avec la précédente."""
+        now, last = self._frame_time, self._last_observation
+        self._last_observation = now
+        if now is None or last is None or now <= last:
+            return self.interval_for(current)
+        return min(now - last, self._max_frame_age())
+
+    def _compute_next_state(self, current: CombatState, img,
+                            dt: float | None = None) -> tuple[CombatState, str | None]:
         """Retourne (next_state, outcome).
 
         outcome est 'win' ou 'lose' lors de la transition vers END_SCREEN, None sinon.
+        `dt` : secondes couvertes par cette observation (défaut : intervalle de l'état).
         """
+        if dt is None:
+            dt = self.interval_for(current)
+        if self._engine is not None:
+            proba = self._detector.predict_proba(img)
+            if proba:
+                return self._compute_with_engine(current, img, proba, dt)
+        return self._compute_with_debounce(current, img, dt)
+
+    def _compute_with_engine(self, current: CombatState, img, proba: dict,
+                             dt: float) -> tuple[CombatState, str | None]:
+        engine = self._engine
+        if engine.state != current:
+            engine.reset(current)   # transition imposée (MUMU perdu, état initial…)
+        next_state = engine.update(proba, dt)
+        if next_state == current:
+            return current, None
+        if next_state == CombatState.END_SCREEN:
+            outcome = self._detector.predict_outcome(img)
+            logger.info("Fin de combat détectée : %s", outcome)
+            return next_state, outcome
+        if current == CombatState.IN_COMBAT and next_state == CombatState.PRE_QUEUE:
+            logger.info("Retour PRE_QUEUE depuis IN_COMBAT (fausse détection corrigée)")
+        return next_state, None
+
+    def _compute_with_debounce(self, current: CombatState, img,
+                               dt: float) -> tuple[CombatState, str | None]:
         d = self._detector
 
         if current == CombatState.IDLE:
@@ -361,25 +1161,20 @@ class PollingLoop:
             _in_combat = d.is_in_combat(img)
             _in_prequeue = d.is_pre_queue_ranked(img)
             if _in_combat:
-                self._prequeue_combat_ticks += 1
-                self._prequeue_exit_ticks = 0
-                if self._prequeue_combat_ticks >= 8:
-                    self._prequeue_combat_ticks = 0
+                self._reset_dwell("prequeue_exit")
+                if self._accumulate("prequeue_combat", dt):
                     return CombatState.IN_COMBAT, None
             elif _in_prequeue:
-                self._prequeue_combat_ticks = 0
-                self._prequeue_exit_ticks = 0
+                self._reset_dwell("prequeue_combat", "prequeue_exit")
             else:
                 # Ni prequeue ni combat — debounce avant de retourner IDLE
-                self._prequeue_combat_ticks = 0
-                self._prequeue_exit_ticks += 1
-                if self._prequeue_exit_ticks >= 15:
-                    self._prequeue_exit_ticks = 0
+                self._reset_dwell("prequeue_combat")
+                if self._accumulate("prequeue_exit", dt):
                     return CombatState.IDLE, None
 
         elif current == CombatState.IN_COMBAT:
             if d.is_end_screen(img):
-                self._combat_prequeue_ticks = 0
+                self._reset_dwell("combat_prequeue")
                 outcome = d.predict_outcome(img)
                 logger.info("Fin de combat détectée : %s", outcome)
                 return CombatState.END_SCREEN, outcome
@@ -387,21 +1182,29 @@ class PollingLoop:
             # si le ML voit pre_queue depuis IN_COMBAT pendant ~1s, c'est une fausse
             # détection — sortir proprement vers PRE_QUEUE sans sauvegarder de match.
             if d.is_pre_queue_ranked(img):
-                self._combat_prequeue_ticks += 1
-                if self._combat_prequeue_ticks >= 10:
-                    self._combat_prequeue_ticks = 0
+                if self._accumulate("combat_prequeue", dt):
                     logger.info("Retour PRE_QUEUE depuis IN_COMBAT (fausse détection corrigée)")
                     return CombatState.PRE_QUEUE, None
             else:
-                self._combat_prequeue_ticks = 0
+                self._reset_dwell("combat_prequeue")
 
         elif current == CombatState.END_SCREEN:
             if not d.is_end_screen(img):
-                self._end_screen_exit_ticks += 1
-                if self._end_screen_exit_ticks >= 5:
-                    self._end_screen_exit_ticks = 0
+                if self._accumulate("end_screen_exit", dt):
                     return CombatState.IDLE, None
             else:
-                self._end_screen_exit_ticks = 0
+                self._reset_dwell("end_screen_exit")
 
         return current, None
+
+    def _accumulate(self, name: str, dt: float) -> bool:
+        """Ajoute dt à la condition `name` ; True (et remise à zéro) une fois le debounce atteint."""
+        self._dwell[name] += dt
+        if self._dwell[name] >= self._debounce[name] - 1e-9:
+            self._dwell[name] = 0.0
+            return True
+        return False
+
+    def _reset_dwell(self, *names: str) -> None:
+        for name in names:
+            self._dwell[name] = 0.0
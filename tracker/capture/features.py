@@ -0,0 +1,302 @@
+"""tracker/capture/features.py — Extraction de features partagée (runtime + entraînement).
+
+Module unique utilisé par StateDetector et tools/train_classifier.py : toute
+modification des features passe par ici, et FEATURE_VERSION (empreinte des
+paramètres d'extraction) est enregistrée dans le modèle — StateDetector refuse
+un modèle dont la version ne correspond pas.
+
+- extract_features(img) / extract_features_batch(frames) : HOG + HSV (1776 valeurs)
+- color_features(img) : 28 features couleur de l'étage 1 de la cascade
+- roi_features(img, roi) : HOG + HSV d'une ROI (240 valeurs), micro-détecteurs
+- xywh_box / crop_xywh : ROI fractionnaire (x, y, largeur, hauteur) de la règle win/lose
+
+Mêmes features que skimage.feature.hog (8 orientations, cellules 16x16,
+blocs 2x2, normalisation L2-Hys) + histogrammes HSV 16 bins, sans importer
+skimage :
+
+- gradients centrés calculés en int16 sur l'image uint8 ; orientation (bin)
+  et module lus dans des tables précalculées indexées par (g_row, g_col),
+  construites une fois avec les formules de skimage (parité des bins exacte) ;
+- histogrammes de cellules par np.bincount, normalisation des 54 blocs
+  vectorisée, sur une image ou une pile d'images ;
+- `dtype=np.float32` : module et normalisation HOG en float32 (écart ~1e-7) ;
+  les histogrammes HSV restent calculés en float64 (un pixel qui change de
+  bin modifierait le vecteur bien plus que l'arrondi float32) ;
+- `resample` ("lanczos" | "bilinear" | "box") / `reducing_gap` :
+  redimensionnement 160x120 (LANCZOS par défaut). "box", ou LANCZOS avec
+  reducing_gap=2.0 (réduction entière préalable), coûtent 4 à 5 fois moins
+  mais modifient les features : ces réglages font partie de la version
+  (feature_version) et sont enregistrés dans le modèle ("feature_params").
+
+Écart avec skimage (float64) : ~2e-7 au maximum (1.88e-7 mesuré sur 20 images).
+"""
+import hashlib
+import json
+
+import numpy as np
+from PIL import Image
+
+from tracker.capture.frame import rgb_array, to_pil_rgb
+
+IMG_SIZE = (160, 120)
+HOG_ORIENTATIONS = 8
+HOG_CELL = 16
+HOG_BLOCK = 2
+HIST_BINS = 16
+
+# Étage couleur : grille ~64x48, bandes 10 % / 80 % / 10 %, bins HSV (H, S, V)
+COLOR_GRID = (64, 48)
+COLOR_HSV_BINS = (8, 4, 4)
+
+# À incrémenter si le calcul change sans que les paramètres ci-dessus changent
+FEATURES_REVISION = 1
+
+# Micro-détecteurs (roi_features) : grille d'échantillonnage et ROIs candidates
+# (x, y, largeur, hauteur) parmi lesquelles l'entraînement choisit par question
+ROI_GRID = (64, 48)
+ROI_FEATURES_REVISION = 1
+ROI_CANDIDATES = {
+    "full":   (0.0, 0.0, 1.0, 1.0),
+    "top":    (0.0, 0.0, 1.0, 0.15),    # bandeau de l'écran de fin
+    "banner": (0.15, 0.30, 0.70, 0.25),  # bandeau central victoire / défaite
+    "middle": (0.0, 0.25, 1.0, 0.50),
+    "bottom": (0.0, 0.80, 1.0, 0.20),   # boutons (file d'attente, fin de combat)
+}
+
+_RESAMPLE = {"lanczos": Image.LANCZOS, "bilinear": Image.BILINEAR, "box": Image.BOX}
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+_GRAD_MAX = 255          # |gradient| max pour une image uint8
+_tables = {}             # dtype → (bins uint8, module) indexés [g_row + 255, g_col + 255]
+
+
+def _gradient_tables(dtype) -> tuple:
+    """Tables (bin d'orientation, module) pour tous les gradients entiers possibles."""
+    key = np.dtype(dtype).str
+    tables = _tables.get(key)
+    if tables is None:
+        g = np.arange(-_GRAD_MAX, _GRAD_MAX + 1, dtype=np.float64)
+        g_row, g_col = np.meshgrid(g, g, indexing="ij")
+        # Formules de skimage (_hoghistogram) : orientation en degrés modulo 180
+        orientation = np.rad2deg(np.arctan2(g_row, g_col)) % 180
+        edges = 180. / HOG_ORIENTATIONS * np.arange(1, HOG_ORIENTATIONS)
+        bins = np.digitize(orientation, edges).astype(np.uint8)
+        tables = (bins, np.hypot(g_col, g_row).astype(dtype))
+        _tables[key] = tables
+    return tables
+
+
+def hog(gray: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """HOG d'une image uint8 (H, W) — identique à skimage.feature.hog(gray, 8, (16, 16), (2, 2)).
+
+    Accepte aussi une pile (N, H, W) : retourne alors (N, 1728).
+    """
+    gray = np.asarray(gray)
+    if gray.dtype != np.uint8:
+        raise ValueError(f"hog attend une image uint8, reçu {gray.dtype}")
+    single = gray.ndim == 2
+    stack = gray[None] if single else gray
+    n, h, w = stack.shape
+    img = stack.astype(np.int16)
+    g_row = np.zeros((n, h, w), dtype=np.int16)
+    g_col = np.zeros((n, h, w), dtype=np.int16)
+    g_row[:, 1:-1, :] = img[:, 2:, :] - img[:, :-2, :]
+    g_col[:, :, 1:-1] = img[:, :, 2:] - img[:, :, :-2]
+
+    # Seules les cellules entières sont utilisées (comme skimage)
+    n_rows, n_cols = h // HOG_CELL, w // HOG_CELL
+    g_row = g_row[:, :n_rows * HOG_CELL, :n_cols * HOG_CELL] + _GRAD_MAX
+    g_col = g_col[:, :n_rows * HOG_CELL, :n_cols * HOG_CELL] + _GRAD_MAX
+    bins_table, magnitude_table = _gradient_tables(dtype)
+    bins = bins_table[g_row, g_col]
+    magnitude = magnitude_table[g_row, g_col]
+
+    n_cells = n_rows * n_cols
+    cell = (np.arange(n_rows * HOG_CELL)[:, None] // HOG_CELL * n_cols
+            + np.arange(n_cols * HOG_CELL)[None, :] // HOG_CELL)
+    cell = cell[None] + (np.arange(n) * n_cells)[:, None, None]
+    index = (cell * HOG_ORIENTATIONS + bins).ravel()
+    hist = np.bincount(index, weights=magnitude.ravel(),
+                       minlength=n * n_cells * HOG_ORIENTATIONS)
+    hist = (hist / (HOG_CELL * HOG_CELL)).astype(dtype, copy=False)
+    hist = hist.reshape(n, n_rows, n_cols, HOG_ORIENTATIONS)
+
+    # Blocs 2x2 glissants (pas d'une cellule) : (N, n_blocks_row, n_blocks_col, 2, 2, orientations)
+    b_rows, b_cols = n_rows - HOG_BLOCK + 1, n_cols - HOG_BLOCK + 1
+    blocks = np.stack([
+        np.stack([hist[:, r:r + b_rows, c:c + b_cols] for c in range(HOG_BLOCK)], axis=3)
+        for r in range(HOG_BLOCK)
+    ], axis=3)
+    flat = blocks.reshape(n, b_rows, b_cols, -1)
+    eps2 = np.asarray(1e-5, dtype) ** 2
+    out = flat / np.sqrt(np.sum(flat ** 2, axis=-1, keepdims=True) + eps2)
+    out = np.minimum(out, 0.2)
+    out = out / np.sqrt(np.sum(out ** 2, axis=-1, keepdims=True) + eps2)
+    out = out.reshape(n, -1)
+    return out[0] if single else out
+
+
+def rgb_to_hsv(arr: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """HSV (H, W, 3) dans [0, 1] depuis un tableau RGB uint8."""
+    rgb = arr.astype(dtype) / np.asarray(255., dtype)
+    r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+    # maximum/minimum élément par élément : bien plus rapide qu'une réduction sur l'axe 3
+    cmax = np.maximum(np.maximum(r, g), b)
+    delta = cmax - np.minimum(np.minimum(r, g), b)
+    safe = np.where(delta > 0, delta, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(cmax > 0, delta / cmax, 0.)
+    # Même priorité que la conversion historique (masques r, g puis b : b l'emporte)
+    h = np.select(
+        [(delta > 0) & (cmax == b), (delta > 0) & (cmax == g), delta > 0],
+        [(r - g) / safe + 4, (b - r) / safe + 2, ((g - b) / safe) % 6],
+        0.,
+    ) / 6.
+    return np.stack([h, s, cmax], axis=2).astype(dtype, copy=False)
+
+
+def hsv_histograms(arr: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Histogrammes normalisés (16 bins sur [0, 1]) des canaux H, S, V (bins calculés en float64).
+
+    Accepte une image (H, W, 3) ou une pile (N, H, W, 3) : retourne (48,) ou (N, 48).
+    """
+    arr = np.asarray(arr)
+    single = arr.ndim == 3
+    stack = arr[None] if single else arr
+    n = stack.shape[0]
+    hsv = rgb_to_hsv(stack.reshape(n, -1, 3)).reshape(n, -1, 3)
+    idx = np.minimum((hsv * HIST_BINS).astype(np.intp), HIST_BINS - 1)
+    # Un histogramme par (image, canal) : décalage de l'indice de bin
+    idx += (np.arange(n)[:, None, None] * 3 + np.arange(3)[None, None, :]) * HIST_BINS
+    hist = np.bincount(idx.ravel(), minlength=n * 3 * HIST_BINS).reshape(n, 3, HIST_BINS)
+    out = (hist / (hist.sum(axis=2, keepdims=True) + 1e-6)).reshape(n, -1).astype(dtype, copy=False)
+    return out[0] if single else out
+
+
+def _resized(img, resample: str, reducing_gap: float | None):
+    return to_pil_rgb(img).resize(IMG_SIZE, _RESAMPLE[resample], reducing_gap=reducing_gap)
+
+
+def extract_features(img, resample: str = "lanczos", reducing_gap: float | None = None,
+                     dtype=np.float64) -> np.ndarray:
+    """Vecteur HOG + histogrammes HSV (1776 valeurs) d'une Frame ou PIL Image."""
+    return extract_features_batch([img], resample, reducing_gap, dtype)[0]
+
+
+def extract_features_batch(frames, resample: str = "lanczos",
+                           reducing_gap: float | None = None, dtype=np.float64) -> np.ndarray:
+    """Features (N, 1776) d'une liste de Frames / PIL Images.
+
+    Seul le redimensionnement est fait image par image ; HOG et histogrammes
+    sont calculés en une passe sur la pile 160x120.
+    """
+    resized = [_resized(img, resample, reducing_gap) for img in frames]
+    if not resized:
+        return np.empty((0, feature_length()), dtype=dtype)
+    rgb = np.stack([np.asarray(im, dtype=np.uint8) for im in resized])
+    gray = np.stack([np.asarray(im.convert("L"), dtype=np.uint8) for im in resized])
+    return np.concatenate([hog(gray, dtype), hsv_histograms(rgb, dtype)], axis=1)
+
+
+def feature_length() -> int:
+    w, h = IMG_SIZE
+    n_rows, n_cols = h // HOG_CELL, w // HOG_CELL
+    blocks = (n_rows - HOG_BLOCK + 1) * (n_cols - HOG_BLOCK + 1)
+    return blocks * HOG_BLOCK * HOG_BLOCK * HOG_ORIENTATIONS + 3 * HIST_BINS
+
+
+# ---------------------------------------------------------------------------
+# Étage couleur de la cascade
+# ---------------------------------------------------------------------------
+
+def color_features(img) -> np.ndarray:
+    """Features couleur bon marché (étage 1 de la cascade), sans resize ni HOG.
+
+    Sur une grille sous-échantillonnée (~64x48 points) : moyenne RGB et écart-type
+    de luminance des bandes haute (bandeau de l'écran de fin), centrale et basse
+    (10 % / 80 % / 10 %), puis histogrammes HSV grossiers (8 teintes, 4 saturations,
+    4 valeurs) de toute l'image — 28 valeurs.
+    """
+    arr = rgb_array(img)
+    h, w = arr.shape[:2]
+    gw, gh = COLOR_GRID
+    sub = arr[::max(1, h // gh), ::max(1, w // gw)]
+    n = sub.shape[0]
+    top, bottom = max(1, n // 10), n - max(1, n // 10)
+    feats = []
+    for band in (sub[:top], sub[top:bottom], sub[bottom:]):
+        band = band.astype(np.float32)
+        feats.extend(band.reshape(-1, 3).mean(axis=0) / 255.)
+        feats.append((band @ _LUMA).std() / 255.)
+    hsv = rgb_to_hsv(sub)
+    for ch, bins in enumerate(COLOR_HSV_BINS):
+        hist, _ = np.histogram(hsv[:, :, ch], bins=bins, range=(0, 1))
+        feats.extend(hist / (hist.sum() + 1e-6))
+    return np.asarray(feats, dtype=np.float64)
+
+
+# ---------------------------------------------------------------------------
+# Micro-détecteurs : features restreintes à une ROI
+# ---------------------------------------------------------------------------
+
+def roi_features(img, roi: tuple) -> np.ndarray:
+    """HOG + histogrammes HSV d'une ROI fractionnaire (x, y, largeur, hauteur).
+
+    La ROI est échantillonnée sur une grille fixe ROI_GRID (64x48 points,
+    indexation directe : ni resize ni conversion de l'image entière), puis
+    HOG (cellules 16x16) et histogrammes HSV 16 bins — 240 valeurs.
+    """
+    arr = rgb_array(img)
+    h, w = arr.shape[:2]
+    x0, y0, x1, y1 = xywh_box((w, h), roi)
+    gw, gh = ROI_GRID
+    rows = np.linspace(y0, max(y0, y1 - 1), gh).astype(np.intp)
+    cols = np.linspace(x0, max(x0, x1 - 1), gw).astype(np.intp)
+    sub = arr[rows[:, None], cols[None, :]]
+    gray = (sub @ _LUMA + 0.5).astype(np.uint8)
+    return np.concatenate([hog(gray), hsv_histograms(sub)])
+
+
+def roi_features_version() -> str:
+    """Empreinte des features ROI — enregistrée avec les micro-détecteurs."""
+    spec = {"revision": ROI_FEATURES_REVISION, "grid": list(ROI_GRID),
+            "hog": [HOG_ORIENTATIONS, HOG_CELL, HOG_BLOCK], "hist_bins": HIST_BINS}
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------------
+# ROI fractionnaire (x, y, largeur, hauteur) — règle win/lose
+# ---------------------------------------------------------------------------
+
+def xywh_box(size: tuple, roi: tuple) -> tuple:
+    """Boîte pixel (x0, y0, x1, y1) d'une ROI fractionnaire (x, y, largeur, hauteur)."""
+    w, h = size
+    return (
+        int(roi[0] * w), int(roi[1] * h),
+        int((roi[0] + roi[2]) * w), int((roi[1] + roi[3]) * h),
+    )
+
+
+def crop_xywh(img, roi: tuple):
+    return img.crop(xywh_box(img.size, roi))
+
+
+# ---------------------------------------------------------------------------
+# Version des features
+# ---------------------------------------------------------------------------
+
+def feature_version(resample: str = "lanczos", reducing_gap: float | None = None) -> str:
+    """Empreinte (12 hex) des paramètres d'extraction — enregistrée dans le modèle."""
+    spec = {
+        "revision": FEATURES_REVISION,
+        "img_size": list(IMG_SIZE),
+        "hog": [HOG_ORIENTATIONS, HOG_CELL, HOG_BLOCK, "L2-Hys"],
+        "hist_bins": HIST_BINS,
+        "color": [list(COLOR_GRID), list(COLOR_HSV_BINS)],
+        "resample": resample,
+        "reducing_gap": reducing_gap,
+    }
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+FEATURE_VERSION = feature_version()
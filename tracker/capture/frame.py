@@ -0,0 +1,227 @@
+"""tracker/capture/frame.py — Frame écran adossée à un tableau NumPy.
+
+Frame : vue `np.frombuffer` (H, W, 4) BGRA sur le buffer brut mss, sans copie.
+- crop() retourne une Frame qui est une simple tranche du tableau (vue) ;
+- .rgb expose une vue (H, W, 3) RGB sans copie (ordre des canaux inversé) ;
+- l'image PIL n'est construite qu'à la demande (to_pil / convert / resize),
+  une seule fois par Frame, puis mise en cache.
+
+Frame imite le sous-ensemble de l'API PIL utilisé par le pipeline (size,
+width, height, crop, convert, resize, save, np.array(frame)) : le code OCR
+existant accepte indifféremment une Frame ou une PIL Image.
+
+rgb_array(img)            : tableau uint8 (H, W, 3) depuis une Frame (vue) ou une PIL Image.
+crop_rgb_array(img, box)  : idem restreint à une zone (tranche pour une Frame).
+
+RoiFrames : jeu de ROIs nommées capturées sans la frame complète (capture
+sous-région, voir screen.capture_rois) ; `size` reste celle de la région
+entière pour que les analyseurs calculent leurs boîtes comme d'habitude.
+"""
+import numpy as np
+
+
+class Frame:
+    """Frame BGRA zero-copy, conversions PIL paresseuses."""
+
+    mode = "RGB"
+
+    def __init__(self, bgra: np.ndarray):
+        if bgra.ndim != 3 or bgra.shape[2] != 4:
+            raise ValueError(f"Frame attend un tableau (H, W, 4), reçu {bgra.shape}")
+        self._bgra = bgra
+        self._pil = None
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_mss(cls, shot) -> "Frame":
+        """Vue sur le buffer d'un ScreenShot mss (`raw` si dispo, sinon `bgra`)."""
+        w, h = shot.size
+        buf = getattr(shot, "raw", None)
+        if not isinstance(buf, (bytes, bytearray, memoryview)):
+            buf = shot.bgra
+        return cls(np.frombuffer(buf, dtype=np.uint8).reshape(h, w, 4))
+
+    @classmethod
+    def from_pil(cls, img) -> "Frame":
+        """Convertit une PIL Image (copie unique) — utile pour les tests et les replays."""
+        rgb = np.asarray(img.convert("RGB"), dtype=np.uint8)
+        bgra = np.empty(rgb.shape[:2] + (4,), dtype=np.uint8)
+        bgra[:, :, :3] = rgb[:, :, ::-1]
+        bgra[:, :, 3] = 255
+        frame = cls(bgra)
+        if img.mode == "RGB":
+            frame._pil = img
+        return frame
+
+    @classmethod
+    def from_rgb(cls, rgb: np.ndarray) -> "Frame":
+        bgra = np.empty(rgb.shape[:2] + (4,), dtype=np.uint8)
+        bgra[:, :, :3] = rgb[:, :, ::-1]
+        bgra[:, :, 3] = 255
+        return cls(bgra)
+
+    # ------------------------------------------------------------------
+    # Accès tableau
+    # ------------------------------------------------------------------
+
+    @property
+    def bgra(self) -> np.ndarray:
+        return self._bgra
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Vue (H, W, 3) RGB uint8 — non contiguë, aucune copie."""
+        return self._bgra[:, :, 2::-1]
+
+    @property
+    def size(self) -> tuple:
+        return (self._bgra.shape[1], self._bgra.shape[0])
+
+    @property
+    def width(self) -> int:
+        return self._bgra.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self._bgra.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        arr = np.ascontiguousarray(self.rgb)
+        return arr if dtype is None else arr.astype(dtype)
+
+    def crop(self, box) -> "Frame":
+        """Équivalent de PIL.Image.crop((x0, y0, x1, y1)) — tranche du tableau, sans copie."""
+        w, h = self.size
+        x0, y0, x1, y1 = (int(v) for v in box)
+        x0, x1 = max(0, min(w, x0)), max(0, min(w, x1))
+        y0, y1 = max(0, min(h, y0)), max(0, min(h, y1))
+        return Frame(self._bgra[y0:max(y0, y1), x0:max(x0, x1)])
+
+    def crop_frac(self, roi) -> "Frame":
+        """Crop en fractions (x, y, largeur, hauteur), même convention que _crop_roi."""
+        w, h = self.size
+        return self.crop((
+            int(roi[0] * w), int(roi[1] * h),
+            int((roi[0] + roi[2]) * w), int((roi[1] + roi[3]) * h),
+        ))
+
+    # ------------------------------------------------------------------
+    # Compatibilité PIL (construite une seule fois)
+    # ------------------------------------------------------------------
+
+    def to_pil(self):
+        """PIL Image RGB construite à la demande puis mise en cache.
+
+        L'image retournée est partagée : ne pas la modifier en place.
+        """
+        if self._pil is None:
+            from PIL import Image  # noqa: PLC0415
+            bgra = self._bgra
+            if not bgra.flags["C_CONTIGUOUS"]:
+                bgra = np.ascontiguousarray(bgra)
+            self._pil = Image.frombuffer("RGB", self.size, bgra, "raw", "BGRX", 0, 1)
+        return self._pil
+
+    def convert(self, mode: str = "RGB"):
+        return self.to_pil().convert(mode)
+
+    def resize(self, size, resample=None):
+        if resample is None:
+            return self.to_pil().resize(size)
+        return self.to_pil().resize(size, resample)
+
+    def save(self, fp, format=None, **params):
+        self.to_pil().save(fp, format=format, **params)
+
+    def copy(self):
+        return self.to_pil().copy()
+
+    def __repr__(self):
+        return f"Frame({self.width}x{self.height})"
+
+
+def rgb_array(img) -> np.ndarray:
+    """Tableau uint8 (H, W, 3) RGB : vue sans copie pour une Frame, conversion sinon."""
+    if isinstance(img, Frame):
+        return img.rgb
+    return np.asarray(img.convert("RGB"), dtype=np.uint8)
+
+
+def crop_rgb_array(img, box) -> np.ndarray:
+    """Zone (x0, y0, x1, y1) en uint8 (h, w, 3) RGB — tranche sans copie pour une Frame.
+
+    Pour une PIL Image, le crop est fait avant la conversion RGB (seule la
+    zone est convertie, pas l'image entière).
+    """
+    if isinstance(img, Frame):
+        return img.crop(box).rgb
+    return np.asarray(img.crop(tuple(int(v) for v in box)).convert("RGB"), dtype=np.uint8)
+
+
+def to_pil_rgb(img):
+    """PIL Image RGB depuis une Frame (cache) ou une PIL Image (convertie si besoin)."""
+    if isinstance(img, Frame):
+        return img.to_pil()
+    return img if getattr(img, "mode", None) == "RGB" else img.convert("RGB")
+
+
+# ---------------------------------------------------------------------------
+# ROIs nommées (capture sous-région)
+# ---------------------------------------------------------------------------
+
+def roi_box(size: tuple, roi: tuple) -> tuple:
+    """Boîte pixel (x0, y0, x1, y1) d'une ROI fractionnaire (x0, y0, x1, y1)."""
+    w, h = size
+    return (int(roi[0] * w), int(roi[1] * h), int(roi[2] * w), int(roi[3] * h))
+
+
+class RoiFrames:
+    """ROIs nommées d'une région, sans la frame complète.
+
+    `size` est la taille de la région entière : un analyseur qui reçoit un
+    RoiFrames à la place d'une image calcule ses boîtes comme sur la frame
+    complète et récupère sa ROI via crop_named_roi().
+    """
+
+    def __init__(self, size: tuple, frames: dict):
+        self.size = tuple(size)
+        self._frames = dict(frames)
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def names(self) -> list:
+        return list(self._frames)
+
+    def __getitem__(self, name: str) -> Frame:
+        return self._frames[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._frames
+
+    def __repr__(self):
+        return f"RoiFrames({self.size[0]}x{self.size[1]}, {self.names})"
+
+
+def crop_rois(img, rois: dict) -> RoiFrames:
+    """Découpe des ROIs nommées dans une image complète (tranches pour une Frame)."""
+    if isinstance(img, RoiFrames):
+        return img
+    return RoiFrames(img.size, {name: img.crop(roi_box(img.size, roi))
+                                for name, roi in rois.items()})
+
+
+def crop_named_roi(img, rois: dict, name: str):
+    """ROI `name` depuis une image complète ou un RoiFrames déjà capturé."""
+    if isinstance(img, RoiFrames):
+        return img[name]
+    return img.crop(roi_box(img.size, rois[name]))
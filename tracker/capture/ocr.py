@@ -5,25 +5,56 @@ OcrPipeline :
                                    player_points, opponent_points, captured_at, raw_ocr_data}
 - extract_deck_from_prequeue(img, active_deck_id) → deck_id ou fallback
 
+Layouts (_LAYOUTS) : les zones à position fixe (lignes du tableau de stats,
+bannière du type de match, bande du nom de deck) sont lues en reconnaissance
+seule — reader.recognize sur des boîtes fournies, sans le détecteur de texte
+CRAFT. Le texte reconnu est validé (labels attendus, chiffres…) ; en cas
+d'échec, readtext (détection + reconnaissance) sur la zone entière.
+
+Cache OCR : les résultats de readtext / recognize sont mémorisés (LRU borné)
+par empreinte du crop quantifié — une frame identique (joueur qui regarde la
+carte résultat) ne repasse pas par EasyOCR.
+
 Règles critiques :
 - Toujours retourner "?" pour les champs texte non reconnus — jamais None ni chaîne vide
-- EasyOCR initialisé une seule fois (singleton injecté depuis main.py)
+- EasyOCR initialisé une seule fois par processus (ReaderRegistry, ocr_reader.py)
 - Imports easyocr et numpy en lazy (lourds, Windows-only en pratique)
 """
+import hashlib
 import json
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 CONFIDENCE_THRESHOLD = 0.5
 
+# Cache OCR : nombre de crops mémorisés, bits de poids faible ignorés par canal
+# (bruit d'encodage / de scaling entre deux captures d'un même écran)
+OCR_CACHE_SIZE = 64
+OCR_CACHE_QUANT_SHIFT = 3
+
 
 class OcrPipeline:
     """Pipeline EasyOCR pour extraire les données de match depuis des captures d'écran."""
 
-    def __init__(self, reader=None):
+    def __init__(self, reader=None, layouts: bool = True, cache_size: int = OCR_CACHE_SIZE,
+                 registry=None):
         self._reader = reader
+        # Source du reader si aucun n'est fourni (défaut : registre du processus)
+        self._registry = registry
+        # False : toujours readtext (diagnostic, mesure "avant" de bench_ocr)
+        self.use_layouts = layouts
+        self._layout_stats = {}
+        # False : chaque lecture repasse par EasyOCR (diagnostic) ; 0 = pas de cache
+        self.use_cache = cache_size > 0
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def set_reader(self, reader) -> None:
         self._reader = reader
@@ -40,9 +71,94 @@ class OcrPipeline:
     _ZONE_TOP           = (0.0, 0.0,  1.0,  0.35)
     _ZONE_BOTTOM        = (0.0, 0.62, 0.85, 0.95)
     _ZONE_PREQUEUE_TYPE = (0.0, 0.03, 1.0,  0.13)
+    _ZONE_PREQUEUE_DECK = (0.05, 0.64, 0.95, 0.76)  # 0.76 : exclut "C'est parti !"
+
+    # Layouts fixes lus en reconnaissance seule, par zone.
+    # Boîte : (nom, (x0, y0, x1, y1) en fractions de la zone, attendu) avec
+    # attendu = mots-clés (un doit apparaître), "digits", "text" (non vide) ou
+    # None (valeur libre, non validée). Les boîtes d'une même ligne partagent
+    # y0/y1 : _group_into_rows les regroupe label puis valeur, comme readtext.
+    # Positions à recaler avec `tools/bench_ocr.py --calibrate`.
+    _LAYOUTS = {
+        # _ZONE_BOTTOM : tableau de stats, 5 lignes régulières
+        "end_stats": (
+            ("first_label",  (0.02, 0.00, 0.48, 0.20), ("ordre d", "action")),
+            ("first_value",  (0.50, 0.00, 0.98, 0.20), ("premier", "deuxi", "first", "second")),
+            ("turns_label",  (0.02, 0.20, 0.48, 0.40), ("tours jou",)),
+            ("turns_value",  (0.50, 0.20, 0.98, 0.40), "digits"),
+            ("points_label", (0.02, 0.40, 0.48, 0.60), ("vos points",)),
+            ("points_value", (0.50, 0.40, 0.98, 0.60), None),
+            ("opp_label",    (0.02, 0.60, 0.48, 0.80), ("points adversaire", "adversaire")),
+            ("opp_value",    (0.50, 0.60, 0.98, 0.80), None),
+            ("damage_label", (0.02, 0.80, 0.48, 1.00), ("dégâts inflig", "degats inflig")),
+            ("damage_value", (0.50, 0.80, 0.98, 1.00), "digits"),
+        ),
+        # _ZONE_PREQUEUE_TYPE : "Match aléatoire" / "Match classé"… centré
+        "prequeue_type": (
+            ("match_type", (0.15, 0.00, 0.85, 1.00), "text"),
+        ),
+        # _ZONE_PREQUEUE_DECK : nom du deck (layout standard, y≈66-73 %)
+        "prequeue_deck": (
+            ("deck_name", (0.05, 0.10, 0.95, 0.80), "text"),
+        ),
+    }
+    _LAYOUT_MIN_CONF = 0.30
+
+    # ROIs lues par les analyseurs de combat (fractions x0, y0, x1, y1).
+    # OPPONENT_ENERGY : icône de génération d'énergie adverse
+    # ACTIVE_OPP      : titre de la carte active adverse (moitié droite, sous le header)
+    #                   Ogerpon Masque Turquoise ex → y=[27%,33%], x=[40%,88%]
+    # ACTIVE_OPP_HI   : légèrement plus haute pour les cartes plus petites
+    _COMBAT_ROIS = {
+        "opponent_energy": (0.10, 0.10, 0.18, 0.16),
+        "active_opp":      (0.38, 0.26, 0.88, 0.34),
+        "active_opp_hi":   (0.35, 0.21, 0.90, 0.30),
+    }
+    # Upscale appliqué avant OCR, par zone nom de Pokémon (ordre = priorité)
+    _OPPONENT_POKEMON_ZONES = (("active_opp", 5), ("active_opp_hi", 4))
+
+    # Pixels nécessaires aux analyseurs OCR par état (CombatState.value) —
+    # permet de capturer uniquement ces zones (screen.capture_rois).
+    _ROIS_BY_STATE = {
+        "in_combat": _COMBAT_ROIS,
+    }
+
+    def rois_for_state(self, state) -> dict:
+        """ROIs {nom: (x0, y0, x1, y1)} lues par les analyseurs OCR dans cet état.
+
+        `state` : CombatState ou sa valeur ("in_combat"…). {} si l'état
+        demande la frame complète ou aucun analyseur OCR.
+        """
+        key = getattr(state, "value", state)
+        return dict(self._ROIS_BY_STATE.get(key, {}))
+
+    @property
+    def layout_stats(self) -> dict:
+        """{layout: {"hits", "fallbacks"}} — lectures servies par reconnaissance seule vs readtext."""
+        return {name: dict(stats) for name, stats in self._layout_stats.items()}
+
+    @property
+    def cache_stats(self) -> dict:
+        """Compteurs du cache OCR : hits, misses, entrées, taille max, actif."""
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": len(self._cache),
+                "max_size": self._cache_size,
+                "enabled": self.use_cache,
+            }
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
 
     def extract_end_screen_data(self, img) -> dict:
-        """Extrait les données de fin de combat depuis l'écran de résultat."""
+        """Extrait les données de fin de combat depuis l'écran de résultat.
+
+        Le tableau de stats est lu via le layout "end_stats" (reconnaissance
+        seule, échelle 1) ; readtext sur le crop upscalé 2x en secours.
+        """
         w, h = img.size
 
         def crop(zone):
@@ -52,17 +168,18 @@ class OcrPipeline:
         top_img    = crop(self._ZONE_TOP)
         bottom_img = crop(self._ZONE_BOTTOM)
 
-        # Upscale 2x le crop bottom pour améliorer la détection des petits textes
-        bottom_img_up = bottom_img.resize(
-            (bottom_img.width * 2, bottom_img.height * 2),
-        )
-
         top_results = bottom_results = []
+        _upscale = 1
         try:
             top_results    = self._read_text(top_img)
-            bottom_results = self._read_text(bottom_img_up)
+            bottom_results = self._read_layout(bottom_img, "end_stats")
+            if bottom_results is None:
+                # Upscale 2x le crop bottom pour améliorer la détection des petits textes
+                _upscale = 2
+                bottom_results = self._read_text(bottom_img, scale=_upscale)
         except Exception as e:
             logger.error("OCR read error: %s", e)
+            bottom_results = bottom_results or []
 
         raw_json = json.dumps(
             [("TOP:" + text, float(conf)) for (_, text, conf) in top_results] +
@@ -70,9 +187,8 @@ class OcrPipeline:
             ensure_ascii=False,
         )
 
-        # Tolérance doublée car coordonnées upscalées 2x
-        rows = self._group_into_rows(bottom_results, y_tolerance=30)
-        _upscale = 2
+        # Tolérance proportionnelle à l'upscale (coordonnées du crop lu)
+        rows = self._group_into_rows(bottom_results, y_tolerance=15 * _upscale)
         logger.info("OCR top: %s", [(t, round(c,2)) for (_, t, c) in top_results])
         logger.info("OCR bottom rows: %s", [[(t, round(c,2)) for (_, t, c) in row] for row in rows])
 
@@ -106,9 +222,12 @@ class OcrPipeline:
         """Détecte le type d'énergie de l'adversaire depuis l'écran de combat.
 
         Analyse la zone de génération d'énergie adverse (haut-gauche du plateau,
-        x=[0%,13%], y=[22%,55%]) par matching d'histogramme de teinte contre les
+        x=[10%,18%], y=[10%,16%]) par matching d'histogramme de teinte contre les
         icônes de référence dans ui/vendor/energy/.
 
+        `img` peut être la frame complète ou un RoiFrames capturé via
+        rois_for_state(IN_COMBAT) — seule la ROI "opponent_energy" est lue.
+
         L'histogramme est invariant à la taille du token — pas besoin de connaître
         l'échelle exacte de l'icône dans le jeu.
 
@@ -121,12 +240,12 @@ class OcrPipeline:
             if not hasattr(self, "_energy_sigs"):
                 self._energy_sigs = self._load_energy_signatures()
 
-            w, h = img.size
-            x1, x2 = int(0.10 * w), int(0.18 * w)
-            y1, y2 = int(0.10 * h), int(0.16 * h)
-            zone = img.convert("RGB").crop((x1, y1, x2, y2))
+            from tracker.capture.frame import crop_named_roi, rgb_array, roi_box  # noqa: PLC0415
+
+            x1, y1, x2, y2 = roi_box(img.size, self._COMBAT_ROIS["opponent_energy"])
+            zone = rgb_array(crop_named_roi(img, self._COMBAT_ROIS, "opponent_energy"))
 
-            sig = self._compute_hue_hist(np.asarray(zone, dtype=float) / 255.)
+            sig = self._compute_hue_hist(zone.astype(float) / 255.)
 
             if not self._energy_sigs:
                 # Pas de références chargées → impossible de matcher
@@ -230,7 +349,10 @@ class OcrPipeline:
         """Sauvegarde une image debug avec la zone d'analyse surlignée."""
         try:
             from PIL import ImageDraw, ImageFont  # noqa: PLC0415
+            from tracker.capture.frame import RoiFrames  # noqa: PLC0415
             from tracker.paths import get_data_dir  # noqa: PLC0415
+            if isinstance(img, RoiFrames):
+                return  # capture sous-région : pas de frame complète à annoter
             dbg = img.convert("RGB").copy()
             draw = ImageDraw.Draw(dbg, "RGBA")
             draw.rectangle((x1, y1, x2, y2), outline=(255, 165, 0, 255), width=3)
@@ -268,24 +390,15 @@ class OcrPipeline:
 
         Retourne le premier nom plausible trouvé (conf >= 0.40, longueur >= 3,
         pas un mot-clé Dresseur/Objet).
+
+        `img` peut être la frame complète ou un RoiFrames (zones "active_opp*").
         """
-        w, h = img.size
-        img_rgb = img.convert("RGB")
-
-        zones = [
-            # (x0_frac, y0_frac, x1_frac, y1_frac, upscale, label)
-            # Zone principale : titre de la carte active adverse (moitié droite, titre sous le header)
-            # Ogerpon Masque Turquoise ex → y=[27%,33%], x=[40%,88%]
-            (0.38, 0.26, 0.88, 0.34, 5, "active_opp"),
-            # Zone secondaire : légèrement plus haute pour les cartes plus petites
-            (0.35, 0.21, 0.90, 0.30, 4, "active_opp_hi"),
-        ]
-
-        for (x0, y0, x1, y1, scale, label) in zones:
-            crop = img_rgb.crop((int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)))
-            crop_up = crop.resize((crop.width * scale, crop.height * scale))
+        from tracker.capture.frame import crop_named_roi, to_pil_rgb  # noqa: PLC0415
+
+        for label, scale in self._OPPONENT_POKEMON_ZONES:
+            crop = to_pil_rgb(crop_named_roi(img, self._COMBAT_ROIS, label))
             try:
-                results = self._read_text(crop_up)
+                results = self._read_text(crop, scale=scale)
                 for (_, text, conf) in results:
                     text = text.strip()
                     if conf < 0.40 or len(text) < 3 or text.isdigit():
@@ -309,10 +422,19 @@ class OcrPipeline:
         w, h = img.size
 
         # Type de match depuis la bannière haute
+        def crop(zone):
+            return img.crop((int(zone[0]*w), int(zone[1]*h),
+                             int(zone[2]*w), int(zone[3]*h)))
+
         type_results = []
         try:
-            type_crop = img.crop((0, int(0.03*h), w, int(0.13*h)))
-            type_results = self._read_text(type_crop)
+            type_crop = crop(self._ZONE_PREQUEUE_TYPE)
+            type_results = self._read_layout(
+                type_crop, "prequeue_type",
+                accept=lambda r: self._parse_match_type(r) != "?",
+            )
+            if type_results is None:
+                type_results = self._read_text(type_crop)
         except Exception as e:
             logger.error("OCR prequeue type error: %s", e)
         match_type = self._parse_match_type(type_results)
@@ -328,12 +450,15 @@ class OcrPipeline:
         # "C'est parti !" est filtré par blacklist si présent en bas de zone.
         deck_name = "?"
         if strip:
-            name_y1 = int(0.64 * h)
-            name_y2 = int(0.76 * h)  # 0.76 : exclut le bouton "C'est parti !" (y≈78-84%)
-            if name_y2 > name_y1:
-                name_crop = img.crop((int(0.05 * w), name_y1, int(0.95 * w), name_y2))
+            name_crop = crop(self._ZONE_PREQUEUE_DECK)
+            if name_crop.height > 0:
                 try:
-                    deck_results = self._read_text(name_crop)
+                    deck_results = self._read_layout(
+                        name_crop, "prequeue_deck",
+                        accept=lambda r: self._parse_prequeue_deck_name(r) != "?",
+                    )
+                    if deck_results is None:
+                        deck_results = self._read_text(name_crop)
                     deck_name = self._parse_prequeue_deck_name(deck_results)
                 except Exception as e:
                     logger.error("OCR deck name error: %s", e)
@@ -375,8 +500,9 @@ class OcrPipeline:
                 draw.rectangle((0, yt, iw, yb), outline=(255, 0, 0, 255), width=3)
                 draw.rectangle((0, yt, iw, yb), fill=(255, 0, 0, 60))
             # Vert : zone nom du deck
+            _dx1, _dy1, _dx2, _dy2 = self._ZONE_PREQUEUE_DECK
             draw.rectangle(
-                (int(0.05*iw), int(0.64*ih), int(0.95*iw), int(0.76*ih)),
+                (int(_dx1*iw), int(_dy1*ih), int(_dx2*iw), int(_dy2*ih)),
                 outline=(0, 200, 0, 255), width=2,
             )
             # Bleu : zone rang — toujours affichée pour debug, remplie si classé
@@ -432,11 +558,13 @@ class OcrPipeline:
         """
         import numpy as np  # noqa: PLC0415
         try:
+            from tracker.capture.frame import crop_rgb_array  # noqa: PLC0415
+
             w, h = img.size
             x1, x2 = int(0.18 * w), int(0.82 * w)
             y1, y2 = int(0.08 * h), int(0.68 * h)
 
-            section = np.asarray(img.convert("RGB").crop((x1, y1, x2, y2)), dtype=float)
+            section = crop_rgb_array(img, (x1, y1, x2, y2)).astype(float)
             sh, sw = section.shape[:2]
             if sh == 0 or sw == 0:
                 return None
@@ -712,14 +840,122 @@ class OcrPipeline:
 
     def _ensure_reader(self) -> None:
         if self._reader is None:
-            import easyocr  # noqa: PLC0415
-            self._reader = easyocr.Reader(["fr", "en"], gpu=False)
-            logger.info("EasyOCR Reader initialisé (fr+en)")
+            from tracker.capture.ocr_reader import get_reader_registry  # noqa: PLC0415
+            registry = self._registry or get_reader_registry()
+            self._reader = registry.get()
 
-    def _read_text(self, img) -> list:
+    def _read_text(self, img, scale: int = 1) -> list:
+        """readtext sur `img` agrandi `scale` fois (agrandissement seulement si cache manqué)."""
         import numpy as np  # noqa: PLC0415
         self._ensure_reader()
-        return self._reader.readtext(np.array(img))
+        arr = np.array(img)
+
+        def read():
+            if scale == 1:
+                return self._reader.readtext(arr)
+            return self._reader.readtext(np.array(img.resize((img.width * scale, img.height * scale))))
+
+        return self._cached(f"readtext x{scale}", arr, read)
+
+    # ------------------------------------------------------------------
+    # Cache OCR (LRU par empreinte de crop)
+    # ------------------------------------------------------------------
+
+    def _cache_key(self, kind: str, arr) -> tuple:
+        """(kind, shape, blake2b des pixels quantifiés) — même crop au bruit près."""
+        import numpy as np  # noqa: PLC0415
+        quantized = np.right_shift(arr, OCR_CACHE_QUANT_SHIFT) if arr.dtype == np.uint8 else arr
+        digest = hashlib.blake2b(np.ascontiguousarray(quantized).data, digest_size=16).digest()
+        return kind, arr.shape, digest
+
+    def _cached(self, kind: str, arr, compute) -> list:
+        """Résultat OCR mémorisé pour ce crop, sinon compute() (exceptions non mémorisées)."""
+        if not self.use_cache or self._cache_size <= 0:
+            return compute()
+        key = self._cache_key(kind, arr)
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                return list(hit)
+            self._cache_misses += 1
+        results = list(compute())
+        with self._cache_lock:
+            self._cache[key] = results
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return list(results)
+
+    def _read_layout(self, img, name: str, accept=None) -> list | None:
+        """Reconnaissance seule sur les boîtes du layout `name` (fractions de `img`).
+
+        Retourne des résultats au format readtext — (bbox 4 points en pixels
+        de `img`, texte, confiance), une entrée par boîte au texte non vide —
+        ou None (→ readtext par l'appelant) si les layouts sont désactivés, si
+        le reader n'a pas de `recognize`, si une boîte n'a pas le texte attendu
+        ou si `accept(résultats)` est faux.
+        """
+        if not self.use_layouts:
+            return None
+        stats = self._layout_stats.setdefault(name, {"hits": 0, "fallbacks": 0})
+        self._ensure_reader()
+        results = None
+        if callable(getattr(self._reader, "recognize", None)):
+            try:
+                results = self._recognize_boxes(img, self._LAYOUTS[name])
+            except Exception as e:
+                logger.debug("OCR layout %s: %s", name, e)
+        if results is not None and accept is not None and not accept(results):
+            results = None
+        stats["hits" if results is not None else "fallbacks"] += 1
+        return results
+
+    def _recognize_boxes(self, img, layout) -> list | None:
+        """reader.recognize sur les boîtes du layout, validées une à une."""
+        import numpy as np  # noqa: PLC0415
+
+        w, h = img.size
+        boxes = [(int(x0 * w), int(x1 * w), int(y0 * h), int(y1 * h))
+                 for _, (x0, y0, x1, y1), _ in layout]
+        arr = np.array(img)
+        raw = self._cached(f"recognize{boxes}", arr, lambda: self._reader.recognize(
+            arr, horizontal_list=[list(b) for b in boxes], free_list=[],
+            detail=1, batch_size=len(boxes),
+        ))
+        # Associer chaque résultat à sa boîte par le centre (ordre non garanti)
+        found = {}
+        for bbox, text, conf in raw:
+            cx = (bbox[0][0] + bbox[2][0]) / 2
+            cy = (bbox[0][1] + bbox[2][1]) / 2
+            for i, (bx0, bx1, by0, by1) in enumerate(boxes):
+                if bx0 <= cx <= bx1 and by0 <= cy <= by1 and i not in found:
+                    found[i] = (str(text), float(conf))
+                    break
+
+        results = []
+        for i, ((_, _, expected), (bx0, bx1, by0, by1)) in enumerate(zip(layout, boxes)):
+            text, conf = found.get(i, ("", 0.0))
+            if not self._layout_text_ok(text, conf, expected):
+                return None
+            if text.strip():
+                results.append(([[bx0, by0], [bx1, by0], [bx1, by1], [bx0, by1]], text, conf))
+        return results
+
+    def _layout_text_ok(self, text: str, conf: float, expected) -> bool:
+        """Validation d'une boîte : mots-clés, "digits", "text" ou None (libre)."""
+        if expected is None:
+            return True
+        if expected == "digits":
+            normalized = text.replace("o", "0").replace("O", "0").replace("l", "1").replace("I", "1")
+            return conf >= 0.15 and any(c.isdigit() for c in normalized)
+        if conf < self._LAYOUT_MIN_CONF or not text.strip():
+            return False
+        if expected == "text":
+            return True
+        lower = text.lower()
+        return any(kw in lower for kw in expected)
 
     # ------------------------------------------------------------------
     # Groupement en lignes (par proximité Y)
@@ -862,8 +1098,7 @@ class OcrPipeline:
                     y1 = min(h, int(row_y + row_h))
                     x0 = w // 2  # moitié droite seulement (valeur)
                     crop = bottom_img.crop((x0, y0, w, y1))
-                    crop_up = crop.resize((crop.width * 4, crop.height * 4))
-                    ocr_res = self._read_text(crop_up)
+                    ocr_res = self._read_text(crop, scale=4)
                     for (_, t, c) in ocr_res:
                         if c < 0.1:
                             continue
@@ -923,6 +1158,7 @@ class OcrPipeline:
 
         try:
             import numpy as np  # noqa: PLC0415
+            from tracker.capture.frame import crop_rgb_array  # noqa: PLC0415
 
             # Coordonnées de la ligne dans l'image originale (corriger upscale)
             bbox = target_row[0][0]
@@ -933,9 +1169,7 @@ class OcrPipeline:
             y0 = max(0, int(row_y - row_h * 0.9))
             y1 = min(h, int(row_y + row_h * 0.9))
             x0 = w // 3  # ignorer la zone label
-            strip = bottom_img.crop((x0, y0, w, y1)).convert("RGB")
-
-            arr = np.asarray(strip, dtype=float)
+            arr = crop_rgb_array(bottom_img, (x0, y0, w, y1)).astype(float)
             r, g, b = arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]
             cmax = np.maximum(np.maximum(r, g), b)
             cmin = np.minimum(np.minimum(r, g), b)
@@ -0,0 +1,233 @@
+"""tracker/capture/ocr_pool.py — Pool de processus OCR, crops transmis par mémoire partagée.
+
+Dans le processus principal, l'inférence EasyOCR/torch partage le CPU et le
+GIL avec le PollingLoop (tick de 100 ms) et le bridge pywebview. OcrWorkerPool
+déporte readtext / recognize dans de petits processus workers :
+
+- chaque worker construit son propre reader au démarrage (initializer) ;
+- le crop est copié dans un segment multiprocessing.shared_memory, seul son
+  nom (+ forme, dtype) traverse le pipe ; le worker le relit sans copie ;
+- submit() retourne un concurrent.futures.Future ; au plus `max_inflight`
+  requêtes sont en vol (submit bloque au-delà) ;
+- le segment est libéré (unlink) par le processus principal à la fin de la
+  requête, succès ou erreur.
+
+Un worker mort (crash natif, kill) casse tout le ProcessPoolExecutor : chaque
+appel suivant lève BrokenProcessPool. readtext / recognize recréent alors
+l'executor une fois par requête et la rejouent ; si la recréation échoue,
+`on_error` est appelé (ReaderRegistry.report_error : état "error") et
+l'erreur remonte.
+
+OcrWorkerPool expose aussi readtext / recognize bloquants : c'est un "reader"
+au sens d'OcrPipeline, fourni par ReaderRegistry quand `ocr_workers` > 0.
+Chaque worker traite une requête à la fois : le pool accepte des appels
+concurrents (thread_safe), le registre ne le sérialise pas.
+Le processus principal ne charge alors aucun modèle EasyOCR.
+"""
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OCR_POOL_WORKERS = 1
+# Threads torch par worker : laisse des cœurs au polling et à l'UI
+OCR_POOL_THREADS = 2
+
+# Reader du processus worker (construit par _worker_init)
+_WORKER_READER = None
+
+
+def _worker_init(factory, threads: int | None) -> None:
+    global _WORKER_READER
+    if threads:
+        try:
+            import torch  # noqa: PLC0415
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    _WORKER_READER = factory()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Ouvre un segment créé par le processus principal.
+
+    Les workers (spawn) partagent le resource_tracker du processus principal :
+    l'enregistrement du segment y est déjà présent, seul l'unlink du
+    processus principal le retire.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _plain(results) -> list:
+    """Résultats EasyOCR en types Python (bbox numpy → listes de nombres)."""
+    out = []
+    for bbox, text, conf in results:
+        points = [[v.item() if hasattr(v, "item") else v for v in point] for point in bbox]
+        out.append((points, str(text), float(conf)))
+    return out
+
+
+def _worker_call(name: str, shape: tuple, dtype: str, method: str, kwargs: dict) -> list:
+    shm = _attach(name)
+    try:
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        try:
+            return _plain(getattr(_WORKER_READER, method)(arr, **kwargs))
+        finally:
+            del arr
+    finally:
+        shm.close()
+
+
+def _warm(_) -> bool:
+    """Tâche vide : force le démarrage (et l'initializer) d'un worker."""
+    return _WORKER_READER is not None
+
+
+class OcrWorkerPool:
+    """Workers OCR avec reader propre ; readtext / recognize via mémoire partagée."""
+
+    thread_safe = True
+
+    def __init__(self, workers: int = OCR_POOL_WORKERS, max_inflight: int | None = None,
+                 factory=None, threads: int | None = OCR_POOL_THREADS,
+                 mp_context: str = "spawn", on_error=None):
+        if factory is None:
+            from tracker.capture.ocr_reader import OCR_LANGS, _easyocr_factory  # noqa: PLC0415
+            factory = functools.partial(_easyocr_factory, OCR_LANGS, False)
+        self._workers = max(1, workers)
+        self._max_inflight = max(1, max_inflight or self._workers)
+        self._factory = factory
+        self._threads = threads
+        self._mp_context = mp_context
+        self._on_error = on_error
+        self._slots = threading.BoundedSemaphore(self._max_inflight)
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._executor = None
+        self._generation = 0
+        self._restarts = 0
+        self._inflight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self, warm: bool = True) -> "OcrWorkerPool":
+        """Crée les workers ; `warm` attend leur démarrage (reader construit)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context(self._mp_context),
+                    initializer=_worker_init,
+                    initargs=(self._factory, self._threads),
+                )
+        if warm:
+            executor = self._executor
+            for ok in executor.map(_warm, range(self._workers)):
+                if not ok:
+                    raise RuntimeError("worker OCR sans reader")
+            logger.info("Pool OCR prêt (%d worker(s), %d requête(s) en vol max)",
+                        self._workers, self._max_inflight)
+        return self
+
+    def submit(self, method: str, img, **kwargs) -> concurrent.futures.Future:
+        """Future de reader.<method>(crop, **kwargs) exécuté dans un worker.
+
+        Bloque tant que `max_inflight` requêtes sont déjà en vol.
+        """
+        if self._executor is None:
+            self.start(warm=False)
+        arr = np.ascontiguousarray(np.asarray(img))
+        self._slots.acquire()
+        shm = None
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            future = self._executor.submit(_worker_call, shm.name, arr.shape, arr.dtype.str,
+                                           method, kwargs)
+        except Exception:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            self._slots.release()
+            raise
+        with self._lock:
+            self._inflight += 1
+            self._submitted += 1
+        future.add_done_callback(functools.partial(self._release, shm))
+        return future
+
+    def _release(self, shm, future) -> None:
+        try:
+            shm.close()
+            shm.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            logger.debug("Pool OCR: libération segment: %s", e)
+        with self._lock:
+            self._inflight -= 1
+            self._completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+        self._slots.release()
+
+    def _restart(self, generation: int, error: Exception) -> None:
+        """Remplace l'executor cassé (sauf si un autre thread l'a déjà fait)."""
+        with self._restart_lock:
+            if generation != self._generation:
+                return
+            logger.warning("Pool OCR: worker perdu (%s), recréation des workers", error)
+            with self._lock:
+                executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            try:
+                self.start()
+            except Exception as e:
+                logger.error("Pool OCR: recréation échouée: %s", e)
+                if self._on_error is not None:
+                    self._on_error(f"pool OCR hors service: {e}")
+                raise
+            self._generation += 1
+            with self._lock:
+                self._restarts += 1
+
+    def _call(self, method: str, img, kwargs: dict) -> list:
+        generation = self._generation
+        try:
+            return self.submit(method, img, **kwargs).result()
+        except BrokenProcessPool as e:
+            self._restart(generation, e)
+        return self.submit(method, img, **kwargs).result()
+
+    # Interface "reader" d'OcrPipeline (appels bloquants)
+    def readtext(self, img, **kwargs) -> list:
+        return self._call("readtext", img, kwargs)
+
+    def recognize(self, img, **kwargs) -> list:
+        return self._call("recognize", img, kwargs)
+
+    def pool_stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "max_inflight": self._max_inflight,
+                "inflight": self._inflight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "restarts": self._restarts,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,182 @@
+"""tracker/capture/ocr_reader.py — Registre process-wide du lecteur EasyOCR.
+
+Un easyocr.Reader charge plusieurs centaines de Mo de poids torch : il n'en
+existe qu'un par processus, partagé par toutes les OcrPipeline (pipeline live
+de main.py et diagnostics de TrackerAPI).
+
+ReaderRegistry :
+- warm_up() construit le reader dans un thread de fond au démarrage, puis
+  lance une inférence à blanc (premier appel torch hors du premier match) ;
+- get() retourne le reader, en attendant la fin du chargement en cours ou en
+  le construisant dans le thread appelant si aucun chargement n'a été lancé ;
+- status() rapporte l'état ("idle", "loading", "ready", "error"), les durées
+  de chargement / chauffe et le nombre d'instances construites (1 au plus).
+
+easyocr.Reader n'est pas prévu pour des inférences concurrentes (modèles torch
+et état internes partagés) : get() le retourne enveloppé dans un LockedReader,
+qui sérialise readtext / recognize sous un verrou propre au registre. Le
+pipeline live et les diagnostics de l'API attendent donc leur tour.
+
+Avec `ocr_workers` > 0 (config), le "reader" du registre est un
+OcrWorkerPool (ocr_pool.py) : les modèles vivent dans les workers, le pool
+accepte des appels concurrents (thread_safe) et n'est pas enveloppé.
+
+get_reader_registry() retourne le registre par défaut du processus.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+OCR_LANGS = ("fr", "en")
+
+
+def _easyocr_factory(langs: tuple, gpu: bool):
+    import easyocr  # noqa: PLC0415
+    return easyocr.Reader(list(langs), gpu=gpu)
+
+
+class LockedReader:
+    """Reader partagé : un seul readtext / recognize à la fois.
+
+    Les autres attributs (pool_stats, shutdown…) sont ceux du reader enveloppé.
+    """
+
+    def __init__(self, reader, lock: threading.Lock):
+        self.reader = reader
+        self._lock = lock
+
+    def __getattr__(self, name):
+        attr = getattr(self.reader, name)
+        if name not in ("readtext", "recognize"):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return locked
+
+
+class ReaderRegistry:
+    """Lecteur EasyOCR unique, chargé à la demande ou en arrière-plan."""
+
+    def __init__(self, langs: tuple = OCR_LANGS, gpu: bool = False, factory=None):
+        self._langs = tuple(langs)
+        self._gpu = gpu
+        self._factory = factory or (lambda: _easyocr_factory(self._langs, self._gpu))
+        self._build_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+        self._reader = None
+        self._thread = None
+        self._state = "idle"
+        self._error = None
+        self._instances = 0
+        self._load_seconds = None
+        self._warmup_seconds = None
+
+    def set_factory(self, factory) -> None:
+        """Change la construction du reader (ex : pool de workers) — avant tout chargement."""
+        with self._build_lock:
+            if self._reader is not None or self._state == "loading":
+                raise RuntimeError("reader OCR déjà chargé")
+            self._factory = factory
+
+    def close(self) -> None:
+        """Arrête le reader s'il possède des ressources propres (workers du pool)."""
+        shutdown = getattr(self._reader, "shutdown", None)
+        if callable(shutdown):
+            shutdown(wait=False)
+
+    def report_error(self, message: str) -> None:
+        """Reader chargé mais hors service (ex : workers du pool non recréés)."""
+        with self._build_lock:
+            self._state, self._error = "error", message
+
+    @property
+    def ready(self) -> bool:
+        return self._reader is not None
+
+    def get(self):
+        """Reader partagé — bloque pendant un chargement en cours ; lève l'erreur de construction."""
+        reader = self._reader
+        if reader is not None:
+            return reader
+        return self._build(warm=False)
+
+    def warm_up(self) -> threading.Thread | None:
+        """Lance le chargement (+ inférence à blanc) dans un thread daemon ; None si déjà fait."""
+        with self._build_lock:
+            if self._reader is not None or (self._thread is not None and self._thread.is_alive()):
+                return None
+            self._state = "loading"
+            self._thread = threading.Thread(target=self._warm_up_safe, name="ocr-warmup",
+                                            daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def _warm_up_safe(self) -> None:
+        try:
+            self._build(warm=True)
+        except Exception as e:
+            logger.error("Chargement EasyOCR en arrière-plan échoué: %s", e)
+
+    def _build(self, warm: bool):
+        with self._build_lock:
+            if self._reader is not None:
+                return self._reader
+            self._state = "loading"
+            t0 = time.perf_counter()
+            try:
+                reader = self._factory()
+            except Exception as e:
+                self._state, self._error = "error", str(e)
+                raise
+            self._instances += 1
+            if not getattr(reader, "thread_safe", False):
+                reader = LockedReader(reader, self._infer_lock)
+            self._load_seconds = time.perf_counter() - t0
+            logger.info("EasyOCR Reader initialisé (%s) en %.1f s",
+                        "+".join(self._langs), self._load_seconds)
+            if warm:
+                self._warm_inference(reader)
+            self._reader, self._state, self._error = reader, "ready", None
+            return reader
+
+    def _warm_inference(self, reader) -> None:
+        """Premier readtext sur une petite image : initialisations torch hors du premier match."""
+        try:
+            import numpy as np  # noqa: PLC0415
+            t0 = time.perf_counter()
+            reader.readtext(np.zeros((32, 96, 3), dtype=np.uint8))
+            self._warmup_seconds = time.perf_counter() - t0
+        except Exception as e:
+            logger.warning("Chauffe EasyOCR échouée: %s", e)
+
+    def status(self) -> dict:
+        """État du lecteur pour l'UI / get_capture_status."""
+        return {
+            "state": self._state,
+            "ready": self.ready,
+            "langs": list(self._langs),
+            "instances": self._instances,
+            "load_seconds": self._load_seconds,
+            "warmup_seconds": self._warmup_seconds,
+            "error": self._error,
+            **({"pool": self._reader.pool_stats()}
+               if callable(getattr(self._reader, "pool_stats", None)) else {}),
+        }
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_reader_registry() -> ReaderRegistry:
+    """Registre par défaut du processus (créé au premier appel)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ReaderRegistry()
+        return _default_registry
@@ -0,0 +1,286 @@
+"""tracker/capture/recording.py — Enregistrement et relecture de sessions de capture.
+
+Format .ptcgrec (little-endian) :
+    magic   b"PTCGREC\\x01"
+    <I>     longueur N de l'en-tête JSON, puis N octets JSON (version, date, région…)
+    records : <c d H H I> (type, timestamp, largeur, hauteur, longueur) + payload
+
+Types de record :
+    b"K" keyframe   : zlib(pixels RGB uint8)
+    b"D" delta      : zlib(pixels XOR frame précédente) — quasi nul sur un écran statique
+    b"T" transition : JSON {"from", "to", "outcome"} (largeur/hauteur = 0)
+
+Une keyframe est écrite toutes les `keyframe_interval` frames et à chaque
+changement de taille. Pas d'index final : SessionReplay reconstruit l'index
+en sautant d'en-tête en en-tête, ce qui reste lisible après un arrêt brutal
+(un dernier record tronqué est ignoré).
+
+SessionReplay lit le fichier via mmap : seuls les payloads demandés sont
+décompressés, la RAM reste bornée même sur une longue session.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from tracker.capture.frame import Frame, rgb_array
+from tracker.paths import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PTCGREC\x01"
+_RECORD = struct.Struct("<cdHHI")
+_KEYFRAME, _DELTA, _TRANSITION = b"K", b"D", b"T"
+
+
+def default_recording_path() -> str:
+    """data/recordings/session_AAAAMMJJ_HHMMSS.ptcgrec"""
+    name = datetime.now().strftime("session_%Y%m%d_%H%M%S.ptcgrec")
+    return os.path.join(get_data_dir(), "recordings", name)
+
+
+class SessionRecorder:
+    """Écrit les frames capturées et les transitions d'état dans un .ptcgrec.
+
+    Usage :
+        recorder = SessionRecorder(default_recording_path(), meta={"region": region})
+        recorder.start(frame_bus)                  # thread d'enregistrement
+        recorder.transition(prev_state, new_state) # depuis on_state_changed
+        recorder.close()
+
+    add_frame() peut aussi être appelé directement (tests, outils).
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 50, min_interval: float = 0.0,
+                 compress_level: int = 1, meta: dict | None = None):
+        self._path = path
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._min_interval = min_interval
+        self._level = compress_level
+        self._lock = threading.Lock()
+        self._prev = None
+        self._since_key = 0
+        self._last_ts = None
+        self._frames = 0
+        self._bytes_raw = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        header = {"version": 1, "created": datetime.now().isoformat()}
+        header.update(meta or {})
+        blob = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+        logger.info("Enregistrement de session : %s", path)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            written = self._file.tell() if not self._file.closed else os.path.getsize(self._path)
+            raw = self._bytes_raw
+            return {
+                "frames": self._frames,
+                "bytes_written": written,
+                "compression_ratio": raw / written if written else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def add_frame(self, img, timestamp: float | None = None) -> bool:
+        """Ajoute une frame (Frame ou PIL Image). False si ignorée (min_interval, fermé)."""
+        ts = time.monotonic() if timestamp is None else timestamp
+        rgb = np.ascontiguousarray(rgb_array(img))
+        h, w = rgb.shape[:2]
+        with self._lock:
+            if self._file.closed:
+                return False
+            if self._last_ts is not None and ts - self._last_ts < self._min_interval:
+                return False
+            prev = self._prev
+            if prev is None or prev.shape != rgb.shape or self._since_key >= self._keyframe_interval:
+                kind, data = _KEYFRAME, rgb
+                self._since_key = 0
+            else:
+                kind, data = _DELTA, np.bitwise_xor(rgb, prev)
+            payload = zlib.compress(data.tobytes(), self._level)
+            self._file.write(_RECORD.pack(kind, ts, w, h, len(payload)) + payload)
+            self._prev = rgb if rgb.flags.owndata else rgb.copy()
+            self._since_key += 1
+            self._last_ts = ts
+            self._frames += 1
+            self._bytes_raw += rgb.nbytes
+            return True
+
+    def transition(self, prev_state, new_state, outcome: str | None = None,
+                   timestamp: float | None = None) -> None:
+        """Enregistre une transition d'état (CombatState ou str)."""
+        ts = time.monotonic() if timestamp is None else timestamp
+        payload = json.dumps({
+            "from": getattr(prev_state, "value", prev_state),
+            "to": getattr(new_state, "value", new_state),
+            "outcome": outcome,
+        }).encode("utf-8")
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(_RECORD.pack(_TRANSITION, ts, 0, 0, len(payload)) + payload)
+
+    # ------------------------------------------------------------------
+    # Enregistrement depuis un FrameBus
+    # ------------------------------------------------------------------
+
+    def start(self, bus) -> None:
+        """Enregistre chaque nouvelle frame du bus dans un thread daemon."""
+        frames = bus.subscribe()
+
+        def _run():
+            while not self._stop_event.is_set():
+                frame = frames.next(timeout=1.0)
+                if frame is None:
+                    continue
+                try:
+                    self.add_frame(frame.image, frame.timestamp)
+                except Exception as e:
+                    logger.error("SessionRecorder: %s", e)
+
+        self._thread = threading.Thread(target=_run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info("Session enregistrée : %s (%d frames)", self._path, self._frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionReplay:
+    """Lecture mmap d'un fichier .ptcgrec.
+
+    frame(i) décode depuis la keyframe la plus proche ; la lecture séquentielle
+    (frames(), i puis i + 1) n'applique qu'un delta par frame.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} : fichier .ptcgrec invalide")
+        (n,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        self._meta = json.loads(self._mm[start:start + n].decode("utf-8"))
+        self._index = []          # (offset payload, type, timestamp, w, h, longueur)
+        self._transitions = []
+        self._scan(start + n)
+        self._cache = None        # (indice, rgb) de la dernière frame décodée
+
+    def _scan(self, pos: int) -> None:
+        size = len(self._mm)
+        while pos + _RECORD.size <= size:
+            kind, ts, w, h, length = _RECORD.unpack_from(self._mm, pos)
+            data_pos = pos + _RECORD.size
+            if data_pos + length > size:
+                logger.warning("%s : dernier record tronqué ignoré", self._path)
+                break
+            if kind == _TRANSITION:
+                event = json.loads(self._mm[data_pos:data_pos + length].decode("utf-8"))
+                event["timestamp"] = ts
+                event["frame"] = len(self._index)
+                self._transitions.append(event)
+            elif kind in (_KEYFRAME, _DELTA):
+                self._index.append((data_pos, kind, ts, w, h, length))
+            pos = data_pos + length
+
+    @property
+    def meta(self) -> dict:
+        return dict(self._meta)
+
+    @property
+    def transitions(self) -> list:
+        """[{"from", "to", "outcome", "timestamp", "frame"}] — frame = indice de la frame suivante."""
+        return list(self._transitions)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return np.array([entry[2] for entry in self._index], dtype=np.float64)
+
+    @property
+    def duration(self) -> float:
+        return self._index[-1][2] - self._index[0][2] if self._index else 0.0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _payload(self, i: int) -> tuple:
+        pos, kind, _, w, h, length = self._index[i]
+        raw = zlib.decompress(self._mm[pos:pos + length])
+        return kind, np.frombuffer(raw, dtype=np.uint8).reshape(h, w, 3)
+
+    def rgb(self, i: int) -> np.ndarray:
+        """Pixels RGB (h, w, 3) de la frame i (lecture seule)."""
+        if i < 0:
+            i += len(self._index)
+        if not 0 <= i < len(self._index):
+            raise IndexError(i)
+        if self._cache is not None and self._cache[0] == i:
+            return self._cache[1]
+        if self._cache is not None and self._cache[0] == i - 1 and self._index[i][1] == _DELTA:
+            start, rgb = i, self._cache[1]
+        else:
+            start = i
+            while self._index[start][1] != _KEYFRAME:
+                start -= 1
+            rgb = None
+        for j in range(start, i + 1):
+            kind, data = self._payload(j)
+            rgb = data if kind == _KEYFRAME else np.bitwise_xor(rgb, data)
+        rgb.flags.writeable = False
+        self._cache = (i, rgb)
+        return rgb
+
+    def frame(self, i: int) -> Frame:
+        return Frame.from_rgb(self.rgb(i))
+
+    def timestamp(self, i: int) -> float:
+        return self._index[i][2]
+
+    def frames(self):
+        """Itère (timestamp, Frame) dans l'ordre d'enregistrement."""
+        for i in range(len(self._index)):
+            yield self._index[i][2], self.frame(i)
+
+    def close(self) -> None:
+        self._cache = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
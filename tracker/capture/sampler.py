@@ -2,14 +2,21 @@
 
 SamplingLoop : tourne en thread daemon, compare les frames successifs,
 sauvegarde dans data/detection_samples/unlabeled/ quand un gros changement
-est détecté. Inclut une heuristique de pré-labélisation basée sur les couleurs.
+est détecté. Inclut une heuristique de pré-labélisation basée sur les couleurs,
+et prelabel_unlabeled : suggestions du modèle ML (label + confiance) par lots.
+Les vignettes JPEG de l'UI sont mises en cache dans unlabeled/.thumbs/
+(thumbnail_jpeg), remplies aussi par prelabel_unlabeled qui a déjà les images
+décodées.
 
 Labels possibles : pre_queue, in_combat, end_screen_win, end_screen_lose, unknown
 """
+import io
+import json
 import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from PIL import Image
@@ -20,6 +27,11 @@ logger = logging.getLogger(__name__)
 
 _SAMPLES_DIR = os.path.join(get_data_dir(), "detection_samples")
 _UNLABELED_DIR = os.path.join(_SAMPLES_DIR, "unlabeled")
+# Suggestions du modèle (prelabel_unlabeled) : {filename: {"label", "confidence"}}
+_SUGGESTIONS_FILE = "suggestions.json"
+# Vignettes JPEG de l'UI : .thumbs/<nom>.jpg, périmée si le PNG est plus récent
+_THUMBS_DIR = ".thumbs"
+_THUMB_SIZE = (320, 240)
 
 # Seuil MSE au-dessus duquel on considère qu'il y a un changement significatif
 _CHANGE_THRESHOLD = 1500.0
@@ -102,15 +114,21 @@ class SamplingLoop:
     """Capture automatiquement des frames quand un gros changement visuel est détecté.
 
     Usage :
-        sampler = SamplingLoop(config=config_manager)
+        sampler = SamplingLoop(config=config_manager, bus=frame_bus)
         thread = threading.Thread(target=sampler.start, daemon=True)
         thread.start()
         ...
         sampler.stop()
+
+    Avec une CaptureSource (`source=`), la région vient de la source et les
+    frames de la source si aucun bus n'est fourni.
     """
 
-    def __init__(self, config=None, interval: float = _POLL_INTERVAL):
+    def __init__(self, config=None, interval: float = _POLL_INTERVAL, bus=None,
+                 source=None):
         self._config = config
+        self._bus = bus
+        self._source = source
         self._interval = interval
         self._stop_event = threading.Event()
         self._lock = threading.Lock()
@@ -165,13 +183,22 @@ class SamplingLoop:
     def _tick(self):
         from tracker.capture.screen import capture_region_pil  # noqa: PLC0415
 
-        if self._config is None:
+        if self._source is not None:
+            region = self._source.region()
+        elif self._config is not None:
+            region = self._config.get_all().get("mumu_region")
+        else:
             return
-        region = self._config.get_all().get("mumu_region")
         if not region:
             return
 
-        img = capture_region_pil(region)
+        if self._bus is not None:
+            from tracker.capture.bus import grab_latest_image  # noqa: PLC0415
+            img = grab_latest_image(self._bus, region)
+        elif self._source is not None:
+            img = self._source.grab(region)
+        else:
+            img = capture_region_pil(region)
         if img is None:
             return
 
@@ -223,23 +250,182 @@ class SamplingLoop:
 # ---------------------------------------------------------------------------
 
 def list_unlabeled() -> list[dict]:
-    """Retourne la liste des fichiers non labélisés avec leur label auto-détecté."""
+    """Retourne la liste des fichiers non labélisés avec leur label auto-détecté.
+
+    "suggested_label" / "confidence" viennent de prelabel_unlabeled (None si
+    le fichier n'a pas encore été évalué par le modèle).
+    """
     if not os.path.isdir(_UNLABELED_DIR):
         return []
+    suggestions = load_suggestions()
     result = []
     for fname in sorted(os.listdir(_UNLABELED_DIR)):
         if not fname.lower().endswith(".png"):
             continue
         parts = fname.rsplit("_", 1)
         auto_label = parts[1].replace(".png", "") if len(parts) == 2 else "unknown"
+        suggestion = suggestions.get(fname, {})
         result.append({
             "filename": fname,
             "path": os.path.join(_UNLABELED_DIR, fname),
             "auto_label": auto_label,
+            "suggested_label": suggestion.get("label"),
+            "confidence": suggestion.get("confidence"),
         })
     return result
 
 
+# ---------------------------------------------------------------------------
+# Pré-labélisation par le modèle (par lots)
+# ---------------------------------------------------------------------------
+
+def load_suggestions() -> dict:
+    """{filename: {"label", "confidence"}} enregistrées par prelabel_unlabeled."""
+    path = os.path.join(_UNLABELED_DIR, _SUGGESTIONS_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("load_suggestions: %s", e)
+        return {}
+
+
+def _save_suggestions(suggestions: dict) -> None:
+    path = os.path.join(_UNLABELED_DIR, _SUGGESTIONS_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(suggestions, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _thumb_path(fname: str) -> str:
+    return os.path.join(_UNLABELED_DIR, _THUMBS_DIR, os.path.splitext(fname)[0] + ".jpg")
+
+
+def _store_thumbnail(fname: str, img) -> bytes:
+    """Vignette JPEG de `img`, écrite dans le cache (l'échec d'écriture n'est pas bloquant)."""
+    thumb = img.copy()
+    thumb.thumbnail(_THUMB_SIZE)
+    buf = io.BytesIO()
+    thumb.convert("RGB").save(buf, format="JPEG", quality=75)
+    data = buf.getvalue()
+    path = _thumb_path(fname)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("vignette %s non mise en cache: %s", fname, e)
+    return data
+
+
+def _thumbnail_fresh(fname: str) -> bool:
+    try:
+        return os.path.getmtime(_thumb_path(fname)) >= \
+            os.path.getmtime(os.path.join(_UNLABELED_DIR, fname))
+    except OSError:
+        return False
+
+
+def thumbnail_jpeg(fname: str) -> bytes:
+    """Vignette JPEG (320x240 max) d'une capture de unlabeled/, depuis le cache si à jour."""
+    if _thumbnail_fresh(fname):
+        try:
+            with open(_thumb_path(fname), "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+    with Image.open(os.path.join(_UNLABELED_DIR, fname)) as img:
+        return _store_thumbnail(fname, img)
+
+
+def _drop_thumbnail(fname: str) -> None:
+    try:
+        os.remove(_thumb_path(fname))
+    except OSError:
+        pass
+
+
+def _decode(fname: str):
+    try:
+        with Image.open(os.path.join(_UNLABELED_DIR, fname)) as img:
+            return img.convert("RGB")
+    except Exception as e:
+        logger.warning("prelabel: %s illisible (%s)", fname, e)
+        return None
+
+
+def _load_chunk(fnames: list, pool) -> tuple[list, list]:
+    """(noms, images RGB décodées) — les fichiers illisibles sont ignorés.
+
+    Le décodage PNG relâche le GIL : les fichiers d'un lot sont décodés en parallèle.
+    """
+    decoded = list(pool.map(_decode, fnames))
+    names = [f for f, img in zip(fnames, decoded) if img is not None]
+    return names, [img for img in decoded if img is not None]
+
+
+def prelabel_unlabeled(detector=None, chunk: int = 64, force: bool = False) -> dict:
+    """Suggère un label (+ confiance) pour chaque capture de unlabeled/ via le modèle.
+
+    Les images sont décodées par lots de `chunk` (en parallèle), features extraites en une
+    passe vectorisée et évaluées par un seul predict_proba par lot
+    (StateDetector.predict_proba_batch). Un écran de fin est suggéré comme
+    end_screen_win / end_screen_lose selon predict_outcome.
+
+    Les fichiers déjà évalués sont sautés sauf si `force` ; les suggestions
+    des fichiers disparus (labélisés ou supprimés) sont purgées.
+
+    Returns:
+        {"labeled": int, "skipped": int, "seconds": float} ou {"error": str}.
+    """
+    if detector is None:
+        from tracker.capture.detector import StateDetector  # noqa: PLC0415
+        detector = StateDetector()
+    if detector._load_model() is None:
+        return {"error": "Modèle ML absent"}
+
+    start = time.perf_counter()
+    files = [f for f in sorted(os.listdir(_UNLABELED_DIR))
+             if f.lower().endswith(".png")] if os.path.isdir(_UNLABELED_DIR) else []
+    present = set(files)
+    suggestions = {k: v for k, v in load_suggestions().items() if k in present}
+    todo = files if force else [f for f in files if f not in suggestions]
+
+    labeled = 0
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        for i in range(0, len(todo), chunk):
+            names, images = _load_chunk(todo[i:i + chunk], pool)
+            if not images:
+                continue
+            # Images déjà en mémoire : vignettes de l'UI au passage
+            stale = [(f, img) for f, img in zip(names, images) if not _thumbnail_fresh(f)]
+            list(pool.map(lambda item: _store_thumbnail(*item), stale))
+            classes, proba = detector.predict_proba_batch(images)
+            if not classes:
+                continue
+            best = proba.argmax(axis=1)
+            for fname, img, k, row in zip(names, images, best, proba):
+                label = classes[k]
+                if label == "end_screen":
+                    outcome = detector.predict_outcome(img)
+                    if outcome in ("win", "lose"):
+                        label = f"end_screen_{outcome}"
+                suggestions[fname] = {"label": label, "confidence": round(float(row[k]), 4)}
+                labeled += 1
+
+    if os.path.isdir(_UNLABELED_DIR):
+        _save_suggestions(suggestions)
+    seconds = time.perf_counter() - start
+    logger.info("prelabel_unlabeled: %d captures en %.2fs (%d déjà évaluées)",
+                labeled, seconds, len(files) - len(todo))
+    return {"labeled": labeled, "skipped": len(files) - len(todo), "seconds": seconds}
+
+
 def capture_now(config) -> dict:
     """Capture immédiatement l'écran et sauvegarde dans unlabeled/.
 
@@ -288,6 +474,7 @@ def label_sample(filename: str, label: str) -> bool:
         logger.warning("label_sample: fichier introuvable %s", filename)
         return False
 
+    _drop_thumbnail(filename)
     if label == "delete":
         os.remove(src)
         return True
@@ -4,9 +4,16 @@
 - show_region_highlight()    : affiche un cadre rouge autour d'une région.
 - select_region_interactive() : overlay tkinter pour délimiter la région MUMU.
 - capture_region() : capture mss de la région configurée → base64 PNG.
+- CaptureSession    : session mss persistante partagée par tous les appelants.
+- capture_region_frame() : capture → Frame NumPy zero-copy (chemin chaud).
+- capture_rois()    : capture directe de ROIs (rectangles séparés ou union).
+- WindowTracker     : hwnd émulateur en cache, validé à chaque tick.
 Windows-only. Imports mss/tkinter en lazy pour WSL/CI compatibility.
 """
 import logging
+import threading
+import time
+import weakref
 
 logger = logging.getLogger(__name__)
 
@@ -85,27 +92,211 @@ def find_window_by_title(title: str) -> dict | None:
     return get_window_region(result[0])
 
 
-def find_mumu_window() -> int | None:
+_MUMU_KEYWORDS = ("mumu", "pokemon", "pokémon")
+# Fenêtres jamais prises pour l'émulateur : le tracker lui-même ("Pokemon TCG Tracker")
+_EXCLUDED_KEYWORDS = ("tracker",)
+
+
+class Win32Windows:
+    """Accès minimal aux fenêtres via win32gui.
+
+    Interface utilisée par find_mumu_window() et WindowTracker — remplaçable
+    par un faux objet pour piloter les tests sous Linux/CI.
+    """
+
+    def __init__(self):
+        import win32gui  # noqa: PLC0415
+        self._gui = win32gui
+
+    def enum_windows(self) -> list:
+        hwnds = []
+        self._gui.EnumWindows(lambda hwnd, _: hwnds.append(hwnd), None)
+        return hwnds
+
+    def is_window(self, hwnd) -> bool:
+        return bool(self._gui.IsWindow(hwnd))
+
+    def is_visible(self, hwnd) -> bool:
+        return bool(self._gui.IsWindowVisible(hwnd))
+
+    def is_iconic(self, hwnd) -> bool:
+        return bool(self._gui.IsIconic(hwnd))
+
+    def get_title(self, hwnd) -> str:
+        return self._gui.GetWindowText(hwnd)
+
+    def get_rect(self, hwnd) -> tuple:
+        return tuple(self._gui.GetWindowRect(hwnd))
+
+
+def find_mumu_window(windows=None, title: str | None = None) -> int | None:
     """Retourne le hwnd de la fenêtre MuMu Player ou None si non trouvée.
 
     Cherche toutes les fenêtres visibles dont le titre contient "MuMu"
     (insensible à la casse) pour couvrir MuMu Player, MuMu Player 12, etc.
+    Le tracker lui-même est exclu, comme dans list_all_windows(). Si `title`
+    (window_title de la config) est donné, la fenêtre de ce titre exact est
+    prioritaire.
     Windows-only — win32gui importé en lazy pour WSL/CI compatibility.
+
+    Énumère toutes les fenêtres top-level : pour un appel à chaque tick,
+    passer par WindowTracker (hwnd en cache + validation légère).
     """
-    import win32gui  # noqa: PLC0415
+    if windows is None:
+        windows = Win32Windows()
+    found = None
+    for hwnd in windows.enum_windows():
+        if not windows.is_visible(hwnd):
+            continue
+        raw = windows.get_title(hwnd)
+        if title and raw == title:
+            return hwnd
+        low = raw.lower()
+        if found is None and any(kw in low for kw in _MUMU_KEYWORDS) \
+                and not any(kw in low for kw in _EXCLUDED_KEYWORDS):
+            found = hwnd
+            if not title:
+                return hwnd
+    return found
 
-    found = []
 
-    _keywords = ("mumu", "pokemon", "pokémon")
+class WindowTracker:
+    """Suivi de la fenêtre émulateur avec hwnd en cache.
 
-    def _enum_cb(hwnd, _):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd).lower()
-            if any(kw in title for kw in _keywords):
-                found.append(hwnd)
+    poll() (appelé à chaque tick du polling) valide le hwnd en cache par
+    trois appels légers — IsWindow, IsWindowVisible, GetWindowRect — et ne
+    relance l'énumération complète (find_mumu_window) qu'en cas d'échec ou
+    toutes les `rescan_interval` secondes.
 
-    win32gui.EnumWindows(_enum_cb, None)
-    return found[0] if found else None
+    Si la fenêtre suivie est bien l'émulateur (titre contenant "MuMu" ou
+    égal au window_title de la config) et qu'elle se déplace ou change de
+    taille, mumu_region suit : mêmes marges par rapport aux quatre bords de la
+    fenêtre (région = fenêtre entière → nouveau rectangle). La config n'est
+    sauvegardée qu'une fois le rectangle stable depuis `settle` secondes,
+    pas à chaque tick d'un glisser-déposer.
+    """
+
+    def __init__(self, windows=None, config=None, rescan_interval: float = 5.0,
+                 clock=None, settle: float = 0.5):
+        self._windows = windows
+        self._config = config
+        self._rescan_interval = rescan_interval
+        self._settle = settle
+        self._clock = clock or time.monotonic
+        self._hwnd = None
+        self._is_emulator = False
+        self._rect = None
+        self._rect_since = None
+        self._saved_rect = None
+        self._last_scan = None
+        self._scans = 0
+        self._validations = 0
+
+    @property
+    def hwnd(self) -> int | None:
+        return self._hwnd
+
+    @property
+    def stats(self) -> dict:
+        return {"full_scans": self._scans, "validations": self._validations}
+
+    def _win(self):
+        if self._windows is None:
+            self._windows = Win32Windows()
+        return self._windows
+
+    def invalidate(self) -> None:
+        """Oublie le hwnd en cache — le prochain poll() refait une énumération."""
+        self._hwnd = None
+        self._rect = self._saved_rect = None
+
+    def poll(self) -> int | None:
+        """hwnd de l'émulateur (None si absent). Énumération complète si nécessaire."""
+        now = self._clock()
+        due = self._last_scan is None or now - self._last_scan >= self._rescan_interval
+        if self._hwnd is not None and not due and self._validate(self._hwnd):
+            return self._hwnd
+        return self._rescan(now)
+
+    def _validate(self, hwnd) -> bool:
+        win = self._win()
+        self._validations += 1
+        try:
+            if not win.is_window(hwnd) or not win.is_visible(hwnd):
+                return False
+            self._check_moved(hwnd)
+            return True
+        except Exception:
+            return False
+
+    def _rescan(self, now) -> int | None:
+        self._last_scan = now
+        self._scans += 1
+        win = self._win()
+        title = self._window_title()
+        try:
+            hwnd = find_mumu_window(win, title=title)
+        except Exception as e:
+            logger.error("WindowTracker: énumération échouée: %s", e)
+            hwnd = None
+        if hwnd != self._hwnd:
+            self._hwnd = hwnd
+            self._rect = self._saved_rect = None
+            self._is_emulator = False
+            if hwnd is not None:
+                try:
+                    name = win.get_title(hwnd)
+                    self._is_emulator = (bool(title) and name == title) or "mumu" in name.lower()
+                except Exception:
+                    pass
+        if hwnd is not None:
+            try:
+                self._check_moved(hwnd)
+            except Exception:
+                pass
+        return hwnd
+
+    def _window_title(self) -> str | None:
+        if self._config is None:
+            return None
+        try:
+            return self._config.get_all().get("window_title")
+        except Exception:
+            return None
+
+    def _check_moved(self, hwnd) -> None:
+        win = self._win()
+        if win.is_iconic(hwnd):
+            return  # fenêtre réduite : rect (-32000, …) sans signification
+        rect = win.get_rect(hwnd)
+        now = self._clock()
+        if rect != self._rect:
+            self._rect, self._rect_since = rect, now
+        if self._saved_rect is None:
+            self._saved_rect = rect
+            return
+        if rect == self._saved_rect or now - self._rect_since < self._settle:
+            return   # immobile, ou encore en cours de déplacement
+        prev, self._saved_rect = self._saved_rect, rect
+        if self._is_emulator:
+            self._on_moved(prev, rect)
+
+    def _on_moved(self, prev: tuple, rect: tuple) -> None:
+        if self._config is None:
+            return
+        cfg = self._config.get_all()
+        region = cfg.get("mumu_region")
+        if not region:
+            return
+        pl, pt, pr, pb = prev
+        l, t, r, b = rect
+        # Marges gauche / haut conservées ; largeur et hauteur suivent le redimensionnement
+        new_region = dict(region, x=region["x"] + l - pl, y=region["y"] + t - pt,
+                          width=max(1, region["width"] + (r - l) - (pr - pl)),
+                          height=max(1, region["height"] + (b - t) - (pb - pt)))
+        cfg["mumu_region"] = new_region
+        self._config.save(cfg)
+        logger.info("Fenêtre émulateur déplacée — mumu_region mise à jour: %s", new_region)
 
 
 def get_tracker_start_position(tracker_width: int, tracker_height: int,
@@ -362,29 +553,273 @@ def select_region_interactive() -> dict | None:
     return result["region"]
 
 
+# ---------------------------------------------------------------------------
+# CaptureSession — handle mss réutilisé entre les captures
+# ---------------------------------------------------------------------------
+
+def _region_to_monitor(region: dict) -> dict:
+    return {
+        "left": region["x"],
+        "top": region["y"],
+        "width": region["width"],
+        "height": region["height"],
+    }
+
+
+class _ThreadHandle:
+    """Porteur thread-local de l'instance mss d'un thread.
+
+    Détruit avec les données thread-local à la fin du thread : son
+    weakref.finalize ferme l'instance mss (threads courts : OCR de fin de
+    combat, diagnostics de l'API).
+    """
+    __slots__ = ("sct", "__weakref__")
+
+    def __init__(self, sct):
+        self.sct = sct
+
+
+class CaptureSession:
+    """Session mss longue durée partagée par tous les appelants de capture.
+
+    Ouvrir `mss.mss()` à chaque frame recrée les DC GDI (Windows) à chaque
+    appel — coût payé 10x/s par le polling + les threads OCR. Ici chaque
+    thread garde sa propre instance mss (les handles GDI de mss sont liés au
+    thread qui les a créés), réutilisée jusqu'à erreur ou jusqu'à la fin du
+    thread (l'instance est alors fermée et retirée de la session).
+
+    En cas d'échec de grab (changement de résolution, session verrouillée,
+    DC invalidé…), l'instance du thread est fermée puis recréée et le grab
+    est retenté une fois — reconnexion transparente pour l'appelant.
+    """
+
+    def __init__(self, factory=None):
+        # factory : callable sans argument retournant un objet mss-like
+        # (grab(monitor), close()). Par défaut mss.mss — injectable en test.
+        self._factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handles = []
+        self._grab_count = 0
+        self._open_count = 0
+        self._reconnect_count = 0
+
+    # ------------------------------------------------------------------
+    # Gestion des handles
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        if self._factory is None:
+            import mss  # noqa: PLC0415
+            self._factory = mss.mss
+        sct = self._factory()
+        with self._lock:
+            self._handles.append(sct)
+            self._open_count += 1
+        return sct
+
+    def _get(self):
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = _ThreadHandle(self._open())
+            weakref.finalize(slot, self._release, slot.sct)
+            self._local.slot = slot
+        return slot.sct
+
+    def _release(self, sct) -> None:
+        """Retire et ferme une instance mss — sans effet si close() l'a déjà fermée."""
+        with self._lock:
+            if sct not in self._handles:
+                return
+            self._handles.remove(sct)
+        try:
+            sct.close()
+        except Exception:
+            pass
+
+    def _drop(self):
+        """Ferme l'instance mss du thread courant (elle sera recréée au prochain grab)."""
+        slot = getattr(self._local, "slot", None)
+        self._local.slot = None
+        if slot is not None:
+            self._release(slot.sct)
+
+    def close(self) -> None:
+        """Ferme toutes les instances mss ouvertes (tous threads confondus).
+
+        La session reste utilisable : le prochain grab rouvre un handle.
+        """
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for sct in handles:
+            try:
+                sct.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+
+    def grab(self, region: dict):
+        """Capture brute mss (objet ScreenShot : .size, .bgra) ou None si erreur."""
+        monitor = _region_to_monitor(region)
+        for attempt in range(2):
+            try:
+                shot = self._get().grab(monitor)
+                with self._lock:
+                    self._grab_count += 1
+                return shot
+            except Exception as e:
+                self._drop()
+                if attempt == 0:
+                    with self._lock:
+                        self._reconnect_count += 1
+                    logger.debug("CaptureSession: reconnexion mss après erreur: %s", e)
+                else:
+                    logger.error("CaptureSession.grab: %s", e)
+        return None
+
+    def grab_pil(self, region: dict):
+        """Capture la région et retourne une PIL Image RGB, ou None si erreur."""
+        from PIL import Image  # noqa: PLC0415
+
+        shot = self.grab(region)
+        if shot is None:
+            return None
+        try:
+            return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+        except Exception as e:
+            logger.error("CaptureSession.grab_pil: %s", e)
+            return None
+
+    def grab_frame(self, region: dict):
+        """Capture la région et retourne une Frame (vue NumPy sur le buffer mss), ou None."""
+        from tracker.capture.frame import Frame  # noqa: PLC0415
+
+        shot = self.grab(region)
+        if shot is None:
+            return None
+        try:
+            return Frame.from_mss(shot)
+        except Exception as e:
+            logger.error("CaptureSession.grab_frame: %s", e)
+            return None
+
+    def grab_rois(self, region: dict, rois: dict, mode: str = "auto"):
+        """Capture uniquement les ROIs demandées de la région → RoiFrames, ou None.
+
+        Args:
+            region: région complète {"x", "y", "width", "height"}.
+            rois:   {nom: (x0, y0, x1, y1)} en fractions de la région.
+            mode:   "union"    — un seul grab du rectangle englobant, ROIs découpées dedans ;
+                    "separate" — un grab par ROI ;
+                    "auto"     — union si elle couvre moins de 2x la somme des ROIs.
+        """
+        from tracker.capture.frame import Frame, RoiFrames, roi_box  # noqa: PLC0415
+
+        size = (region["width"], region["height"])
+        boxes = {name: roi_box(size, roi) for name, roi in rois.items()}
+        boxes = {n: b for n, b in boxes.items() if b[2] > b[0] and b[3] > b[1]}
+        if not boxes:
+            return None
+
+        ux0 = min(b[0] for b in boxes.values())
+        uy0 = min(b[1] for b in boxes.values())
+        ux1 = max(b[2] for b in boxes.values())
+        uy1 = max(b[3] for b in boxes.values())
+        if mode == "auto":
+            area_sum = sum((b[2] - b[0]) * (b[3] - b[1]) for b in boxes.values())
+            mode = "union" if (ux1 - ux0) * (uy1 - uy0) <= 2 * area_sum else "separate"
+
+        def _sub_region(x0, y0, x1, y1):
+            return {"x": region["x"] + x0, "y": region["y"] + y0,
+                    "width": x1 - x0, "height": y1 - y0}
+
+        try:
+            frames = {}
+            if mode == "union":
+                shot = self.grab(_sub_region(ux0, uy0, ux1, uy1))
+                if shot is None:
+                    return None
+                union = Frame.from_mss(shot)
+                for name, (x0, y0, x1, y1) in boxes.items():
+                    frames[name] = union.crop((x0 - ux0, y0 - uy0, x1 - ux0, y1 - uy0))
+            else:
+                for name, box in boxes.items():
+                    shot = self.grab(_sub_region(*box))
+                    if shot is None:
+                        return None
+                    frames[name] = Frame.from_mss(shot)
+            return RoiFrames(size, frames)
+        except Exception as e:
+            logger.error("CaptureSession.grab_rois: %s", e)
+            return None
+
+    @property
+    def stats(self) -> dict:
+        """Compteurs : grabs réussis, handles ouverts, reconnexions."""
+        with self._lock:
+            return {
+                "grabs": self._grab_count,
+                "opened": self._open_count,
+                "reconnects": self._reconnect_count,
+                "live_handles": len(self._handles),
+            }
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_capture_session() -> CaptureSession:
+    """Retourne la CaptureSession partagée du process (créée au premier appel)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CaptureSession()
+        return _session
+
+
 def capture_region_pil(region: dict):
     """Capture la région écran via mss. Retourne une PIL Image ou None si erreur.
 
     Utilisé en interne par le pipeline de détection (pas de conversion base64).
+    Passe par la CaptureSession partagée — pas de mss.mss() par appel.
     """
-    import mss  # noqa: PLC0415
-    from PIL import Image  # noqa: PLC0415
-
     try:
-        monitor = {
-            "left": region["x"],
-            "top": region["y"],
-            "width": region["width"],
-            "height": region["height"],
-        }
-        with mss.mss() as sct:
-            screenshot = sct.grab(monitor)
-            return Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+        return get_capture_session().grab_pil(region)
     except Exception as e:
         logger.error("capture_region_pil: %s", e)
         return None
 
 
+def capture_region_frame(region: dict):
+    """Capture la région écran → Frame NumPy (sans conversion PIL), ou None si erreur.
+
+    Chemin chaud du FrameBus : les crops sont des tranches de tableau et la
+    PIL Image n'est construite que si un consommateur la demande.
+    """
+    try:
+        return get_capture_session().grab_frame(region)
+    except Exception as e:
+        logger.error("capture_region_frame: %s", e)
+        return None
+
+
+def capture_rois(region: dict, rois: dict, mode: str = "auto"):
+    """Capture seulement les ROIs {nom: (x0, y0, x1, y1) fractions} → RoiFrames, ou None.
+
+    Voir CaptureSession.grab_rois pour le choix union / rectangles séparés.
+    """
+    try:
+        return get_capture_session().grab_rois(region, rois, mode=mode)
+    except Exception as e:
+        logger.error("capture_rois: %s", e)
+        return None
+
+
 def capture_region(region: dict) -> dict | None:
     """Capture la région écran via mss. Retourne base64 PNG ou None si erreur.
 
@@ -396,19 +831,11 @@ def capture_region(region: dict) -> dict | None:
     """
     import base64  # noqa: PLC0415
     import io  # noqa: PLC0415
-    import mss  # noqa: PLC0415
-    from PIL import Image  # noqa: PLC0415
 
     try:
-        monitor = {
-            "left": region["x"],
-            "top": region["y"],
-            "width": region["width"],
-            "height": region["height"],
-        }
-        with mss.mss() as sct:
-            screenshot = sct.grab(monitor)
-            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+        img = get_capture_session().grab_pil(region)
+        if img is None:
+            return None
         buffer = io.BytesIO()
         img.save(buffer, format="PNG")
         b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
@@ -0,0 +1,233 @@
+"""tracker/capture/source.py — Sources de capture interchangeables.
+
+CaptureSource : interface commune consommée par FrameBus, PollingLoop,
+SamplingLoop et main.py.
+    poll()            : identifiant de la source (hwnd…) ou None si indisponible
+    region()          : région {"x", "y", "width", "height"} à capturer, ou None
+    grab(region)      : Frame de la région (None si rien à lire)
+    grab_rois(…)      : ROIs nommées (RoiFrames)
+    live              : True pour l'écran réel (capture à la demande possible)
+
+Implémentations :
+    LiveSource      : écran réel — mss (CaptureSession) + win32gui (WindowTracker)
+    DirectorySource : dossier de captures PNG/JPG rejouées dans l'ordre des noms
+    ReplaySource    : session enregistrée .ptcgrec (tracker.capture.recording)
+
+Les sources hors ligne ne dépendent ni de mss ni de win32gui : toute la pile
+de détection tourne sans émulateur (Linux, CI).
+
+make_source(spec) choisit l'implémentation depuis une chaîne (PTCG_SOURCE) :
+None / "live", un dossier, ou un fichier .ptcgrec.
+"""
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from tracker.capture.frame import Frame, crop_rois
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class CaptureSource(ABC):
+    """Interface d'une source de frames (voir docstring du module).
+
+    region() et grab() sont abstraites : une implémentation incomplète échoue
+    à l'instanciation, pas au premier grab.
+    """
+
+    name = "source"
+    live = False
+
+    def poll(self):
+        return True
+
+    @abstractmethod
+    def region(self) -> dict | None:
+        """Région {"x", "y", "width", "height"} à capturer, ou None."""
+
+    @abstractmethod
+    def grab(self, region: dict | None = None):
+        """Frame de la région, ou None si rien à lire."""
+
+    def grab_rois(self, region: dict | None, rois: dict):
+        img = self.grab(region)
+        return crop_rois(img, rois) if img is not None else None
+
+    def close(self) -> None:
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class LiveSource(CaptureSource):
+    """Écran réel : fenêtre MuMu via WindowTracker (ou find_mumu_window), capture mss.
+
+    La région est lue dans la config (mumu_region) à chaque appel, comme avant.
+    """
+
+    name = "live"
+    live = True
+
+    def __init__(self, config=None, window=None):
+        self._config = config
+        self._window = window
+
+    def poll(self):
+        if self._window is not None:
+            return self._window.poll()
+        from tracker.capture import screen  # noqa: PLC0415
+        return screen.find_mumu_window()
+
+    def region(self) -> dict | None:
+        if self._config is None:
+            return None
+        return self._config.get_all().get("mumu_region")
+
+    def grab(self, region: dict | None = None):
+        from tracker.capture import screen  # noqa: PLC0415
+        region = region or self.region()
+        return screen.capture_region_frame(region) if region else None
+
+    def grab_rois(self, region: dict | None, rois: dict):
+        from tracker.capture import screen  # noqa: PLC0415
+        region = region or self.region()
+        return screen.capture_rois(region, rois) if region else None
+
+
+class _SequenceSource(CaptureSource):
+    """Base des sources hors ligne : frames lues une à une, dans l'ordre.
+
+    Chaque grab() avance d'une frame ; en fin de séquence, poll() retourne
+    None (équivalent d'un émulateur fermé) sauf si `loop=True`.
+    """
+
+    def __init__(self, loop: bool = False):
+        self._loop = loop
+        self._pos = 0
+        self._lock = threading.Lock()
+        self._region = None
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Nombre de frames de la séquence."""
+
+    @abstractmethod
+    def _load(self, i: int):
+        """Frame d'indice `i`."""
+
+    @property
+    def position(self) -> int:
+        """Indice de la prochaine frame à lire."""
+        with self._lock:
+            return self._pos
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return not self._loop and self._pos >= len(self)
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._pos = 0
+
+    def poll(self):
+        return None if self.exhausted or len(self) == 0 else True
+
+    def region(self) -> dict | None:
+        if self._region is None and len(self) > 0:
+            w, h = self._load(0).size
+            self._region = {"x": 0, "y": 0, "width": w, "height": h}
+        return self._region
+
+    def grab(self, region: dict | None = None):
+        with self._lock:
+            n = len(self)
+            if n == 0 or (self._pos >= n and not self._loop):
+                return None
+            i = self._pos % n
+            self._pos += 1
+        return self._load(i)
+
+
+class DirectorySource(_SequenceSource):
+    """Captures d'écran d'un dossier (ordre alphabétique), ex. detection_samples/<label>/."""
+
+    name = "directory"
+
+    def __init__(self, path: str, loop: bool = False, recursive: bool = False):
+        super().__init__(loop=loop)
+        self._path = path
+        self._files = _list_images(path, recursive)
+        if not self._files:
+            logger.warning("DirectorySource: aucune image dans %s", path)
+
+    @property
+    def files(self) -> list:
+        return list(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _load(self, i: int):
+        from PIL import Image  # noqa: PLC0415
+        with Image.open(self._files[i]) as img:
+            return Frame.from_pil(img.convert("RGB"))
+
+    def __repr__(self):
+        return f"DirectorySource({self._path!r}, {len(self)} images)"
+
+
+class ReplaySource(_SequenceSource):
+    """Session enregistrée (.ptcgrec) rejouée frame par frame."""
+
+    name = "replay"
+
+    def __init__(self, replay, loop: bool = False):
+        super().__init__(loop=loop)
+        if isinstance(replay, str):
+            from tracker.capture.recording import SessionReplay  # noqa: PLC0415
+            replay = SessionReplay(replay)
+        self._replay = replay
+
+    @property
+    def replay(self):
+        return self._replay
+
+    def __len__(self) -> int:
+        return len(self._replay)
+
+    def _load(self, i: int):
+        return self._replay.frame(i)
+
+    def close(self) -> None:
+        self._replay.close()
+
+    def __repr__(self):
+        return f"ReplaySource({len(self)} frames)"
+
+
+def _list_images(path: str, recursive: bool) -> list:
+    if recursive:
+        found = [os.path.join(root, f) for root, _, files in os.walk(path) for f in files]
+    else:
+        found = [os.path.join(path, f) for f in os.listdir(path)] if os.path.isdir(path) else []
+    return sorted(f for f in found if f.lower().endswith(_IMAGE_EXTENSIONS))
+
+
+def make_source(spec: str | None = None, config=None, window=None, loop: bool = False) -> CaptureSource:
+    """Source de capture depuis une spécification texte.
+
+    None / "" / "live" → LiveSource ; dossier → DirectorySource ;
+    fichier .ptcgrec → ReplaySource. ValueError sinon.
+    """
+    if not spec or spec == "live":
+        return LiveSource(config=config, window=window)
+    if os.path.isdir(spec):
+        return DirectorySource(spec, loop=loop)
+    if spec.endswith(".ptcgrec") and os.path.isfile(spec):
+        return ReplaySource(spec, loop=loop)
+    raise ValueError(f"Source de capture inconnue : {spec!r}")
@@ -0,0 +1,232 @@
+"""tracker/capture/stats_screen.py — Détection rapide du tableau de stats de fin de combat.
+
+Après la carte résultat ("Touchez pour continuer"), le jeu affiche un
+tableau de stats (Ordre d'action, Tours joués, Vos points, Points
+adversaire, Dégâts infligés) dans OcrPipeline._ZONE_BOTTOM. Tant que ce
+tableau n'est pas affiché, l'OCR complet de l'écran de fin est inutile.
+
+StatsScreenDetector décide sur une vignette de luminance de la zone (~1 ms),
+positif si l'un des deux critères est rempli :
+- gabarit : corrélation normalisée (contours horizontaux) avec la vignette du
+  dernier tableau de stats confirmé par l'OCR (learn), persistée dans data/ ;
+- structure en lignes : plusieurs bandes de texte horizontales
+  séparées par des interlignes, avec du texte côté label (gauche) ET côté
+  valeur (droite) — la carte star ou le texte centré "Touchez pour
+  continuer" n'ont pas cette structure.
+
+wait_for_stats : boucle de main._capture_end_screen — l'OCR ne tourne que sur
+les frames que le détecteur accepte, plus une OCR de secours quand le
+détecteur refuse tout depuis `ocr_every` secondes (un faux négatif retarde
+l'enregistrement sans le perdre). Chaque secours infructueux double l'attente
+du suivant (5, 10, 20… s, plafonnée) : deux OCR de secours au plus sur une
+carte résultat de 30 s.
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from PIL import Image
+
+from tracker.capture.frame import roi_box, to_pil_rgb
+
+logger = logging.getLogger(__name__)
+
+STATS_THUMB_SIZE = (128, 48)
+STATS_TEMPLATE_MIN = 0.80     # corrélation minimale avec le gabarit appris
+STATS_EDGE_MIN = 3.0          # énergie de contour minimale d'une ligne de texte (0-255)
+STATS_VALUE_EDGE_MIN = 20.0   # contraste minimal d'une valeur (max de la ligne, 0-255)
+STATS_MIN_ROWS = 3            # lignes label + valeur nécessaires
+STATS_MAX_ROWS = 8
+STATS_OCR_EVERY = 5.0         # s : OCR de secours si le détecteur refuse tout
+STATS_OCR_EVERY_MAX = 40.0    # s : plafond de l'attente entre deux OCR de secours
+STATS_TIMEOUT = 90.0          # s : abandon de l'attente du tableau
+
+_TEMPLATE_FILE = "stats_screen_template.npy"
+
+
+def _bands(active: np.ndarray) -> list:
+    """[(début, fin)] des suites de lignes actives (fin exclue)."""
+    bands, start = [], None
+    for i, on in enumerate(active):
+        if on and start is None:
+            start = i
+        elif not on and start is not None:
+            bands.append((start, i))
+            start = None
+    if start is not None:
+        bands.append((start, len(active)))
+    return bands
+
+
+class StatsScreenDetector:
+    """Porte « tableau de stats affiché ? » devant extract_end_screen_data."""
+
+    def __init__(self, zone: tuple | None = None, template_path: str | None = None):
+        if zone is None:
+            from tracker.capture.ocr import OcrPipeline  # noqa: PLC0415
+            zone = OcrPipeline._ZONE_BOTTOM
+        if template_path is None:
+            from tracker.paths import get_data_dir  # noqa: PLC0415
+            template_path = os.path.join(get_data_dir(), _TEMPLATE_FILE)
+        self._zone = zone
+        self._template_path = template_path
+        self._template = None
+        self._template_loaded = False
+        self._lock = threading.Lock()
+        self._checks = 0
+        self._positives = 0
+
+    # ------------------------------------------------------------------
+    # Signature
+    # ------------------------------------------------------------------
+
+    def thumbnail(self, img) -> np.ndarray:
+        """Vignette de luminance (48, 128) float32 de la zone du tableau (moyenne par bloc)."""
+        zone = to_pil_rgb(img.crop(roi_box(img.size, self._zone))).convert("L")
+        return np.asarray(zone.resize(STATS_THUMB_SIZE, Image.BOX), dtype=np.float32)
+
+    @staticmethod
+    def _normalized(thumb: np.ndarray) -> np.ndarray:
+        edges = np.abs(np.diff(thumb, axis=1)).ravel()
+        edges = edges - edges.mean()
+        norm = float(np.linalg.norm(edges))
+        return edges / norm if norm > 0 else edges
+
+    # ------------------------------------------------------------------
+    # Décision
+    # ------------------------------------------------------------------
+
+    def row_structure(self, thumb: np.ndarray) -> int:
+        """Nombre de lignes de texte ayant un label ET une valeur (0 si pas un tableau)."""
+        edges = np.abs(np.diff(thumb, axis=1))
+        half = edges.shape[1] // 2
+        left = edges[:, :half].mean(axis=1)
+        # Valeurs parfois courtes ("3", "12") : maximum plutôt que moyenne
+        right = edges[:, half:].max(axis=1)
+        threshold = max(STATS_EDGE_MIN, 0.25 * float(left.max()))
+        active = left >= threshold
+        # Interlignes : au moins un tiers de la zone sans texte côté label
+        if active.mean() > 2 / 3:
+            return 0
+        bands = _bands(active)
+        if not STATS_MIN_ROWS <= len(bands) <= STATS_MAX_ROWS:
+            return 0
+        return sum(1 for b0, b1 in bands if right[b0:b1].max() >= STATS_VALUE_EDGE_MIN)
+
+    def score(self, img) -> dict:
+        """{"template": corrélation avec le gabarit (None sans gabarit), "rows": lignes}."""
+        thumb = self.thumbnail(img)
+        template = self._load_template()
+        corr = None
+        if template is not None and template.shape == thumb.shape:
+            corr = float(self._normalized(thumb) @ self._normalized(template))
+        return {"template": corr, "rows": self.row_structure(thumb)}
+
+    def is_stats_screen(self, img) -> bool:
+        """Gabarit reconnu OU structure en lignes label/valeur."""
+        try:
+            score = self.score(img)
+        except Exception as e:
+            logger.debug("StatsScreenDetector: %s", e)
+            return False
+        found = (score["template"] is not None and score["template"] >= STATS_TEMPLATE_MIN) \
+            or score["rows"] >= STATS_MIN_ROWS
+        with self._lock:
+            self._checks += 1
+            self._positives += int(found)
+        return found
+
+    # ------------------------------------------------------------------
+    # Gabarit appris
+    # ------------------------------------------------------------------
+
+    def learn(self, img) -> None:
+        """Mémorise (et persiste) la vignette d'un tableau de stats confirmé par l'OCR."""
+        try:
+            thumb = self.thumbnail(img)
+        except Exception as e:
+            logger.debug("StatsScreenDetector.learn: %s", e)
+            return
+        with self._lock:
+            self._template, self._template_loaded = thumb, True
+        try:
+            tmp = self._template_path + ".tmp.npy"
+            np.save(tmp, thumb)
+            os.replace(tmp, self._template_path)
+        except OSError as e:
+            logger.warning("Gabarit écran de stats non sauvegardé: %s", e)
+
+    def _load_template(self):
+        with self._lock:
+            if not self._template_loaded:
+                self._template_loaded = True
+                if os.path.exists(self._template_path):
+                    try:
+                        self._template = np.load(self._template_path)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Gabarit écran de stats illisible: %s", e)
+            return self._template
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {"checks": self._checks, "positives": self._positives,
+                    "template": self._template is not None}
+
+
+def wait_for_stats(next_image, extract, detector=None, timeout: float = STATS_TIMEOUT,
+                   attempts: int | None = None,
+                   interval: float = 0.15, ocr_every: float = STATS_OCR_EVERY,
+                   ocr_every_max: float = STATS_OCR_EVERY_MAX,
+                   sleep=time.sleep, clock=time.monotonic) -> dict:
+    """Attend le tableau de stats et retourne son OCR.
+
+    next_image() → image ou None ; extract(img) → dict d'extract_end_screen_data.
+    Sans détecteur, chaque frame passe par l'OCR (comportement historique).
+    Avec détecteur, l'OCR de secours attend `ocr_every` s, puis le double après
+    chaque secours infructueux (jusqu'à `ocr_every_max`).
+    L'attente est bornée par `timeout` secondes de `clock()` (next_image peut
+    bloquer jusqu'à la frame suivante du bus) ; `attempts` plafonne en plus le
+    nombre de frames.
+    Retourne {"data", "image", "attempt", "ocr_calls", "safety_calls", "skipped"}
+    — data/image None si le tableau n'a pas été vu avant l'échéance.
+    """
+    result = {"data": None, "image": None, "attempt": None, "ocr_calls": 0,
+              "safety_calls": 0, "skipped": 0}
+    last_ocr = clock()
+    deadline = last_ocr + timeout
+    backoff = ocr_every
+    attempt = -1
+    while clock() < deadline and (attempts is None or attempt + 1 < attempts):
+        attempt += 1
+        img = next_image()
+        if clock() >= deadline:
+            break
+        if img is None:
+            sleep(interval)
+            continue
+        safety = detector is not None and not detector.is_stats_screen(img)
+        if safety and clock() - last_ocr < backoff:
+            result["skipped"] += 1
+            sleep(interval)
+            continue
+        if safety:
+            result["safety_calls"] += 1
+            backoff = min(2 * backoff, max(ocr_every, ocr_every_max))
+        last_ocr = clock()
+        result["ocr_calls"] += 1
+        try:
+            data = extract(img)
+        except Exception:
+            continue
+        raw = data.get("raw_ocr_data", "").lower()
+        if data.get("turns_played") is not None or "tours jou" in raw or "ordre d" in raw:
+            if detector is not None:
+                detector.learn(img)
+            result.update(data=data, image=img, attempt=attempt + 1)
+            return result
+        sleep(interval)
+    return result
@@ -0,0 +1,128 @@
+"""tracker/capture/temporal.py — Filtre temporel probabiliste sur CombatState.
+
+StateFilter : modèle de Markov caché à 4 états (IDLE, PRE_QUEUE, IN_COMBAT,
+END_SCREEN) mis à jour par filtre forward à chaque frame :
+
+    prédiction  : α ← α · A(dt)        A dérivée de taux de transition (1/s)
+    correction  : α ← α ⊙ e(p)         e = émission depuis predict_proba
+    normalisation
+
+- A(dt) ne permet que les transitions du jeu (celles de PollingLoop) ; la
+  probabilité de quitter un état pendant dt vaut 1 - exp(-taux · dt), le
+  filtre est donc indépendant de la cadence de polling.
+- e(p) : pour chaque état caché, Σ_classe B[état][classe] · p(classe | frame).
+  IDLE (menus, lobby, combats non classés) n'a pas de classe dédiée dans le
+  classificateur : son émission est large, surtout in_combat/end_screen.
+- La croyance est restreinte à l'état validé et à ses successeurs directs
+  (absorbants : détection de changement depuis l'état validé). Une
+  transition est validée dès que la probabilité a posteriori d'un
+  successeur dépasse `threshold`, puis la croyance est recentrée sur ce
+  nouvel état. Une frame très sûre (p ≈ 0.98) valide IDLE → PRE_QUEUE et
+  IN_COMBAT → END_SCREEN, comme l'ancien moteur à un tick ; PRE_QUEUE →
+  IN_COMBAT en demande trois. Une suite de frames ambiguës en demande
+  davantage, une frame isolée aberrante (p ≈ 0.9) ne suffit pas.
+
+Taux et émissions réglés avec tools/eval_state_engine.py --synthetic : les
+taux sont des a priori de latence, pas des durées réelles (un combat dure
+plusieurs minutes, son taux de sortie vaut pourtant 1/s).
+"""
+import math
+
+import numpy as np
+
+from tracker.capture.detector import CombatState
+
+_STATES = (CombatState.IDLE, CombatState.PRE_QUEUE, CombatState.IN_COMBAT,
+           CombatState.END_SCREEN)
+_INDEX = {state: i for i, state in enumerate(_STATES)}
+_CLASSES = ("pre_queue", "in_combat", "end_screen")
+
+# Taux de transition (par seconde) — même topologie que PollingLoop
+TRANSITION_RATES = {
+    (CombatState.IDLE, CombatState.PRE_QUEUE): 1.0,
+    (CombatState.PRE_QUEUE, CombatState.IN_COMBAT): 1.0,
+    (CombatState.PRE_QUEUE, CombatState.IDLE): 0.2,
+    (CombatState.IN_COMBAT, CombatState.END_SCREEN): 1.0,
+    (CombatState.IN_COMBAT, CombatState.PRE_QUEUE): 0.005,
+    (CombatState.END_SCREEN, CombatState.IDLE): 2.0,
+}
+
+# Émission B[état caché][classe du classificateur]
+EMISSIONS = {
+    # Combat non classé depuis les menus : in_combat/end_screen ne sortent pas d'IDLE
+    CombatState.IDLE:       {"pre_queue": 0.05, "in_combat": 0.57, "end_screen": 0.38},
+    CombatState.PRE_QUEUE:  {"pre_queue": 0.90, "in_combat": 0.05, "end_screen": 0.05},
+    # Certaines animations de combat ressemblent aux menus : confusion pre_queue tolérée
+    CombatState.IN_COMBAT:  {"pre_queue": 0.15, "in_combat": 0.84, "end_screen": 0.01},
+    CombatState.END_SCREEN: {"pre_queue": 0.05, "in_combat": 0.05, "end_screen": 0.90},
+}
+
+
+class StateFilter:
+    """Filtre forward sur CombatState alimenté par les probabilités du classificateur.
+
+    Usage :
+        f = StateFilter()
+        state = f.update(detector.predict_proba(img), dt=0.1)
+    """
+
+    def __init__(self, threshold: float = 0.9, rates: dict | None = None,
+                 emissions: dict | None = None, initial: CombatState = CombatState.IDLE):
+        self._threshold = threshold
+        self._rates = {**TRANSITION_RATES, **(rates or {})}
+        emissions = {**EMISSIONS, **(emissions or {})}
+        self._B = np.array([[emissions[s].get(c, 0.0) for c in _CLASSES] for s in _STATES])
+        self._A_cache = {}
+        self.reset(initial)
+
+    @property
+    def state(self) -> CombatState:
+        return self._state
+
+    @property
+    def posterior(self) -> dict:
+        return {state.value: float(p) for state, p in zip(_STATES, self._alpha)}
+
+    def reset(self, state: CombatState) -> None:
+        """Croyance concentrée sur `state` (transition imposée de l'extérieur)."""
+        self._state = state
+        self._alpha = np.zeros(len(_STATES))
+        self._alpha[_INDEX[state]] = 1.0
+
+    def transition_matrix(self, dt: float, state: CombatState | None = None) -> np.ndarray:
+        """Matrice de transition pour dt. Avec `state`, seules ses sorties sont
+        conservées (les autres états sont absorbants)."""
+        key = (round(dt, 6), state)
+        A = self._A_cache.get(key)
+        if A is None:
+            A = np.zeros((len(_STATES), len(_STATES)))
+            for (src, dst), rate in self._rates.items():
+                if state is None or src == state:
+                    A[_INDEX[src], _INDEX[dst]] = rate
+            out = A.sum(axis=1)
+            # Probabilité de quitter l'état pendant dt, répartie au prorata des taux
+            leave = 1.0 - np.exp(-out * dt)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                A = np.where(out[:, None] > 0, A / out[:, None] * leave[:, None], 0.0)
+            A[np.diag_indices_from(A)] = 1.0 - leave
+            self._A_cache[key] = A
+        return A
+
+    def update(self, proba: dict, dt: float) -> CombatState:
+        """Intègre une frame (probabilités par classe) ; retourne l'état validé."""
+        p = np.array([float(proba.get(c, 0.0)) for c in _CLASSES])
+        if p.sum() <= 0:
+            return self._state
+        p /= p.sum()
+        alpha = self._alpha @ self.transition_matrix(dt, self._state)
+        alpha *= self._B @ p
+        total = alpha.sum()
+        if not math.isfinite(total) or total <= 0:
+            self.reset(self._state)
+            return self._state
+        self._alpha = alpha / total
+
+        best = _STATES[int(np.argmax(self._alpha))]
+        if best != self._state and self._alpha[_INDEX[best]] >= self._threshold:
+            self.reset(best)
+        return self._state
@@ -19,6 +19,16 @@ CONFIG_DEFAULTS = {
     "active_deck_id": None,
     "active_season": None,
     "theme": "ptcg-dark",
+    # Moteur de transitions : "debounce" (compteurs) ou "filter" (filtre HMM)
+    "state_engine": "debounce",
+    # Classificateur d'état : "svm" (HOG + SVM) ou "cnn" (petit CNN torch, state_classifier_cnn.pt)
+    "state_backend": "svm",
+    # Threads torch du processus principal (CNN d'état + EasyOCR) : None = défaut torch
+    "torch_threads": None,
+    # OCR hors processus : 0 = reader EasyOCR dans le processus principal,
+    # N > 0 = N workers (ocr_pool.py), au plus ocr_max_inflight requêtes en vol
+    "ocr_workers": 0,
+    "ocr_max_inflight": None,
 }
 
 
@@ -24,6 +24,7 @@ class SampleManager {
         this._captureNowBtn = null;
         this._captureNowStatus = null;
         this._pollInterval = null;
+        this._prelabelBtn = null;
     }
 
     init() {
@@ -36,10 +37,12 @@ class SampleManager {
         this._captureNowBtn   = document.getElementById('capture-now-btn');
         this._captureNowStatus = document.getElementById('capture-now-status');
         const refreshBtn      = document.getElementById('sampling-refresh-btn');
+        this._prelabelBtn     = document.getElementById('sampling-prelabel-btn');
 
         if (this._startBtn)      this._startBtn.addEventListener('click', () => this._start());
         if (this._stopBtn)       this._stopBtn.addEventListener('click',  () => this._stop());
         if (refreshBtn)          refreshBtn.addEventListener('click', () => this._loadGallery());
+        if (this._prelabelBtn)   this._prelabelBtn.addEventListener('click', () => this._prelabel());
         if (this._captureNowBtn) this._captureNowBtn.addEventListener('click', () => this._captureNow());
 
         window.addEventListener('tab-changed', (e) => {
@@ -69,6 +72,22 @@ class SampleManager {
         }
     }
 
+    async _prelabel() {
+        this._prelabelBtn.disabled = true;
+        try {
+            const r = await window.pywebview.api.prelabel_samples();
+            if (r && r.error) {
+                this._statusText.textContent = r.error;
+            } else {
+                await this._loadGallery();
+            }
+        } catch (e) {
+            this._statusText.textContent = 'Erreur inattendue';
+        } finally {
+            this._prelabelBtn.disabled = false;
+        }
+    }
+
     async _start() {
         this._startBtn.disabled = true;
         this._statusText.textContent = 'Démarrage…';
@@ -148,6 +167,12 @@ class SampleManager {
 
         const autoLabel = SAMPLE_LABELS.find(l => l.key === sample.auto_label);
         const autoText  = autoLabel ? autoLabel.label : sample.auto_label;
+        const suggested = SAMPLE_LABELS.find(l => l.key === sample.suggested_label);
+        const suggestedHtml = sample.suggested_label ? `
+            <p class="text-xs mb-2">
+                Modèle : <span class="badge badge-sm badge-primary">${suggested ? suggested.label : sample.suggested_label}</span>
+                <span class="opacity-60">${Math.round(sample.confidence * 100)} %</span>
+            </p>` : '';
 
         card.innerHTML = `
             <img src="data:image/jpeg;base64,${sample.thumbnail}"
@@ -155,7 +180,7 @@ class SampleManager {
             <p class="text-xs font-mono opacity-50 mb-1 truncate">${sample.filename}</p>
             <p class="text-xs mb-2">
                 Auto-label : <span class="badge badge-sm badge-outline">${autoText}</span>
-            </p>
+            </p>${suggestedHtml}
             <div class="flex flex-wrap gap-1">
                 ${SAMPLE_LABELS.map(l => `
                     <button class="btn btn-xs ${l.style}"